@@ -1,19 +1,34 @@
 import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 import json
 from datetime import datetime, timedelta
 import logging
 from telegram import Bot
 from telegram.constants import ParseMode
 from dotenv import load_dotenv
-from PIL import Image, ImageDraw, ImageFont
 import os
 import asyncio
 import pytz
-import time
 import sys
 import traceback
+from src.config import settings
+from src.services.headshot_service import HeadshotService
+from src.services.http_client import get_http_client, telegram_request
+from src.services.rate_limiter import THROTTLE_STATUSES, get_rate_limiter, run_limited
+from src.services.backfill_pipeline import BackfillPipeline
+from src.services.collage_output import persist_collage
+from src.services.collage_template import VERTICAL_PHOTO_SIZE
+from src.services.render_cache import render_key
+from src.services.telegram_files import send_photo
+from src.services.render_service import RenderService, pack_image, render_vertical
+from src.services.period_batch import build_period_filter, fetch_periods
+from src.services.player_projection import read_players
+from src.utils.player_record import PlayerDay
+from src.services.response_archive import get_archive, set_archive_mode
+from src.services.schedule_index import get_schedule_index
+from src.services.period_trigger import PeriodTrigger
+from src.services.player_stats_store import get_week_key
+from src.services.stats_db import open_player_stats_store
+from src.utils.team_utils import top_k
 
 # Конфигурация
 LOG_FILE = "C:\\dev\\fantasy-hockey-bot\\log.txt"
@@ -21,7 +36,8 @@ ESPN_TIMEZONE = pytz.timezone('US/Eastern')  # Используем только
 SEASON_START_DATE = datetime(2024, 10, 4, tzinfo=ESPN_TIMEZONE)
 SEASON_START_SCORING_PERIOD_ID = 1
 LEAGUE_ID = 484910394
-API_URL_TEMPLATE = 'https://lm-api-reads.fantasy.espn.com/apis/v3/games/fhl/seasons/2025/segments/0/leagues/{league_id}?view=kona_player_info'
+SEASON_ID = 2025
+API_URL_TEMPLATE = 'https://lm-api-reads.fantasy.espn.com/apis/v3/games/fhl/seasons/{season}/segments/0/leagues/{league_id}?view=kona_player_info'
 PLAYER_STATS_FILE = "player_stats.json"
 
 POSITION_MAP = {
@@ -40,19 +56,21 @@ GRADE_COLORS = {
     "legend": "orange"
 }
 
-# Настройка ретраев и таймаутов
-retry_strategy = Retry(
-    total=3,  # количество попыток
-    backoff_factor=1,  # время между попытками будет увеличиваться
-    status_forcelist=[429, 500, 502, 503, 504],  # коды ошибок для повторных попыток
-)
-adapter = HTTPAdapter(max_retries=retry_strategy)
-session = requests.Session()
-session.mount("https://", adapter)
-session.mount("http://", adapter)
+# Общий пул соединений к API ESPN (ретраи и ограничение одновременных запросов)
+session = get_http_client().session_for(API_URL_TEMPLATE)
 
 TIMEOUT = 10  # таймаут в секундах
 
+# Адаптивные ограничители частоты запросов вместо фиксированных пауз
+espn_limiter = get_rate_limiter('espn')
+telegram_limiter = get_rate_limiter('telegram')
+
+# Количество одновременных запросов к ESPN при обработке всех недель
+BACKFILL_CONCURRENCY = int(os.getenv('BACKFILL_CONCURRENCY', '4'))
+
+# Параллельная загрузка фотографий игроков для коллажей
+headshot_service = HeadshotService()
+
 # Логирование
 logging.basicConfig(
     filename=LOG_FILE,
@@ -71,7 +89,7 @@ if not TELEGRAM_TOKEN or not CHAT_ID:
     logging.error("TELEGRAM_TOKEN или CHAT_ID не установлены в файле .env.")
     exit(1)
 
-bot = Bot(token=TELEGRAM_TOKEN)
+bot = Bot(token=TELEGRAM_TOKEN, request=telegram_request())
 
 def get_current_week_dates():
     """Получение дат текущей недели по времени ESPN"""
@@ -104,142 +122,47 @@ def get_previous_week_dates():
     
     return previous_tuesday, previous_monday
 
-def update_week_period():
+def update_week_period(store=None):
     """Обновление периода недели и проверка на новую неделю"""
     tuesday, next_monday = get_current_week_dates()
-    week_key = f"{tuesday.strftime('%Y-%m-%d')}_{next_monday.strftime('%Y-%m-%d')}"
-    
-    if os.path.exists(PLAYER_STATS_FILE):
-        with open(PLAYER_STATS_FILE, 'r') as f:
-            data = json.load(f)
-    else:
-        data = {"current_week": {}, "weeks": {}}
-
-    # Проверяем, началась ли новая неделя
-    if data.get("current_week", {}).get("start_date") != tuesday.strftime("%Y-%m-%d"):
-        # Создаем структуру для новой недели
-        if week_key not in data["weeks"]:
-            data["weeks"][week_key] = {"players": {}}
-        
-        data["current_week"] = {
-            "start_date": tuesday.strftime("%Y-%m-%d"),
-            "end_date": next_monday.strftime("%Y-%m-%d")
-        }
-        
-        with open(PLAYER_STATS_FILE, 'w') as f:
-            json.dump(data, f, indent=4)
 
-    return tuesday, next_monday
+    if store is None:
+        store = open_player_stats_store(PLAYER_STATS_FILE)
 
-def calculate_grade(team_of_the_day_count):
-    """Определение грейда игрока на основе количества попаданий в команду недели"""
-    if team_of_the_day_count >= 5:
-        return "legend"
-    elif team_of_the_day_count >= 4:
-        return "epic"
-    elif team_of_the_day_count >= 3:
-        return "rare"
-    elif team_of_the_day_count >= 2:
-        return "uncommon"
-    else:
-        return "common"
+    # Создаем структуру для новой недели, если она началась
+    if store.begin_week(tuesday, next_monday):
+        store.flush()
+
+    return tuesday, next_monday
 
-def update_player_stats(player_id, name, date_str, applied_total, position, team_of_the_day=False):
-    """Обновление статистики игрока с учетом недельной статистики"""
+def update_player_stats(player_id, name, date_str, applied_total, position, team_of_the_day=False, store=None):
+    """Обновление статистики игрока с учетом недельной статистики
+    
+    Если передано хранилище, изменение применяется только в памяти и
+    сохраняется вызывающим кодом через store.flush(). Без хранилища файл
+    читается и записывается для одного игрока.
+    """
     try:
         logging.info(f"Обновление статистики для игрока {name} (ID: {player_id})")
         logging.info(f"Дата: {date_str}, Позиция: {position}, Очки: {applied_total}")
         
-        if os.path.exists(PLAYER_STATS_FILE):
-            with open(PLAYER_STATS_FILE, 'r') as f:
-                player_stats = json.load(f)
-        else:
-            player_stats = {"current_week": {}, "weeks": {}}
-
-        # Определяем к какой неделе относится дата
-        date = datetime.strptime(date_str, "%Y-%m-%d").replace(tzinfo=ESPN_TIMEZONE)
-        days_since_tuesday = (date.weekday() - 1) % 7
-        week_start = date - timedelta(days=days_since_tuesday)
-        week_end = week_start + timedelta(days=6)
-        week_key = f"{week_start.strftime('%Y-%m-%d')}_{week_end.strftime('%Y-%m-%d')}"
-        
-        logging.info(f"Неделя: {week_key}")
-
-        # Создаем структуру для недели, если её нет
-        if week_key not in player_stats["weeks"]:
-            player_stats["weeks"][week_key] = {"players": {}}
-
-        week_stats = player_stats["weeks"][week_key]["players"]
-        
-        if str(player_id) not in week_stats:
-            logging.info(f"Создание новой записи для игрока {name}")
-            week_stats[str(player_id)] = {
-                "name": name,
-                "team_of_the_day_count": 0,
-                "grade": "common",
-                "team_of_the_day_dates": [],
-                "positions": [],
-                "daily_stats": {},
-                "total_points": 0,
-                "position_appearances": {}
-            }
-
-        stats = week_stats[str(player_id)]
-        stats["name"] = name
-
-        # Проверяем, не обрабатывали ли мы уже эту дату для этого игрока
-        date_position_key = f"{position}:{date_str}"
-        if date_str in stats["daily_stats"]:
-            logging.info(f"Статистика за {date_str} уже существует, пропускаем обновление")
-            return stats["grade"]
-        
-        # Добавляем позицию, если её еще нет
-        if position not in stats["positions"]:
-            logging.info(f"Добавление новой позиции {position} для игрока {name}")
-            stats["positions"].append(position)
-        
-        # Обновляем счетчик появлений для позиции
-        if position not in stats["position_appearances"]:
-            stats["position_appearances"][position] = 0
-        stats["position_appearances"][position] += 1
-        logging.info(f"Появлений на позиции {position}: {stats['position_appearances'][position]}")
-
-        # Сохраняем статистику за день
-        stats["daily_stats"][date_str] = {
-            "points": applied_total,
-            "position": position,
-            "team_of_the_day": team_of_the_day
-        }
-        logging.info(f"Сохранена статистика за {date_str}: {applied_total} очков")
-
-        # Обновляем общее количество очков
-        stats["total_points"] = sum(day["points"] for day in stats["daily_stats"].values())
-        logging.info(f"Общее количество очков: {stats['total_points']}")
-
-        # Проверяем уникальность даты перед добавлением
-        if team_of_the_day and date_position_key not in stats["team_of_the_day_dates"]:
-            stats["team_of_the_day_dates"].append(date_position_key)
-            stats["team_of_the_day_count"] = len(stats["team_of_the_day_dates"])
-            stats["grade"] = calculate_grade(stats["team_of_the_day_count"])
-            logging.info(f"Обновление грейда для игрока {name}: {stats['grade']} ({stats['team_of_the_day_count']} раз)")
-
-        # Обновляем информацию о текущей неделе
-        current_date = datetime.now(ESPN_TIMEZONE)
-        current_days_since_tuesday = (current_date.weekday() - 1) % 7
-        current_week_start = current_date - timedelta(days=current_days_since_tuesday)
-        current_week_end = current_week_start + timedelta(days=6)
-        
-        player_stats["current_week"] = {
-            "start_date": current_week_start.strftime("%Y-%m-%d"),
-            "end_date": current_week_end.strftime("%Y-%m-%d")
-        }
-
-        # Сохраняем обновленные данные
-        with open(PLAYER_STATS_FILE, 'w') as f:
-            json.dump(player_stats, f, indent=4)
-        logging.info(f"Данные успешно сохранены в {PLAYER_STATS_FILE}")
+        single_update = store is None
+        if single_update:
+            store = open_player_stats_store(PLAYER_STATS_FILE)
+
+        grade = store.record_selection(
+            player_id=player_id,
+            name=name,
+            date_str=date_str,
+            applied_total=applied_total,
+            position=position,
+            team_of_the_day=team_of_the_day
+        )
+
+        if single_update:
+            store.flush()
         
-        return stats["grade"]
+        return grade
     except Exception as e:
         logging.error(f"Ошибка при обновлении статистики игрока {name}: {str(e)}")
         traceback.print_exc()
@@ -247,34 +170,64 @@ def update_player_stats(player_id, name, date_str, applied_total, position, team
 
 def fetch_player_data(scoring_period_id, league_id, max_retries=3, timeout=10):
     """Получение данных игроков из API ESPN с поддержкой повторных попыток"""
+    filters = build_period_filter([scoring_period_id])
+    return request_player_data(filters, league_id, f"scoring_period_id={scoring_period_id}", max_retries, timeout)
+
+def fetch_player_data_range(scoring_period_ids, league_id, max_retries=3, timeout=10):
+    """Получение данных за несколько игровых дней одним запросом
+    
+    Ответ раскладывается на рейтинги по дням локально. Дни, для которых пакетный
+    ответ неполный (обрезан лимитом или без игроков), загружаются по одному.
+    
+    Returns:
+        dict: {scoring_period_id: данные в формате fetch_player_data или None}
+    """
+    scoring_period_ids = list(scoring_period_ids)
+    if len(scoring_period_ids) <= 1:
+        return {period_id: fetch_player_data(period_id, league_id, max_retries, timeout) for period_id in scoring_period_ids}
+
+    def request(filters):
+        players_filter = filters['players']
+        label = f"scoring_period_id={scoring_period_ids[0]}..{scoring_period_ids[-1]} offset={players_filter.get('offset', 0)}"
+        return request_player_data(filters, league_id, label, max_retries, timeout, allow_empty=True)
+
+    periods, missing = fetch_periods(request, scoring_period_ids)
+    for period_id in missing:
+        periods[period_id] = fetch_player_data(period_id, league_id, max_retries, timeout)
+    return periods
+
+def request_player_data(filters, league_id, label, max_retries=3, timeout=10, allow_empty=False):
+    """Получение ответа kona_player_info с учетом архива ответов (--offline / --replay)"""
+    periods = filters['players']['filterStatsForCurrentSeasonScoringPeriodId']['value']
+    return get_archive().fetch(
+        league_id,
+        SEASON_ID,
+        periods,
+        filters,
+        lambda: _request_player_data(filters, league_id, label, max_retries, timeout, allow_empty)
+    )
+
+def _request_player_data(filters, league_id, label, max_retries=3, timeout=10, allow_empty=False):
+    """Выполнение запроса kona_player_info с фильтром и повторными попытками"""
     base_headers = {
         'Accept': 'application/json',
         'User-Agent': 'Mozilla/5.0',
     }
 
-    filters = {
-        "players": {
-            "filterSlotIds": {"value": [0, 6, 1, 2, 4, 5]},
-            "filterStatsForCurrentSeasonScoringPeriodId": {"value": [scoring_period_id]},
-            "sortAppliedStatTotalForScoringPeriodId": {"sortAsc": False, "sortPriority": 2, "value": scoring_period_id},
-            "limit": 100
-        }
-    }
-
-    url = API_URL_TEMPLATE.format(league_id=league_id)
+    url = API_URL_TEMPLATE.format(season=SEASON_ID, league_id=league_id)
     retry_count = 0
     
     while retry_count < max_retries:
         try:
-            logging.info(f"Запрос данных для scoring_period_id={scoring_period_id} (попытка {retry_count + 1}/{max_retries})")
+            logging.info(f"Запрос данных для {label} (попытка {retry_count + 1}/{max_retries})")
             headers = base_headers.copy()
             headers['x-fantasy-filter'] = json.dumps(filters)
-            response = session.get(url, headers=headers, timeout=timeout)
+            response = session.get(url, headers=headers, timeout=timeout, stream=True)
             response.raise_for_status()
-            data = response.json()
-            if not data.get('players'):
+            data = read_players(response)
+            if not data.get('players') and not allow_empty:
                 raise ValueError("Получен пустой список игроков")
-            logging.info(f"Успешно получены данные для scoring_period_id={scoring_period_id}")
+            logging.info(f"Успешно получены данные для {label}")
             return data
         except requests.exceptions.Timeout:
             retry_count += 1
@@ -282,59 +235,63 @@ def fetch_player_data(scoring_period_id, league_id, max_retries=3, timeout=10):
             if retry_count == max_retries:
                 logging.error("Превышено максимальное количество попыток из-за таймаута")
                 return None
-            time.sleep(2 * retry_count)  # Увеличиваем время ожидания с каждой попыткой
+            # Снижаем частоту запросов; следующая попытка дождется разрешения ограничителя
+            espn_limiter.on_throttle()
         except requests.exceptions.RequestException as e:
             retry_count += 1
             logging.warning(f"Ошибка при запросе данных: {str(e)} (попытка {retry_count}/{max_retries})")
             if retry_count == max_retries:
                 logging.error(f"Превышено максимальное количество попыток: {str(e)}")
                 return None
-            time.sleep(2 * retry_count)
+            # Ответы 429/503 ограничитель уже учел в пуле соединений; остальные
+            # ошибки снижают скорость, и следующая попытка ждет разрешения
+            status = getattr(getattr(e, 'response', None), 'status_code', None)
+            if status not in THROTTLE_STATUSES:
+                espn_limiter.on_throttle()
         except ValueError as e:
             logging.error(f"Ошибка в данных: {str(e)}")
             return None
         except requests.exceptions.ConnectionError as e:
             if "NameResolutionError" in str(e):
                 retry_count += 1
-                wait_time = min(8, 2 ** (retry_count - 1))  # 2, 4, 8 секунд
-                logging.warning(f"Ошибка разрешения имени при запросе данных (попытка {retry_count}/3). Ожидание {wait_time} сек...")
+                logging.warning(f"Ошибка разрешения имени при запросе данных (попытка {retry_count}/3)")
                 if retry_count == 3:
                     logging.error("Превышено максимальное количество ��опыток из-за ошибки разрешения имени")
                     return None
-                time.sleep(wait_time)
+                espn_limiter.on_throttle()
             else:
                 raise e
         except Exception as e:
             logging.error(f"Неожиданная ошибка: {str(e)}")
             return None
 
-def parse_player_data(data, scoring_period_id, target_date):
-    """Разбор данных игроков с учетом недельной статистики"""
+def parse_player_data(data, scoring_period_id, target_date, store=None):
+    """Разбор данных игроков с учетом недельной статистики
+    
+    Returns:
+        dict: {позиция: [PlayerDay]}
+    """
     players_data = data.get('players', [])
     positions = {'C': [], 'LW': [], 'RW': [], 'D': [], 'G': []}
 
     try:
-        with open(PLAYER_STATS_FILE, 'r') as f:
-            player_stats = json.load(f)
-            
-        # Определяем неделю для целевой даты
-        days_since_tuesday = (target_date.weekday() - 1) % 7
-        week_start = target_date - timedelta(days=days_since_tuesday)
-        week_end = week_start + timedelta(days=6)
-        week_key = f"{week_start.strftime('%Y-%m-%d')}_{week_end.strftime('%Y-%m-%d')}"
-        
-        week_stats = player_stats.get("weeks", {}).get(week_key, {}).get("players", {})
+        if store is None:
+            store = open_player_stats_store(PLAYER_STATS_FILE)
+        week_stats = store.get_week_players(get_week_key(target_date))
     except Exception as e:
         logging.warning(f"Ошибка при загрузке файла статистики игроков: {e}")
         week_stats = {}
 
+    # Игроки команд, не игравших в этот день, не участвуют в выборе
+    schedule = get_schedule_index()
+
     for player_entry in players_data:
         player = player_entry.get('player', {})
-        player_id = str(player.get('id', 'unknown'))
-        name = player.get('fullName', 'Unknown')
-        position_id = player.get('defaultPositionId', -1)
-        position = POSITION_MAP.get(position_id, 'Unknown')
-        image_url = f"https://a.espncdn.com/combiner/i?img=/i/headshots/nhl/players/full/{player_id}.png&w=130&h=100"
+        position = POSITION_MAP.get(player.get('defaultPositionId', -1))
+        if position not in positions:
+            continue
+        if schedule is not None and not schedule.team_played(scoring_period_id, player.get('proTeamId')):
+            continue
 
         applied_total = 0
         for stat in player.get('stats', []):
@@ -342,99 +299,97 @@ def parse_player_data(data, scoring_period_id, target_date):
                 applied_total = round(stat.get('appliedTotal', 0), 2)
                 break
 
-        if position in positions:
-            positions[position].append({
-                'id': player_id,
-                'name': name,
-                'appliedTotal': applied_total,
-                'image_url': image_url,
-                'grade': week_stats.get(player_id, {}).get("grade", "common")
-            })
+        # URL фото и строки для вывода строятся по запросу только для игроков команды
+        record = PlayerDay(
+            str(player.get('id', 'unknown')),
+            player.get('fullName', 'Unknown'),
+            player.get('defaultPositionId'),
+            points=applied_total
+        )
+        record.grade = week_stats.get(record.id, {}).get("grade", "common")
+        positions[position].append(record)
 
     return positions
 
-def create_collage(team, date_str):
-    """Создание коллажа с учетом грейдов игроков"""
-    player_img_width, player_img_height = 130, 100
-    padding = 20
-    text_padding = 10
-    line_height = player_img_height + text_padding + 30 + padding
+def collage_rows(team):
+    """Строки коллажа команды дня: (игрок, подпись, цвет по грейду)"""
+    return [
+        (player, f"{position}: {player.name} ({player.points:.2f} ftps)", GRADE_COLORS.get(player.grade, "black"))
+        for position, players in team.items()
+        for player in players
+    ]
 
-    total_players = sum(len(players) for players in team.values())
-    height = total_players * line_height + padding * 2
-    width = 500
+def collage_job(team, date_str):
+    """Задание на отрисовку коллажа команды дня: загрузка фото и подписи с учетом грейдов
+    
+    Returns:
+        tuple: (заголовок, строки) для render_vertical
+    """
+    rows = collage_rows(team)
 
-    image = Image.new("RGB", (width, height), "white")
-    draw = ImageDraw.Draw(image)
+    # Загружаем фотографии всей команды одновременно
+    headshots = headshot_service.fetch_many((player.id for player, _, _ in rows), size=VERTICAL_PHOTO_SIZE)
 
-    font_path = "C:\\Windows\\Fonts\\arial.ttf"
-    font = ImageFont.truetype(font_path, size=20)
+    job_rows = []
+    for player, text, color in rows:
+        player_image = headshots.get(player.id)
+        if player_image is None:
+            logging.warning(f"Ошибка загрузки изображения для {player.name}")
+        job_rows.append((pack_image(player_image), text, color))
 
-    y_offset = padding
-    
-    # Добавляем заголовок с датой
-    title = f"Команда дня {date_str}"
-    title_width = draw.textlength(title, font=font)
-    draw.text(((width - title_width) // 2, y_offset), title, fill="black", font=font)
-    y_offset += 40
+    return f"Команда дня {date_str}", job_rows
 
-    for position, players in team.items():
-        for player in players:
-            name = player['name']
-            points = player['appliedTotal']
-            image_url = player['image_url']
-            grade = player['grade']
-            color = GRADE_COLORS.get(grade, "black")
-
-            try:
-                response = requests.get(image_url, stream=True, timeout=10)
-                response.raise_for_status()
-                player_image = Image.open(response.raw).convert("RGBA")
-                bg = Image.new("RGBA", player_image.size, (255, 255, 255, 255))
-                combined_image = Image.alpha_composite(bg, player_image)
-                player_image = combined_image.convert("RGB").resize((player_img_width, player_img_height), Image.LANCZOS)
-                image_x = (width - player_img_width) // 2
-                image.paste(player_image, (image_x, y_offset))
-            except Exception as e:
-                logging.warning(f"Ошибка загрузки изображения для {name}: {e}")
-                empty_img = Image.new("RGB", (player_img_width, player_img_height), "gray")
-                image_x = (width - player_img_width) // 2
-                image.paste(empty_img, (image_x, y_offset))
-
-            text = f"{position}: {name} ({points:.2f} ftps)"
-            text_width = draw.textlength(text, font=font)
-            text_x = (width - text_width) // 2
-            draw.text((text_x, y_offset + player_img_height + text_padding), text, fill=color, font=font)
-            y_offset += line_height
-
-    file_path = f"C:\\dev\\fantasy-hockey-bot\\team_day_collage_{date_str}.jpg"
-    image.save(file_path)
-    return file_path
-
-async def send_collage(team, date_str):
-    """Отправка коллажа команды дня в Telegram"""
+def collage_key(team, date_str):
+    """Отпечаток коллажа команды дня для кэша готовых коллажей"""
+    players = [(player.id, text, player.grade) for player, text, _ in collage_rows(team)]
+    return render_key('vertical', f"Команда дня {date_str}", players)
+
+def create_collage(team, date_str):
+    """Создание коллажа с учетом грейдов игроков
+    
+    Returns:
+        bytes: Коллаж в формате JPEG
+    """
+    return render_vertical(*collage_job(team, date_str))
+
+async def render_collage(team, date_str, renderer=None):
+    """Создание коллажа вне цикла событий: фото загружаются в потоке, отрисовка идет
+    в пуле процессов renderer (без него - тоже в потоке). Та же команда с теми же
+    очками и грейдами берется из кэша готовых коллажей
+    
+    Returns:
+        bytes: Коллаж в формате JPEG
+    """
+    def prepare():
+        title, rows = collage_job(team, date_str)
+        # Коллаж с заглушками вместо фото не кэшируем: фото может загрузиться в следующий раз
+        return (title, rows), all(photo is not None for photo, _, _ in rows)
+
+    renderer = renderer or RenderService(workers=0)
+    return await renderer.render_job(collage_key(team, date_str), prepare, render_vertical)
+
+async def send_collage(team, date_str, render=None):
+    """Отправка коллажа команды дня в Telegram
+    
+    Args:
+        render: Задача отрисовки коллажа, запущенная заранее (None - отрисовать здесь)
+    """
     try:
-        # Создание коллажа
-        file_path = create_collage(team, date_str)
+        # Коллаж остается в памяти и отправляется без временного файла
+        photo = await (render if render is not None else render_collage(team, date_str))
+        persist_collage(photo, f"team_day_collage_{date_str}.jpg")
         
-        # Отправка коллажа
+        # Отправка коллажа с учетом ограничений Telegram (429 / RetryAfter);
+        # уже загруженный коллаж (в том числе в предыдущей попытке) отправляется по file_id
+        async def send():
+            await send_photo(bot, CHAT_ID, photo, parse_mode=ParseMode.HTML)
+
         max_attempts = 3
-        for attempt in range(1, max_attempts + 1):
-            try:
-                with open(file_path, 'rb') as photo:
-                    await bot.send_photo(chat_id=CHAT_ID, photo=photo, parse_mode=ParseMode.HTML)
-                logging.info(f"Коллаж успешно отправлен для даты {date_str}")
-                break
-            except Exception as e:
-                if attempt < max_attempts:
-                    logging.warning(f"Попытка {attempt} из {max_attempts} не удалась: {str(e)}")
-                    await asyncio.sleep(1)
-                else:
-                    logging.error(f"Не удалось отправить коллаж после {max_attempts} попыток: {str(e)}")
-        
-        # Удаление временного файла
-        if os.path.exists(file_path):
-            os.remove(file_path)
+        try:
+            await run_limited(telegram_limiter, send, attempts=max_attempts)
+            logging.info(f"Коллаж успешно отправлен для даты {date_str}")
+        except Exception as e:
+            logging.error(f"Не удалось отправить коллаж после {max_attempts} попыток: {str(e)}")
             
     except Exception as e:
         logging.error(f"Ошибка при создании/отправке коллажа: {str(e)}")
@@ -445,77 +400,209 @@ async def send_text_message(team, date_str):
         message = f"\U0001F3D2 Команда дня {date_str}\n\n"
         for position, players in team.items():
             for player in players:
-                message += f"{position}: {player['name']} ({player['appliedTotal']:.2f} ftps)\n"
+                message += f"{position}: {player.name} ({player.points:.2f} ftps)\n"
         await bot.send_message(chat_id=CHAT_ID, text=message, parse_mode=ParseMode.HTML)
         logging.info(f"Текстовое сообщение успешно отправлено для даты {date_str}")
     except Exception as e:
         logging.error(f"Не удалось отправить даже текстовое сообщение: {str(e)}")
 
-async def process_dates_range(start_date, end_date):
-    """Обработка данных за указанный диапазон дат"""
+async def process_dates_range(start_date, end_date, store=None):
+    """Обработка данных за указанный диапазон дат
+    
+    Статистика игроков загружается один раз, все выборы за период
+    применяются в памяти и сохраняются одной атомарной записью в конце.
+    """
+    if store is None:
+        store = open_player_stats_store(PLAYER_STATS_FILE)
+
+    try:
+        await _process_dates(start_date, end_date, store)
+    finally:
+        store.flush()
+
+def get_scoring_period_id(date):
+    """Расчет scoring_period_id для даты"""
+    return (date.date() - SEASON_START_DATE.date()).days + SEASON_START_SCORING_PERIOD_ID
+
+def select_team_of_day(data, current_date, store):
+    """Формирование команды дня и обновление грейдов игроков в хранилище"""
+    scoring_period_id = get_scoring_period_id(current_date)
+    positions = parse_player_data(data, scoring_period_id - 1, current_date, store)
+    
+    # Проверяем наличие игроков на каждой позиции
+    empty_positions = [pos for pos, players in positions.items() if not players]
+    if empty_positions:
+        logging.warning(f"Нет игроков на позициях: {empty_positions}")
+    
+    team = {
+        position: top_k(positions.get(position, []), count, key=lambda x: x.points)
+        for position, count in settings.TEAM_OF_DAY_COMPOSITION.items()
+    }
+
+    date_str = current_date.strftime("%Y-%m-%d")
+    
+    # Логируем состав команды
+    logging.info(f"Состав команды дня {date_str}:")
+    for position, players in team.items():
+        for player in players:
+            logging.info(f"{position}: {player.name} ({player.points:.2f} ftps)")
+            # Обновляем статистику игрока
+            player.grade = update_player_stats(
+                player_id=player.id,
+                name=player.name,
+                date_str=date_str,
+                applied_total=player.points,
+                position=position,
+                team_of_the_day=True,
+                store=store
+            )
+
+    return team
+
+def get_dates(start_date, end_date):
+    """Список дат периода, не позже текущего момента"""
+    dates = []
     current_date = start_date
     while current_date <= min(datetime.now(ESPN_TIMEZONE), end_date):
+        dates.append(current_date)
+        current_date = (current_date + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return dates
+
+def skip_dates_without_games(dates):
+    """Даты, за игровой день которых по расписанию были матчи НХЛ"""
+    schedule = get_schedule_index()
+    if schedule is None:
+        return dates
+
+    game_dates = []
+    for date in dates:
+        if schedule.has_games(get_scoring_period_id(date) - 1):
+            game_dates.append(date)
+        else:
+            logging.info(f"Пропуск даты {date.strftime('%Y-%m-%d')}: по расписанию матчей не было")
+    return game_dates
+
+def fetch_dates_data(dates):
+    """Загрузка данных за список дат одним пакетным запросом
+    
+    Returns:
+        dict: {scoring_period_id запроса: данные или None}
+    """
+    return fetch_player_data_range([get_scoring_period_id(date) - 1 for date in dates], LEAGUE_ID)
+
+async def _process_dates(start_date, end_date, store):
+    """Последовательная обработка дат периода с общим хранилищем статистики"""
+    await _process_date_list(skip_dates_without_games(get_dates(start_date, end_date)), store)
+
+async def _process_date_list(dates, store):
+    """Обработка списка дат с общим хранилищем статистики
+    
+    Returns:
+        list: Даты (YYYY-MM-DD), для которых команда дня сформирована и отправлена
+    """
+    processed = []
+    if not dates:
+        return processed
+
+    # Все дни периода запрашиваются одним пакетом, а не отдельным запросом на каждый день
+    batch = fetch_dates_data(dates)
+
+    for current_date in dates:
         try:
             logging.info(f"=== Начало обработки даты: {current_date.strftime('%Y-%m-%d')} ===")
             
-            scoring_period_id = (current_date.date() - SEASON_START_DATE.date()).days + SEASON_START_SCORING_PERIOD_ID
+            scoring_period_id = get_scoring_period_id(current_date)
             logging.info(f"Расчетный scoring_period_id: {scoring_period_id}")
 
-            data = fetch_player_data(scoring_period_id - 1, LEAGUE_ID)
+            data = batch.get(scoring_period_id - 1)
             if not data:
                 logging.error(f"Пропуск даты {current_date.strftime('%Y-%m-%d')} из-за ошибки получения данных")
-                current_date += timedelta(days=1)
                 continue
 
-            positions = parse_player_data(data, scoring_period_id - 1, current_date)
-            
-            # Проверяем наличие игроков на каждой позиции
-            empty_positions = [pos for pos, players in positions.items() if not players]
-            if empty_positions:
-                logging.warning(f"Нет игроков на позициях: {empty_positions}")
-            
-            team = {
-                'C': sorted(positions['C'], key=lambda x: x['appliedTotal'], reverse=True)[:1],
-                'LW': sorted(positions['LW'], key=lambda x: x['appliedTotal'], reverse=True)[:1],
-                'RW': sorted(positions['RW'], key=lambda x: x['appliedTotal'], reverse=True)[:1],
-                'D': sorted(positions['D'], key=lambda x: x['appliedTotal'], reverse=True)[:2],
-                'G': sorted(positions['G'], key=lambda x: x['appliedTotal'], reverse=True)[:1]
-            }
-
+            team = select_team_of_day(data, current_date, store)
             date_str = current_date.strftime("%Y-%m-%d")
-            
-            # Логируем состав команды
-            logging.info(f"Состав команды дня {date_str}:")
-            for position, players in team.items():
-                for player in players:
-                    logging.info(f"{position}: {player['name']} ({player['appliedTotal']:.2f} ftps)")
-                    # Обновляем статистику игрока
-                    grade = update_player_stats(
-                        player_id=player['id'],
-                        name=player['name'],
-                        date_str=date_str,
-                        applied_total=player['appliedTotal'],
-                        position=position,
-                        team_of_the_day=True
-                    )
-                    player['grade'] = grade
 
             # Отправляем коллаж
             logging.info(f"Отправка коллажа для даты {date_str} (попытка 1/3)")
             await send_collage(team, date_str)
+            processed.append(date_str)
             logging.info(f"=== Завершена обработка даты: {date_str} ===\n")
-
-            # Пауза между датами
-            await asyncio.sleep(2)
-
-            current_date += timedelta(days=1)
-            current_date = current_date.replace(hour=0, minute=0, second=0, microsecond=0)
         except Exception as e:
             logging.error(f"Критическая ошибка при обработке даты {current_date.strftime('%Y-%m-%d')}: {str(e)}")
             traceback.print_exc()
-            current_date += timedelta(days=1)
             continue
 
+    return processed
+
+def get_date_for_period(scoring_period_id):
+    """Дата команды дня для игрового дня (команда дня за дату строится по предыдущему игровому дню)"""
+    return SEASON_START_DATE + timedelta(days=scoring_period_id)
+
+async def process_period(scoring_period_id, store):
+    """Обработка одного завершенного игрового дня: команда дня и обновление статистики
+    
+    Returns:
+        bool: True, если команда дня сформирована и отправлена
+    """
+    update_week_period(store)
+    try:
+        processed = await _process_date_list([get_date_for_period(scoring_period_id)], store)
+    finally:
+        store.flush()
+    return bool(processed)
+
+async def backfill_weeks(weeks, store, concurrency=BACKFILL_CONCURRENCY):
+    """Обработка нескольких недель конвейером
+    
+    Данные за недели загружаются одновременно (одним пакетным запросом на неделю,
+    не более concurrency недель сразу), команды дня и грейды формируются строго
+    по порядку дат, а отрисовка и отправка коллажей идут параллельно с загрузкой
+    следующих недель. Коллажи рисуются в пуле процессов (settings.RENDER_WORKERS).
+    """
+    weeks = [
+        (week_start, week_end, skip_dates_without_games(get_dates(week_start, week_end)))
+        for week_start, week_end in weeks
+    ]
+    weeks = [week for week in weeks if week[2]]
+
+    def fetch(week):
+        return fetch_dates_data(week[2])
+
+    def process(week, batch):
+        jobs = []
+        try:
+            for current_date in week[2]:
+                date_str = current_date.strftime("%Y-%m-%d")
+                data = (batch or {}).get(get_scoring_period_id(current_date) - 1)
+                if not data:
+                    logging.error(f"Пропуск даты {date_str} из-за ошибки получения данных")
+                    continue
+                try:
+                    jobs.append((select_team_of_day(data, current_date, store), date_str))
+                except Exception as e:
+                    logging.error(f"Критическая ошибка при обработке даты {date_str}: {str(e)}")
+                    traceback.print_exc()
+        finally:
+            # Сохраняем статистику одной записью в конце каждой недели
+            store.flush()
+        return jobs or None
+
+    async def publish(jobs):
+        # Коллажи недели рисуются одновременно в пуле процессов, отправляются по порядку дат
+        renders = [asyncio.ensure_future(render_collage(team, date_str, renderer)) for team, date_str in jobs]
+        for (team, date_str), render in zip(jobs, renders):
+            await send_collage(team, date_str, render)
+            logging.info(f"=== Завершена обработка даты: {date_str} ===")
+
+    pipeline = BackfillPipeline(fetch, process, publish, fetch_concurrency=concurrency)
+    try:
+        with RenderService() as renderer:
+            report = await pipeline.run(weeks)
+    finally:
+        store.flush()
+    logging.info(report.format())
+    return report
+
 def get_all_weeks_dates():
     """Получение списка всех недель с начала сезона"""
     weeks = []
@@ -545,29 +632,37 @@ def get_all_weeks_dates():
 async def main():
     import sys
     
-    if len(sys.argv) > 1:
-        if sys.argv[1] == '--previous-week':
-            # Обработка предыдущей недели
-            previous_tuesday, previous_monday = get_previous_week_dates()
-            logging.info(f"Обработка данных за предыдущую неделю: {previous_tuesday.strftime('%Y-%m-%d')} - {previous_monday.strftime('%Y-%m-%d')}")
-            await process_dates_range(previous_tuesday, previous_monday)
-        elif sys.argv[1] == '--all-weeks':
-            # Обработка всех недель с начала сезона
-            weeks = get_all_weeks_dates()
-            total_weeks = len(weeks)
-            
-            logging.info(f"Начинаем обработку всех недель с начала сезона ({total_weeks} недель)")
-            for i, (week_start, week_end) in enumerate(weeks, 1):
-                logging.info(f"Обработка недели {i}/{total_weeks}: {week_start.strftime('%Y-%m-%d')} - {week_end.strftime('%Y-%m-%d')}")
-                await process_dates_range(week_start, week_end)
-                # Небольшая пауза между неделями чтобы не перегружать API
-                if i < total_weeks:
-                    await asyncio.sleep(2)
-    else:
-        # Обработка текущей недели
-        tuesday, next_monday = update_week_period()
+    store = open_player_stats_store(PLAYER_STATS_FILE)
+    
+    # --offline: только архив ответов ESPN, --replay: архив с догрузкой недостающего из сети
+    args = [arg for arg in sys.argv[1:] if arg not in ('--offline', '--replay')]
+    if '--offline' in sys.argv:
+        set_archive_mode('offline')
+    elif '--replay' in sys.argv:
+        set_archive_mode('replay')
+    
+    if not args or args[0] == '--watch':
+        # Обработка каждого игрового дня сразу после его завершения, ровно один раз:
+        # без аргументов - одна проверка (cron), --watch - постоянное ожидание
+        trigger = PeriodTrigger(season=SEASON_ID)
+        await trigger.run(lambda period: process_period(period, store), once=not args)
+    elif args[0] == '--current-week':
+        # Обработка текущей недели целиком
+        tuesday, next_monday = update_week_period(store)
         logging.info(f"Обработка данных за текущую неделю: {tuesday.strftime('%Y-%m-%d')} - {next_monday.strftime('%Y-%m-%d')}")
-        await process_dates_range(tuesday, next_monday)
+        await process_dates_range(tuesday, next_monday, store)
+    elif args[0] == '--previous-week':
+        # Обработка предыдущей недели
+        previous_tuesday, previous_monday = get_previous_week_dates()
+        logging.info(f"Обработка данных за предыдущую неделю: {previous_tuesday.strftime('%Y-%m-%d')} - {previous_monday.strftime('%Y-%m-%d')}")
+        await process_dates_range(previous_tuesday, previous_monday, store)
+    elif args[0] == '--all-weeks':
+        # Обработка всех недель с начала сезона
+        weeks = get_all_weeks_dates()
+        total_weeks = len(weeks)
+        
+        logging.info(f"Начинаем обработку всех недель с начала сезона ({total_weeks} недель)")
+        await backfill_weeks(weeks, store)
 
 if __name__ == "__main__":
     asyncio.run(main())
@@ -4,13 +4,22 @@ import logging
 from telegram import Bot
 from telegram.constants import ParseMode
 from dotenv import load_dotenv
-from PIL import Image, ImageDraw, ImageFont
 import os
 import asyncio
 import pytz
 import sys
 import traceback
-import requests
+from src.config import settings
+from src.services.collage_output import persist_collage
+from src.services.collage_template import VERTICAL_PHOTO_SIZE
+from src.services.headshot_service import HeadshotService
+from src.services.http_client import telegram_request
+from src.services.render_cache import render_key
+from src.services.telegram_files import send_photo
+from src.services.render_service import RenderService, pack_image, render_vertical
+from src.services.player_stats_store import atomic_write_json, changed_weeks
+from src.services.rate_limiter import get_rate_limiter, run_limited
+from src.services.stats_db import get_stats_db
 
 def debug_print(message):
     """Вывод отладочной информации"""
@@ -91,7 +100,10 @@ if not TELEGRAM_TOKEN or not CHAT_ID:
     logging.error("TELEGRAM_TOKEN или CHAT_ID не установлены в файле .env")
     exit(1)
 
-bot = Bot(token=TELEGRAM_TOKEN)
+bot = Bot(token=TELEGRAM_TOKEN, request=telegram_request())
+
+# Параллельная загрузка фотографий игроков для коллажей
+headshot_service = HeadshotService()
 
 def get_week_dates(date):
     """Получение дат начала и конца недели для заданной даты"""
@@ -105,6 +117,8 @@ def get_week_dates(date):
 def load_player_stats():
     """Загрузка статистики игроков"""
     try:
+        if settings.STATS_BACKEND == 'sqlite':
+            return get_stats_db().export_player_stats()
         with open(PLAYER_STATS_FILE, 'r') as f:
             return json.load(f)
     except Exception as e:
@@ -113,6 +127,8 @@ def load_player_stats():
 
 def load_weekly_stats():
     """Загрузка статистики команд недели"""
+    if settings.STATS_BACKEND == 'sqlite':
+        return get_stats_db().load_weekly_stats()
     try:
         with open(WEEKLY_STATS_FILE, 'r') as f:
             return json.load(f)
@@ -121,8 +137,10 @@ def load_weekly_stats():
 
 def save_weekly_stats(stats):
     """Сохранение статистики команд недели"""
-    with open(WEEKLY_STATS_FILE, 'w') as f:
-        json.dump(stats, f, indent=4)
+    if settings.STATS_BACKEND == 'sqlite':
+        get_stats_db().save_weekly_stats(stats)
+        return
+    atomic_write_json(WEEKLY_STATS_FILE, stats, indent=4)
 
 def calculate_weekly_team(week_key, players_data):
     """Формирование команды недели на основе грейдов и очков"""
@@ -194,87 +212,96 @@ def calculate_weekly_team(week_key, players_data):
 
     return team
 
-def create_weekly_collage(team, week_str):
-    """Создание коллажа команды недели"""
-    player_img_width, player_img_height = 130, 100
-    padding = 20
-    text_padding = 10
-    line_height = player_img_height + text_padding + 30 + padding
-
-    total_players = sum(len(players) for players in team.values())
-    height = total_players * line_height + padding * 2
-    width = 500
-
-    image = Image.new("RGB", (width, height), "white")
-    draw = ImageDraw.Draw(image)
-
-    font_path = "C:\\Windows\\Fonts\\arial.ttf"
-    font = ImageFont.truetype(font_path, size=20)
-
-    y_offset = padding
-    
-    title = f"Команда недели {week_str}"
-    title_width = draw.textlength(title, font=font)
-    draw.text(((width - title_width) // 2, y_offset), title, fill="black", font=font)
-    y_offset += 40
-
+def weekly_collage_rows(team):
+    """Строки коллажа команды недели: (игрок, подпись, цвет по грейду)"""
+    rows = []
     for position, players in team.items():
         for player in players:
             name = player['name']
             appearances = player['total_points']
             weekly_points = player.get('weekly_points', 0)
-            grade = player['grade']
-            color = GRADE_COLORS.get(grade, "black")
-            player_id = player['id']
-
-            try:
-                image_url = f"https://a.espncdn.com/combiner/i?img=/i/headshots/nhl/players/full/{player_id}.png&w=130&h=100"
-                response = requests.get(image_url, stream=True, timeout=10)
-                response.raise_for_status()
-                player_image = Image.open(response.raw).convert("RGBA")
-                bg = Image.new("RGBA", player_image.size, (255, 255, 255, 255))
-                combined_image = Image.alpha_composite(bg, player_image)
-                player_image = combined_image.convert("RGB").resize((player_img_width, player_img_height), Image.LANCZOS)
-                image_x = (width - player_img_width) // 2
-                image.paste(player_image, (image_x, y_offset))
-            except Exception as e:
-                debug_print(f"Ошибка загрузки изображения для {name}: {e}")
-                empty_img = Image.new("RGB", (player_img_width, player_img_height), "gray")
-                image_x = (width - player_img_width) // 2
-                image.paste(empty_img, (image_x, y_offset))
 
             # Формируем текст
             if appearances > 1:
                 text = f"{position}: {name} [{appearances}] {weekly_points:.1f} ftps"
             else:
                 text = f"{position}: {name} {weekly_points:.1f} ftps"
-            
-            text_width = draw.textlength(text, font=font)
-            text_x = (width - text_width) // 2
-            draw.text((text_x, y_offset + player_img_height + text_padding), text, fill=color, font=font)
-            y_offset += line_height
+            rows.append((player, text, GRADE_COLORS.get(player['grade'], "black")))
+    return rows
+
+def weekly_collage_job(team, week_str):
+    """Задание на отрисовку коллажа команды недели: загрузка фото и подписи
+    
+    Returns:
+        tuple: (заголовок, строки) для render_vertical
+    """
+    rows = weekly_collage_rows(team)
 
-    temp_file = f"weekly_team_{week_str}.jpg"
-    image.save(temp_file)
-    return temp_file
+    # Загружаем фотографии всей команды одновременно
+    headshots = headshot_service.fetch_many((player['id'] for player, _, _ in rows), size=VERTICAL_PHOTO_SIZE)
 
-async def send_weekly_team(team, week_str):
-    """Отправка команды недели в Telegram"""
+    job_rows = []
+    for player, text, color in rows:
+        player_image = headshots.get(str(player['id']))
+        if player_image is None:
+            debug_print(f"Ошибка загрузки изображения для {player['name']}")
+        job_rows.append((pack_image(player_image), text, color))
+
+    return f"Команда недели {week_str}", job_rows
+
+def weekly_collage_key(team, week_str):
+    """Отпечаток коллажа команды недели для кэша готовых коллажей"""
+    players = [(str(player['id']), text, player['grade']) for player, text, _ in weekly_collage_rows(team)]
+    return render_key('vertical', f"Команда недели {week_str}", players)
+
+def create_weekly_collage(team, week_str):
+    """Создание коллажа команды недели
+    
+    Returns:
+        bytes: Коллаж в формате JPEG
+    """
+    return render_vertical(*weekly_collage_job(team, week_str))
+
+async def render_weekly_collage(team, week_str, renderer=None):
+    """Создание коллажа команды недели вне цикла событий (отрисовка - в пуле процессов renderer);
+    неизменившаяся команда берется из кэша готовых коллажей
+    
+    Returns:
+        bytes: Коллаж в формате JPEG
+    """
+    def prepare():
+        title, rows = weekly_collage_job(team, week_str)
+        # Коллаж с заглушками вместо фото не кэшируем: фото может загрузиться в следующий раз
+        return (title, rows), all(photo is not None for photo, _, _ in rows)
+
+    renderer = renderer or RenderService(workers=0)
+    return await renderer.render_job(weekly_collage_key(team, week_str), prepare, render_vertical)
+
+async def send_weekly_team(team, week_str, render=None):
+    """Отправка команды недели в Telegram
+
+    Args:
+        render: Задача отрисовки коллажа, запущенная заранее (None - отрисовать здесь)
+
+    Returns:
+        bool: True если команда отправлена
+    """
     try:
-        temp_file = create_weekly_collage(team, week_str)
+        # Коллаж остается в памяти и отправляется без временного файла
+        photo = await (render if render is not None else render_weekly_collage(team, week_str))
+        persist_collage(photo, f"weekly_team_{week_str}.jpg")
         
-        with open(temp_file, 'rb') as photo:
-            await bot.send_photo(
-                chat_id=CHAT_ID,
-                photo=photo,
-                parse_mode=ParseMode.HTML
-            )
+        # Отправка с учетом ограничений Telegram (429 / RetryAfter) вместо фиксированных пауз;
+        # уже загруженный коллаж отправляется по file_id
+        async def send():
+            await send_photo(bot, CHAT_ID, photo, parse_mode=ParseMode.HTML)
         
-        if os.path.exists(temp_file):
-            os.remove(temp_file)
+        await run_limited(get_rate_limiter('telegram'), send)
+        return True
 
     except Exception as e:
         logging.error(f"Ошибка при отправке команды недели: {e}")
+        return False
 
 async def process_all_weeks():
     """Обработка всех недель"""
@@ -290,41 +317,55 @@ async def process_all_weeks():
         weekly_stats = load_weekly_stats()
         debug_print(f"Уже обработано недель: {len(weekly_stats.get('weeks', {}))}")
         
-        weeks_to_process = []
-        for week_key, week_data in player_stats['weeks'].items():
-            if 'players' not in week_data:
-                debug_print(f"Пропуск недели {week_key}: нет данных об игроках")
-                continue
-            if not week_data['players']:
-                debug_print(f"Пропуск недели {week_key}: пустой список игроков")
-                continue
-            weeks_to_process.append(week_key)
+        # Отпечатки обработанных недель: пересчитываются и отправляются
+        # только новые недели и недели с изменившимися записями игроков
+        fingerprints = weekly_stats.setdefault('fingerprints', {})
+        weeks_to_process = changed_weeks(player_stats['weeks'], fingerprints)
         
         debug_print(f"Предстоит обработать недель: {len(weeks_to_process)}")
         
-        for week_key in weeks_to_process:
-            debug_print(f"\n{'='*50}")
-            debug_print(f"Обработка недели: {week_key}")
-            
-            week_data = player_stats['weeks'][week_key]
-            team = calculate_weekly_team(week_key, week_data['players'])
-            
-            if not any(team.values()):
-                debug_print("Предупреждение: Не найдено игроков для команды недели")
-                continue
-            
-            # Save the team data for this week
-            weekly_stats.setdefault('weeks', {})[week_key] = team
-            save_weekly_stats(weekly_stats)
-            debug_print(f"Сохранена статистика для недели {week_key}")
-            
-            try:
-                debug_print("Отправка команды недели в Telegram")
-                await send_weekly_team(team, week_key)
-            except Exception as e:
-                debug_print(f"Ошибка при отправке команды недели: {e}")
+        # Коллажи недель рисуются одновременно в пуле процессов, пока считаются
+        # следующие недели; отправляются по порядку недель
+        renderer = RenderService(workers=None if len(weeks_to_process) > 1 else 0)
+        sends = []
+        try:
+            for week_key, fingerprint in weeks_to_process:
+                debug_print(f"\n{'='*50}")
+                debug_print(f"Обработка недели: {week_key}")
+                
+                week_data = player_stats['weeks'][week_key]
+                team = calculate_weekly_team(week_key, week_data['players'])
+                
+                if not any(team.values()):
+                    debug_print("Предупреждение: Не найдено игроков для команды недели")
+                    continue
+                
+                # В weekly_stats хранится последняя отправленная команда недели
+                previous_team = weekly_stats.setdefault('weeks', {}).get(week_key)
+                if previous_team == team:
+                    # Записи игроков изменились, но команда та же: повторно не отправляем
+                    fingerprints[week_key] = fingerprint
+                    debug_print(f"Команда недели {week_key} не изменилась, отправка не требуется")
+                    continue
+                
+                render = asyncio.ensure_future(render_weekly_collage(team, week_key, renderer))
+                sends.append((week_key, fingerprint, team, render))
             
-            await asyncio.sleep(2)
+            for week_key, fingerprint, team, render in sends:
+                debug_print(f"Отправка команды недели {week_key} в Telegram")
+                if await send_weekly_team(team, week_key, render):
+                    weekly_stats['weeks'][week_key] = team
+                    fingerprints[week_key] = fingerprint
+                else:
+                    # Отпечаток не сохраняем, чтобы повторить отправку при следующем запуске
+                    debug_print(f"Ошибка при отправке команды недели {week_key}")
+        finally:
+            for _, _, _, render in sends:
+                render.cancel()
+            renderer.close()
+            if weeks_to_process:
+                save_weekly_stats(weekly_stats)
+                debug_print(f"Сохранена статистика для недель: {len(weeks_to_process)}")
             
         debug_print("\nОбработка всех недель завершена")
         
@@ -63,18 +63,18 @@ async def main():
     logger.info(f"Команда дня сформирована, общие очки: {team['total_points']}")
     
     # Создаем коллаж
-    collage_path = team_service.create_team_collage(team)
-    if not collage_path:
+    collage = team_service.create_team_collage(team)
+    if not collage:
         logger.error("Не удалось создать коллаж")
         return
         
-    logger.info(f"Коллаж создан: {collage_path}")
+    logger.info(f"Коллаж создан: {len(collage)} байт")
     
     # Отправляем в Telegram
     if not args.no_send:
         telegram = TelegramService()
         message = format_telegram_message(team)
-        sent = await telegram.send_team_of_day(message, collage_path)
+        sent = await telegram.send_team_of_day(message, collage)
         if sent:
             logger.info("Результаты успешно отправлены в Telegram")
         else:
@@ -74,8 +74,8 @@ async def main():
             
         # Создаем коллаж
         logger.info(f"Создаем коллаж с заголовком: {team['date']}")
-        collage_path = team_service.create_team_collage(team)
-        if not collage_path:
+        collage = team_service.create_team_collage(team)
+        if not collage:
             logger.error("Не удалось создать коллаж")
             return
             
@@ -86,7 +86,7 @@ async def main():
             for pos, player in team["players"].items():
                 message += f"*{pos}*: {player['info']['name']} ({player['stats']['total_points']} очков)\n"
             message += f"\nОбщие очки: {team['total_points']}"
-            await telegram_service.send_team_of_week(message, collage_path)
+            await telegram_service.send_team_of_week(message, collage)
             
     except Exception as e:
         logger.error(f"Неожиданная ошибка: {e}")
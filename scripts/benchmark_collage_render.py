@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк отрисовки коллажей: построение с нуля против готовых макетов
+
+Прежняя отрисовка на каждый коллаж загружала TTF-шрифт, создавала пустой
+холст и пересчитывала координаты строк. Макет (collage_template) готовит
+фон, шрифты и геометрию один раз; текст выводится тем же ImageDraw.text.
+Миниатюры синтетические и готовы заранее, кодирование в JPEG/PNG в замер
+не входит.
+"""
+
+import os
+import sys
+import time
+import argparse
+
+from PIL import Image, ImageDraw, ImageFont
+
+# Добавляем путь к корневой директории проекта
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.collage_template import load_font, team_grid_template, vertical_template
+
+TEAM = [('C', 'Connor McDavid'), ('LW', 'Artemi Panarin'), ('RW', 'Nikita Kucherov'),
+        ('D', 'Cale Makar'), ('D', 'Quinn Hughes'), ('G', 'Igor Shesterkin')]
+GRID_SLOTS = ['G', 'D1', 'D2', 'LW', 'C', 'RW']
+
+
+def font_path() -> str:
+    """Путь к TTF, который найдет и прежний код (ImageFont.truetype)"""
+    return load_font(None, 20).path
+
+
+def vertical_baseline(path, photo):
+    """Прежний app_day.create_collage: шрифт и геометрия на каждый вызов"""
+    player_img_width, player_img_height = 130, 100
+    padding = 20
+    text_padding = 10
+    line_height = player_img_height + text_padding + 30 + padding
+    width = 500
+    height = len(TEAM) * line_height + padding * 2
+
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.truetype(path, size=20)
+
+    y_offset = padding
+    title = "Команда дня 2025-01-15"
+    title_width = draw.textlength(title, font=font)
+    draw.text(((width - title_width) // 2, y_offset), title, fill="black", font=font)
+    y_offset += 40
+
+    for position, name in TEAM:
+        image.paste(photo, ((width - player_img_width) // 2, y_offset))
+        text = f"{position}: {name} (12.30 ftps)"
+        text_width = draw.textlength(text, font=font)
+        draw.text(((width - text_width) // 2, y_offset + player_img_height + text_padding), text, fill="black", font=font)
+        y_offset += line_height
+    return image
+
+
+def vertical_template_render(path, photo):
+    """Новый app_day.create_collage: готовый макет"""
+    template = vertical_template(len(TEAM), path)
+    image, draw = template.canvas()
+    template.draw_title(draw, "Команда дня 2025-01-15")
+    for row, (position, name) in enumerate(TEAM):
+        template.paste(image, row, photo)
+        template.draw_caption(draw, row, f"{position}: {name} (12.30 ftps)")
+    return image
+
+
+def grid_baseline(path, photo):
+    """Прежний ImageService.render_team_collage"""
+    collage = Image.new('RGB', (1200, 800), 'white')
+    draw = ImageDraw.Draw(collage)
+    title_font = ImageFont.truetype(path, 36)
+    stats_font = ImageFont.truetype(path, 24)
+
+    title = "Команда недели 13.01 - 19.01"
+    title_bbox = draw.textbbox((0, 0), title, font=title_font)
+    draw.text(((1200 - (title_bbox[2] - title_bbox[0])) // 2, 20), title, font=title_font, fill='black')
+
+    positions = {'G': (500, 150), 'D1': (200, 300), 'D2': (800, 300), 'LW': (200, 500), 'C': (500, 500), 'RW': (800, 500)}
+    photo_size = (200, 200)
+    for (pos, coords), (_, name) in zip(positions.items(), TEAM):
+        photo_x = coords[0] - photo_size[0] // 2
+        photo_y = coords[1] - photo_size[1] // 2
+        collage.paste(photo, (photo_x, photo_y))
+        text = f"{name}\n42.5 pts"
+        text_bbox = draw.textbbox((0, 0), text, font=stats_font)
+        draw.text((coords[0] - (text_bbox[2] - text_bbox[0]) // 2, photo_y + photo_size[1] + 10),
+                  text, font=stats_font, fill='black', align='center')
+    return collage
+
+
+def grid_template_render(path, photo):
+    """Новый ImageService.render_team_collage: готовый макет"""
+    template = team_grid_template(path)
+    collage, draw = template.canvas()
+    template.draw_title(draw, "Команда недели 13.01 - 19.01")
+    for pos, (_, name) in zip(GRID_SLOTS, TEAM):
+        template.paste(collage, pos, photo)
+        template.draw_caption(draw, pos, f"{name}\n42.5 pts")
+    return collage
+
+
+def measure(render, path, photo, iterations: int, repeats: int) -> float:
+    """Задержка отрисовки одного коллажа (мс), лучшая из repeats серий"""
+    render(path, photo)
+    best = float('inf')
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            render(path, photo)
+        best = min(best, (time.perf_counter() - started) / iterations)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк отрисовки коллажей')
+    parser.add_argument('--iterations', type=int, default=100, help='Коллажей в серии')
+    parser.add_argument('--repeats', type=int, default=5, help='Серий на замер')
+    args = parser.parse_args()
+
+    path = font_path()
+    small = Image.new('RGB', (130, 100), 'gray')
+    large = Image.new('RGB', (200, 200), 'gray')
+
+    print(f"Шрифт: {path}, серии: {args.repeats} x {args.iterations}")
+    print(f"{'Макет':<22}{'до, мс':>10}{'после, мс':>12}{'ускорение':>12}")
+    for label, baseline, optimized, photo in (
+        ('вертикальный (день)', vertical_baseline, vertical_template_render, small),
+        ('сетка 1200x800', grid_baseline, grid_template_render, large),
+    ):
+        before = measure(baseline, path, photo, args.iterations, args.repeats)
+        after = measure(optimized, path, photo, args.iterations, args.repeats)
+        print(f"{label:<22}{before:>10.2f}{after:>12.2f}{before / after:>11.1f}x")
+
+
+if __name__ == '__main__':
+    main()
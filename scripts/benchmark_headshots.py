@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк загрузки фотографий для коллажа команды дня
+
+Поднимает локальный HTTP-сервер, который отдает PNG с искусственной задержкой,
+и сравнивает последовательную загрузку (как раньше в create_collage)
+с параллельной загрузкой через HeadshotService и с повторным рендером
+из кэша миниатюр.
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+from io import BytesIO
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from PIL import Image
+
+# Добавляем путь к корневой директории проекта
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.headshot_service import HeadshotService, prepare_headshot
+from src.services.thumbnail_cache import ThumbnailCache
+
+
+def make_png() -> bytes:
+    """Создает PNG размером с оригинальное фото ESPN"""
+    buffer = BytesIO()
+    Image.new('RGBA', (260, 190), (40, 80, 160, 200)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def start_server(latency: float) -> ThreadingHTTPServer:
+    """Запускает локальный сервер, отдающий PNG с задержкой"""
+    png = make_png()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header('Content-Type', 'image/png')
+            self.send_header('Content-Length', str(len(png)))
+            self.end_headers()
+            self.wfile.write(png)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def fetch_sequential(urls):
+    """Последовательная загрузка, как в исходной версии create_collage"""
+    images = {}
+    for url in urls:
+        response = requests.get(url, stream=True, timeout=10)
+        response.raise_for_status()
+        images[url] = prepare_headshot(response.raw.read())
+    return images
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк загрузки фотографий игроков')
+    parser.add_argument('--latency', type=float, default=0.5, help='Задержка сервера в секундах')
+    parser.add_argument('--players', type=int, default=6, help='Количество игроков в команде')
+    parser.add_argument('--rounds', type=int, default=3, help='Количество повторов')
+    args = parser.parse_args()
+
+    server = start_server(args.latency)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    cache_dir = tempfile.TemporaryDirectory()
+    service = HeadshotService(
+        cache=ThumbnailCache(cache_dir.name),
+        url_template=f"{base_url}/{{player_id}}.png"
+    )
+
+    try:
+        for round_number in range(1, args.rounds + 1):
+            ids = [f"{round_number}-{i}" for i in range(args.players)]
+            urls = [f"{base_url}/{player_id}.png" for player_id in ids]
+
+            started = time.perf_counter()
+            fetch_sequential(urls)
+            sequential = time.perf_counter() - started
+
+            started = time.perf_counter()
+            service.fetch_many(ids)
+            concurrent = time.perf_counter() - started
+
+            started = time.perf_counter()
+            service.fetch_many(ids)
+            cached = time.perf_counter() - started
+
+            print(
+                f"Раунд {round_number}: последовательно {sequential:.2f} с, "
+                f"параллельно {concurrent:.2f} с (x{sequential / concurrent:.1f}), "
+                f"из кэша {cached * 1000:.1f} мс"
+            )
+    finally:
+        server.shutdown()
+        cache_dir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
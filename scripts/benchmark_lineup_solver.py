@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк оптимального состава с учетом eligibleSlots
+
+Сравнивает прежний выбор по defaultPositionId (лучшие игроки основной
+позиции) с solve_lineup, который позволяет игроку занять любую
+допустимую позицию, по сумме очков состава и времени на пул игроков.
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+# Добавляем путь к корневой директории проекта
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import settings
+from src.utils.lineup_solver import eligible_positions, solve_lineup
+from src.utils.team_utils import select_top_by_position
+
+# Типичные наборы слотов ESPN: основная позиция, F, UTIL, Bench, IR
+FORWARD_SLOTS = {1: [0, 3, 6, 7, 8], 2: [1, 3, 6, 7, 8], 3: [2, 3, 6, 7, 8]}
+
+
+def generate_pool(size: int, multi_share: float, seed: int = 42):
+    """Генерирует пул игроков ESPN; часть нападающих допущена на две позиции"""
+    rng = random.Random(seed)
+    pool = []
+    for i in range(size):
+        position_id = rng.choice([1, 1, 2, 2, 3, 3, 4, 4, 4, 5])
+        if position_id in FORWARD_SLOTS:
+            slots = list(FORWARD_SLOTS[position_id])
+            if rng.random() < multi_share:
+                slots.append(rng.choice([slot for slot in (0, 1, 2) if slot != position_id - 1]))
+        else:
+            slots = [position_id, 6 if position_id == 4 else 7, 7]
+        player = {"id": i, "defaultPositionId": position_id, "eligibleSlots": slots}
+        pool.append({"player": player, "points": round(rng.uniform(0, 20), 1), "positions": eligible_positions(player)})
+    return pool
+
+
+def default_team(pool):
+    """Прежний выбор: только по основной позиции"""
+    return select_top_by_position(
+        pool,
+        position_of=lambda p: settings.PLAYER_POSITIONS.get(p["player"]["defaultPositionId"]),
+        points_of=lambda p: p["points"]
+    )
+
+
+def solver_team(pool):
+    return solve_lineup(pool, points_of=lambda p: p["points"], positions_of=lambda p: p["positions"])
+
+
+def total(team):
+    return sum(p["points"] for players in team.values() for p in players)
+
+
+def measure(func, pool, repeat: int) -> float:
+    """Среднее время вызова в миллисекундах"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func(pool)
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк оптимального состава')
+    parser.add_argument('--pool', type=int, nargs='+', default=[300, 1000, 5000], help='Размеры пула игроков')
+    parser.add_argument('--multi', type=float, default=0.3, help='Доля нападающих с двумя позициями')
+    parser.add_argument('--seeds', type=int, default=50, help='Количество случайных пулов для сравнения сумм')
+    parser.add_argument('--repeat', type=int, default=50, help='Повторов замера времени')
+    args = parser.parse_args()
+
+    print(f"{'Игроков':>8}{'по основной, мс':>18}{'solver, мс':>13}{'прирост суммы':>16}{'пулов с приростом':>20}")
+    for size in args.pool:
+        gains = []
+        for seed in range(args.seeds):
+            pool = generate_pool(size, args.multi, seed)
+            gain = total(solver_team(pool)) - total(default_team(pool))
+            assert gain >= -1e-9, "Решение хуже выбора по основной позиции"
+            gains.append(gain)
+        pool = generate_pool(size, args.multi)
+        default_ms = measure(default_team, pool, args.repeat)
+        solver_ms = measure(solver_team, pool, args.repeat)
+        improved = sum(1 for gain in gains if gain > 1e-9)
+        print(f"{size:>8}{default_ms:>18.3f}{solver_ms:>13.3f}{sum(gains) / len(gains):>16.2f}{improved:>14}/{len(gains)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк разбора ответа kona_player_info: response.json() против потокового разбора
+
+Прежняя схема загружает весь ответ ESPN (рейтинги, владение, ранги,
+разбивки статистики по stat id) в словари Python. Потоковый разбор
+(ijson) проходит по массиву players и сохраняет только id, имя,
+позиции, proTeamId и appliedTotal, поэтому пиковая память определяется
+компактными записями, а не полным документом.
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tracemalloc
+
+# Добавляем путь к корневой директории проекта
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.player_projection import iter_players, project_players, streaming_available
+
+
+def generate_response(players: int, splits: int, seed: int = 42) -> bytes:
+    """Синтетический ответ ESPN с полным набором полей игрока"""
+    rng = random.Random(seed)
+    entries = []
+    for player_id in range(players):
+        stats = []
+        for split in range(splits):
+            stats.append({
+                "id": f"{split}{player_id}",
+                "scoringPeriodId": split,
+                "seasonId": 2025,
+                "statSourceId": split % 2,
+                "statSplitTypeId": split % 6,
+                "appliedTotal": round(rng.uniform(0, 20), 2),
+                "stats": {str(stat_id): rng.random() for stat_id in range(40)},
+                "appliedStats": {str(stat_id): rng.random() for stat_id in range(15)},
+            })
+        entries.append({
+            "id": player_id,
+            "onTeamId": rng.randint(0, 12),
+            "draftAuctionValue": 0,
+            "keeperValue": 0,
+            "ratings": {str(split): {"positionalRanking": rng.randint(1, 300),
+                                     "totalRanking": rng.randint(1, 900),
+                                     "totalRating": rng.random() * 100} for split in range(3)},
+            "player": {
+                "id": player_id,
+                "fullName": f"Player {player_id}",
+                "firstName": "Player",
+                "lastName": str(player_id),
+                "defaultPositionId": rng.randint(1, 5),
+                "proTeamId": rng.randint(1, 32),
+                "eligibleSlots": [0, 1, 3, 6, 7],
+                "injured": False,
+                "ownership": {"percentOwned": rng.random() * 100, "percentChange": rng.random()},
+                "rankings": {"0": [{"rank": rng.randint(1, 900), "slotId": 0}]},
+                "stats": stats,
+            },
+        })
+    return json.dumps({"players": entries, "positionAgainstOpponent": {}}).encode("utf-8")
+
+
+def full_parse(body: bytes):
+    """Прежняя схема: response.json() и сокращение после разбора"""
+    return project_players(json.loads(body))
+
+
+def stream_parse(body: bytes):
+    """Потоковый разбор: в памяти только текущий игрок и компактные записи"""
+    return {"players": list(iter_players(io.BytesIO(body)))}
+
+
+def measure(func, body: bytes, repeat: int):
+    """Процессорное время (мс) и пиковая память (МБ) разбора"""
+    started = time.process_time()
+    for _ in range(repeat):
+        func(body)
+    cpu_ms = (time.process_time() - started) / repeat * 1000
+
+    tracemalloc.start()
+    func(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cpu_ms, peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк разбора ответов kona_player_info')
+    parser.add_argument('--players', type=int, default=1000, help='Количество игроков (limit запроса)')
+    parser.add_argument('--splits', type=int, default=6, help='Записей статистики на игрока')
+    parser.add_argument('--repeat', type=int, default=5, help='Повторов замера времени')
+    args = parser.parse_args()
+
+    if not streaming_available():
+        print("ijson не установлен: pip install ijson")
+        sys.exit(1)
+
+    body = generate_response(args.players, args.splits)
+    assert full_parse(body) == stream_parse(body), "Результаты разбора отличаются"
+
+    print(f"Игроков: {args.players}, размер ответа: {len(body) / 1024 / 1024:.1f} МБ")
+    print(f"{'Способ':<22}{'CPU, мс':>12}{'пик памяти, МБ':>18}")
+    for label, func in (('response.json()', full_parse), ('потоковый (ijson)', stream_parse)):
+        cpu_ms, peak_mb = measure(func, body, args.repeat)
+        print(f"{label:<22}{cpu_ms:>12.1f}{peak_mb:>18.1f}")
+
+
+if __name__ == '__main__':
+    main()
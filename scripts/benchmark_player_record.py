@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк записей игроков: вложенные словари против PlayerDay (__slots__)
+
+Прежняя схема создает на каждого игрока дня словарь {"info": {...},
+"stats": {...}} (StatsService) или словарь с готовым URL фото
+(app_day.parse_player_data). PlayerDay хранит только скалярные поля,
+URL и словари прежнего формата строятся по запросу. Замер: разбор всех
+дней сезона с сохранением результатов в памяти, как при бэкфилле.
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tracemalloc
+
+# Добавляем путь к корневой директории проекта
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import settings
+from src.utils.player_record import PlayerDay
+
+
+def generate_season(players: int, days: int, seed: int = 42):
+    """Синтетические компактные ответы ESPN за каждый игровой день"""
+    rng = random.Random(seed)
+    roster = [
+        {"id": player_id, "fullName": f"Player {player_id}",
+         "defaultPositionId": rng.randint(1, 5), "proTeamId": rng.randint(1, 32)}
+        for player_id in range(players)
+    ]
+    return [
+        {"players": [
+            {"player": {**player, "stats": [{"scoringPeriodId": day, "appliedTotal": round(rng.uniform(0, 15), 2)}]}}
+            for player in roster
+        ]}
+        for day in range(days)
+    ]
+
+
+def parse_dicts(data, scoring_period_id):
+    """Прежняя схема (app_day.parse_player_data): словарь на игрока с URL фото"""
+    positions = {position: [] for position in settings.TEAM_OF_DAY_COMPOSITION}
+    for entry in data["players"]:
+        player = entry["player"]
+        player_id = str(player["id"])
+        position = settings.PLAYER_POSITIONS.get(player["defaultPositionId"])
+        applied_total = 0
+        for stat in player["stats"]:
+            if stat["scoringPeriodId"] == scoring_period_id:
+                applied_total = round(stat["appliedTotal"], 2)
+                break
+        positions[position].append({
+            "id": player_id,
+            "name": player["fullName"],
+            "appliedTotal": applied_total,
+            "image_url": f"https://a.espncdn.com/combiner/i?img=/i/headshots/nhl/players/full/{player_id}.png&w=130&h=100",
+            "grade": "common"
+        })
+    return positions
+
+
+def parse_records(data, scoring_period_id):
+    """Новая схема (app_day.parse_player_data): PlayerDay на игрока"""
+    positions = {position: [] for position in settings.TEAM_OF_DAY_COMPOSITION}
+    for entry in data["players"]:
+        player = entry["player"]
+        applied_total = 0
+        for stat in player["stats"]:
+            if stat["scoringPeriodId"] == scoring_period_id:
+                applied_total = round(stat["appliedTotal"], 2)
+                break
+        positions[settings.PLAYER_POSITIONS.get(player["defaultPositionId"])].append(
+            PlayerDay(str(player["id"]), player["fullName"], player["defaultPositionId"], points=applied_total)
+        )
+    return positions
+
+
+def run(parse, season):
+    """Разбор сезона: время (с) и память удерживаемых результатов (МБ)"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = [parse(data, day) for day, data in enumerate(season)]
+    elapsed = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    started = time.perf_counter()
+    for day, data in enumerate(season):
+        parse(data, day)
+    return time.perf_counter() - started, current / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк записей игроков')
+    parser.add_argument('--players', type=int, default=1000, help='Игроков в ответе за день')
+    parser.add_argument('--days', type=int, default=180, help='Игровых дней в сезоне')
+    args = parser.parse_args()
+
+    season = generate_season(args.players, args.days)
+    records = args.players * args.days
+
+    print(f"Игроков в день: {args.players}, дней: {args.days}, записей: {records}")
+    print(f"{'Схема':<20}{'время, с':>10}{'записей/с':>14}{'память, МБ':>14}")
+    for label, parse in (('словари', parse_dicts), ('PlayerDay', parse_records)):
+        elapsed, memory_mb = run(parse, season)
+        print(f"{label:<20}{elapsed:>10.2f}{records / elapsed:>14.0f}{memory_mb:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк отрисовки коллажей при массовой обработке сезона
+
+Все коллажи сезона отправляются в RenderService и ожидаются из asyncio,
+как в app_day --all-weeks. Для каждого числа процессов замеряются
+пропускная способность и наибольшая задержка цикла событий (насколько
+отрисовка мешает отправке сообщений). 0 процессов - отрисовка в потоках
+цикла событий, как до пула процессов.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+
+from PIL import Image
+
+# Добавляем путь к корневой директории проекта
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.render_service import RenderService, pack_image, render_vertical
+
+
+def make_jobs(count: int):
+    """Задания коллажей команды дня с синтетическими миниатюрами"""
+    positions = ['C', 'LW', 'RW', 'D', 'D', 'G']
+    jobs = []
+    for day in range(count):
+        rows = []
+        for slot, position in enumerate(positions):
+            photo = Image.effect_noise((130, 100), 64).convert('RGB')
+            rows.append((pack_image(photo), f"{position}: Player {day}-{slot} ({day % 17 + slot:.2f} ftps)", "black"))
+        jobs.append((f"Команда дня {day}", rows))
+    return jobs
+
+
+async def run(jobs, workers: int):
+    """Отрисовка всех заданий: (секунды, наибольшая задержка цикла событий в мс)"""
+    lag = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal lag
+        while not done:
+            started = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lag = max(lag, time.perf_counter() - started - 0.005)
+
+    watcher = asyncio.ensure_future(ticker())
+    with RenderService(workers=workers) as renderer:
+        # Прогрев: запуск процессов в замер не входит
+        await asyncio.gather(*(renderer.submit(render_vertical, *jobs[0]) for _ in range(max(1, workers))))
+        started = time.perf_counter()
+        await asyncio.gather(*(renderer.submit(render_vertical, *job) for job in jobs))
+        elapsed = time.perf_counter() - started
+    done = True
+    await watcher
+    return elapsed, lag * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк пула отрисовки коллажей')
+    parser.add_argument('--collages', type=int, default=84, help='Коллажей (12 недель по 7 дней)')
+    parser.add_argument('--workers', type=int, nargs='*', help='Числа процессов для замера')
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    workers = args.workers or sorted({0, 1, 2, 4, cpus})
+    jobs = make_jobs(args.collages)
+
+    print(f"Коллажей: {args.collages}, ядер: {cpus}")
+    print(f"{'процессов':<12}{'время, с':>10}{'коллажей/с':>14}{'задержка цикла, мс':>22}")
+    for count in workers:
+        elapsed, lag_ms = asyncio.run(run(jobs, count))
+        print(f"{count:<12}{elapsed:>10.2f}{len(jobs) / elapsed:>14.1f}{lag_ms:>22.1f}")
+
+
+if __name__ == '__main__':
+    main()
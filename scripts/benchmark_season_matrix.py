@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк агрегации очков за период: вложенные словари против SeasonMatrix
+
+Прежняя схема (rewrite_all_stats.process_week, StatsService.get_team_of_the_week)
+обходит списки игроков каждого дня и суммирует очки в словаре, после чего
+сортирует кандидатов по позициям. SeasonMatrix хранит очки в плотной
+матрице игроки x игровые дни и считает то же суммой столбцов и argpartition.
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+from collections import defaultdict
+
+# Добавляем путь к корневой директории проекта
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import settings
+from src.services.season_matrix import SeasonMatrix
+
+
+def generate_season(players: int, periods: int, seed: int = 42):
+    """Генерирует дни сезона: {period_id: [(player_id, position_id, очки), ...]}"""
+    rng = random.Random(seed)
+    positions = [rng.choice(list(settings.PLAYER_POSITIONS)) for _ in range(players)]
+    season = {}
+    for period_id in range(1, periods + 1):
+        # В игровой день играет примерно половина игроков
+        season[period_id] = [
+            (str(player), positions[player], round(rng.uniform(0, 15), 1))
+            for player in range(players) if rng.random() < 0.5
+        ]
+    return season
+
+
+def dict_team(season, start: int, end: int):
+    """Прежняя схема: суммирование по словарям и сортировка по позициям"""
+    totals = defaultdict(float)
+    positions = {}
+    for period_id in range(start, end + 1):
+        for player_id, position_id, points in season.get(period_id, []):
+            totals[player_id] += points
+            positions[player_id] = position_id
+
+    by_position = defaultdict(list)
+    for player_id, points in totals.items():
+        if points > 0:
+            by_position[settings.PLAYER_POSITIONS[positions[player_id]]].append((player_id, points))
+
+    team = {}
+    for position, count in settings.TEAM_OF_DAY_COMPOSITION.items():
+        team[position] = sorted(by_position[position], key=lambda x: x[1], reverse=True)[:count]
+    return team
+
+
+def measure(func, repeat: int) -> float:
+    """Среднее время вызова в миллисекундах"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк матрицы очков сезона')
+    parser.add_argument('--players', type=int, default=1000, help='Количество игроков')
+    parser.add_argument('--periods', type=int, default=200, help='Количество игровых дней')
+    parser.add_argument('--repeat', type=int, default=20, help='Повторов каждого замера')
+    args = parser.parse_args()
+
+    season = generate_season(args.players, args.periods)
+
+    started = time.perf_counter()
+    matrix = SeasonMatrix(periods=args.periods)
+    for period_id, rows in season.items():
+        matrix.set_period(period_id, ((player_id, position_id, points, None) for player_id, position_id, points in rows))
+    build = time.perf_counter() - started
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        matrix.save(tmp_dir)
+        size_kb = sum(os.path.getsize(os.path.join(tmp_dir, name)) for name in os.listdir(tmp_dir)) / 1024
+        started = time.perf_counter()
+        loaded = SeasonMatrix.load(tmp_dir)
+        load = (time.perf_counter() - started) * 1000
+
+        print(f"Игроков: {args.players}, игровых дней: {args.periods}")
+        print(f"Построение матрицы: {build:.2f} с, на диске {size_kb:.0f} КБ, загрузка (mmap): {load:.1f} мс")
+        print(f"{'Запрос':<22}{'словари, мс':>14}{'матрица, мс':>14}{'ускорение':>12}")
+
+        ranges = {
+            'команда дня': (100, 100),
+            'команда недели': (100, 106),
+            'последние 30 дней': (args.periods - 29, args.periods),
+            'весь сезон': (1, args.periods),
+        }
+        for label, (start, end) in ranges.items():
+            expected = dict_team(season, start, end)
+            actual = loaded.team_of_period(start, end)
+            for position in expected:
+                assert [player_id for player_id, _ in expected[position]] == \
+                    [player_id for player_id, _ in actual[position]], f"Результаты отличаются: {label}"
+
+            dict_ms = measure(lambda: dict_team(season, start, end), args.repeat)
+            matrix_ms = measure(lambda: loaded.team_of_period(start, end), args.repeat)
+            print(f"{label:<22}{dict_ms:>14.2f}{matrix_ms:>14.2f}{dict_ms / matrix_ms:>11.0f}x")
+
+
+if __name__ == '__main__':
+    main()
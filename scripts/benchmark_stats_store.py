@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк обновления player_stats.json при обработке сезона
+
+Сравнивает прежнее поведение app_day.update_player_stats (чтение и запись
+всего файла на каждого выбранного игрока) с PlayerStatsStore, который
+загружается один раз и сохраняет неделю одной атомарной записью.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+
+# Добавляем путь к корневой директории проекта
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.player_stats_store import PlayerStatsStore
+
+TEAM_SLOTS = ['C', 'LW', 'RW', 'D', 'D', 'G']
+SEASON_START = datetime(2024, 10, 8)
+
+
+def generate_season(weeks: int, pool_size: int, seed: int = 42):
+    """Генерирует выборы команд дня за сезон: [(неделя, [(дата, id, очки, позиция), ...])]"""
+    rng = random.Random(seed)
+    season = []
+    for week in range(weeks):
+        selections = []
+        for day in range(7):
+            date_str = (SEASON_START + timedelta(days=week * 7 + day)).strftime('%Y-%m-%d')
+            for position in TEAM_SLOTS:
+                player_id = str(rng.randrange(pool_size))
+                selections.append((date_str, player_id, round(rng.uniform(0, 20), 1), position))
+        season.append(selections)
+    return season
+
+
+def run_legacy(path: str, season) -> float:
+    """Прежнее поведение: полный цикл чтения и записи файла на каждого игрока"""
+    started = time.perf_counter()
+    for selections in season:
+        for date_str, player_id, points, position in selections:
+            store = PlayerStatsStore(path).load()
+            store.record_selection(player_id, f"Player {player_id}", date_str, points, position, True)
+            with open(path, 'w') as f:
+                json.dump(store.data, f, indent=4)
+    return time.perf_counter() - started
+
+
+def run_batched(path: str, season) -> float:
+    """Новое поведение: одна загрузка за запуск и одна запись на неделю"""
+    started = time.perf_counter()
+    store = PlayerStatsStore(path).load()
+    for selections in season:
+        for date_str, player_id, points, position in selections:
+            store.record_selection(player_id, f"Player {player_id}", date_str, points, position, True)
+        store.flush()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк записи статистики игроков')
+    parser.add_argument('--weeks', type=int, default=26, help='Количество недель в сезоне')
+    parser.add_argument('--pool', type=int, default=300, help='Количество разных игроков')
+    args = parser.parse_args()
+
+    season = generate_season(args.weeks, args.pool)
+    updates = sum(len(selections) for selections in season)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        legacy_path = os.path.join(tmp_dir, 'legacy.json')
+        batched_path = os.path.join(tmp_dir, 'batched.json')
+
+        legacy = run_legacy(legacy_path, season)
+        batched = run_batched(batched_path, season)
+
+        with open(legacy_path) as f_legacy, open(batched_path) as f_batched:
+            legacy_weeks = json.load(f_legacy)['weeks']
+            batched_weeks = json.load(f_batched)['weeks']
+        assert legacy_weeks == batched_weeks, "Результаты отличаются"
+
+        size_kb = os.path.getsize(batched_path) / 1024
+
+    print(f"Недель: {args.weeks}, обновлений: {updates}, итоговый файл: {size_kb:.0f} КБ")
+    print(f"Чтение/запись на каждого игрока: {legacy:.2f} с")
+    print(f"Одна запись на неделю:          {batched:.2f} с (x{legacy / batched:.0f})")
+
+
+if __name__ == '__main__':
+    main()
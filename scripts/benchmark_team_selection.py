@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк выбора команды дня: полная сортировка против select_top_by_position
+
+Прежние реализации (TeamService, TeamWeekService, send_daily_teams,
+app_day) группировали игроков по позициям, сортировали каждый список
+целиком и брали один-два первых. select_top_by_position делает один
+проход с кучей из нужного количества игроков на позицию.
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+from collections import defaultdict
+
+# Добавляем путь к корневой директории проекта
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import settings
+from src.utils.team_utils import select_top_by_position, team_slots
+
+
+def generate_pool(size: int, seed: int = 42):
+    """Генерирует пул игроков в формате StatsService"""
+    rng = random.Random(seed)
+    return [
+        {
+            "info": {"id": str(i), "name": f"Player {i}", "primary_position": rng.randint(1, 5)},
+            "stats": {"total_points": round(rng.uniform(-2, 20), 1)}
+        }
+        for i in range(size)
+    ]
+
+
+def sort_team(players):
+    """Прежняя схема: группировка, полная сортировка, срез"""
+    grouped = defaultdict(list)
+    for player in players:
+        position = settings.PLAYER_POSITIONS.get(player["info"]["primary_position"])
+        if position and player["stats"]["total_points"] > 0:
+            grouped[position].append(player)
+    for position in grouped:
+        grouped[position].sort(key=lambda x: x["stats"]["total_points"], reverse=True)
+
+    selected = {}
+    for position, count in settings.TEAM_OF_DAY_COMPOSITION.items():
+        for i, player in enumerate(grouped.get(position, [])[:count]):
+            selected[position if count == 1 else f"{position}{i + 1}"] = player
+    return selected
+
+
+def heap_team(players):
+    """Новая схема: один проход с кучами по позициям"""
+    return team_slots(select_top_by_position(
+        players,
+        position_of=lambda player: settings.PLAYER_POSITIONS.get(player["info"]["primary_position"]),
+        points_of=lambda player: player["stats"]["total_points"],
+        min_points=0
+    ))
+
+
+def measure(func, players, repeat: int) -> float:
+    """Среднее время вызова в миллисекундах"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func(players)
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк выбора команды дня')
+    parser.add_argument('--pool', type=int, nargs='+', default=[300, 1000, 5000], help='Размеры пула игроков')
+    parser.add_argument('--repeat', type=int, default=200, help='Повторов каждого замера')
+    args = parser.parse_args()
+
+    print(f"{'Игроков':>8}{'сортировка, мс':>17}{'куча, мс':>11}{'ускорение':>12}")
+    for size in args.pool:
+        players = generate_pool(size)
+        assert sort_team(players) == heap_team(players), "Результаты отличаются"
+        sort_ms = measure(sort_team, players, args.repeat)
+        heap_ms = measure(heap_team, players, args.repeat)
+        print(f"{size:>8}{sort_ms:>17.3f}{heap_ms:>11.3f}{sort_ms / heap_ms:>11.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,10 +3,10 @@ import os
 import sys
 import json
 import logging
-import random
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional
 from datetime import datetime
 from src.config.settings import PROCESSED_DATA_DIR
+from src.utils.lineup_solver import eligible_positions, solve_lineup
 
 def setup_logging():
     """Настройка логирования"""
@@ -35,109 +35,14 @@ def calculate_player_score(player: Dict) -> float:
         total_score += stat.get('appliedTotal', 0)
     return total_score
 
-def get_position_name(position_id: int) -> str:
-    """Возвращает название позиции по её ID"""
-    positions = {
-        0: "C",   # Center
-        1: "LW",  # Left Wing
-        2: "RW",  # Right Wing
-        3: "F",   # Forward (может быть C/LW/RW)
-        4: "D",   # Defense
-        5: "G"    # Goalie
-    }
-    return positions.get(position_id, "Unknown")
-
 def get_player_positions(player: Dict) -> List[str]:
-    """Определяет все возможные позиции игрока"""
-    position_id = player['defaultPositionId']
-    eligible_slots = player.get('eligibleSlots', [])
-    
-    # Возвращаем только основную позицию игрока
-    position = get_position_name(position_id)
-    return [position] if position != "Unknown" else []
-
-def select_best_players(players: List[Dict], num_players: int = 1, used_players: Set[int] = None) -> List[Dict]:
-    """Выбирает лучших игроков с учетом случайного выбора при равных очках"""
-    if not players:
-        return []
-        
-    if used_players is None:
-        used_players = set()
-        
-    # Отфильтровываем уже использованных игроков
-    available_players = [p for p in players if p['id'] not in used_players]
-    if not available_players:
-        return []
-        
-    # Сортируем игроков по очкам
-    sorted_players = sorted(available_players, key=lambda x: x['score'], reverse=True)
-    
-    # Выбираем игроков с лучшим результатом
-    best_score = sorted_players[0]['score']
-    best_players = [p for p in sorted_players if p['score'] == best_score]
-    
-    # Если есть несколько игроков с одинаковым результатом, выбираем случайно
-    if len(best_players) > num_players:
-        selected = random.sample(best_players, num_players)
-        for player in selected:
-            used_players.add(player['id'])
-        return selected
-    
-    # Если лучших игроков меньше чем нужно, добавляем следующих по очкам
-    result = best_players
-    for player in result:
-        used_players.add(player['id'])
-        
-    remaining_players = [p for p in sorted_players if p not in best_players and p['id'] not in used_players]
-    
-    while len(result) < num_players and remaining_players:
-        next_score = remaining_players[0]['score']
-        next_players = [p for p in remaining_players if p['score'] == next_score]
-        
-        if len(result) + len(next_players) <= num_players:
-            for player in next_players:
-                used_players.add(player['id'])
-            result.extend(next_players)
-            remaining_players = [p for p in remaining_players if p not in next_players]
-        else:
-            needed = num_players - len(result)
-            selected = random.sample(next_players, needed)
-            for player in selected:
-                used_players.add(player['id'])
-            result.extend(selected)
-            break
-            
-    return result
-
-def get_player_position(player):
-    position_id = player['defaultPositionId']
-    eligible_slots = player.get('eligibleSlots', [])
-    
-    # Если игрок может играть в центре (слот 0) и его основная позиция - нападающий
-    if 0 in eligible_slots and position_id in [1, 2, 3]:
-        return 'C'
-    # Если игрок может играть слева (слот 1) и его основная позиция - нападающий
-    elif position_id == 1 and 1 not in eligible_slots:
-        return 'LW'
-    elif position_id == 2:
-        return 'RW'
-    elif position_id == 3:
-        return 'F'
-    elif position_id == 4:
-        return 'D'
-    elif position_id == 5:
-        return 'G'
-    else:
-        return None
+    """Определяет все возможные позиции игрока (по eligibleSlots)"""
+    return sorted(eligible_positions(player))
 
 def form_team(stats: Dict) -> Dict:
     """Формирует команду на основе статистики"""
     logger = logging.getLogger(__name__)
     
-    # Словарь для хранения игроков по позициям
-    positions = {'C': [], 'LW': [], 'RW': [], 'D': [], 'G': []}
-    used_players = set()
-    
     # Собираем статистику по всем игрокам за все дни
     all_players = {}  # id -> player_info
     
@@ -158,10 +63,10 @@ def form_team(stats: Dict) -> Dict:
                         'stats': player['stats']
                     })
             else:
-                # Получаем позицию игрока
-                position = get_player_position(player)
+                # Получаем все позиции, на которых может играть игрок
+                positions = eligible_positions(player)
                 
-                if not position:
+                if not positions:
                     logger.warning(f"Неизвестная позиция для игрока {player['fullName']}: {player['defaultPositionId']}")
                     continue
                     
@@ -172,36 +77,25 @@ def form_team(stats: Dict) -> Dict:
                 player_info = {
                     'id': player_id,
                     'name': player['fullName'],
-                    'position': position,
+                    'positions': positions,
                     'score': score,
                     'stats': player['stats']
                 }
                 
                 all_players[player_id] = player_info
     
-    # Сортируем игроков по убыванию очков для каждой позиции
-    for position in positions:
-        position_players = [p for p in all_players.values() if p['position'] == position]
-        sorted_players = sorted(position_players, key=lambda x: x['score'], reverse=True)
-        
-        # Выбираем лучших игроков для каждой позиции
-        max_players = get_max_players_for_position(position)
-        for player in sorted_players:
-            if player['id'] not in used_players and len(positions[position]) < max_players:
-                positions[position].append(player)
-                used_players.add(player['id'])
-                logger.info(f"Добавлен игрок {player['name']} на позицию {position}")
+    # Состав с максимальной суммой очков: игрок может занять любую
+    # допустимую для него позицию, но только одно место
+    team = solve_lineup(
+        all_players.values(),
+        points_of=lambda p: p['score'],
+        positions_of=lambda p: p['positions']
+    )
+    for position, players in team.items():
+        for player in players:
+            logger.info(f"Добавлен игрок {player['name']} на позицию {position}")
     
-    return positions
-
-def get_max_players_for_position(position):
-    return {
-        'C': 1,   # 1 центральный нападающий
-        'LW': 1,  # 1 левый нападающий
-        'RW': 1,  # 1 правый нападающий
-        'D': 2,   # 2 защитника
-        'G': 1    # 1 вратарь
-    }[position]
+    return team
 
 def main():
     """Основная функция"""
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Перенос статистики из JSON-файлов в базу SQLite (settings.STATS_DB_FILE)
+
+Импортируются недельная статистика игроков (player_stats.json), команды
+недели (weekly_team_stats.json), команды дня StatsService
+(data/processed/player_stats.json) и история send_daily_teams
+(data/processed/teams_history.json). Повторный запуск безопасен: записи
+обновляются по первичным ключам. После импорта включите STATS_BACKEND=sqlite.
+"""
+
+import os
+import sys
+import json
+import argparse
+from pathlib import Path
+
+# Добавляем путь к корневой директории проекта
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.config import settings
+from src.services.stats_db import StatsDB
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+
+def load_json(path: Path):
+    """Чтение JSON-файла; отсутствующий файл пропускается"""
+    if not path.exists():
+        print(f"Пропуск {path}: файл не найден")
+        return None
+    with path.open('r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Импорт статистики из JSON в SQLite')
+    parser.add_argument('--db', type=Path, default=settings.STATS_DB_FILE, help='Файл базы SQLite')
+    parser.add_argument('--player-stats', type=Path, default=ROOT_DIR / 'player_stats.json',
+                        help='Недельная статистика игроков (app_day)')
+    parser.add_argument('--weekly-stats', type=Path, default=ROOT_DIR / 'weekly_team_stats.json',
+                        help='Команды недели (app_week)')
+    parser.add_argument('--daily-stats', type=Path, default=settings.STATS_FILE,
+                        help='Команды дня StatsService')
+    parser.add_argument('--history', type=Path, default=settings.PROCESSED_DATA_DIR / 'teams_history.json',
+                        help='История send_daily_teams')
+    args = parser.parse_args()
+
+    db = StatsDB(args.db)
+
+    data = load_json(args.player_stats)
+    if data is not None:
+        count = db.import_player_stats(data)
+        print(f"{args.player_stats}: импортировано игроков: {count}")
+
+    data = load_json(args.weekly_stats)
+    if data is not None:
+        db.save_weekly_stats(data)
+        print(f"{args.weekly_stats}: импортировано недель: {len(data.get('weeks', {}))}")
+
+    data = load_json(args.daily_stats)
+    if data is not None:
+        db.save_daily_teams(data, 'stats', days_key='days')
+        print(f"{args.daily_stats}: импортировано дней: {len(data.get('days', {}))}")
+
+    data = load_json(args.history)
+    if data is not None:
+        db.save_daily_teams(data, 'history', days_key='teams')
+        print(f"{args.history}: импортировано дней: {len(data.get('teams', {}))}")
+
+    db.close()
+    print(f"База статистики: {args.db}")
+
+
+if __name__ == '__main__':
+    main()
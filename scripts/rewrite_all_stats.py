@@ -7,13 +7,21 @@ import asyncio
 import pytz
 from datetime import datetime, timedelta
 import argparse
+from typing import Optional, Tuple
+from collections import deque
 
 # Добавляем путь к корневой директории проекта
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.services.espn_service import ESPNService
 from src.services.image_service import ImageService
+from src.services.collage_output import persist_collage
+from src.services.render_service import RenderService
 from src.services.telegram_service import TelegramService
+from src.services.response_archive import set_archive_mode
+from src.services.game_state import is_period_final
+from src.services.season_matrix import SeasonMatrix, espn_period_rows
+from src.services.schedule_index import has_games
 from src.config import settings
 from scripts.send_daily_teams import (
     load_history,
@@ -21,6 +29,8 @@ from scripts.send_daily_teams import (
     update_history
 )
 
+REQUIRED_SLOTS = ['C', 'LW', 'RW', 'D1', 'D2', 'G']
+
 async def process_date(
     date: datetime,
     espn_service: ESPNService,
@@ -69,12 +79,13 @@ async def process_date(
                     logger.info(f"Фото для игрока {player['info']['name']} успешно загружено")
 
             # Создаем коллаж
-            collage_path = image_service.create_collage(player_photos, team, date_str, None)
-            if not collage_path:
+            collage = image_service.render_collage(player_photos, team, date_str, None)
+            if not collage:
                 logger.error("Не удалось создать коллаж")
                 return
 
-            logger.info(f"Коллаж успешно создан: {collage_path}")
+            logger.info(f"Коллаж успешно создан: {len(collage)} байт")
+            persist_collage(collage, f"team_day_{date_str}.png")
 
             # Формируем сообщение в нужном порядке: LW, C, RW, D1, D2, G
             message = f"🏒 Команда дня - {date_str}\n\n"
@@ -84,13 +95,113 @@ async def process_date(
                 message += f"{pos}: {player['info']['name']} - {player['stats']['total_points']} очков\n"
 
             # Отправляем в Telegram
-            await telegram_service.send_team_of_day(message, collage_path)
+            await telegram_service.send_team_of_day(message, collage)
             logger.info(f"Статистика успешно отправлена в Telegram для даты {date_str}")
 
     except Exception as e:
         logger.error(f"Ошибка при обработке даты {date}: {e}")
         return
 
+async def prepare_week(
+    start_date: datetime,
+    end_date: datetime,
+    espn_service: ESPNService,
+    image_service: ImageService,
+    logger: logging.Logger,
+    no_send: bool = False,
+    matrix: Optional[SeasonMatrix] = None,
+    renderer: Optional[RenderService] = None
+) -> Optional[Tuple[str, str, asyncio.Future]]:
+    """Формирование команды периода и запуск отрисовки коллажа
+    
+    Returns:
+        Optional[Tuple[str, str, asyncio.Future]]: (период, сообщение, задача отрисовки)
+        или None, если отправлять нечего
+    """
+    logger.info(f"Обработка периода с {start_date.strftime('%Y-%m-%d')} по {end_date.strftime('%Y-%m-%d')}")
+    
+    weekly_stats = {
+        "date": f"{start_date.strftime('%Y-%m-%d')} - {end_date.strftime('%Y-%m-%d')}"
+    }
+    if matrix is None:
+        matrix = SeasonMatrix.load()
+    
+    # Догружаем в матрицу сезона только отсутствующие и незавершенные дни.
+    # Статистика за дату берется по игровому дню следующей даты (см. ESPNService.get_daily_stats)
+    periods = []
+    updated = False
+    current_date = start_date
+    while current_date <= end_date:
+        period_id = espn_service.get_scoring_period_id(current_date + timedelta(days=1))
+        periods.append(period_id)
+        if not has_games(period_id):
+            # День без матчей: запрос не нужен, в матрице он остается пустым
+            if not matrix.has_period(period_id):
+                matrix.set_period(period_id, [])
+                updated = True
+        elif not matrix.has_period(period_id) or not is_period_final(period_id):
+            daily_stats = espn_service.get_daily_stats(current_date)
+            if daily_stats and daily_stats.get("players"):
+                matrix.set_period(period_id, espn_period_rows(daily_stats["players"], period_id))
+                updated = True
+        current_date += timedelta(days=1)
+    
+    if updated:
+        matrix.save()
+    
+    # Формируем команду периода: сумма очков за дни периода, лучшие по позициям
+    team = matrix.team_slots(matrix.team_of_period(min(periods), max(periods)))
+    
+    if not all(slot in team for slot in REQUIRED_SLOTS):
+        logger.warning("Не удалось сформировать команду периода")
+        return None
+        
+    if no_send:
+        return None
+        
+    # Загружаем фотографии игроков
+    player_photos = {}
+    for pos, player in team.items():
+        player_id = str(player['info']['id'])
+        photo_path = image_service.get_player_photo(player_id, player['info']['name'])
+        if photo_path:
+            player_photos[player_id] = photo_path
+            logger.info(f"Фото для игрока {player['info']['name']} успешно загружено")
+            
+    # Формируем сообщение
+    message = f"🏒 Команда периода {weekly_stats['date']}\n\n"
+    positions_order = ['LW', 'C', 'RW', 'D1', 'D2', 'G']
+    for pos in positions_order:
+        player = team[pos]
+        message += f"{pos}: {player['info']['name']} - {player['stats']['total_points']} очков\n"
+    
+    # Коллаж команды периода рисуется в фоне (в пуле процессов renderer)
+    render = asyncio.ensure_future(
+        image_service.render_collage_async(player_photos, team, weekly_stats["date"], renderer)
+    )
+    return weekly_stats["date"], message, render
+
+async def publish_week(
+    job: Tuple[str, str, asyncio.Future],
+    telegram_service: TelegramService,
+    logger: logging.Logger
+):
+    """Отправка команды периода после отрисовки коллажа"""
+    period, message, render = job
+    try:
+        collage = await render
+        if not collage:
+            logger.error("Не удалось создать коллаж команды периода")
+            return
+        persist_collage(collage, f"team_period_{period.replace(' ', '')}.png")
+        
+        # Отправляем в Telegram
+        await telegram_service.send_team_of_day(message, collage)
+        logger.info("Команда периода успешно отправлена в Telegram")
+        
+    except Exception as e:
+        logger.error(f"Ошибка при отправке команды периода: {e}")
+
 async def process_week(
     start_date: datetime,
     end_date: datetime,
@@ -99,62 +210,14 @@ async def process_week(
     telegram_service: TelegramService,
     history: dict,
     logger: logging.Logger,
-    no_send: bool = False
+    no_send: bool = False,
+    matrix: Optional[SeasonMatrix] = None
 ):
     """Обработка статистики за неделю"""
     try:
-        logger.info(f"Обработка периода с {start_date.strftime('%Y-%m-%d')} по {end_date.strftime('%Y-%m-%d')}")
-        
-        # Собираем статистику за все дни периода
-        weekly_stats = {
-            "date": f"{start_date.strftime('%Y-%m-%d')} - {end_date.strftime('%Y-%m-%d')}",
-            "players": []
-        }
-        
-        current_date = start_date
-        while current_date <= end_date:
-            daily_stats = espn_service.get_daily_stats(current_date)
-            if daily_stats and "players" in daily_stats:
-                weekly_stats["players"].extend(daily_stats["players"])
-            current_date += timedelta(days=1)
-        
-        if not weekly_stats["players"]:
-            logger.warning("Нет статистики за указанный период")
-            return
-            
-        # Формируем команду периода
-        team = get_best_players_by_position(weekly_stats, weekly_stats["date"], history)
-        
-        if not team:
-            logger.warning("Не удалось сформировать команду периода")
-            return
-            
-        if not no_send:
-            # Загружаем фотографии игроков
-            player_photos = {}
-            for pos, player in team.items():
-                player_id = str(player['info']['id'])
-                photo_path = image_service.get_player_photo(player_id, player['info']['name'])
-                if photo_path:
-                    player_photos[player_id] = photo_path
-                    logger.info(f"Фото для игрока {player['info']['name']} успешно загружено")
-                    
-            # Создаем коллаж команды периода
-            collage_path = image_service.create_collage(player_photos, team, weekly_stats["date"], None)
-            if not collage_path:
-                logger.error("Не удалось создать коллаж команды периода")
-                return
-                
-            # Формируем сообщение
-            message = f"🏒 Команда периода {weekly_stats['date']}\n\n"
-            positions_order = ['LW', 'C', 'RW', 'D1', 'D2', 'G']
-            for pos in positions_order:
-                player = team[pos]
-                message += f"{pos}: {player['info']['name']} - {player['stats']['total_points']} очков\n"
-                
-            # Отправляем в Telegram
-            await telegram_service.send_team_of_day(message, collage_path)
-            logger.info("Команда периода успешно отправлена в Telegram")
+        job = await prepare_week(start_date, end_date, espn_service, image_service, logger, no_send, matrix)
+        if job:
+            await publish_week(job, telegram_service, logger)
             
     except Exception as e:
         logger.error(f"Ошибка при обработке периода: {e}")
@@ -173,10 +236,18 @@ async def main():
     parser = argparse.ArgumentParser(description='Перезапись статистики')
     parser.add_argument('--date', help='Конкретная дата для обработки в формате YYYY-MM-DD')
     parser.add_argument('--week', help='Период для формирования команды периода в формате YYYY-MM-DD:YYYY-MM-DD')
+    parser.add_argument('--last-days', type=int, help='Команда лучших игроков за последние N дней')
     parser.add_argument('--all-weeks', action='store_true', help='Обработать все периода с начала сезона')
     parser.add_argument('--no-send', action='store_true', help='Не отправлять результаты в Telegram')
+    parser.add_argument('--offline', action='store_true', help='Брать ответы ESPN только из архива, без обращения к сети')
+    parser.add_argument('--replay', action='store_true', help='Брать ответы ESPN из архива, догружая недостающее из сети')
     args = parser.parse_args()
     
+    if args.offline:
+        set_archive_mode('offline')
+    elif args.replay:
+        set_archive_mode('replay')
+    
     # Инициализируем сервисы
     espn_service = ESPNService()
     image_service = ImageService()
@@ -214,23 +285,52 @@ async def main():
             logger.error(f"Неверный формат периода: {e}")
             return
             
+    elif args.last_days:
+        # Команда за последние N дней: суммы берутся из накопленных сумм матрицы сезона,
+        # из сети догружаются только отсутствующие и незавершенные дни
+        if args.last_days < 1:
+            logger.error("Количество дней должно быть положительным")
+            return
+        end_date = datetime.now(pytz.UTC).replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=1)
+        start_date = end_date - timedelta(days=args.last_days - 1)
+        await process_week(start_date, end_date, espn_service, image_service, telegram_service, history, logger, args.no_send)
+            
     elif args.all_weeks:
         # Обработка всех недель с начала сезона
         start_date = datetime(2024, 10, 4, tzinfo=pytz.UTC)  # Начало сезона
         end_date = datetime.now(pytz.UTC) - timedelta(days=1)  # Вчерашний день
         
+        matrix = SeasonMatrix.load()
         current_date = start_date
-        while current_date <= end_date:
-            # Находим начало и конец недели (понедельник-воскресенье)
-            week_start = current_date - timedelta(days=current_date.weekday())  # Получаем понедельник
-            week_end = week_start + timedelta(days=6)  # Получаем воскресенье
-            
-            if week_end > end_date:
-                week_end = end_date
+        # Коллажи рисуются в пуле процессов, пока считаются следующие недели;
+        # отправка идет строго по порядку недель
+        pending = deque()
+        with RenderService() as renderer:
+            while current_date <= end_date:
+                # Находим начало и конец недели (понедельник-воскресенье)
+                week_start = current_date - timedelta(days=current_date.weekday())  # Получаем понедельник
+                week_end = week_start + timedelta(days=6)  # Получаем воскресенье
+                
+                if week_end > end_date:
+                    week_end = end_date
+                    
+                try:
+                    job = await prepare_week(
+                        week_start, week_end, espn_service, image_service,
+                        logger, args.no_send, matrix, renderer
+                    )
+                    if job:
+                        pending.append(job)
+                except Exception as e:
+                    logger.error(f"Ошибка при обработке периода: {e}")
+                    
+                # Не держим в работе больше коллажей, чем процессов в пуле
+                while len(pending) > max(1, renderer.workers):
+                    await publish_week(pending.popleft(), telegram_service, logger)
+                current_date = week_end + timedelta(days=1)  # Переходим к следующей неделе
                 
-            await process_week(week_start, week_end, espn_service, image_service, telegram_service, history, logger, args.no_send)
-            current_date = week_end + timedelta(days=1)  # Переходим к следующей неделе
-            await asyncio.sleep(5)  # Задержка между неделями
+            while pending:
+                await publish_week(pending.popleft(), telegram_service, logger)
             
     else:
         # Стандартная обработка всех дат
@@ -245,7 +345,6 @@ async def main():
             logger.info(f"Обработка даты: {current_date.strftime('%Y-%m-%d')}")
             await process_date(current_date, espn_service, image_service, telegram_service, history, logger, args.no_send)
             current_date += timedelta(days=1)
-            await asyncio.sleep(5)  # Добавляем задержку между датами
 
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
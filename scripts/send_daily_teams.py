@@ -8,11 +8,16 @@ import logging
 from pathlib import Path
 
 from src.config import settings
+from src.services.stats_db import get_stats_db
+from src.utils.team_utils import select_top_by_position, team_slots
 
 logger = logging.getLogger(__name__)
 
 def load_history() -> Dict:
     """Загрузка истории команд"""
+    if settings.STATS_BACKEND == 'sqlite':
+        return get_stats_db().load_daily_teams('history', days_key='teams')
+
     history_file = settings.PROCESSED_DATA_DIR / "teams_history.json"
     
     if not history_file.exists():
@@ -27,6 +32,11 @@ def load_history() -> Dict:
 
 def save_history(history: Dict) -> None:
     """Сохранение истории команд"""
+    if settings.STATS_BACKEND == 'sqlite':
+        get_stats_db().save_daily_teams(history, 'history', days_key='teams')
+        logger.info("История успешно сохранена")
+        return
+
     history_file = settings.PROCESSED_DATA_DIR / "teams_history.json"
     
     try:
@@ -43,15 +53,7 @@ def get_best_players_by_position(daily_stats: Dict, date_str: str, history: Dict
         if not players:
             return None
             
-        # Группируем игроков по позициям
-        players_by_position = {
-            "C": [],
-            "LW": [],
-            "RW": [],
-            "D": [],
-            "G": []
-        }
-        
+        candidates = []
         for player_data in players:
             # Получаем базовую информацию об игроке
             player = player_data.get("player", {})
@@ -81,27 +83,16 @@ def get_best_players_by_position(daily_stats: Dict, date_str: str, history: Dict
                                     "total_points": total_points
                                 }
                             }
-                            players_by_position[position].append(processed_player)
+                            candidates.append((position, processed_player))
                             break
         
-        # Сортируем игроков по очкам
-        for pos in players_by_position:
-            players_by_position[pos].sort(
-                key=lambda x: x["stats"]["total_points"],
-                reverse=True
-            )
-        
-        # Формируем команду
-        team = {}
-        for pos, count in settings.TEAM_OF_DAY_COMPOSITION.items():
-            if pos == "D":
-                # Для защитников нам нужно два игрока
-                if len(players_by_position[pos]) >= 2:
-                    team["D1"] = players_by_position[pos][0]
-                    team["D2"] = players_by_position[pos][1]
-            else:
-                if players_by_position[pos]:
-                    team[pos] = players_by_position[pos][0]
+        # Формируем команду: лучшие игроки каждой позиции без полной сортировки
+        team = team_slots(select_top_by_position(
+            candidates,
+            position_of=lambda candidate: candidate[0],
+            points_of=lambda candidate: candidate[1]["stats"]["total_points"]
+        ))
+        team = {slot: processed_player for slot, (_, processed_player) in team.items()}
         
         # Проверяем, что все позиции заполнены
         required_positions = ["C", "LW", "RW", "D1", "D2", "G"]
@@ -20,6 +20,26 @@ for dir_path in [CACHE_DIR, PROCESSED_DATA_DIR, LOG_DIR]:
 
 # Файлы данных
 STATS_FILE = PROCESSED_DATA_DIR / "player_stats.json"
+GAME_STATE_FILE = BASE_DIR / "kona_game_state.json"
+# Расписание команд НХЛ (proGamesByScoringPeriod) и его бинарный индекс
+TEAM_SCHEDULES_FILE = BASE_DIR / "TeamShedules.json"
+SCHEDULE_INDEX_FILE = PROCESSED_DATA_DIR / "schedule_index.bin"
+# Расчетная длительность матча для времени окончания игрового дня
+GAME_DURATION_MINUTES = int(os.getenv("GAME_DURATION_MINUTES", "210"))
+STATS_DB_FILE = Path(os.getenv("STATS_DB_FILE", PROCESSED_DATA_DIR / "stats.sqlite3"))
+# Хранилище статистики игроков: json (файлы) или sqlite (STATS_DB_FILE)
+STATS_BACKEND = os.getenv("STATS_BACKEND", "json")
+ARCHIVE_DIR = DATA_DIR / "archive"
+# Матрица очков сезона (игроки x игровые дни)
+SEASON_MATRIX_DIR = PROCESSED_DATA_DIR / "season_matrix"
+SEASON_PERIODS = int(os.getenv("SEASON_PERIODS", "200"))
+# Коллажи отправляются из памяти; копия на диск сохраняется только при COLLAGE_ARCHIVE=1
+COLLAGE_ARCHIVE = os.getenv("COLLAGE_ARCHIVE", "0") == "1"
+COLLAGE_ARCHIVE_DIR = DATA_DIR / "collages"
+# Шрифт коллажей app_day / app_week (при отсутствии - Roboto из assets или DejaVuSans)
+COLLAGE_FONT = os.getenv("COLLAGE_FONT", "C:\\Windows\\Fonts\\arial.ttf")
+# Процессов для отрисовки коллажей при массовой обработке (0 - рисовать в текущем процессе)
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", str(os.cpu_count() or 1)))
 
 # Настройки временной зоны
 ESPN_TIMEZONE = pytz.timezone(os.getenv("TIMEZONE", "US/Eastern"))
@@ -64,9 +84,28 @@ ESPN_API = {
     'RETRY_DELAY': int(os.getenv("RETRY_DELAY", "5"))
 }
 
+# Состояние игры ESPN (currentScoringPeriod)
+GAME_STATE_URL = os.getenv(
+    "GAME_STATE_URL",
+    f"https://lm-api-reads.fantasy.espn.com/apis/v3/games/fhl/seasons/{os.getenv('SEASON_ID', '2025')}?view=kona_game_state"
+)
+
+# Запуск обработки по завершении игрового дня
+TRIGGER_STATE_FILE = PROCESSED_DATA_DIR / "published_periods.json"
+# Запас после расчетного окончания последнего матча (овертаймы, буллиты, правки статистики)
+GAME_FINAL_GRACE_MINUTES = int(os.getenv("GAME_FINAL_GRACE_MINUTES", "45"))
+# Интервал опроса состояния игры, пока день не завершен (секунды)
+TRIGGER_POLL_SECONDS = int(os.getenv("TRIGGER_POLL_SECONDS", "300"))
+# Сколько прошедших игровых дней проверять на неопубликованные
+TRIGGER_LOOKBACK_PERIODS = int(os.getenv("TRIGGER_LOOKBACK_PERIODS", "2"))
+
 # Настройки Telegram
 TELEGRAM_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+# Дополнительные чаты для рассылки TelegramService (через запятую)
+TELEGRAM_EXTRA_CHAT_IDS = [chat_id.strip() for chat_id in os.getenv('TELEGRAM_EXTRA_CHAT_IDS', '').split(',') if chat_id.strip()]
+# file_id загруженных в Telegram изображений по хэшу содержимого
+TELEGRAM_FILE_IDS_FILE = PROCESSED_DATA_DIR / "telegram_file_ids.json"
 
 # Позиции игроков
 PLAYER_POSITIONS = {
@@ -91,8 +130,46 @@ REQUEST_TIMEOUT = int(os.getenv("REQUEST_TIMEOUT", "30"))
 MAX_RETRIES = int(os.getenv("MAX_RETRIES", "3"))
 RETRY_DELAY = int(os.getenv("RETRY_DELAY", "5"))
 
+# Общий HTTP-клиент: одновременные запросы к хосту и пулы соединений
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", "0.5"))
+HTTP_HOST_LIMITS = {
+    'lm-api-reads.fantasy.espn.com': int(os.getenv("ESPN_API_CONCURRENCY", "4")),
+    'a.espncdn.com': int(os.getenv("ESPN_CDN_CONCURRENCY", "8")),
+}
+HTTP_DEFAULT_HOST_LIMIT = 4
+TELEGRAM_POOL_SIZE = int(os.getenv("TELEGRAM_POOL_SIZE", "8"))
+
+# Адаптивные ограничители частоты запросов: запросов в секунду
+HTTP_RATE_LIMITERS = {
+    'lm-api-reads.fantasy.espn.com': 'espn',
+}
+RATE_LIMITS = {
+    'espn': {'rate': 2.0, 'min_rate': 0.1, 'max_rate': 10.0, 'burst': 4},
+    # Telegram допускает около 20 сообщений в минуту в одну группу
+    'telegram': {'rate': 0.3, 'min_rate': 0.02, 'max_rate': 1.0, 'burst': 3},
+}
+
 # Настройки кэширования
 CACHE_TTL = 3600  # 1 час в секундах
+CACHE_TTL_CURRENT = int(os.getenv("CACHE_TTL_CURRENT", "300"))  # текущий игровой день, статистика еще меняется
+CACHE_MEMORY_SIZE = int(os.getenv("CACHE_MEMORY_SIZE", "64"))  # записей в памяти процесса
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(200 * 1024 * 1024)))  # предельный размер кэша на диске
+CACHE_EVICTION_POLICY = os.getenv("CACHE_EVICTION_POLICY", "lru")  # lru или lfu
+
+# Кэш готовых миниатюр фотографий игроков
+THUMBNAILS_CACHE_DIR = CACHE_DIR / "thumbnails"
+THUMBNAIL_TTL = 7 * 24 * 3600  # неделя, после чего миниатюра перепроверяется по ETag
+THUMBNAIL_MEMORY_SIZE = 512  # количество миниатюр в памяти процесса
+
+# Кэш готовых коллажей по отпечатку команды (общий для app_day, app_week и скриптов)
+RENDER_CACHE_DIR = CACHE_DIR / "renders"
+RENDER_CACHE_MAX_BYTES = int(os.getenv("RENDER_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))  # 0 - без кэша на диске
+RENDER_CACHE_MEMORY_BYTES = int(os.getenv("RENDER_CACHE_MEMORY_BYTES", str(16 * 1024 * 1024)))
+
+# Архив ответов ESPN (kona_player_info)
+# record - сохранять ответы за завершенные дни, replay - брать из архива и догружать недостающее,
+# offline - работать только из архива, off - не использовать архив
+ESPN_ARCHIVE_MODE = os.getenv("ESPN_ARCHIVE_MODE", "record")
 
 # Пути к директориям
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'data')
@@ -1,12 +1,12 @@
 import os
 import json
 import logging
-import time
 from datetime import datetime
 from typing import Dict, List
 from src.services.stats_service import StatsService
 from src.services.image_service import ImageService
 from src.services.telegram_service import TelegramService
+from src.services.rate_limiter import get_rate_limiter
 from src.config.settings import (
     ESPN_API,
     ESPN_TIMEZONE,
@@ -140,6 +140,7 @@ def main():
         # Инициализируем сервисы
         image_service = ImageService()
         telegram_service = TelegramService(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID)
+        telegram_limiter = get_rate_limiter('telegram')
         
         # Обрабатываем каждый день
         for daily_stat in season_stats['daily_stats']:
@@ -153,6 +154,9 @@ def main():
                 # Формируем сообщение
                 message = create_team_message(date, best_players)
                 
+                # Ожидание разрешения ограничителя Telegram вместо фиксированной паузы
+                telegram_limiter.acquire()
+                
                 if best_players:
                     # Создаем коллаж
                     collage_path = image_service.create_team_collage(best_players, date)
@@ -169,9 +173,6 @@ def main():
                 
                 logger.info(f"Данные за {date} успешно обработаны и отправлены")
                 
-                # Добавляем задержку между запросами
-                time.sleep(1)
-                
             except Exception as e:
                 logger.error(f"Ошибка при обработке данных за {date}: {str(e)}")
                 continue
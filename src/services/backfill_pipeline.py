@@ -0,0 +1,176 @@
+"""
+Конвейер массовой обработки периодов: загрузка -> обработка по порядку -> публикация
+"""
+
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Iterable, List, Optional, Tuple
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class StageStats:
+    """Статистика одной стадии конвейера"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.items = 0
+        self.busy_seconds = 0.0
+
+    def add(self, seconds: float) -> None:
+        """Учитывает обработку одного элемента"""
+        self.items += 1
+        self.busy_seconds += seconds
+
+    @property
+    def avg_seconds(self) -> float:
+        """Среднее время обработки одного элемента"""
+        return self.busy_seconds / self.items if self.items else 0.0
+
+
+class PipelineReport:
+    """Итоговый отчет о работе конвейера"""
+
+    def __init__(self, stages: List[StageStats], wall_seconds: float):
+        self.stages = {stage.name: stage for stage in stages}
+        self.wall_seconds = wall_seconds
+
+    def format(self) -> str:
+        """Форматирует отчет для лога"""
+        lines = [f"Конвейер завершен за {self.wall_seconds:.1f} с"]
+        for stage in self.stages.values():
+            throughput = stage.items / self.wall_seconds if self.wall_seconds else 0.0
+            lines.append(
+                f"  {stage.name}: {stage.items} шт., "
+                f"в среднем {stage.avg_seconds:.2f} с, "
+                f"пропускная способность {throughput:.2f} шт./с"
+            )
+        return "\n".join(lines)
+
+
+class BackfillPipeline:
+    """
+    Конвейер «производитель/потребитель» для обработки последовательности периодов
+
+    - fetch вызывается в пуле потоков одновременно для нескольких периодов,
+      не более fetch_concurrency одновременно; загрузки запускаются не дальше
+      чем на fetch_concurrency периодов вперед от обработки, поэтому при
+      медленной публикации загруженные данные не копятся в памяти;
+    - process вызывается строго в порядке периодов (грейды зависят от
+      предыдущих дней недели);
+    - publish выполняется отдельной задачей и перекрывается с загрузкой
+      и обработкой следующих периодов.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[Any], Any],
+        process: Callable[[Any, Any], Optional[Any]],
+        publish: Optional[Callable[[Any], Awaitable[None]]] = None,
+        fetch_concurrency: int = 4,
+        publish_queue_size: int = 2
+    ):
+        """
+        Args:
+            fetch: Синхронная загрузка данных периода
+            process: Синхронная обработка (период, данные); возвращает задание для публикации или None
+            publish: Асинхронная публикация задания
+            fetch_concurrency: Максимальное количество одновременных загрузок
+            publish_queue_size: Сколько заданий может ждать публикации
+        """
+        self.fetch = fetch
+        self.process = process
+        self.publish = publish
+        self.fetch_concurrency = max(1, fetch_concurrency)
+        self.publish_queue_size = max(1, publish_queue_size)
+
+    async def _fetch(self, item: Any, stats: StageStats) -> Any:
+        """Загрузка одного периода"""
+        started = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(None, self.fetch, item)
+        except Exception as e:
+            logger.error(f"Ошибка загрузки {item}: {e}")
+            return None
+        finally:
+            stats.add(time.perf_counter() - started)
+
+    async def _publisher(self, queue: asyncio.Queue, stats: StageStats) -> None:
+        """Публикация заданий из очереди по порядку"""
+        while True:
+            job = await queue.get()
+            try:
+                if job is None:
+                    return
+                started = time.perf_counter()
+                try:
+                    await self.publish(job)
+                except Exception as e:
+                    logger.error(f"Ошибка публикации: {e}")
+                stats.add(time.perf_counter() - started)
+            finally:
+                queue.task_done()
+
+    async def run(self, items: Iterable[Any]) -> PipelineReport:
+        """
+        Запуск конвейера
+
+        Args:
+            items: Периоды в порядке обработки
+
+        Returns:
+            PipelineReport: Статистика по стадиям
+        """
+        fetch_stats = StageStats("загрузка")
+        process_stats = StageStats("обработка")
+        publish_stats = StageStats("публикация")
+        started = time.perf_counter()
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.publish_queue_size)
+        publisher = None
+        if self.publish is not None:
+            publisher = asyncio.create_task(self._publisher(queue, publish_stats))
+
+        pending = iter(items)
+        fetches: Deque[Tuple[Any, asyncio.Task]] = deque()
+
+        def fill_window() -> None:
+            # Следующая загрузка запускается, когда обработка забирает очередной период
+            while len(fetches) < self.fetch_concurrency:
+                item = next(pending, _DONE)
+                if item is _DONE:
+                    return
+                fetches.append((item, asyncio.create_task(self._fetch(item, fetch_stats))))
+
+        try:
+            fill_window()
+            while fetches:
+                item, fetch_task = fetches.popleft()
+                data = await fetch_task
+                fill_window()
+
+                process_started = time.perf_counter()
+                try:
+                    job = self.process(item, data)
+                except Exception as e:
+                    logger.error(f"Ошибка обработки {item}: {e}")
+                    job = None
+                process_stats.add(time.perf_counter() - process_started)
+
+                if job is not None and publisher is not None:
+                    await queue.put(job)
+        finally:
+            for _, fetch_task in fetches:
+                fetch_task.cancel()
+            if publisher is not None:
+                await queue.put(None)
+                await publisher
+
+        stages = [fetch_stats, process_stats]
+        if self.publish is not None:
+            stages.append(publish_stats)
+        return PipelineReport(stages, time.perf_counter() - started)
@@ -2,86 +2,352 @@
 Сервис для кэширования данных API
 """
 
-from typing import Dict, Optional
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
 from datetime import datetime, timedelta
+import atexit
 import json
 import os
 import logging
 from pathlib import Path
+import threading
 import time
+import weakref
+
+from ..config import settings
+from .player_stats_store import atomic_write_json
 
 logger = logging.getLogger(__name__)
 
+INDEX_FILE = "_index.json"
+EVICTION_POLICIES = ("lru", "lfu")
+# Индекс сохраняется раз в INDEX_SAVE_EVERY записей и в flush()
+INDEX_SAVE_EVERY = 32
+
+# Открытые кэши, индексы которых сохраняются при выходе из процесса
+_instances: "weakref.WeakSet[CacheService]" = weakref.WeakSet()
+
+
 class CacheService:
-    def __init__(self, cache_dir: str = "cache"):
+    """
+    Двухуровневый кэш ответов API: LRU в памяти процесса и файлы на диске
+
+    Запись хранится в виде {"meta": {"final": ..., "cached_at": ...}, "data": ...}.
+    Записи с final=True (данные завершенного игрового дня) не устаревают,
+    остальные живут max_age секунд. Файлы старого формата (без meta)
+    читаются как незавершенные записи.
+
+    Размеры, время последнего обращения и количество обращений к записям
+    на диске хранятся в индексе (_index.json), поэтому вытеснение при
+    превышении max_bytes не требует обхода директории. Индекс пишется
+    пакетно (раз в INDEX_SAVE_EVERY записей) и в flush(), который
+    вызывается при выходе из процесса и из контекстного менеджера; записи,
+    не попавшие в индекс при аварийном завершении, добавляются при загрузке.
+
+    Пространство имен записи - префикс ключа до первого "_"
+    (например, "stats" для "stats_2024-10-08").
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = "cache",
+        memory_size: int = settings.CACHE_MEMORY_SIZE,
+        max_bytes: int = settings.CACHE_MAX_BYTES,
+        policy: str = settings.CACHE_EVICTION_POLICY
+    ):
         """
         Инициализация сервиса кэширования
-        
+
         Args:
             cache_dir: Директория для хранения кэша
+            memory_size: Количество записей в памяти (0 - без кэша в памяти)
+            max_bytes: Предельный размер кэша на диске (0 - без ограничения)
+            policy: Политика вытеснения на диске: lru или lfu
         """
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Неизвестная политика вытеснения: {policy}")
+
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-        
-    def get_cached_data(self, key: str, max_age: int = 3600) -> Optional[Dict]:
+        self.memory_size = memory_size
+        self.max_bytes = max_bytes
+        self.policy = policy
+
+        self._lock = threading.RLock()
+        self._memory: "OrderedDict[str, Tuple[Dict, Dict]]" = OrderedDict()
+        self._index_path = self.cache_dir / INDEX_FILE
+        self._index: Dict[str, Dict] = self._load_index()
+        self._index_dirty = False
+        self._unsaved_writes = 0
+
+        _instances.add(self)
+
+        self.counters = {
+            "hits": 0,
+            "memory_hits": 0,
+            "final_hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "writes": 0,
+            "evictions": 0,
+            "bytes_read": 0,
+            "bytes_written": 0
+        }
+
+    @staticmethod
+    def namespace_of(key: str) -> str:
+        """Пространство имен ключа"""
+        return key.split("_", 1)[0]
+
+    def _file(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _load_index(self) -> Dict[str, Dict]:
+        """Загрузка индекса с дополнением записями, которых в нем нет"""
+        index = {}
+        try:
+            with self._index_path.open('r', encoding='utf-8') as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logger.warning(f"Индекс кэша поврежден, строим заново: {e}")
+
+        files = {file.stem: file for file in self.cache_dir.glob("*.json") if file.name != INDEX_FILE}
+        for key in set(index) - set(files):
+            del index[key]
+        for key in set(files) - set(index):
+            stat = files[key].stat()
+            index[key] = {"size": stat.st_size, "last_access": stat.st_mtime, "hits": 0}
+        return index
+
+    def _save_index(self) -> None:
+        try:
+            atomic_write_json(self._index_path, self._index, indent=None)
+            self._index_dirty = False
+            self._unsaved_writes = 0
+        except OSError as e:
+            logger.error(f"Ошибка сохранения индекса кэша: {e}")
+
+    def flush(self) -> None:
+        """Сохраняет индекс (размеры, статистику обращений) на диске"""
+        with self._lock:
+            if self._index_dirty and self.cache_dir.is_dir():
+                self._save_index()
+
+    def __enter__(self) -> "CacheService":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.flush()
+
+    @property
+    def disk_bytes(self) -> int:
+        """Размер записей на диске по индексу"""
+        return sum(entry["size"] for entry in self._index.values())
+
+    @staticmethod
+    def _unwrap(payload) -> Tuple[Dict, Dict]:
+        """Разделяет запись на метаданные и данные (с поддержкой старого формата)"""
+        if (
+            isinstance(payload, dict)
+            and set(payload) == {"meta", "data"}
+            and isinstance(payload["meta"], dict)
+            and "final" in payload["meta"]
+        ):
+            return payload["meta"], payload["data"]
+        return {"final": False, "cached_at": None}, payload
+
+    def _remember(self, key: str, meta: Dict, data: Dict) -> None:
+        if self.memory_size <= 0:
+            return
+        self._memory[key] = (meta, data)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _touch(self, key: str, size: int) -> None:
+        entry = self._index.setdefault(key, {"size": size, "last_access": 0.0, "hits": 0})
+        entry["last_access"] = time.time()
+        entry["hits"] += 1
+        self._index_dirty = True
+
+    def _read_disk(self, key: str) -> Optional[Tuple[Dict, Dict]]:
+        """Чтение записи с диска"""
+        cache_file = self._file(key)
+        try:
+            raw = cache_file.read_bytes()
+        except FileNotFoundError:
+            self._index.pop(key, None)
+            return None
+        except OSError as e:
+            logger.error(f"Ошибка чтения кэша {key}: {e}")
+            return None
+
+        try:
+            meta, data = self._unwrap(json.loads(raw))
+        except Exception as e:
+            logger.error(f"Ошибка чтения кэша {key}: {e}")
+            return None
+
+        if meta.get("cached_at") is None:
+            # Запись старого формата: время берем из файла
+            meta = dict(meta, cached_at=cache_file.stat().st_mtime)
+
+        self.counters["bytes_read"] += len(raw)
+        self._touch(key, len(raw))
+        return meta, data
+
+    def get_cached_data(self, key: str, max_age: int = settings.CACHE_TTL) -> Optional[Dict]:
         """
         Получение данных из кэша
-        
+
+        Возвращаемый объект может быть общим с кэшем в памяти,
+        поэтому его не следует изменять.
+
         Args:
             key: Ключ кэша
-            max_age: Максимальный возраст кэша в секундах
-            
+            max_age: Максимальный возраст незавершенных данных в секундах
+
         Returns:
             Dict если данные найдены и актуальны, иначе None
         """
-        cache_file = self.cache_dir / f"{key}.json"
-        
-        if not cache_file.exists():
-            return None
-            
-        # Проверяем возраст файла
-        file_age = time.time() - cache_file.stat().st_mtime
-        if file_age > max_age:
-            logger.debug(f"Кэш устарел для {key}")
-            return None
-            
-        try:
-            with cache_file.open('r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"Ошибка чтения кэша {key}: {e}")
-            return None
-            
-    def cache_data(self, key: str, data: Dict) -> None:
+        with self._lock:
+            cached = self._memory.get(key)
+            from_memory = cached is not None
+            if from_memory:
+                self._memory.move_to_end(key)
+            else:
+                cached = self._read_disk(key)
+                if cached is None:
+                    self.counters["misses"] += 1
+                    return None
+
+            meta, data = cached
+            if not meta.get("final") and time.time() - meta["cached_at"] > max_age:
+                logger.debug(f"Кэш устарел для {key}")
+                self.counters["misses"] += 1
+                self.counters["expired"] += 1
+                return None
+
+            if not from_memory:
+                self._remember(key, meta, data)
+            self.counters["hits"] += 1
+            if from_memory:
+                self.counters["memory_hits"] += 1
+            if meta.get("final"):
+                self.counters["final_hits"] += 1
+            return data
+
+    def cache_data(self, key: str, data: Dict, final: bool = False) -> None:
         """
         Сохранение данных в кэш
-        
+
         Args:
             key: Ключ кэша
             data: Данные для сохранения
+            final: Данные завершенного игрового дня, которые больше не изменятся
         """
-        cache_file = self.cache_dir / f"{key}.json"
-        
+        meta = {"final": bool(final), "cached_at": time.time()}
+        payload = {"meta": meta, "data": data}
+
+        with self._lock:
+            try:
+                raw = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+                self._file(key).write_bytes(raw)
+            except Exception as e:
+                logger.error(f"Ошибка сохранения в кэш {key}: {e}")
+                return
+
+            self.counters["writes"] += 1
+            self.counters["bytes_written"] += len(raw)
+            self._index[key] = {"size": len(raw), "last_access": meta["cached_at"], "hits": 0}
+            self._remember(key, meta, data)
+            self._evict(protect=key)
+            self._index_dirty = True
+            self._unsaved_writes += 1
+            if self._unsaved_writes >= INDEX_SAVE_EVERY:
+                self._save_index()
+            logger.debug(f"Данные сохранены в кэш: {key} (final={bool(final)})")
+
+    def _evict(self, protect: Optional[str] = None) -> None:
+        """Вытеснение записей с диска до укладывания в max_bytes"""
+        if self.max_bytes <= 0:
+            return
+
+        total = self.disk_bytes
+        if total <= self.max_bytes:
+            return
+
+        if self.policy == "lfu":
+            order = lambda item: (item[1]["hits"], item[1]["last_access"])
+        else:
+            order = lambda item: item[1]["last_access"]
+
+        for key, entry in sorted(self._index.items(), key=order):
+            if total <= self.max_bytes:
+                break
+            if key == protect:
+                continue
+            self._remove(key)
+            total -= entry["size"]
+            self.counters["evictions"] += 1
+            logger.debug(f"Запись {key} вытеснена из кэша ({self.policy})")
+
+    def _remove(self, key: str) -> None:
+        self._memory.pop(key, None)
+        self._index.pop(key, None)
         try:
-            with cache_file.open('w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            logger.debug(f"Данные сохранены в кэш: {key}")
-        except Exception as e:
-            logger.error(f"Ошибка сохранения в кэш {key}: {e}")
-            
-    def clear_cache(self, key: Optional[str] = None) -> None:
+            self._file(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Статистика работы кэша
+
+        Returns:
+            Dict: Счетчики попаданий, промахов и байт, доля попаданий и размер на диске
+        """
+        with self._lock:
+            lookups = self.counters["hits"] + self.counters["misses"]
+            result = dict(self.counters)
+            result["hit_rate"] = self.counters["hits"] / lookups if lookups else 0.0
+            result["disk_bytes"] = self.disk_bytes
+            result["memory_entries"] = len(self._memory)
+            return result
+
+    def clear_cache(self, key: Optional[str] = None, namespace: Optional[str] = None) -> None:
         """
         Очистка кэша
-        
+
         Args:
             key: Если указан, удаляется только этот ключ
+            namespace: Если указан, удаляются все ключи пространства имен
         """
-        if key:
-            cache_file = self.cache_dir / f"{key}.json"
-            if cache_file.exists():
-                cache_file.unlink()
+        with self._lock:
+            if key:
+                self._remove(key)
                 logger.debug(f"Удален кэш: {key}")
-        else:
-            for file in self.cache_dir.glob("*.json"):
-                file.unlink()
-            logger.debug("Кэш полностью очищен") 
\ No newline at end of file
+            elif namespace:
+                keys = set(self._index) | set(self._memory)
+                keys |= {file.stem for file in self.cache_dir.glob(f"{namespace}_*.json")}
+                for cached_key in keys:
+                    if self.namespace_of(cached_key) == namespace:
+                        self._remove(cached_key)
+                logger.debug(f"Очищено пространство имен кэша: {namespace}")
+            else:
+                self._memory.clear()
+                self._index.clear()
+                for file in self.cache_dir.glob("*.json"):
+                    if file.name != INDEX_FILE:
+                        file.unlink()
+                logger.debug("Кэш полностью очищен")
+            self._save_index()
+
+
+@atexit.register
+def _flush_all() -> None:
+    """Сохранение индексов открытых кэшей при выходе"""
+    for cache in list(_instances):
+        cache.flush()
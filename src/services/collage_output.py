@@ -0,0 +1,75 @@
+"""
+Кодирование коллажей в память и необязательное сохранение в архив
+"""
+
+from io import BytesIO
+from pathlib import Path
+from typing import Optional, Union
+import logging
+import os
+import tempfile
+
+from PIL import Image
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Параметры кодирования по формату
+ENCODE_OPTIONS = {
+    'JPEG': {'quality': 90, 'optimize': True},
+    'PNG': {'optimize': False},
+}
+
+
+def encode_image(image: Image.Image, format: str = 'JPEG') -> bytes:
+    """
+    Кодирование изображения в байты без временного файла
+
+    Args:
+        image: Готовый коллаж
+        format: Формат (JPEG, PNG)
+
+    Returns:
+        bytes: Закодированное изображение для Bot.send_photo
+    """
+    if format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    image.save(buffer, format=format, **ENCODE_OPTIONS.get(format, {}))
+    return buffer.getvalue()
+
+
+def persist_collage(
+    data: bytes,
+    name: str,
+    directory: Optional[Union[str, Path]] = None,
+    force: bool = False
+) -> Optional[Path]:
+    """
+    Сохранение коллажа в архив (только при settings.COLLAGE_ARCHIVE или force)
+
+    Args:
+        data: Закодированный коллаж
+        name: Имя файла
+        directory: Директория архива (по умолчанию settings.COLLAGE_ARCHIVE_DIR)
+        force: Сохранить независимо от настройки
+
+    Returns:
+        Optional[Path]: Путь к файлу или None, если сохранение отключено или не удалось
+    """
+    if not (force or settings.COLLAGE_ARCHIVE):
+        return None
+
+    directory = Path(directory or settings.COLLAGE_ARCHIVE_DIR)
+    path = directory / name
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix=".tmp")
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Не удалось сохранить коллаж {path}: {e}")
+        return None
+    return path
@@ -0,0 +1,222 @@
+"""
+Макеты коллажей: шрифты, фон и геометрия слотов вычисляются один раз на макет
+"""
+
+from functools import lru_cache
+from typing import Dict, Hashable, Optional, Tuple
+import logging
+import os
+
+from PIL import Image, ImageDraw, ImageFont
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Запасные шрифты, если заданный в настройках недоступен (например, arial.ttf вне Windows)
+FALLBACK_FONTS = (
+    os.path.join(settings.ASSETS_DIR, 'fonts', 'Roboto-Regular.ttf'),
+    'DejaVuSans.ttf',
+    'arial.ttf',
+)
+
+# Размер миниатюры вертикального коллажа (app_day, app_week)
+VERTICAL_PHOTO_SIZE = (130, 100)
+
+
+@lru_cache(maxsize=32)
+def load_font(path: Optional[str], size: int) -> ImageFont.ImageFont:
+    """
+    Шрифт нужного размера (загружается один раз на процесс)
+
+    Args:
+        path: Путь к TTF (None - settings.COLLAGE_FONT)
+        size: Размер шрифта
+
+    Returns:
+        ImageFont.ImageFont: Первый доступный шрифт из заданного и запасных
+    """
+    for candidate in (path or settings.COLLAGE_FONT,) + FALLBACK_FONTS:
+        if not candidate:
+            continue
+        try:
+            return ImageFont.truetype(candidate, size=size)
+        except OSError:
+            continue
+    logger.warning("Не найден TTF-шрифт, используется встроенный шрифт PIL")
+    return ImageFont.load_default(size=size)
+
+
+class CollageTemplate:
+    """
+    Макет коллажа
+
+    Фон, шрифты, координаты фото и подписей рассчитываются при создании,
+    поэтому отрисовка команды сводится к копии фона, вставке миниатюр и
+    выводу переменного текста через ImageDraw.text.
+
+    Текст выравнивается так же, как в прежнем коде макета: measure="length"
+    - по ImageDraw.textlength (вертикальный коллаж, только однострочный
+    текст), measure="bbox" - по ширине ImageDraw.textbbox (сетка 1200x800).
+    """
+
+    def __init__(
+        self,
+        size: Tuple[int, int],
+        photo_size: Tuple[int, int],
+        slots: Dict[Hashable, Tuple[int, int]],
+        captions: Optional[Dict[Hashable, Tuple[int, int]]] = None,
+        title_font: Optional[ImageFont.ImageFont] = None,
+        text_font: Optional[ImageFont.ImageFont] = None,
+        title_y: int = 0,
+        mode: str = 'RGB',
+        background=(255, 255, 255),
+        measure: str = 'length'
+    ):
+        """
+        Args:
+            size: Размер коллажа
+            photo_size: Размер миниатюры игрока
+            slots: {слот: левый верхний угол фото}
+            captions: {слот: (центр подписи по x, верх подписи по y)}
+            title_font: Шрифт заголовка
+            text_font: Шрифт подписей
+            title_y: Верх заголовка
+            mode: Режим изображения (RGB, RGBA)
+            background: Цвет фона
+            measure: Измерение ширины текста: length или bbox
+        """
+        self.size = size
+        self.photo_size = photo_size
+        self.slots = slots
+        self.captions = captions or {}
+        self.title_font = title_font
+        self.text_font = text_font
+        self.measure = measure
+        self.title_y = title_y
+        self.background = Image.new(mode, size, background)
+        self.placeholder = Image.new('RGB', photo_size, 'gray')
+
+    def canvas(self) -> Tuple[Image.Image, ImageDraw.ImageDraw]:
+        """Новый коллаж: копия готового фона"""
+        image = self.background.copy()
+        return image, ImageDraw.Draw(image)
+
+    def text_width(self, draw: ImageDraw.ImageDraw, text: str, font: ImageFont.ImageFont) -> float:
+        """Ширина текста для выравнивания"""
+        if self.measure == 'bbox':
+            left, _, right, _ = draw.textbbox((0, 0), text, font=font)
+            return right - left
+        return draw.textlength(text, font=font)
+
+    def draw_title(self, draw: ImageDraw.ImageDraw, title: str, fill: str = 'black') -> None:
+        """Заголовок по центру"""
+        width = self.text_width(draw, title, self.title_font)
+        draw.text(((self.size[0] - width) // 2, self.title_y), title, fill=fill, font=self.title_font)
+
+    def paste(self, image: Image.Image, slot: Hashable, photo: Optional[Image.Image]) -> None:
+        """Вставка миниатюры в слот (без фото - серая заглушка)"""
+        image.paste(photo if photo is not None else self.placeholder, self.slots[slot])
+
+    def draw_caption(self, draw: ImageDraw.ImageDraw, slot: Hashable, text: str, fill: str = 'black') -> None:
+        """Подпись под фото слота, по центру (строки многострочной подписи тоже)"""
+        center_x, y = self.captions[slot]
+        width = self.text_width(draw, text, self.text_font)
+        if self.measure == 'bbox':
+            x = center_x - width // 2
+        else:
+            x = (2 * center_x - width) // 2
+        draw.text((x, y), text, fill=fill, font=self.text_font, align='center')
+
+
+@lru_cache(maxsize=16)
+def vertical_template(rows: int, font_path: Optional[str] = None) -> CollageTemplate:
+    """
+    Вертикальный коллаж команды дня / недели (app_day, app_week): заголовок
+    и строки "фото + подпись"
+
+    Args:
+        rows: Количество игроков
+        font_path: Путь к шрифту (None - settings.COLLAGE_FONT)
+    """
+    photo_width, photo_height = VERTICAL_PHOTO_SIZE
+    padding = 20
+    text_padding = 10
+    line_height = photo_height + text_padding + 30 + padding
+    width = 500
+    height = rows * line_height + padding * 2
+    first_row = padding + 40
+
+    font = load_font(font_path, 20)
+    slots = {row: ((width - photo_width) // 2, first_row + row * line_height) for row in range(rows)}
+    captions = {row: (width // 2, y + photo_height + text_padding) for row, (_, y) in slots.items()}
+    return CollageTemplate(
+        (width, height), (photo_width, photo_height), slots, captions,
+        title_font=font, text_font=font, title_y=padding
+    )
+
+
+def grid_positions(width: int, height: int) -> Dict[str, Tuple[int, int]]:
+    """
+    Позиции фото в сетке ImageService: LW, C, RW в первом ряду, D1, D2 во
+    втором, G в третьем
+
+    Args:
+        width: Ширина коллажа
+        height: Высота коллажа
+
+    Returns:
+        Dict[str, Tuple[int, int]]: {слот: левый верхний угол фото}
+    """
+    photo_size = (130, 100)
+    padding = 10
+
+    row1_y = padding
+    row1_x = [padding, width // 2, width - padding - photo_size[0]]
+    row2_y = photo_size[1] + padding * 2
+    row2_x = [width // 3, 2 * width // 3]
+    row3_y = (photo_size[1] + padding) * 2
+    row3_x = width // 2
+
+    return {
+        'LW': (row1_x[0], row1_y),
+        'C': (row1_x[1] - photo_size[0] // 2, row1_y),
+        'RW': (row1_x[2], row1_y),
+        'D1': (row2_x[0] - photo_size[0] // 2, row2_y),
+        'D2': (row2_x[1] - photo_size[0] // 2, row2_y),
+        'G': (row3_x - photo_size[0] // 2, row3_y),
+    }
+
+
+@lru_cache(maxsize=1)
+def lineup_grid_template() -> CollageTemplate:
+    """Сетка фото без подписей на прозрачном фоне (ImageService.render_collage)"""
+    photo_size = (130, 100)
+    padding = 10
+    width = photo_size[0] * 3 + padding * 4
+    height = photo_size[1] * 3 + padding * 4
+    return CollageTemplate(
+        (width, height), photo_size, grid_positions(width, height),
+        mode='RGBA', background=(255, 255, 255, 0)
+    )
+
+
+@lru_cache(maxsize=4)
+def team_grid_template(font_path: Optional[str] = None) -> CollageTemplate:
+    """Коллаж 1200x800 с заголовком и подписями (ImageService.render_team_collage)"""
+    photo_size = (200, 200)
+    centers = {
+        'G': (500, 150),
+        'D1': (200, 300),
+        'D2': (800, 300),
+        'LW': (200, 500),
+        'C': (500, 500),
+        'RW': (800, 500),
+    }
+    slots = {slot: (x - photo_size[0] // 2, y - photo_size[1] // 2) for slot, (x, y) in centers.items()}
+    captions = {slot: (x, y + photo_size[1] // 2 + 10) for slot, (x, y) in centers.items()}
+    return CollageTemplate(
+        (1200, 800), photo_size, slots, captions,
+        title_font=load_font(font_path, 36), text_font=load_font(font_path, 24), title_y=20,
+        measure='bbox'
+    )
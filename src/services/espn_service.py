@@ -8,6 +8,10 @@ import pytz
 from dotenv import load_dotenv
 from src.utils.logging import setup_logging
 from src.config import settings
+from src.services.http_client import get_http_client
+from src.services.player_projection import read_players
+from src.services.schedule_index import has_games
+from src.services.response_archive import get_archive
 from collections import defaultdict
 
 # Загружаем переменные окружения
@@ -51,6 +55,9 @@ class ESPNService:
             # так как статистика доступна только на следующий день
             stats_date = date + timedelta(days=1)
             scoring_period_id = self.get_scoring_period_id(stats_date)
+            if not has_games(scoring_period_id):
+                self.logger.info(f"Пропуск игрового дня {scoring_period_id}: по расписанию матчей нет")
+                return None
             
             # Параметры запроса
             params = {
@@ -81,7 +88,7 @@ class ESPNService:
                 self.logger.error("Не удалось получить статистику")
                 return None
                 
-            self.logger.info(f"Получены данные: {json.dumps(data)[:1000]}...")
+            self.logger.info(f"Получены данные: {len(data.get('players', []))} игроков")
             
             return {
                 'date': date.strftime('%Y-%m-%d'),  # Возвращаем исходную дату
@@ -122,13 +129,38 @@ class ESPNService:
             headers['X-Fantasy-Filter'] = json.dumps(fantasy_filter)
             
             # Выполняем запрос
-            return self._make_request(params, headers)
+            return self._make_request(params, headers, archive_period=self.get_scoring_period_id(end_date))
             
         except Exception as e:
             self.logger.error(f"Неожиданная ошибка при получении недельной статистики: {e}")
             return None
             
-    def _make_request(self, params: Dict, headers: Dict) -> Optional[Dict]:
+    def _make_request(self, params: Dict, headers: Dict, archive_period: Optional[int] = None) -> Optional[Dict]:
+        """Выполнение запроса к API с учетом архива ответов
+        
+        Args:
+            params (Dict): Параметры запроса
+            headers (Dict): Заголовки запроса
+            archive_period (int, optional): Игровой день для ключа архива
+                (по умолчанию scoringPeriodId запроса)
+            
+        Returns:
+            Optional[Dict]: Ответ API или None в случае ошибки
+        """
+        fantasy_filter = headers.get('x-fantasy-filter') or headers.get('X-Fantasy-Filter')
+        request_key = {
+            'params': params,
+            'filter': json.loads(fantasy_filter) if fantasy_filter else None
+        }
+        return get_archive().fetch(
+            self.league_id,
+            self.season,
+            archive_period or params['scoringPeriodId'],
+            request_key,
+            lambda: self._request(params, headers)
+        )
+    
+    def _request(self, params: Dict, headers: Dict) -> Optional[Dict]:
         """Выполнение запроса к API
         
         Args:
@@ -142,30 +174,19 @@ class ESPNService:
             # Формируем URL
             url = f"{self.base_url}?view={params['view']}&scoringPeriodId={params['scoringPeriodId']}"
             
-            # Отключаем предупреждения о SSL
-            import urllib3
-            urllib3.disable_warnings()
-            
-            # Выполняем запрос
-            response = requests.request(
-                'GET',
-                url,
-                headers=headers,
-                timeout=30,
-                verify=False  # Отключаем проверку SSL
-            )
+            # Выполняем запрос через общий пул соединений
+            response = get_http_client().get(url, headers=headers, timeout=30, stream=True)
             
             # Проверяем статус
             response.raise_for_status()
             
-            # Пытаемся получить JSON
+            # Разбираем ответ потоком, оставляя только нужные поля игроков
             try:
-                data = response.json()
+                data = read_players(response)
                 self.logger.info(f"Получен ответ от API")
                 return data
             except ValueError as e:
                 self.logger.error(f"Ошибка при парсинге JSON: {e}")
-                self.logger.error(f"Текст ответа: {response.text[:1000]}")  # Логируем только первую 1000 символов
                 return None
             
         except requests.exceptions.RequestException as e:
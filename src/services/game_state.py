@@ -0,0 +1,107 @@
+"""
+Состояние игры ESPN: текущий игровой день и завершенные дни
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+import json
+import logging
+import threading
+
+import requests
+
+from ..config import settings
+from .http_client import get_http_client
+from .player_stats_store import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_cached = {"path": None, "mtime": None, "period": None}
+
+
+def _period_from_date(now: Optional[datetime] = None) -> int:
+    """Расчет текущего игрового дня по дате начала сезона"""
+    now = now or datetime.now(settings.ESPN_TIMEZONE)
+    season_start = datetime.strptime(settings.SEASON_START, '%Y-%m-%d').date()
+    return settings.SEASON_START_SCORING_PERIOD + (now.date() - season_start).days
+
+
+def get_current_scoring_period(path: Optional[Path] = None) -> int:
+    """
+    Возвращает ID текущего игрового дня
+
+    Источник истины - currentScoringPeriod из kona_game_state.json. Файл
+    перечитывается только при изменении. Если файла нет или он поврежден,
+    день рассчитывается по дате начала сезона.
+
+    Args:
+        path: Путь к kona_game_state.json
+
+    Returns:
+        int: ID текущего игрового дня
+    """
+    path = Path(path or settings.GAME_STATE_FILE)
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        return _period_from_date()
+
+    with _lock:
+        if _cached["path"] == path and _cached["mtime"] == mtime:
+            return _cached["period"]
+
+        try:
+            with path.open('r', encoding='utf-8') as f:
+                period = int(json.load(f)["currentScoringPeriod"]["id"])
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Не удалось прочитать {path}: {e}")
+            return _period_from_date()
+
+        _cached.update(path=path, mtime=mtime, period=period)
+        return period
+
+
+def is_period_final(scoring_period_id: int, path: Optional[Path] = None) -> bool:
+    """
+    Проверяет, завершен ли игровой день (статистика за него больше не изменится)
+
+    Args:
+        scoring_period_id: ID игрового дня
+        path: Путь к kona_game_state.json
+
+    Returns:
+        bool: True если день раньше текущего
+    """
+    return int(scoring_period_id) < get_current_scoring_period(path)
+
+
+def refresh_game_state(path: Optional[Path] = None) -> Optional[int]:
+    """
+    Загружает kona_game_state из API ESPN и сохраняет его в файл
+
+    Args:
+        path: Путь к kona_game_state.json
+
+    Returns:
+        Optional[int]: ID текущего игрового дня или None при ошибке запроса
+    """
+    path = Path(path or settings.GAME_STATE_FILE)
+    try:
+        response = get_http_client().get(
+            settings.GAME_STATE_URL,
+            headers=settings.ESPN_API['HEADERS'],
+            timeout=settings.REQUEST_TIMEOUT
+        )
+        response.raise_for_status()
+        data = response.json()
+        period = int(data["currentScoringPeriod"]["id"])
+    except (requests.RequestException, ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Не удалось обновить состояние игры: {e}")
+        return None
+
+    atomic_write_json(path, data, indent=None)
+    with _lock:
+        _cached.update(path=path, mtime=path.stat().st_mtime, period=period)
+    return period
@@ -0,0 +1,144 @@
+"""
+Сервис для параллельной загрузки фотографий игроков
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Dict, Iterable, Optional, Tuple
+import logging
+
+from PIL import Image
+
+from .http_client import HostSession, get_http_client
+from .thumbnail_cache import ThumbnailCache
+
+logger = logging.getLogger(__name__)
+
+HEADSHOT_URL_TEMPLATE = "https://a.espncdn.com/combiner/i?img=/i/headshots/nhl/players/full/{player_id}.png&w=130&h=100"
+HEADSHOT_SIZE = (130, 100)
+MAX_WORKERS = 6  # Размер команды дня
+TIMEOUT = 10  # секунды
+
+
+def get_headshot_url(player_id: str) -> str:
+    """Возвращает URL фотографии игрока на CDN ESPN"""
+    return HEADSHOT_URL_TEMPLATE.format(player_id=player_id)
+
+
+def prepare_headshot(data: bytes, size: Tuple[int, int] = HEADSHOT_SIZE) -> Image.Image:
+    """
+    Декодирует фото, накладывает его на белый фон и приводит к нужному размеру
+
+    Args:
+        data: Содержимое PNG-файла
+        size: Размер готовой миниатюры
+
+    Returns:
+        Image.Image: RGB-изображение, готовое к вставке в коллаж
+    """
+    player_image = Image.open(BytesIO(data)).convert("RGBA")
+    bg = Image.new("RGBA", player_image.size, (255, 255, 255, 255))
+    combined_image = Image.alpha_composite(bg, player_image)
+    return combined_image.convert("RGB").resize(size, Image.LANCZOS)
+
+
+class HeadshotService:
+    """Параллельная загрузка фотографий игроков через общий пул соединений к CDN"""
+
+    def __init__(
+        self,
+        max_workers: int = MAX_WORKERS,
+        timeout: int = TIMEOUT,
+        session: Optional[HostSession] = None,
+        cache: Optional[ThumbnailCache] = None,
+        url_template: str = HEADSHOT_URL_TEMPLATE
+    ):
+        """
+        Инициализация сервиса
+
+        Args:
+            max_workers: Максимальное количество одновременных загрузок
+            timeout: Таймаут одного запроса в секундах
+            session: Готовая сессия (по умолчанию общий пул соединений к CDN ESPN)
+            cache: Кэш миниатюр (по умолчанию общий кэш в data/cache/thumbnails)
+            url_template: Шаблон URL фотографии с подстановкой {player_id}
+        """
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.session = session or get_http_client().session_for(url_template)
+        self.cache = cache or ThumbnailCache()
+        self.url_template = url_template
+
+    def fetch_headshot(self, player_id: str, size: Tuple[int, int] = HEADSHOT_SIZE) -> Optional[Image.Image]:
+        """
+        Получает миниатюру фото игрока
+
+        Свежая миниатюра берется из кэша без обращения к сети. Устаревшая
+        перепроверяется условным запросом (ETag / Last-Modified), и при ответе
+        304 повторно не декодируется и не масштабируется.
+
+        Args:
+            player_id: ID игрока
+            size: Размер готовой миниатюры
+
+        Returns:
+            Optional[Image.Image]: Миниатюра или None в случае ошибки
+        """
+        entry = self.cache.get_entry(player_id, size)
+        if entry is not None and entry.is_fresh(self.cache.ttl):
+            return entry.image
+
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+
+        url = self.url_template.format(player_id=player_id)
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+            if response.status_code == 304 and entry is not None:
+                self.cache.touch(player_id, size)
+                return entry.image
+
+            response.raise_for_status()
+            image = prepare_headshot(response.content, size)
+            self.cache.put(
+                player_id,
+                size,
+                image,
+                etag=response.headers.get('ETag'),
+                last_modified=response.headers.get('Last-Modified')
+            )
+            return image
+        except Exception as e:
+            logger.warning(f"Ошибка загрузки изображения {url}: {e}")
+            # Устаревшая миниатюра лучше, чем пустое место в коллаже
+            return entry.image if entry is not None else None
+
+    def fetch_many(
+        self,
+        player_ids: Iterable[str],
+        size: Tuple[int, int] = HEADSHOT_SIZE
+    ) -> Dict[str, Optional[Image.Image]]:
+        """
+        Получает миниатюры набора игроков одновременно
+
+        Время выполнения ограничено самой медленной загрузкой, а не суммой всех.
+
+        Args:
+            player_ids: ID игроков (повторы загружаются один раз)
+            size: Размер готовых миниатюр
+
+        Returns:
+            Dict[str, Optional[Image.Image]]: Миниатюры по ID игрока, None для неудачных загрузок
+        """
+        unique_ids = list(dict.fromkeys(str(player_id) for player_id in player_ids))
+        if not unique_ids:
+            return {}
+
+        workers = min(self.max_workers, len(unique_ids))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            images = executor.map(lambda player_id: self.fetch_headshot(player_id, size), unique_ids)
+            return dict(zip(unique_ids, images))
@@ -0,0 +1,208 @@
+"""
+Общий HTTP-клиент с пулами keep-alive соединений по хостам
+"""
+
+from importlib.util import find_spec
+from threading import BoundedSemaphore, Lock
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ..config import settings
+from .rate_limiter import AdaptiveRateLimiter, get_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = [429, 500, 502, 503, 504]
+
+
+def _host_key(url: str) -> str:
+    """Ключ пула: схема и хост URL"""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class HostSession:
+    """
+    Пул соединений к одному хосту
+
+    Совместим с requests.Session по методам get/post/request. Ограничивает
+    количество одновременных запросов к хосту, подставляет таймаут
+    по умолчанию и, если задан ограничитель, выдерживает частоту запросов
+    и сообщает ему о 429 / Retry-After.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        limit: int,
+        timeout: float,
+        retry: Retry,
+        limiter: Optional[AdaptiveRateLimiter] = None
+    ):
+        """
+        Args:
+            host: Схема и хост (https://example.com)
+            limit: Максимальное количество одновременных запросов
+            timeout: Таймаут запроса по умолчанию в секундах
+            retry: Политика повторных попыток
+            limiter: Ограничитель частоты запросов к хосту
+        """
+        self.host = host
+        self.limit = limit
+        self.timeout = timeout
+        self.limiter = limiter
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=limit, max_retries=retry)
+        self.session.mount(host, adapter)
+        self._semaphore = BoundedSemaphore(limit)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Выполнение запроса через пул хоста"""
+        kwargs.setdefault('timeout', self.timeout)
+        with self._semaphore:
+            if self.limiter is None:
+                return self.session.request(method, url, **kwargs)
+
+            self.limiter.acquire()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.exceptions.RetryError:
+                # Транспорт исчерпал повторы на 429/5xx
+                self.limiter.on_throttle()
+                raise
+            self.limiter.observe(response.status_code, response.headers, self._retried_statuses(response))
+            return response
+
+    @staticmethod
+    def _retried_statuses(response: requests.Response):
+        """Коды ответов, которые транспорт повторил до итогового"""
+        retries = getattr(getattr(response, 'raw', None), 'retries', None)
+        history = getattr(retries, 'history', None) or ()
+        return [entry.status for entry in history if getattr(entry, 'status', None)]
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class HttpClient:
+    """
+    HTTP-клиент процесса: отдельный пул keep-alive соединений на каждый хост
+    (API ESPN, CDN фотографий и т.д.), единая политика повторов и таймаутов
+    и ограничение одновременных запросов к хосту
+    """
+
+    def __init__(
+        self,
+        timeout: float = settings.REQUEST_TIMEOUT,
+        retries: int = settings.MAX_RETRIES,
+        backoff: float = settings.HTTP_BACKOFF,
+        host_limits: Optional[Dict[str, int]] = None,
+        default_limit: int = settings.HTTP_DEFAULT_HOST_LIMIT
+    ):
+        """
+        Args:
+            timeout: Таймаут запроса по умолчанию в секундах
+            retries: Количество повторных попыток
+            backoff: Коэффициент экспоненциальной задержки между попытками
+            host_limits: Ограничения одновременных запросов по имени хоста
+            default_limit: Ограничение для остальных хостов
+        """
+        self.timeout = timeout
+        self.retry = Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            respect_retry_after_header=True
+        )
+        self.host_limits = dict(settings.HTTP_HOST_LIMITS if host_limits is None else host_limits)
+        self.default_limit = default_limit
+        self._pools: Dict[str, HostSession] = {}
+        self._lock = Lock()
+
+    def session_for(self, url: str) -> HostSession:
+        """
+        Пул соединений для хоста URL (создается при первом обращении)
+
+        Args:
+            url: Любой URL на нужном хосте
+
+        Returns:
+            HostSession: Пул хоста
+        """
+        key = _host_key(url)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                hostname = urlsplit(url).hostname or ''
+                limit = self.host_limits.get(hostname, self.default_limit)
+                limiter_name = settings.HTTP_RATE_LIMITERS.get(hostname)
+                limiter = get_rate_limiter(limiter_name) if limiter_name else None
+                pool = self._pools[key] = HostSession(key, limit, self.timeout, self.retry, limiter)
+                logger.debug(f"Создан пул соединений {key} (до {limit} одновременных запросов)")
+            return pool
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        return self.session_for(url).request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def close(self) -> None:
+        """Закрытие всех пулов"""
+        with self._lock:
+            for pool in self._pools.values():
+                pool.close()
+            self._pools.clear()
+
+
+_client: Optional[HttpClient] = None
+_client_lock = Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Общий HTTP-клиент процесса"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+
+def http2_available() -> bool:
+    """Установлен ли пакет h2, необходимый httpx для HTTP/2"""
+    return find_spec('h2') is not None
+
+
+def telegram_request(pool_size: int = settings.TELEGRAM_POOL_SIZE):
+    """
+    Транспорт для telegram.Bot с пулом соединений к api.telegram.org
+
+    HTTP/2 включается, если установлен пакет h2. Каждому экземпляру Bot
+    нужен свой транспорт.
+
+    Args:
+        pool_size: Размер пула соединений
+
+    Returns:
+        HTTPXRequest: Транспорт для Bot(request=...)
+    """
+    from telegram.request import HTTPXRequest
+
+    return HTTPXRequest(
+        connection_pool_size=pool_size,
+        connect_timeout=10.0,
+        read_timeout=settings.REQUEST_TIMEOUT,
+        write_timeout=settings.REQUEST_TIMEOUT,
+        http_version="2" if http2_available() else "1.1"
+    )
@@ -1,13 +1,22 @@
 from typing import Dict, List, Optional, Tuple
 import os
 import logging
-import requests
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image
 from ..config import settings
+from .collage_output import encode_image, persist_collage
+from .collage_template import grid_positions, lineup_grid_template, team_grid_template
+from .headshot_service import prepare_headshot
+from .render_cache import get_render_cache, render_key
+from .render_service import PackedImage, RenderService, pack_image, render_lineup
+from .http_client import get_http_client
+from .thumbnail_cache import ThumbnailCache
 import time
 
 logger = logging.getLogger(__name__)
 
+# Слоты коллажа-сетки в порядке вставки фото
+LINEUP_SLOTS = ['LW', 'C', 'RW', 'D1', 'D2', 'G']
+
 class ImageService:
     """Сервис для работы с изображениями"""
     
@@ -18,6 +27,12 @@ class ImageService:
         os.makedirs(self.collage_dir, exist_ok=True)
         os.makedirs(self.photos_dir, exist_ok=True)
         
+        # Кэш готовых миниатюр, общий со скриптами app_day/app_week
+        self.thumbnails = ThumbnailCache()
+        
+        # Кэш готовых коллажей по отпечатку состава
+        self.render_cache = get_render_cache()
+        
         # Создаем директорию для шрифтов
         self.fonts_dir = os.path.join(settings.ASSETS_DIR, 'fonts')
         os.makedirs(self.fonts_dir, exist_ok=True)
@@ -31,7 +46,7 @@ class ImageService:
         """Скачивание шрифта Roboto"""
         try:
             font_url = "https://github.com/googlefonts/roboto/raw/main/src/hinted/Roboto-Regular.ttf"
-            response = requests.get(font_url)
+            response = get_http_client().get(font_url)
             response.raise_for_status()
             
             with open(self.font_path, 'wb') as f:
@@ -66,7 +81,7 @@ class ImageService:
                 return None
                 
             # Скачиваем фото
-            response = requests.get(photo_url)
+            response = get_http_client().get(photo_url)
             if response.status_code != 200:
                 self.logger.warning(f"Не удалось скачать фото для игрока {player_name} (ID: {player_id})")
                 return None
@@ -89,65 +104,145 @@ class ImageService:
         date: str,
         total_points: Optional[float]
     ) -> Optional[str]:
-        """Создание коллажа из фотографий игроков"""
+        """Создание коллажа из фотографий игроков с сохранением в файл
+        
+        Returns:
+            Optional[str]: Путь к коллажу в collage_dir
+        """
+        data = self.render_collage(player_photos, player_data, date, total_points)
+        if data is None:
+            return None
+        path = persist_collage(data, f'team_{int(time.time())}.png', self.collage_dir, force=True)
+        return str(path) if path else None
+
+    def render_collage(
+        self,
+        player_photos: Dict[str, str],
+        player_data: Dict,
+        date: str,
+        total_points: Optional[float]
+    ) -> Optional[bytes]:
+        """Создание коллажа из фотографий игроков в памяти
+        
+        Returns:
+            Optional[bytes]: Коллаж в формате PNG
+        """
         try:
             self.logger.info(f"Начинаем создание коллажа для даты {date}")
-            self.logger.info(f"Получено фотографий: {len(player_photos)}")
-            self.logger.info(f"Данные игроков: {list(player_data.keys())}")
+            key = self.lineup_key(player_data)
+            data = self.render_cache.get(key)
+            if data is None:
+                photos = self.lineup_photos(player_photos, player_data)
+                data = render_lineup(photos)
+                if self._lineup_complete(photos, player_data):
+                    self.render_cache.put(key, data)
+            return data
             
-            # Размеры фото и коллажа
-            photo_size = (130, 100)  # Ширина больше высоты
-            padding = 10
-            collage_width = photo_size[0] * 3 + padding * 4
-            collage_height = photo_size[1] * 3 + padding * 4  # Увеличиваем высоту для вратаря
-            positions = self._get_photo_positions(collage_width, collage_height)
+        except Exception as e:
+            self.logger.error(f"Ошибка при создании коллажа: {e}")
+            return None
+
+    async def render_collage_async(
+        self,
+        player_photos: Dict[str, str],
+        player_data: Dict,
+        date: str,
+        renderer: Optional[RenderService] = None
+    ) -> Optional[bytes]:
+        """Создание коллажа вне цикла событий: миниатюры готовятся в потоке,
+        отрисовка идет в пуле процессов renderer (без него - тоже в потоке),
+        тот же состав берется из кэша готовых коллажей
+        
+        Returns:
+            Optional[bytes]: Коллаж в формате PNG
+        """
+        try:
+            self.logger.info(f"Начинаем создание коллажа для даты {date}")
+            def prepare():
+                photos = self.lineup_photos(player_photos, player_data)
+                return (photos,), self._lineup_complete(photos, player_data)
             
-            # Создаем новое изображение с прозрачным фоном
-            collage_size = (collage_width, collage_height)
-            collage = Image.new('RGBA', collage_size, (255, 255, 255, 0))
+            renderer = renderer or RenderService(workers=0)
+            return await renderer.render_job(self.lineup_key(player_data), prepare, render_lineup, self.render_cache)
             
-            # Добавляем фото игроков в порядке: LW, C, RW, D1, D2, G
-            for pos in ['LW', 'C', 'RW', 'D1', 'D2', 'G']:
-                if pos not in player_data:
-                    self.logger.warning(f"Нет данных для позиции {pos}")
-                    continue
-                    
-                player = player_data[pos]
-                player_id = str(player['info']['id'])
+        except Exception as e:
+            self.logger.error(f"Ошибка при создании коллажа: {e}")
+            return None
+
+    @staticmethod
+    def lineup_key(player_data: Dict) -> str:
+        """Отпечаток коллажа-сетки: на нем видны только фото игроков по слотам"""
+        players = [
+            (pos, str(player_data[pos]['info']['id']))
+            for pos in LINEUP_SLOTS if pos in player_data
+        ]
+        return render_key('lineup', '', players, format='PNG')
+
+    @staticmethod
+    def _lineup_complete(photos: Dict[str, PackedImage], player_data: Dict) -> bool:
+        """Есть ли фото у всех игроков сетки (неполный коллаж не кэшируется)"""
+        return all(pos in photos for pos in LINEUP_SLOTS if pos in player_data)
+
+    def lineup_photos(self, player_photos: Dict[str, str], player_data: Dict) -> Dict[str, PackedImage]:
+        """Миниатюры игроков по слотам сетки для render_lineup
+        
+        Args:
+            player_photos: {ID игрока: путь к фото}
+            player_data: {слот (LW, C, RW, D1, D2, G): игрок}
+            
+        Returns:
+            Dict[str, PackedImage]: {слот: миниатюра}
+        """
+        self.logger.info(f"Получено фотографий: {len(player_photos)}")
+        self.logger.info(f"Данные игроков: {list(player_data.keys())}")
+        
+        photo_size = lineup_grid_template().photo_size
+        photos = {}
+        
+        # Добавляем фото игроков в порядке: LW, C, RW, D1, D2, G
+        for pos in LINEUP_SLOTS:
+            if pos not in player_data:
+                self.logger.warning(f"Нет данных для позиции {pos}")
+                continue
                 
-                if player_id not in player_photos:
-                    self.logger.warning(f"Нет фото для игрока {player['info']['name']} (ID: {player_id})")
-                    continue
-                    
-                photo_path = player_photos[player_id]
-                if not os.path.exists(photo_path):
-                    self.logger.warning(f"Файл фото не существует: {photo_path}")
-                    continue
-                    
-                # Открываем и изменяем размер фото
-                photo = Image.open(photo_path)
-                photo = photo.resize(photo_size, Image.Resampling.LANCZOS)
+            player = player_data[pos]
+            player_id = str(player['info']['id'])
+            
+            if player_id not in player_photos:
+                self.logger.warning(f"Нет фото для игрока {player['info']['name']} (ID: {player_id})")
+                continue
                 
-                # Определяем позицию для фото
-                position = positions.get(pos)
-                if not position:
-                    self.logger.warning(f"Нет позиции для {pos}")
-                    continue
-                    
-                self.logger.info(f"Добавляем фото игрока {player['info']['name']} на позицию {pos}")
+            photo_path = player_photos[player_id]
+            if not os.path.exists(photo_path):
+                self.logger.warning(f"Файл фото не существует: {photo_path}")
+                continue
                 
-                # Вставляем фото
-                collage.paste(photo, position)
+            self.logger.info(f"Добавляем фото игрока {player['info']['name']} на позицию {pos}")
             
-            # Сохраняем коллаж
-            collage_path = os.path.join(self.collage_dir, f'team_{int(time.time())}.png')
-            collage.save(collage_path)
+            # Берем готовую миниатюру из кэша
+            photos[pos] = pack_image(self._load_thumbnail(player_id, photo_path, photo_size))
+        
+        return photos
             
-            return collage_path
+    def _load_thumbnail(self, player_id: str, photo_path: str, size: Tuple[int, int]) -> Image.Image:
+        """Получение миниатюры фото игрока нужного размера
+        
+        Миниатюра декодируется и масштабируется один раз, дальше берется из кэша.
+        
+        Args:
+            player_id: ID игрока
+            photo_path: Путь к исходному фото
+            size: Размер миниатюры
             
-        except Exception as e:
-            self.logger.error(f"Ошибка при создании коллажа: {e}")
-            return None
+        Returns:
+            Image.Image: RGB-миниатюра
+        """
+        thumbnail = self.thumbnails.get(player_id, size)
+        if thumbnail is None:
+            with open(photo_path, 'rb') as f:
+                thumbnail = prepare_headshot(f.read(), size)
+            self.thumbnails.put(player_id, size, thumbnail)
+        return thumbnail
             
     def _get_photo_positions(self, width: int, height: int) -> Dict[str, Tuple[int, int]]:
         """Возвращает позиции для фото игроков
@@ -159,40 +254,14 @@ class ImageService:
         Returns:
             Dict[str, Tuple[int, int]]: Словарь позиций для каждой позиции игрока
         """
-        # Размер фото игрока
-        photo_size = (130, 100)  # Ширина больше высоты
-        padding = 10
-        
-        # Первый ряд: LW, C, RW
-        row1_y = padding
-        row1_x = [padding, width//2, width - padding - photo_size[0]]  # LW слева, C по центру, RW справа
-        
-        # Второй ряд: D1, D2
-        row2_y = photo_size[1] + padding * 2
-        row2_x = [width//3, 2*width//3]
-        
-        # Третий ряд: G (значительно ниже)
-        row3_y = (photo_size[1] + padding) * 2
-        row3_x = width//2
-        
-        positions = {}
-        
-        # Добавляем позиции для каждой позиции игрока
-        positions['LW'] = (row1_x[0], row1_y)  # Левый нападающий слева
-        positions['C'] = (row1_x[1] - photo_size[0]//2, row1_y)  # Центральный по центру
-        positions['RW'] = (row1_x[2], row1_y)  # Правый нападающий справа
-        positions['D1'] = (row2_x[0] - photo_size[0]//2, row2_y)
-        positions['D2'] = (row2_x[1] - photo_size[0]//2, row2_y)
-        positions['G'] = (row3_x - photo_size[0]//2, row3_y)
-        
-        return positions
+        return grid_positions(width, height)
         
     def _get_player_photo_url(self, player_id: str) -> Optional[str]:
         """Получает URL фото игрока"""
         return f"https://a.espncdn.com/i/headshots/nhl/players/full/{player_id}.png"
 
     def create_team_collage(self, player_photos: dict, team: dict, title: str) -> str:
-        """Создание коллажа команды недели
+        """Создание коллажа команды недели с сохранением в файл
         
         Args:
             player_photos (dict): Словарь с путями к фотографиям игроков
@@ -202,64 +271,47 @@ class ImageService:
         Returns:
             str: Путь к созданному коллажу
         """
-        try:
-            # Создаем пустое изображение для коллажа
-            collage = Image.new('RGB', (1200, 800), 'white')
-            draw = ImageDraw.Draw(collage)
+        data = self.render_team_collage(player_photos, team, title)
+        if data is None:
+            return None
+        path = persist_collage(data, f'team_of_week_{int(time.time())}.png', self.collage_dir, force=True)
+        return str(path) if path else None
+
+    def render_team_collage(self, player_photos: dict, team: dict, title: str) -> Optional[bytes]:
+        """Создание коллажа команды недели в памяти
+        
+        Args:
+            player_photos (dict): Словарь с путями к фотографиям игроков
+            team (dict): Словарь с информацией об игроках
+            title (str): Заголовок коллажа
             
-            # Загружаем шрифт
-            title_font = ImageFont.truetype(self.font_path, 36)
-            stats_font = ImageFont.truetype(self.font_path, 24)
+        Returns:
+            Optional[bytes]: Коллаж в формате PNG
+        """
+        try:
+            # Фон, шрифты и позиции фото берутся из готового макета
+            template = team_grid_template(self.font_path)
+            collage, draw = template.canvas()
             
             # Добавляем заголовок
-            title_bbox = draw.textbbox((0, 0), title, font=title_font)
-            title_width = title_bbox[2] - title_bbox[0]
-            draw.text(((1200 - title_width) // 2, 20), title, font=title_font, fill='black')
-            
-            # Позиции для фотографий игроков
-            positions = {
-                'G': (500, 150),
-                'D1': (200, 300),
-                'D2': (800, 300),
-                'LW': (200, 500),
-                'C': (500, 500),
-                'RW': (800, 500)
-            }
-            
-            # Размер фотографии игрока
-            photo_size = (200, 200)
+            template.draw_title(draw, title)
             
             # Добавляем фотографии и статистику игроков
-            for pos, coords in positions.items():
+            for pos in template.slots:
                 if pos in team:
                     player = team[pos]
                     player_id = str(player['info']['id'])
                     
                     if player_id in player_photos:
-                        # Загружаем и изменяем размер фото
-                        photo = Image.open(player_photos[player_id])
-                        photo = photo.resize(photo_size, Image.Resampling.LANCZOS)
-                        
-                        # Вычисляем позицию для фото (центрируем относительно заданных координат)
-                        photo_x = coords[0] - photo_size[0] // 2
-                        photo_y = coords[1] - photo_size[1] // 2
-                        
-                        # Вставляем фото
-                        collage.paste(photo, (photo_x, photo_y))
+                        # Берем готовую миниатюру из кэша
+                        photo = self._load_thumbnail(player_id, player_photos[player_id], template.photo_size)
+                        template.paste(collage, pos, photo)
                         
                         # Добавляем имя игрока и очки
                         player_text = f"{player['info']['name']}\n{player['stats']['total_points']} pts"
-                        text_bbox = draw.textbbox((0, 0), player_text, font=stats_font)
-                        text_width = text_bbox[2] - text_bbox[0]
-                        text_x = coords[0] - text_width // 2
-                        text_y = photo_y + photo_size[1] + 10
-                        draw.text((text_x, text_y), player_text, font=stats_font, fill='black', align='center')
-            
-            # Сохраняем коллаж
-            collage_path = os.path.join(self.collage_dir, f'team_of_week_{int(time.time())}.png')
-            collage.save(collage_path)
+                        template.draw_caption(draw, pos, player_text)
             
-            return collage_path
+            return encode_image(collage, 'PNG')
             
         except Exception as e:
             self.logger.error(f"Ошибка при создании коллажа команды недели: {e}")
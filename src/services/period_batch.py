@@ -0,0 +1,179 @@
+"""
+Пакетная загрузка статистики за несколько игровых дней одним запросом kona_player_info
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+SLOT_IDS = [0, 6, 1, 2, 4, 5]
+PERIOD_LIMIT = 100  # Размер рейтинга за один день, как в запросе по одному дню
+PAGE_SIZE = 500
+MAX_PAGES = 4
+
+
+def build_period_filter(
+    scoring_period_ids: List[int],
+    limit: int = PERIOD_LIMIT,
+    offset: int = 0
+) -> Dict:
+    """
+    Формирует x-fantasy-filter для одного или нескольких игровых дней
+
+    Для одного дня фильтр совпадает с прежним запросом. ESPN не умеет
+    сортировать по сумме нескольких периодов, поэтому для нескольких дней
+    сортировка по очкам первого дня только задает стабильный порядок
+    страниц по offset: загружаются все страницы (fetch_periods), а рейтинги
+    по дням строятся после загрузки (split_by_period).
+
+    Args:
+        scoring_period_ids: ID игровых дней
+        limit: Размер страницы
+        offset: Смещение страницы
+
+    Returns:
+        Dict: Фильтр запроса
+    """
+    players_filter = {
+        "filterSlotIds": {"value": SLOT_IDS},
+        "filterStatsForCurrentSeasonScoringPeriodId": {"value": list(scoring_period_ids)},
+        "sortAppliedStatTotalForScoringPeriodId": {
+            "sortAsc": False, "sortPriority": 2, "value": scoring_period_ids[0]
+        },
+        "limit": limit
+    }
+    if offset:
+        players_filter["offset"] = offset
+    return {"players": players_filter}
+
+
+def period_split(player: Dict, period_id: int) -> Optional[Dict]:
+    """
+    Статистика игрока за день: фактическая (statSourceId 0), иначе первая найденная
+
+    ESPN возвращает за период и фактическую, и прогнозную (statSourceId 1)
+    статистику; в рейтинг дня игрок попадает один раз.
+
+    Args:
+        player: Запись player из ответа
+        period_id: ID игрового дня
+
+    Returns:
+        Optional[Dict]: Запись stats или None
+    """
+    found = None
+    for stat in player.get('stats', []):
+        if stat.get('scoringPeriodId') != period_id:
+            continue
+        if stat.get('statSourceId', 0) == 0:
+            return stat
+        if found is None:
+            found = stat
+    return found
+
+
+def split_by_period(
+    players: Iterable[Dict],
+    scoring_period_ids: Iterable[int],
+    limit: int = PERIOD_LIMIT
+) -> Dict[int, Dict]:
+    """
+    Раскладывает ответ за несколько дней на отдельные рейтинги по дням
+
+    В каждый рейтинг попадают игроки со статистикой за этот день (один раз,
+    см. period_split), отсортированные по appliedTotal и обрезанные до limit.
+    В записях игрока остается только статистика за соответствующий день, так
+    что результат имеет ту же форму, что и ответ на запрос по одному дню.
+
+    Args:
+        players: Записи players из ответов kona_player_info
+        scoring_period_ids: ID игровых дней
+        limit: Размер рейтинга за день
+
+    Returns:
+        Dict[int, Dict]: {scoring_period_id: {"players": [...]}}
+    """
+    buckets: Dict[int, List[Tuple[float, Dict]]] = {period_id: [] for period_id in scoring_period_ids}
+
+    for entry in players:
+        player = entry.get('player', {})
+        periods = {stat.get('scoringPeriodId') for stat in player.get('stats', [])}
+        for period_id in periods & buckets.keys():
+            stat = period_split(player, period_id)
+            period_player = dict(player, stats=[stat])
+            buckets[period_id].append((stat.get('appliedTotal', 0), dict(entry, player=period_player)))
+
+    result = {}
+    for period_id, entries in buckets.items():
+        # Стабильная сортировка: при равенстве очков сохраняется порядок ответа
+        entries.sort(key=lambda item: item[0], reverse=True)
+        result[period_id] = {"players": [entry for _, entry in entries[:limit]]}
+    return result
+
+
+def fetch_periods(
+    request: Callable[[Dict], Optional[Dict]],
+    scoring_period_ids: Iterable[int],
+    page_size: int = PAGE_SIZE,
+    max_pages: int = MAX_PAGES,
+    limit: int = PERIOD_LIMIT
+) -> Tuple[Dict[int, Dict], List[int]]:
+    """
+    Загружает несколько игровых дней одним запросом (с постраничной догрузкой)
+
+    Страницы загружаются до первой неполной, то есть выборка всегда полная,
+    и рейтинги не зависят от порядка игроков в ответе. Если ответ обрезан лимитом (все max_pages страниц заполнены полностью),
+    рейтинги по дням могут быть неполными — такие дни возвращаются в списке
+    для загрузки по одному.
+
+    Args:
+        request: Функция выполнения запроса: фильтр -> JSON ответа или None
+        scoring_period_ids: ID игровых дней
+        page_size: Количество игроков на странице
+        max_pages: Максимальное количество страниц
+        limit: Размер рейтинга за день
+
+    Returns:
+        Tuple[Dict[int, Dict], List[int]]: Рейтинги по дням и дни, которые нужно загрузить отдельно
+    """
+    period_ids = sorted(set(scoring_period_ids))
+    if not period_ids:
+        return {}, []
+
+    players: List[Dict] = []
+    seen = set()
+    truncated = True
+    for page in range(max_pages):
+        data = request(build_period_filter(period_ids, limit=page_size, offset=page * page_size))
+        if data is None:
+            logger.warning(f"Не удалось загрузить страницу {page + 1} для дней {period_ids}")
+            return {}, period_ids
+
+        page_players = data.get('players', [])
+        for entry in page_players:
+            # Игрок, сдвинувшийся между страницами, учитывается один раз
+            player_id = entry.get('player', {}).get('id')
+            if player_id is not None:
+                if player_id in seen:
+                    continue
+                seen.add(player_id)
+            players.append(entry)
+        if len(page_players) < page_size:
+            truncated = False
+            break
+
+    if truncated:
+        logger.warning(
+            f"Ответ для дней {period_ids} обрезан лимитом "
+            f"({max_pages} x {page_size}), переходим на запросы по дням"
+        )
+        return {}, period_ids
+
+    periods = split_by_period(players, period_ids, limit=limit)
+    missing = [period_id for period_id in period_ids if not periods[period_id]['players']]
+    logger.info(
+        f"Получено {len(players)} игроков за {len(period_ids)} дней одним запросом "
+        f"({page + 1} стр.)"
+    )
+    return {period_id: data for period_id, data in periods.items() if data['players']}, missing
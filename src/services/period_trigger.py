@@ -0,0 +1,165 @@
+"""
+Запуск обработки игрового дня после его завершения
+"""
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional, Set, Union
+import asyncio
+import json
+import logging
+
+from ..config import settings
+from .game_state import get_current_scoring_period, refresh_game_state
+from .player_stats_store import atomic_write_json
+from .schedule_index import ScheduleIndex, get_schedule_index
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodTrigger:
+    """
+    Определяет завершенные игровые дни и запускает их обработку ровно один раз
+
+    День считается завершенным, когда ESPN перешел на следующий игровой
+    день (currentScoringPeriod из kona_game_state) или когда прошло
+    расчетное время окончания последнего матча дня по расписанию плюс
+    запас settings.GAME_FINAL_GRACE_MINUTES. Опубликованные дни хранятся
+    в settings.TRIGGER_STATE_FILE вместе с сезоном: ID игровых дней каждый
+    сезон начинаются с 1, поэтому состояние другого сезона не учитывается.
+    """
+
+    def __init__(
+        self,
+        state_path: Optional[Path] = None,
+        schedule: Optional[ScheduleIndex] = None,
+        grace_minutes: Optional[int] = None,
+        lookback: Optional[int] = None,
+        season: Optional[Union[int, str]] = None
+    ):
+        self.state_path = Path(state_path or settings.TRIGGER_STATE_FILE)
+        self.season = str(season if season is not None else settings.ESPN_API['season_id'])
+        self.schedule = schedule if schedule is not None else get_schedule_index()
+        self.grace = timedelta(minutes=settings.GAME_FINAL_GRACE_MINUTES if grace_minutes is None else grace_minutes)
+        self.lookback = settings.TRIGGER_LOOKBACK_PERIODS if lookback is None else lookback
+        self.published: Set[int] = self._load()
+
+    def _load(self) -> Set[int]:
+        """Загрузка списка опубликованных игровых дней текущего сезона"""
+        try:
+            with self.state_path.open('r', encoding='utf-8') as f:
+                state = json.load(f)
+            season = state.get("season")
+            published = {int(period) for period in state.get("published", [])}
+        except FileNotFoundError:
+            return set()
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            logger.warning(f"Не удалось прочитать {self.state_path}: {e}")
+            return set()
+
+        if season is None or str(season) != self.season:
+            logger.info(f"Состояние {self.state_path} относится к сезону {season}, начинаем сезон {self.season} заново")
+            return set()
+        return published
+
+    def mark_published(self, period: int) -> None:
+        """Отметка игрового дня как опубликованного"""
+        self.published.add(int(period))
+        atomic_write_json(
+            self.state_path,
+            {"season": self.season, "published": sorted(self.published)},
+            indent=None
+        )
+
+    def _has_games(self, period: int) -> bool:
+        return self.schedule is None or self.schedule.has_games(period)
+
+    def _estimated_final(self, period: int) -> Optional[datetime]:
+        """Расчетное время, когда статистика дня окончательна"""
+        if self.schedule is None:
+            return None
+        end = self.schedule.last_game_end(period)
+        return end + self.grace if end is not None else None
+
+    def is_final(self, period: int, current_period: int, now: datetime) -> bool:
+        """
+        Завершен ли игровой день
+
+        Args:
+            period: ID игрового дня
+            current_period: currentScoringPeriod из состояния игры ESPN
+            now: Текущее время (с часовым поясом)
+
+        Returns:
+            bool: True, если статистика дня окончательна
+        """
+        if period < current_period:
+            return True
+        final_at = self._estimated_final(period)
+        return final_at is not None and now >= final_at
+
+    def pending(self, current_period: int) -> List[int]:
+        """Неопубликованные игровые дни с матчами, от current_period - lookback до следующего дня"""
+        first = max(settings.SEASON_START_SCORING_PERIOD, current_period - self.lookback)
+        return [
+            period for period in range(first, current_period + 2)
+            if period not in self.published and self._has_games(period)
+        ]
+
+    def ready_periods(self, current_period: int, now: datetime) -> List[int]:
+        """Завершенные и еще не опубликованные игровые дни"""
+        return [period for period in self.pending(current_period) if self.is_final(period, current_period, now)]
+
+    def next_check(self, current_period: int, now: datetime) -> float:
+        """
+        Пауза до следующей проверки (секунды)
+
+        Ближайшее расчетное завершение неопубликованного дня; если оно
+        неизвестно - settings.TRIGGER_POLL_SECONDS.
+        """
+        upcoming = [
+            final_at for final_at in map(self._estimated_final, self.pending(current_period))
+            if final_at is not None and final_at > now
+        ]
+        if not upcoming:
+            return float(settings.TRIGGER_POLL_SECONDS)
+        return max(1.0, (min(upcoming) - now).total_seconds())
+
+    async def run(
+        self,
+        process: Callable[[int], Awaitable[bool]],
+        once: bool = False,
+        clock: Callable[[], datetime] = lambda: datetime.now(timezone.utc),
+        sleep: Callable[[float], Awaitable] = asyncio.sleep,
+        refresh: Callable[[], Optional[int]] = refresh_game_state
+    ) -> List[int]:
+        """
+        Цикл ожидания завершения игровых дней
+
+        Args:
+            process: Обработка игрового дня, возвращает True при успехе
+            once: Одна проверка без ожидания (запуск по cron)
+            clock: Текущее время
+            sleep: Ожидание
+            refresh: Обновление состояния игры из API (ID текущего дня или None)
+
+        Returns:
+            List[int]: Обработанные игровые дни
+        """
+        processed = []
+        while True:
+            current_period = refresh() or get_current_scoring_period()
+            for period in self.ready_periods(current_period, clock()):
+                logger.info(f"Игровой день {period} завершен, запускаем обработку")
+                if await process(period):
+                    self.mark_published(period)
+                    processed.append(period)
+                else:
+                    logger.warning(f"Игровой день {period} не обработан, повторим при следующей проверке")
+
+            if once:
+                return processed
+
+            delay = self.next_check(current_period, clock())
+            logger.info(f"Следующая проверка через {delay / 60:.1f} мин")
+            await sleep(delay)
@@ -0,0 +1,120 @@
+"""
+Потоковый разбор ответов kona_player_info с отбором нужных полей
+"""
+
+from typing import Dict, Iterable, Iterator
+import io
+import logging
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - без ijson ответ разбирается целиком
+    ijson = None
+
+logger = logging.getLogger(__name__)
+
+# Поля, которые используют app_day, StatsService, period_batch и SeasonMatrix
+ENTRY_FIELDS = ("id", "onTeamId")
+PLAYER_FIELDS = ("id", "fullName", "defaultPositionId", "proTeamId", "eligibleSlots")
+STAT_FIELDS = ("scoringPeriodId", "seasonId", "statSourceId", "statSplitTypeId", "appliedTotal")
+
+
+def streaming_available() -> bool:
+    """Установлен ли пакет ijson для потокового разбора"""
+    return ijson is not None
+
+
+def _project_stats(stats: Iterable[Dict]) -> list:
+    """Записи статистики с очками: только поля периода и appliedTotal (без разбивки по stat id)"""
+    return [
+        {field: stat[field] for field in STAT_FIELDS if field in stat}
+        for stat in stats or ()
+        if isinstance(stat, dict) and "appliedTotal" in stat
+    ]
+
+
+def project_entry(entry: Dict) -> Dict:
+    """
+    Компактная запись игрока из элемента players ответа ESPN
+
+    Сохраняется исходная структура ({"id", "player": {..., "stats": [...]}}),
+    поэтому существующие обработчики работают без изменений.
+
+    Args:
+        entry: Элемент players
+
+    Returns:
+        Dict: Запись только с нужными полями
+    """
+    projected = {field: entry[field] for field in ENTRY_FIELDS if field in entry}
+    if "stats" in entry:
+        projected["stats"] = _project_stats(entry["stats"])
+
+    player = entry.get("player")
+    if isinstance(player, dict):
+        projected_player = {field: player[field] for field in PLAYER_FIELDS if field in player}
+        projected_player["stats"] = _project_stats(player.get("stats"))
+        projected["player"] = projected_player
+    return projected
+
+
+def project_players(data: Dict) -> Dict:
+    """
+    Компактная версия уже разобранного ответа
+
+    Args:
+        data: Ответ kona_player_info
+
+    Returns:
+        Dict: {"players": [компактные записи]}
+    """
+    if not isinstance(data, dict):
+        return data
+    return {"players": [project_entry(entry) for entry in data.get("players", [])]}
+
+
+def iter_players(stream) -> Iterator[Dict]:
+    """
+    Потоковый обход элементов players: в памяти одновременно только один игрок
+
+    Args:
+        stream: Файлоподобный объект с JSON ответа (байты)
+
+    Yields:
+        Dict: Компактная запись игрока
+    """
+    for entry in ijson.items(stream, "players.item", use_float=True):
+        yield project_entry(entry)
+
+
+def read_players(response) -> Dict:
+    """
+    Разбор ответа kona_player_info с отбором нужных полей
+
+    Если установлен ijson и запрос выполнен с stream=True, игроки
+    разбираются по мере получения тела ответа, а рейтинги, владение,
+    ранги и разбивки статистики отбрасываются, не попадая в память
+    целиком. Иначе ответ разбирается через response.json() и сокращается
+    после разбора.
+
+    Args:
+        response: Ответ requests
+
+    Returns:
+        Dict: {"players": [компактные записи]}
+    """
+    try:
+        raw = getattr(response, "raw", None)
+        # Тело еще не прочитано requests (stream=True) - читаем его потоком
+        unread = not getattr(response, "_content_consumed", True)
+        if ijson is not None and unread and isinstance(raw, io.IOBase):
+            raw.decode_content = True
+            try:
+                return {"players": list(iter_players(raw))}
+            except ijson.JSONError as e:
+                raise ValueError(f"Некорректный JSON в ответе: {e}") from e
+        return project_players(response.json())
+    finally:
+        close = getattr(response, "close", None)
+        if close:
+            close()
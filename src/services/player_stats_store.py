@@ -0,0 +1,282 @@
+"""
+Хранилище недельной статистики игроков (player_stats.json) с пакетной записью
+"""
+
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+import pytz
+
+logger = logging.getLogger(__name__)
+
+ESPN_TIMEZONE = pytz.timezone('US/Eastern')
+
+
+def calculate_grade(team_of_the_day_count: int) -> str:
+    """Определение грейда игрока на основе количества попаданий в команду недели"""
+    if team_of_the_day_count >= 5:
+        return "legend"
+    elif team_of_the_day_count >= 4:
+        return "epic"
+    elif team_of_the_day_count >= 3:
+        return "rare"
+    elif team_of_the_day_count >= 2:
+        return "uncommon"
+    else:
+        return "common"
+
+
+def get_week_key(date: datetime) -> str:
+    """
+    Получает ключ недели (со вторника по понедельник) для даты
+
+    Args:
+        date: Дата
+
+    Returns:
+        str: Ключ недели в формате YYYY-MM-DD_YYYY-MM-DD
+    """
+    days_since_tuesday = (date.weekday() - 1) % 7
+    week_start = date - timedelta(days=days_since_tuesday)
+    week_end = week_start + timedelta(days=6)
+    return f"{week_start.strftime('%Y-%m-%d')}_{week_end.strftime('%Y-%m-%d')}"
+
+
+def atomic_write_json(path: Path, data: Dict, indent: Optional[int] = 4) -> None:
+    """
+    Атомарная запись JSON: временный файл в той же директории и os.replace
+
+    Args:
+        path: Путь к итоговому файлу
+        data: Данные для сохранения
+        indent: Отступ JSON
+    """
+    path = Path(path)
+    directory = path.parent if str(path.parent) else Path('.')
+    directory.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def week_fingerprint(players: Dict) -> str:
+    """
+    Отпечаток содержимого недели: хэш записей игроков
+
+    Args:
+        players: Записи игроков недели {player_id: запись}
+
+    Returns:
+        str: SHA-256 канонического JSON
+    """
+    canonical = json.dumps(players, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def changed_weeks(weeks: Dict[str, Dict], fingerprints: Dict[str, str]) -> List[Tuple[str, str]]:
+    """
+    Недели, которых нет среди обработанных или содержимое которых изменилось
+
+    Args:
+        weeks: Недели из player_stats.json {week_key: {"players": ...}}
+        fingerprints: Отпечатки уже обработанных недель
+
+    Returns:
+        List[Tuple[str, str]]: [(week_key, новый отпечаток)] в порядке недель
+    """
+    result = []
+    for week_key, week_data in weeks.items():
+        players = week_data.get('players')
+        if not players:
+            continue
+        fingerprint = week_fingerprint(players)
+        if fingerprints.get(week_key) != fingerprint:
+            result.append((week_key, fingerprint))
+    return result
+
+
+class PlayerStatsStore:
+    """
+    Статистика игроков, загружаемая один раз за запуск
+
+    Все изменения применяются в памяти и сохраняются одной атомарной
+    записью в flush().
+    """
+
+    def __init__(self, path: str = "player_stats.json"):
+        """
+        Args:
+            path: Путь к файлу статистики
+        """
+        self.path = Path(path)
+        self.data: Dict = {"current_week": {}, "weeks": {}}
+        self.dirty = False
+
+    def load(self) -> "PlayerStatsStore":
+        """
+        Загрузка статистики из файла
+
+        Returns:
+            PlayerStatsStore: self, для цепочки вызовов
+        """
+        if self.path.exists():
+            with self.path.open('r') as f:
+                self.data = json.load(f)
+        self.data.setdefault("current_week", {})
+        self.data.setdefault("weeks", {})
+        self.dirty = False
+        return self
+
+    def get_week_players(self, week_key: str) -> Dict:
+        """Возвращает записи игроков за неделю (пустой словарь, если недели нет)"""
+        return self.data["weeks"].get(week_key, {}).get("players", {})
+
+    def get_grade(self, week_key: str, player_id: str) -> str:
+        """Возвращает текущий грейд игрока за неделю"""
+        return self.get_week_players(week_key).get(str(player_id), {}).get("grade", "common")
+
+    def set_current_week(self, start_date: datetime, end_date: datetime) -> None:
+        """Обновляет информацию о текущей неделе"""
+        current_week = {
+            "start_date": start_date.strftime("%Y-%m-%d"),
+            "end_date": end_date.strftime("%Y-%m-%d")
+        }
+        if self.data.get("current_week") != current_week:
+            self.data["current_week"] = current_week
+            self.dirty = True
+
+    def get_current_week(self) -> Dict:
+        """Текущая неделя {"start_date", "end_date"} (пустой словарь, если не задана)"""
+        return self.data.get("current_week") or {}
+
+    def begin_week(self, start_date: datetime, end_date: datetime) -> bool:
+        """
+        Начало новой недели: структура недели и текущая неделя
+
+        Args:
+            start_date: Вторник недели
+            end_date: Понедельник недели
+
+        Returns:
+            bool: True если неделя сменилась
+        """
+        if self.get_current_week().get("start_date") == start_date.strftime("%Y-%m-%d"):
+            return False
+        self.ensure_week(f"{start_date.strftime('%Y-%m-%d')}_{end_date.strftime('%Y-%m-%d')}")
+        self.set_current_week(start_date, end_date)
+        return True
+
+    def ensure_week(self, week_key: str) -> Dict:
+        """Создает структуру недели, если её нет"""
+        week = self.data["weeks"].get(week_key)
+        if week is None:
+            week = self.data["weeks"][week_key] = {"players": {}}
+            self.dirty = True
+        return week["players"]
+
+    def record_selection(
+        self,
+        player_id: str,
+        name: str,
+        date_str: str,
+        applied_total: float,
+        position: str,
+        team_of_the_day: bool = False
+    ) -> str:
+        """
+        Применяет попадание игрока в команду дня в памяти
+
+        Args:
+            player_id: ID игрока
+            name: Имя игрока
+            date_str: Дата в формате YYYY-MM-DD
+            applied_total: Очки за день
+            position: Позиция в команде
+            team_of_the_day: Попал ли игрок в команду дня
+
+        Returns:
+            str: Грейд игрока после обновления
+        """
+        date = datetime.strptime(date_str, "%Y-%m-%d").replace(tzinfo=ESPN_TIMEZONE)
+        week_key = get_week_key(date)
+        week_stats = self.ensure_week(week_key)
+
+        if str(player_id) not in week_stats:
+            logger.info(f"Создание новой записи для игрока {name} в неделе {week_key}")
+            week_stats[str(player_id)] = {
+                "name": name,
+                "team_of_the_day_count": 0,
+                "grade": "common",
+                "team_of_the_day_dates": [],
+                "positions": [],
+                "daily_stats": {},
+                "total_points": 0,
+                "position_appearances": {}
+            }
+
+        stats = week_stats[str(player_id)]
+        stats["name"] = name
+
+        # Проверяем, не обрабатывали ли мы уже эту дату для этого игрока
+        date_position_key = f"{position}:{date_str}"
+        if date_str in stats["daily_stats"]:
+            logger.info(f"Статистика {name} за {date_str} уже существует, пропускаем обновление")
+            return stats["grade"]
+
+        if position not in stats["positions"]:
+            stats["positions"].append(position)
+
+        stats["position_appearances"][position] = stats["position_appearances"].get(position, 0) + 1
+
+        stats["daily_stats"][date_str] = {
+            "points": applied_total,
+            "position": position,
+            "team_of_the_day": team_of_the_day
+        }
+        stats["total_points"] = sum(day["points"] for day in stats["daily_stats"].values())
+
+        # Проверяем уникальность даты перед добавлением
+        if team_of_the_day and date_position_key not in stats["team_of_the_day_dates"]:
+            stats["team_of_the_day_dates"].append(date_position_key)
+            stats["team_of_the_day_count"] = len(stats["team_of_the_day_dates"])
+            stats["grade"] = calculate_grade(stats["team_of_the_day_count"])
+            logger.info(f"Обновление грейда для игрока {name}: {stats['grade']} ({stats['team_of_the_day_count']} раз)")
+
+        # Обновляем информацию о текущей неделе
+        current_date = datetime.now(ESPN_TIMEZONE)
+        current_days_since_tuesday = (current_date.weekday() - 1) % 7
+        current_week_start = current_date - timedelta(days=current_days_since_tuesday)
+        self.set_current_week(current_week_start, current_week_start + timedelta(days=6))
+
+        self.dirty = True
+        return stats["grade"]
+
+    def flush(self) -> bool:
+        """
+        Сохраняет изменения одной атомарной записью
+
+        Returns:
+            bool: True если файл был записан
+        """
+        if not self.dirty:
+            return False
+
+        atomic_write_json(self.path, self.data, indent=4)
+        self.dirty = False
+        logger.info(f"Данные успешно сохранены в {self.path}")
+        return True
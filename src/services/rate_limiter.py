@@ -0,0 +1,269 @@
+"""
+Адаптивное ограничение частоты запросов (token bucket) по конечным точкам
+"""
+
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Optional
+import asyncio
+import logging
+import time
+
+import requests
+from telegram.error import BadRequest, NetworkError
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_STATUSES = (429, 503)
+
+
+def parse_retry_after(value: Any) -> Optional[float]:
+    """
+    Разбор Retry-After: секунды, timedelta или HTTP-дата
+
+    Args:
+        value: Значение заголовка или атрибута retry_after
+
+    Returns:
+        Optional[float]: Задержка в секундах или None
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, timedelta):
+        return max(0.0, value.total_seconds())
+    if isinstance(value, (int, float)):
+        return max(0.0, float(value))
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = parsedate_to_datetime(str(value))
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket с адаптивной скоростью (AIMD)
+
+    Каждый успешный ответ немного увеличивает скорость (до max_rate),
+    каждый 429/503 или Retry-After уменьшает её вдвое (до min_rate) и,
+    если сервер указал Retry-After, приостанавливает выдачу токенов
+    на указанное время. Здоровый API получает полную пропускную
+    способность, перегруженный - меньше.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        min_rate: float,
+        max_rate: float,
+        burst: float = 1.0,
+        increase: float = 0.1,
+        decrease: float = 0.5,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            name: Имя конечной точки (для логов)
+            rate: Начальная скорость, запросов в секунду
+            min_rate: Минимальная скорость
+            max_rate: Максимальная скорость
+            burst: Емкость ведра (сколько запросов можно выполнить подряд)
+            increase: Прибавка скорости после успешного ответа
+            decrease: Множитель скорости при ограничении
+            clock: Источник монотонного времени
+        """
+        self.name = name
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self._clock = clock
+        self._tokens = burst
+        self._updated = clock()
+        self._blocked_until = 0.0
+        self._lock = Lock()
+        self.throttled = 0
+
+    def reserve(self) -> float:
+        """
+        Резервирует токен
+
+        Returns:
+            float: Сколько секунд нужно подождать перед запросом
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._blocked_until - now)
+
+    def acquire(self) -> None:
+        """Ожидание разрешения на запрос (синхронно)"""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """Ожидание разрешения на запрос (в цикле событий)"""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def on_success(self) -> None:
+        """Успешный ответ: плавное увеличение скорости"""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        """
+        Сервер ограничивает запросы или перегружен: снижение скорости
+
+        Args:
+            retry_after: Пауза, запрошенная сервером, в секундах
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self.throttled += 1
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            # Накопленные токены сбрасываются: следующий запрос ждет 1 / rate
+            # (пауза растет с каждым ограничением), а после паузы нет всплеска
+            self._tokens = min(self._tokens, 0.0)
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+        logger.warning(
+            f"Ограничение запросов к {self.name}: скорость {self.rate:.2f} запр./с"
+            + (f", пауза {retry_after:.1f} с" if retry_after else "")
+        )
+
+    def observe(self, status_code: int, headers: Optional[Dict] = None, retried_statuses=()) -> None:
+        """
+        Учет HTTP-ответа
+
+        Args:
+            status_code: Код итогового ответа
+            headers: Заголовки ответа
+            retried_statuses: Коды промежуточных ответов, повторенных транспортом
+        """
+        retry_after = parse_retry_after((headers or {}).get('Retry-After'))
+        if status_code in THROTTLE_STATUSES or retry_after:
+            self.on_throttle(retry_after)
+        elif any(status in THROTTLE_STATUSES for status in retried_statuses):
+            self.on_throttle()
+        elif status_code < 400:
+            self.on_success()
+
+
+def error_status(error: BaseException) -> Optional[int]:
+    """HTTP-код ошибки (requests, aiohttp и т.п.) или None"""
+    status = getattr(error, 'status', None)
+    if status is None:
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Временная ли ошибка: ограничение частоты, сбой сети или ошибка сервера (5xx)
+
+    Ошибки запроса (BadRequest, неверная разметка, прочие 4xx) при повторе
+    повторятся, поэтому они не считаются ограничением частоты.
+
+    Args:
+        error: Исключение вызова
+
+    Returns:
+        bool: True если вызов стоит повторить с пониженной скоростью
+    """
+    if parse_retry_after(getattr(error, 'retry_after', None)) is not None:
+        return True
+    status = error_status(error)
+    if status is not None:
+        return status in THROTTLE_STATUSES or status >= 500
+    if isinstance(error, BadRequest):
+        return False
+    return isinstance(error, (
+        NetworkError,
+        requests.ConnectionError,
+        requests.Timeout,
+        asyncio.TimeoutError,
+        ConnectionError,
+        TimeoutError
+    ))
+
+
+_limiters: Dict[str, AdaptiveRateLimiter] = {}
+_limiters_lock = Lock()
+
+
+def get_rate_limiter(name: str) -> AdaptiveRateLimiter:
+    """
+    Общий ограничитель для конечной точки
+
+    Параметры берутся из settings.RATE_LIMITS[name]
+    (rate, min_rate, max_rate, burst).
+
+    Args:
+        name: Имя конечной точки (espn, telegram, ...)
+
+    Returns:
+        AdaptiveRateLimiter: Ограничитель
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = _limiters[name] = AdaptiveRateLimiter(name, **settings.RATE_LIMITS[name])
+        return limiter
+
+
+async def run_limited(
+    limiter: AdaptiveRateLimiter,
+    call: Callable[[], Awaitable[Any]],
+    attempts: int = 3
+) -> Any:
+    """
+    Выполнение асинхронного вызова (например, bot.send_photo) с ограничением частоты
+
+    Исключение с атрибутом retry_after (telegram.error.RetryAfter) снижает
+    скорость и приостанавливает ограничитель на запрошенное время, после
+    чего вызов повторяется. Сбои сети и ошибки сервера (5xx) тоже снижают
+    скорость и повторяются до attempts раз. Остальные ошибки (BadRequest,
+    прочие 4xx) пробрасываются сразу, не меняя скорость.
+
+    Args:
+        limiter: Ограничитель конечной точки
+        call: Фабрика корутины; вызывается заново на каждой попытке
+        attempts: Количество попыток
+
+    Returns:
+        Any: Результат вызова
+    """
+    for attempt in range(1, attempts + 1):
+        await limiter.acquire_async()
+        try:
+            result = await call()
+        except Exception as e:
+            if not is_retryable(e):
+                raise
+            limiter.on_throttle(parse_retry_after(getattr(e, 'retry_after', None)))
+            if attempt == attempts:
+                raise
+            logger.warning(f"Попытка {attempt} из {attempts} для {limiter.name} не удалась: {e}")
+            continue
+        limiter.on_success()
+        return result
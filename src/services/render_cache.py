@@ -0,0 +1,176 @@
+"""
+Кэш готовых коллажей по отпечатку команды
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from ..config import settings
+from .collage_template import load_font
+
+logger = logging.getLogger(__name__)
+
+# Меняется при изменении отрисовки, чтобы не отдавать коллажи старого вида
+RENDER_VERSION = 2
+
+
+def render_key(
+    layout: str,
+    title: str,
+    players: Iterable[Sequence],
+    font: Optional[str] = None,
+    format: str = 'JPEG'
+) -> str:
+    """
+    Отпечаток коллажа: все, что на нем видно
+
+    Args:
+        layout: Макет (vertical, lineup, ...)
+        title: Заголовок
+        players: Игроки по порядку слотов: (ID игрока, выводимый текст с очками, грейд, ...)
+        font: Путь к шрифту (None - шрифт коллажей по умолчанию)
+        format: Формат результата
+
+    Returns:
+        str: SHA-256 отпечатка
+    """
+    font = font or getattr(load_font(None, 20), 'path', 'default')
+    payload = [RENDER_VERSION, layout, title, [list(player) for player in players], str(font), format]
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class RenderCache:
+    """
+    Кэш коллажей: LRU в памяти и файлы на диске, оба с ограничением по размеру
+
+    Директория общая для app_day, app_week и скриптов, которые работают в
+    разных процессах, поэтому размер на диске считается по самим файлам, а
+    давность обращения - по mtime (обновляется при попадании).
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_bytes: Optional[int] = None,
+        memory_bytes: Optional[int] = None
+    ):
+        """
+        Args:
+            cache_dir: Директория кэша (None - settings.RENDER_CACHE_DIR)
+            max_bytes: Предельный размер на диске (0 - без диска)
+            memory_bytes: Предельный размер в памяти (0 - без памяти)
+        """
+        self.cache_dir = Path(cache_dir or settings.RENDER_CACHE_DIR)
+        self.max_bytes = settings.RENDER_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.memory_bytes = settings.RENDER_CACHE_MEMORY_BYTES if memory_bytes is None else memory_bytes
+        if self.max_bytes:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_used = 0
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    def _file(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.bin"
+
+    def _remember(self, key: str, data: bytes) -> None:
+        """LRU в памяти с вытеснением по размеру"""
+        if len(data) > self.memory_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_used -= len(previous)
+            self._memory[key] = data
+            self._memory_used += len(data)
+            while self._memory_used > self.memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_used -= len(evicted)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Готовый коллаж или None"""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.counters["hits"] += 1
+                return data
+
+        if self.max_bytes:
+            path = self._file(key)
+            try:
+                data = path.read_bytes()
+                os.utime(path)
+            except OSError:
+                data = None
+            if data is not None:
+                self._remember(key, data)
+                self.counters["hits"] += 1
+                return data
+
+        self.counters["misses"] += 1
+        return None
+
+    def put(self, key: str, data: bytes) -> None:
+        """Сохранение коллажа"""
+        self._remember(key, data)
+        self.counters["writes"] += 1
+        if not self.max_bytes or len(data) > self.max_bytes:
+            return
+
+        path = self._file(key)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Не удалось сохранить коллаж в кэш: {e}")
+            return
+        self._evict(protect=path)
+
+    def _evict(self, protect: Path) -> None:
+        """Удаление давно не использованных коллажей до укладывания в max_bytes"""
+        entries = []
+        for path in self.cache_dir.glob("*.bin"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == protect:
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            self.counters["evictions"] += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Счетчики попаданий, промахов, записей и вытеснений"""
+        return dict(self.counters, memory_bytes=self._memory_used)
+
+
+_cache_lock = threading.Lock()
+_cache: Optional[RenderCache] = None
+
+
+def get_render_cache() -> RenderCache:
+    """Общий кэш коллажей процесса"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = RenderCache()
+        return _cache
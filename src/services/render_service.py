@@ -0,0 +1,175 @@
+"""
+Отрисовка коллажей в пуле процессов
+
+Декодирование, вставка миниатюр, вывод текста и кодирование в JPEG/PNG
+занимают процессор и держат GIL, поэтому при массовой обработке сезона
+коллажи рисуются в отдельных процессах, а цикл событий продолжает
+отправлять сообщения в Telegram. Задания передаются в процессы в
+сериализуемом виде: миниатюры - сырыми байтами пикселей (pack_image).
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import logging
+
+from PIL import Image
+
+from ..config import settings
+from .collage_output import encode_image
+from .collage_template import lineup_grid_template, vertical_template
+from .render_cache import RenderCache, get_render_cache
+
+logger = logging.getLogger(__name__)
+
+# Миниатюра для передачи в процесс: (режим, размер, пиксели)
+PackedImage = Tuple[str, Tuple[int, int], bytes]
+
+
+def pack_image(image: Optional[Image.Image]) -> Optional[PackedImage]:
+    """Миниатюра в сериализуемом виде (без повторного кодирования)"""
+    if image is None:
+        return None
+    return image.mode, image.size, image.tobytes()
+
+
+def unpack_image(packed: Optional[PackedImage]) -> Optional[Image.Image]:
+    """Миниатюра из pack_image"""
+    if packed is None:
+        return None
+    mode, size, data = packed
+    return Image.frombytes(mode, size, data)
+
+
+def render_vertical(title: str, rows: List[Tuple[Optional[PackedImage], str, str]], format: str = 'JPEG') -> bytes:
+    """
+    Вертикальный коллаж команды дня / недели (app_day, app_week)
+
+    Args:
+        title: Заголовок
+        rows: Строки (миниатюра или None, подпись, цвет подписи)
+        format: Формат результата
+
+    Returns:
+        bytes: Закодированный коллаж
+    """
+    template = vertical_template(len(rows))
+    image, draw = template.canvas()
+    template.draw_title(draw, title)
+    for row, (photo, text, fill) in enumerate(rows):
+        template.paste(image, row, unpack_image(photo))
+        template.draw_caption(draw, row, text, fill)
+    return encode_image(image, format)
+
+
+def render_lineup(photos: Dict[str, PackedImage], format: str = 'PNG') -> bytes:
+    """
+    Сетка фото без подписей (ImageService.render_collage)
+
+    Args:
+        photos: {слот (LW, C, RW, D1, D2, G): миниатюра}
+        format: Формат результата
+
+    Returns:
+        bytes: Закодированный коллаж
+    """
+    template = lineup_grid_template()
+    image, _ = template.canvas()
+    for slot, photo in photos.items():
+        template.paste(image, slot, unpack_image(photo))
+    return encode_image(image, format)
+
+
+class RenderService:
+    """
+    Пул процессов для отрисовки коллажей
+
+    Пул создается при первом задании. При workers=0 отрисовка идет в пуле
+    потоков цикла событий (одиночные коллажи, где запуск процессов дороже
+    самой отрисовки).
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        """
+        Args:
+            workers: Количество процессов (None - settings.RENDER_WORKERS, 0 - без процессов)
+        """
+        self.workers = settings.RENDER_WORKERS if workers is None else max(0, workers)
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers and self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        return self._pool
+
+    async def render(self, func: Callable[..., bytes], *args: Any) -> bytes:
+        """
+        Выполнение функции отрисовки вне цикла событий
+
+        Args:
+            func: Функция уровня модуля (сериализуется в процесс по имени)
+            *args: Сериализуемые аргументы
+
+        Returns:
+            bytes: Результат функции
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor(), func, *args)
+        except BrokenProcessPool as e:
+            logger.warning(f"Пул отрисовки недоступен ({e}), коллаж рисуется в текущем процессе")
+            self.close()
+            self.workers = 0
+            return await loop.run_in_executor(None, func, *args)
+
+    async def render_job(
+        self,
+        key: str,
+        prepare: Callable[[], Tuple[tuple, bool]],
+        func: Callable[..., bytes],
+        cache: Optional[RenderCache] = None
+    ) -> bytes:
+        """
+        Отрисовка с кэшем готовых коллажей
+
+        При попадании в кэш фото не загружаются и коллаж не рисуется.
+
+        Args:
+            key: Отпечаток коллажа (render_key)
+            prepare: Подготовка задания в потоке (загрузка фото); возвращает
+                аргументы func и признак, что результат можно кэшировать
+                (False, если часть фото не загрузилась)
+            func: Функция отрисовки
+            cache: Кэш (None - общий кэш процесса)
+
+        Returns:
+            bytes: Коллаж
+        """
+        cache = cache or get_render_cache()
+        data = cache.get(key)
+        if data is not None:
+            logger.info(f"Коллаж {key[:12]} взят из кэша")
+            return data
+
+        args, cacheable = await asyncio.get_running_loop().run_in_executor(None, prepare)
+        data = await self.render(func, *args)
+        if cacheable:
+            cache.put(key, data)
+        return data
+
+    def submit(self, func: Callable[..., bytes], *args: Any) -> asyncio.Future:
+        """Запуск отрисовки без ожидания; результат - задача asyncio"""
+        return asyncio.ensure_future(self.render(func, *args))
+
+    def close(self) -> None:
+        """Остановка процессов пула"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def __enter__(self) -> "RenderService":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,258 @@
+"""
+Архив сырых ответов ESPN kona_player_info с адресацией по содержимому
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Union
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+from ..config import settings
+from .game_state import is_period_final
+from .player_stats_store import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+MODES = ("off", "record", "replay", "offline")
+
+Period = Union[int, str, Iterable[int]]
+
+
+def filter_hash(request_key: Dict) -> str:
+    """
+    Хэш параметров запроса (фильтр, view и т.п.), не зависящий от порядка ключей
+
+    Args:
+        request_key: Параметры, определяющие ответ
+
+    Returns:
+        str: Первые 16 символов sha256
+    """
+    canonical = json.dumps(request_key, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def period_label(period: Period) -> str:
+    """Имя игрового дня (или диапазона дней) в ключе архива"""
+    if isinstance(period, (int, str)):
+        return str(period)
+    periods = sorted(int(p) for p in period)
+    if len(periods) == 1:
+        return str(periods[0])
+    return f"{periods[0]}-{periods[-1]}"
+
+
+def periods_final(period: Period) -> bool:
+    """Проверяет, что все игровые дни ключа завершены"""
+    if isinstance(period, str):
+        period = [int(p) for p in period.split('-')]
+    if isinstance(period, int):
+        period = [period]
+    periods = list(period)
+    return bool(periods) and all(is_period_final(p) for p in periods)
+
+
+class ResponseArchive:
+    """
+    Архив сжатых ответов API
+
+    Ответы хранятся один раз по sha256 содержимого (blobs/ab/abcd....json.gz),
+    а индекс (index/лига/сезон/день/хэш_фильтра.json) связывает ключ запроса
+    с содержимым. Одинаковые ответы на разные запросы занимают место один раз.
+
+    Режимы:
+        off - архив не используется;
+        record - запрос всегда идет в сеть, ответы за завершенные дни сохраняются;
+        replay - завершенные дни берутся из архива, недостающее догружается и сохраняется;
+        offline - только архив, без обращения к сети.
+    """
+
+    def __init__(self, root: Optional[Path] = None, mode: Optional[str] = None):
+        """
+        Args:
+            root: Директория архива (по умолчанию settings.ARCHIVE_DIR)
+            mode: Режим работы (по умолчанию settings.ESPN_ARCHIVE_MODE)
+        """
+        self.root = Path(root or settings.ARCHIVE_DIR)
+        self.mode = mode or settings.ESPN_ARCHIVE_MODE
+
+    @property
+    def mode(self) -> str:
+        return self._mode
+
+    @mode.setter
+    def mode(self, value: str) -> None:
+        if value not in MODES:
+            raise ValueError(f"Неизвестный режим архива: {value}. Допустимые: {', '.join(MODES)}")
+        self._mode = value
+
+    def _index_path(self, league_id, season, period: Period, request_key: Dict) -> Path:
+        return self.root / "index" / str(league_id) / str(season) / period_label(period) / f"{filter_hash(request_key)}.json"
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.root / "blobs" / digest[:2] / f"{digest}.json.gz"
+
+    def get(self, league_id, season, period: Period, request_key: Dict) -> Optional[Dict]:
+        """
+        Получение ответа из архива
+
+        Args:
+            league_id: ID лиги
+            season: Сезон
+            period: Игровой день или дни запроса
+            request_key: Параметры запроса
+
+        Returns:
+            Optional[Dict]: Ответ API или None, если его нет в архиве
+        """
+        index_path = self._index_path(league_id, season, period, request_key)
+        try:
+            with index_path.open('r') as f:
+                digest = json.load(f)["sha256"]
+            with gzip.open(self._blob_path(digest), 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Поврежденная запись архива {index_path}: {e}")
+            return None
+
+        if hashlib.sha256(raw).hexdigest() != digest:
+            logger.warning(f"Контрольная сумма не совпадает для {index_path}")
+            return None
+        return json.loads(raw)
+
+    def put(self, league_id, season, period: Period, request_key: Dict, data: Dict) -> str:
+        """
+        Сохранение ответа в архив
+
+        Args:
+            league_id: ID лиги
+            season: Сезон
+            period: Игровой день или дни запроса
+            request_key: Параметры запроса
+            data: Ответ API
+
+        Returns:
+            str: sha256 содержимого
+
+        Raises:
+            ValueError: Если ID лиги не задан
+        """
+        if league_id is None:
+            raise ValueError("Нельзя архивировать ответ без ID лиги")
+        raw = json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        digest = hashlib.sha256(raw).hexdigest()
+
+        blob_path = self._blob_path(digest)
+        if not blob_path.exists():
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=blob_path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(gzip.compress(raw, compresslevel=6))
+                os.replace(tmp_path, blob_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+        atomic_write_json(
+            self._index_path(league_id, season, period, request_key),
+            {
+                "sha256": digest,
+                "size": len(raw),
+                "archived_at": datetime.now().isoformat(timespec='seconds'),
+                "request": request_key
+            },
+            indent=None
+        )
+        return digest
+
+    def fetch(
+        self,
+        league_id,
+        season,
+        period: Period,
+        request_key: Dict,
+        fetcher: Callable[[], Optional[Dict]],
+        final: Optional[bool] = None
+    ) -> Optional[Dict]:
+        """
+        Получение ответа с учетом режима архива
+
+        Args:
+            league_id: ID лиги
+            season: Сезон
+            period: Игровой день или дни запроса
+            request_key: Параметры запроса
+            fetcher: Запрос к API, возвращающий ответ или None
+            final: Завершены ли дни запроса (по умолчанию по kona_game_state.json)
+
+        Returns:
+            Optional[Dict]: Ответ API или None
+        """
+        if self.mode == "off":
+            return fetcher()
+
+        if league_id is None:
+            # Без ID лиги ответы разных лиг попали бы под один ключ
+            if self.mode == "offline":
+                logger.warning(f"Режим offline: ID лиги не задан, нет ответа для дня {period_label(period)}")
+                return None
+            logger.warning(f"ID лиги не задан, ответ для дня {period_label(period)} не архивируется")
+            return fetcher()
+
+        if self.mode in ("replay", "offline"):
+            data = self.get(league_id, season, period, request_key)
+            if data is not None:
+                logger.info(f"Ответ для дня {period_label(period)} взят из архива")
+                return data
+            if self.mode == "offline":
+                logger.warning(f"Режим offline: нет ответа в архиве для дня {period_label(period)}")
+                return None
+
+        data = fetcher()
+        if data is None:
+            return None
+
+        if final is None:
+            final = periods_final(period)
+        if final:
+            try:
+                self.put(league_id, season, period, request_key, data)
+            except OSError as e:
+                logger.warning(f"Не удалось сохранить ответ в архив: {e}")
+        return data
+
+
+_archive: Optional[ResponseArchive] = None
+
+
+def get_archive() -> ResponseArchive:
+    """Общий архив процесса"""
+    global _archive
+    if _archive is None:
+        _archive = ResponseArchive()
+    return _archive
+
+
+def set_archive_mode(mode: str) -> ResponseArchive:
+    """
+    Переключение режима общего архива (для флагов --offline / --replay)
+
+    Args:
+        mode: Режим работы
+
+    Returns:
+        ResponseArchive: Общий архив
+    """
+    archive = get_archive()
+    archive.mode = mode
+    logger.info(f"Режим архива ответов ESPN: {mode}")
+    return archive
@@ -0,0 +1,274 @@
+"""
+Индекс расписания НХЛ по игровым дням из TeamShedules.json
+"""
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+import json
+import logging
+import os
+import struct
+import threading
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Заголовок бинарного индекса: сигнатура, версия, mtime и размер исходного файла,
+# число игровых дней и число команд
+_MAGIC = b"SCHI"
+_VERSION = 1
+_HEADER = struct.Struct("<4sIdqII")
+# Команда занимает бит маски дня, поэтому команд не больше 64
+_MAX_TEAMS = 64
+
+_lock = threading.Lock()
+_cached = {"key": None, "index": None}
+
+
+class ScheduleIndex:
+    """
+    Компактный индекс расписания: для каждого игрового дня - битовая маска
+    команд, сыгравших в этот день, число матчей и время окончания последнего
+    матча (начало последнего матча + settings.GAME_DURATION_MINUTES)
+
+    ID команд ESPN не подряд (есть 124292), поэтому бит маски - номер
+    команды в team_ids.
+    """
+
+    def __init__(self, team_ids: List[int], team_masks: List[int], game_counts: List[int], last_ends: List[int]):
+        self.team_ids = team_ids
+        self.team_bits = {team_id: bit for bit, team_id in enumerate(team_ids)}
+        self.team_masks = team_masks
+        self.game_counts = game_counts
+        # Время окончания последнего матча дня, мс UTC (0 - матчей нет)
+        self.last_ends = last_ends
+
+    @classmethod
+    def from_schedule(cls, data: Dict) -> "ScheduleIndex":
+        """
+        Построение индекса из ответа ESPN с proTeams[].proGamesByScoringPeriod
+
+        Args:
+            data: Содержимое TeamShedules.json
+
+        Returns:
+            ScheduleIndex: Индекс расписания
+        """
+        duration = settings.GAME_DURATION_MINUTES * 60 * 1000
+        teams = data.get("settings", {}).get("proTeams", [])
+        team_ids = sorted({
+            team_id
+            for team in teams
+            for period_games in (team.get("proGamesByScoringPeriod") or {}).values()
+            for game in period_games
+            for team_id in (game.get("homeProTeamId", team.get("id")), game.get("awayProTeamId", team.get("id")))
+        })
+        if len(team_ids) > _MAX_TEAMS:
+            raise ValueError(f"Слишком много команд в расписании: {len(team_ids)}")
+        bits = {team_id: bit for bit, team_id in enumerate(team_ids)}
+
+        masks: Dict[int, int] = {}
+        games: Dict[int, Set[int]] = {}
+        last_ends: Dict[int, int] = {}
+        for team in teams:
+            for period, period_games in (team.get("proGamesByScoringPeriod") or {}).items():
+                period = int(period)
+                for game in period_games:
+                    # Каждый матч указан у обеих команд - считаем его один раз
+                    games.setdefault(period, set()).add(game.get("id"))
+                    for side in ("homeProTeamId", "awayProTeamId"):
+                        masks[period] = masks.get(period, 0) | (1 << bits[game.get(side, team.get("id"))])
+                    if game.get("date"):
+                        last_ends[period] = max(last_ends.get(period, 0), game["date"] + duration)
+
+        size = max(masks, default=-1) + 1
+        return cls(
+            team_ids,
+            [masks.get(period, 0) for period in range(size)],
+            [len(games.get(period, ())) for period in range(size)],
+            [last_ends.get(period, 0) for period in range(size)]
+        )
+
+    def covers(self, scoring_period_id: int) -> bool:
+        """Входит ли игровой день в расписание (дни после конца расписания неизвестны)"""
+        return 0 <= scoring_period_id < len(self.team_masks)
+
+    def has_games(self, scoring_period_id: int) -> bool:
+        """
+        Есть ли матчи в игровой день
+
+        Для дней вне расписания возвращает True, чтобы их не пропускали.
+        """
+        return not self.covers(scoring_period_id) or self.game_counts[scoring_period_id] > 0
+
+    def game_count(self, scoring_period_id: int) -> int:
+        """Число матчей в игровой день"""
+        return self.game_counts[scoring_period_id] if self.covers(scoring_period_id) else 0
+
+    def teams_playing(self, scoring_period_id: int) -> Optional[Set[int]]:
+        """
+        ID команд НХЛ, сыгравших в игровой день
+
+        Returns:
+            Optional[Set[int]]: Команды или None, если день вне расписания
+        """
+        if not self.covers(scoring_period_id):
+            return None
+        mask = self.team_masks[scoring_period_id]
+        return {team_id for bit, team_id in enumerate(self.team_ids) if mask >> bit & 1}
+
+    def team_played(self, scoring_period_id: int, team_id: Optional[int]) -> bool:
+        """Играла ли команда в игровой день (вне расписания - True)"""
+        if not self.covers(scoring_period_id) or team_id is None:
+            return True
+        bit = self.team_bits.get(int(team_id))
+        return bit is not None and bool(self.team_masks[scoring_period_id] >> bit & 1)
+
+    def last_game_end(self, scoring_period_id: int) -> Optional[datetime]:
+        """Расчетное время окончания последнего матча дня (UTC) или None"""
+        if not self.covers(scoring_period_id) or not self.last_ends[scoring_period_id]:
+            return None
+        return datetime.fromtimestamp(self.last_ends[scoring_period_id] / 1000, tz=timezone.utc)
+
+    def game_periods(self, scoring_period_ids: Iterable[int]) -> List[int]:
+        """Игровые дни с матчами из переданных"""
+        return [period for period in scoring_period_ids if self.has_games(period)]
+
+    def to_bytes(self, source_mtime: float = 0.0, source_size: int = 0) -> bytes:
+        """Бинарное представление индекса"""
+        size, teams = len(self.team_masks), len(self.team_ids)
+        return b"".join((
+            _HEADER.pack(_MAGIC, _VERSION, source_mtime, source_size, size, teams),
+            struct.pack(f"<{teams}q", *self.team_ids),
+            struct.pack(f"<{size}Q", *self.team_masks),
+            struct.pack(f"<{size}H", *self.game_counts),
+            struct.pack(f"<{size}q", *self.last_ends)
+        ))
+
+    @classmethod
+    def from_bytes(cls, payload: bytes, source_mtime: Optional[float] = None, source_size: Optional[int] = None) -> Optional["ScheduleIndex"]:
+        """
+        Индекс из бинарного представления
+
+        Args:
+            payload: Данные to_bytes
+            source_mtime: Ожидаемый mtime исходного файла (None - не проверять)
+            source_size: Ожидаемый размер исходного файла (None - не проверять)
+
+        Returns:
+            Optional[ScheduleIndex]: Индекс или None, если данные устарели или повреждены
+        """
+        try:
+            magic, version, mtime, file_size, size, teams = _HEADER.unpack_from(payload)
+            if magic != _MAGIC or version != _VERSION:
+                return None
+            if source_mtime is not None and mtime != source_mtime:
+                return None
+            if source_size is not None and file_size != source_size:
+                return None
+            offset = _HEADER.size
+            team_ids = struct.unpack_from(f"<{teams}q", payload, offset)
+            offset += 8 * teams
+            masks = struct.unpack_from(f"<{size}Q", payload, offset)
+            offset += 8 * size
+            counts = struct.unpack_from(f"<{size}H", payload, offset)
+            offset += 2 * size
+            ends = struct.unpack_from(f"<{size}q", payload, offset)
+        except struct.error:
+            return None
+        return cls(list(team_ids), list(masks), list(counts), list(ends))
+
+
+def _load(source: Path, cache_path: Path) -> Optional[ScheduleIndex]:
+    """Загрузка индекса из бинарного кэша или построение из JSON"""
+    stat = source.stat()
+    try:
+        index = ScheduleIndex.from_bytes(cache_path.read_bytes(), stat.st_mtime, stat.st_size)
+        if index is not None:
+            return index
+    except OSError:
+        pass
+
+    try:
+        with source.open('r', encoding='utf-8') as f:
+            index = ScheduleIndex.from_schedule(json.load(f))
+    except (OSError, ValueError, TypeError, AttributeError, KeyError) as e:
+        logger.warning(f"Не удалось прочитать расписание {source}: {e}")
+        return None
+
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(cache_path.suffix + ".tmp")
+        tmp_path.write_bytes(index.to_bytes(stat.st_mtime, stat.st_size))
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Не удалось сохранить индекс расписания {cache_path}: {e}")
+
+    logger.info(f"Построен индекс расписания: {len(index.team_masks)} игровых дней")
+    return index
+
+
+def get_schedule_index(path: Optional[Path] = None, cache_path: Optional[Path] = None) -> Optional[ScheduleIndex]:
+    """
+    Индекс расписания (загружается при первом обращении)
+
+    Индекс строится из TeamShedules.json один раз и сохраняется в бинарном
+    виде; JSON перечитывается только при изменении файла.
+
+    Args:
+        path: Путь к TeamShedules.json
+        cache_path: Путь к бинарному индексу
+
+    Returns:
+        Optional[ScheduleIndex]: Индекс или None, если расписание недоступно
+    """
+    path = Path(path or settings.TEAM_SCHEDULES_FILE)
+    cache_path = Path(cache_path or settings.SCHEDULE_INDEX_FILE)
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+
+    key = (path, cache_path, stat.st_mtime, stat.st_size)
+    with _lock:
+        if _cached["key"] == key:
+            return _cached["index"]
+        index = _load(path, cache_path)
+        _cached.update(key=key, index=index)
+        return index
+
+
+def has_games(scoring_period_id: int) -> bool:
+    """
+    Есть ли матчи в игровой день (без расписания - True)
+
+    Args:
+        scoring_period_id: ID игрового дня
+
+    Returns:
+        bool: False, если по расписанию в этот день матчей нет
+    """
+    index = get_schedule_index()
+    return index is None or index.has_games(scoring_period_id)
+
+
+def filter_playing(players: List[Dict], scoring_period_id: int) -> List[Dict]:
+    """
+    Игроки ответа ESPN, чья команда играла в игровой день
+
+    Args:
+        players: Элементы players ответа ESPN
+        scoring_period_id: ID игрового дня
+
+    Returns:
+        List[Dict]: Игроки сыгравших команд (без расписания - все)
+    """
+    index = get_schedule_index()
+    if index is None or not index.covers(scoring_period_id):
+        return players
+    return [
+        entry for entry in players
+        if index.team_played(scoring_period_id, (entry.get("player") or {}).get("proTeamId"))
+    ]
@@ -0,0 +1,330 @@
+"""
+Колоночное хранилище очков сезона: матрица игроки x игровые дни (NumPy)
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import json
+import logging
+import os
+
+import numpy as np
+
+from ..config import settings
+from .player_stats_store import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+POINTS_FILE = "points.npy"
+POSITIONS_FILE = "positions.npy"
+FILLED_FILE = "filled.npy"
+CUMULATIVE_FILE = "cumulative.npy"
+PLAYERS_FILE = "players.json"
+
+POSITION_IDS = {name: position_id for position_id, name in settings.PLAYER_POSITIONS.items()}
+
+
+def applied_total(player: Dict, period_id: int) -> Optional[float]:
+    """
+    Очки игрока за игровой день из ответа ESPN
+
+    Берется appliedTotal записи статистики с нужным scoringPeriodId,
+    а если такой нет - первая запись с appliedTotal.
+
+    Args:
+        player: Объект player из ответа ESPN
+        period_id: ID игрового дня
+
+    Returns:
+        Optional[float]: Очки или None, если статистики нет
+    """
+    fallback = None
+    for stat in player.get("stats", []):
+        if "appliedTotal" not in stat:
+            continue
+        if stat.get("scoringPeriodId") == period_id:
+            return float(stat["appliedTotal"])
+        if fallback is None:
+            fallback = float(stat["appliedTotal"])
+    return fallback
+
+
+def espn_period_rows(players: Iterable[Dict], period_id: int) -> Iterable[Tuple[str, int, float, Dict]]:
+    """
+    Строки игрового дня для SeasonMatrix.set_period из списка игроков ESPN
+
+    Args:
+        players: Элементы players ответа ESPN ({"player": {...}})
+        period_id: ID игрового дня
+
+    Returns:
+        Iterable: (player_id, defaultPositionId, очки, info)
+    """
+    for player_data in players:
+        player = player_data.get("player", {})
+        position_id = player.get("defaultPositionId")
+        if not player or position_id not in settings.PLAYER_POSITIONS:
+            continue
+        points = applied_total(player, period_id)
+        if points is None:
+            continue
+        info = {
+            "id": str(player.get("id")),
+            "name": player.get("fullName"),
+            "primary_position": position_id,
+            "team_id": str(player.get("proTeamId"))
+        }
+        yield info["id"], position_id, points, info
+
+
+class SeasonMatrix:
+    """
+    Очки всех игроков за все игровые дни сезона
+
+    points - плотная матрица float32 (строка - игрок, столбец - ID игрового
+    дня), positions - defaultPositionId игрока, filled - признак загруженного
+    дня, ids/info - ID игроков в порядке строк и их описания. Команда дня,
+    команда недели и рейтинг за любой диапазон дней считаются суммой
+    столбцов и выбором лучших по позициям (argpartition) без обхода
+    вложенных словарей.
+
+    cumulative - накопленные суммы очков (float64) по игровым дням:
+    cumulative[i, p] = сумма очков игрока i за дни 1..p. Сумма за любой
+    диапазон - одно вычитание на игрока. Накопленные суммы обновляются
+    при записи каждого дня, пересчитывается только хвост от этого дня.
+
+    Матрица сохраняется в .npy и загружается с отображением в память.
+    """
+
+    def __init__(self, periods: int = settings.SEASON_PERIODS, capacity: int = 1024):
+        """
+        Args:
+            periods: Количество игровых дней в сезоне
+            capacity: Начальное количество строк
+        """
+        self.points = np.zeros((capacity, periods + 1), dtype=np.float32)
+        self.positions = np.zeros(capacity, dtype=np.int8)
+        self.filled = np.zeros(periods + 1, dtype=bool)
+        self.cumulative = np.zeros((capacity, periods + 1), dtype=np.float64)
+        self.ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.info: Dict[str, Dict] = {}
+
+    @property
+    def size(self) -> int:
+        """Количество игроков"""
+        return len(self.ids)
+
+    @property
+    def periods(self) -> int:
+        """Последний ID игрового дня, помещающийся в матрицу"""
+        return self.points.shape[1] - 1
+
+    def has_period(self, period_id: int) -> bool:
+        """Загружен ли игровой день"""
+        return 0 <= period_id <= self.periods and bool(self.filled[period_id])
+
+    def _reserve(self, rows: int, period_id: int) -> None:
+        """Расширение матрицы под rows строк и игровой день period_id"""
+        capacity, columns = self.points.shape
+        if rows <= capacity and period_id < columns:
+            return
+        new_capacity = max(capacity, 1)
+        while new_capacity < rows:
+            new_capacity *= 2
+        new_columns = max(columns, period_id + 1)
+
+        points = np.zeros((new_capacity, new_columns), dtype=np.float32)
+        points[:capacity, :columns] = self.points
+        positions = np.zeros(new_capacity, dtype=np.int8)
+        positions[:capacity] = self.positions
+        filled = np.zeros(new_columns, dtype=bool)
+        filled[:columns] = self.filled
+        cumulative = np.zeros((new_capacity, new_columns), dtype=np.float64)
+        cumulative[:capacity, :columns] = self.cumulative
+        # Новые дни продолжают накопленную сумму последнего дня
+        cumulative[:capacity, columns:] = self.cumulative[:, columns - 1:columns]
+        self.points, self.positions, self.filled, self.cumulative = points, positions, filled, cumulative
+
+    def _row(self, player_id: str, position_id: int, info: Optional[Dict]) -> int:
+        """Строка игрока (добавляется при первом появлении)"""
+        row = self.index.get(player_id)
+        if row is None:
+            row = self.index[player_id] = len(self.ids)
+            self.ids.append(player_id)
+            self._reserve(row + 1, 0)
+        self.positions[row] = position_id
+        if info:
+            self.info[player_id] = info
+        return row
+
+    def set_period(self, period_id: int, rows: Iterable[Tuple[str, int, float, Optional[Dict]]]) -> None:
+        """
+        Запись (или перезапись) очков за игровой день
+
+        Args:
+            period_id: ID игрового дня
+            rows: (player_id, defaultPositionId, очки, info)
+        """
+        self._reserve(self.size, period_id)
+        self._writable()
+        previous = self.points[:, period_id].astype(np.float64)
+        self.points[:, period_id] = 0
+        for player_id, position_id, points, info in rows:
+            row = self._row(str(player_id), position_id, info)
+            self.points[row, period_id] = points
+        self.filled[period_id] = True
+
+        # Массивы могли расшириться при добавлении игроков
+        delta = self.points[:, period_id].astype(np.float64)
+        delta[:len(previous)] -= previous
+        changed = np.flatnonzero(delta)
+        if len(changed):
+            self.cumulative[changed, period_id:] += delta[changed, None]
+
+    def _writable(self) -> None:
+        """Копия массивов в памяти, если матрица загружена только для чтения"""
+        if not self.points.flags.writeable:
+            self.points = np.array(self.points)
+            self.positions = np.array(self.positions)
+            self.filled = np.array(self.filled)
+            self.cumulative = np.array(self.cumulative)
+
+    def range_totals(self, start_period: int, end_period: int) -> np.ndarray:
+        """
+        Сумма очков каждого игрока за игровые дни start_period..end_period
+
+        Считается по накопленным суммам: одно вычитание на игрока
+        независимо от длины диапазона.
+
+        Returns:
+            np.ndarray: Вектор длиной size
+        """
+        start = max(start_period, 1)
+        end = min(end_period, self.periods)
+        if end < start:
+            return np.zeros(self.size, dtype=np.float64)
+        return self.cumulative[:self.size, end] - self.cumulative[:self.size, start - 1]
+
+    def top_by_position(
+        self,
+        totals: np.ndarray,
+        composition: Dict[str, int] = settings.TEAM_OF_DAY_COMPOSITION
+    ) -> Dict[str, List[Tuple[str, float]]]:
+        """
+        Лучшие игроки каждой позиции по вектору очков
+
+        Игроки без положительных очков не выбираются. При равенстве очков
+        выше игрок, добавленный в матрицу раньше.
+
+        Args:
+            totals: Очки игроков (например, из range_totals)
+            composition: Количество игроков на позицию
+
+        Returns:
+            Dict[str, List[Tuple[str, float]]]: {позиция: [(player_id, очки)]}
+        """
+        positions = self.positions[:self.size]
+        team = {}
+        for position, count in composition.items():
+            rows = np.flatnonzero((positions == POSITION_IDS[position]) & (totals > 0))
+            if len(rows) > count:
+                rows = rows[np.argpartition(-totals[rows], count - 1)[:count]]
+                # argpartition не гарантирует выбор раннего игрока при равенстве на границе
+                boundary = totals[rows].min()
+                rows = np.union1d(rows, np.flatnonzero(
+                    (positions == POSITION_IDS[position]) & (totals == boundary)
+                ))
+            rows = rows[np.lexsort((rows, -totals[rows]))][:count]
+            team[position] = [(self.ids[row], float(totals[row])) for row in rows]
+        return team
+
+    def team_of_period(
+        self,
+        start_period: int,
+        end_period: int,
+        composition: Dict[str, int] = settings.TEAM_OF_DAY_COMPOSITION
+    ) -> Dict[str, List[Tuple[str, float]]]:
+        """Команда за диапазон игровых дней (для одного дня start_period == end_period)"""
+        return self.top_by_position(self.range_totals(start_period, end_period), composition)
+
+    def team_slots(self, team: Dict[str, List[Tuple[str, float]]]) -> Dict[str, Dict]:
+        """
+        Команда в формате send_daily_teams: {"C": {...}, "D1": {...}, "D2": {...}, ...}
+
+        Args:
+            team: Результат top_by_position / team_of_period
+
+        Returns:
+            Dict[str, Dict]: {слот: {"info": ..., "stats": {"total_points": ...}}}
+        """
+        slots = {}
+        for position, players in team.items():
+            for number, (player_id, points) in enumerate(players, start=1):
+                slot = position if len(players) == 1 else f"{position}{number}"
+                slots[slot] = {
+                    "info": self.info.get(player_id, {"id": player_id}),
+                    "stats": {"total_points": round(points, 2)}
+                }
+        return slots
+
+    def save(self, directory: Path = settings.SEASON_MATRIX_DIR) -> None:
+        """
+        Сохранение матрицы в .npy (каждый файл записывается атомарно)
+
+        Args:
+            directory: Директория матрицы
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name, array in (
+            (POINTS_FILE, self.points[:self.size]),
+            (POSITIONS_FILE, self.positions[:self.size]),
+            (FILLED_FILE, self.filled),
+            (CUMULATIVE_FILE, self.cumulative[:self.size]),
+        ):
+            tmp_path = directory / f".{name}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, np.ascontiguousarray(array))
+            os.replace(tmp_path, directory / name)
+        atomic_write_json(directory / PLAYERS_FILE, {"ids": self.ids, "info": self.info}, indent=None)
+        logger.debug(f"Матрица сезона сохранена: {self.size} игроков, {int(self.filled.sum())} дней")
+
+    @classmethod
+    def load(cls, directory: Path = settings.SEASON_MATRIX_DIR, mmap_mode: Optional[str] = "r") -> "SeasonMatrix":
+        """
+        Загрузка матрицы; при отсутствии файлов возвращается пустая матрица
+
+        Args:
+            directory: Директория матрицы
+            mmap_mode: Режим отображения в память для np.load (None - чтение целиком).
+                При записи в матрицу, открытую только для чтения, создается копия в памяти.
+
+        Returns:
+            SeasonMatrix: Матрица
+        """
+        directory = Path(directory)
+        matrix = cls()
+        try:
+            with open(directory / PLAYERS_FILE, "r", encoding="utf-8") as f:
+                players = json.load(f)
+            points = np.load(directory / POINTS_FILE, mmap_mode=mmap_mode)
+            positions = np.load(directory / POSITIONS_FILE, mmap_mode=mmap_mode)
+            filled = np.load(directory / FILLED_FILE, mmap_mode=mmap_mode)
+        except FileNotFoundError:
+            return matrix
+        except (OSError, ValueError) as e:
+            logger.warning(f"Матрица сезона повреждена, начинаем заново: {e}")
+            return matrix
+
+        try:
+            cumulative = np.load(directory / CUMULATIVE_FILE, mmap_mode=mmap_mode)
+        except FileNotFoundError:
+            cumulative = np.cumsum(points, axis=1, dtype=np.float64)
+
+        matrix.points, matrix.positions, matrix.filled = points, positions, filled
+        matrix.cumulative = cumulative
+        matrix.ids = list(players["ids"])
+        matrix.index = {player_id: row for row, player_id in enumerate(matrix.ids)}
+        matrix.info = players.get("info", {})
+        return matrix
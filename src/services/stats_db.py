@@ -0,0 +1,511 @@
+"""
+Хранилище статистики игроков в SQLite (WAL) с индексами по игроку, дате и неделе
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+import atexit
+import json
+import logging
+import sqlite3
+import threading
+
+from ..config import settings
+from .player_stats_store import ESPN_TIMEZONE, PlayerStatsStore, calculate_grade, get_week_key
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    player_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL
+);
+
+-- Очки игрока за день (daily_stats из player_stats.json)
+CREATE TABLE IF NOT EXISTS daily_points (
+    player_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    week_key TEXT NOT NULL,
+    position TEXT NOT NULL,
+    points REAL NOT NULL,
+    team_of_the_day INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (player_id, date)
+);
+CREATE INDEX IF NOT EXISTS idx_daily_points_date ON daily_points (date);
+CREATE INDEX IF NOT EXISTS idx_daily_points_week ON daily_points (week_key, player_id);
+
+-- Попадания в команду дня (team_of_the_day_dates)
+CREATE TABLE IF NOT EXISTS appearances (
+    player_id TEXT NOT NULL,
+    date TEXT NOT NULL,
+    position TEXT NOT NULL,
+    week_key TEXT NOT NULL,
+    PRIMARY KEY (player_id, date, position)
+);
+CREATE INDEX IF NOT EXISTS idx_appearances_date ON appearances (date);
+CREATE INDEX IF NOT EXISTS idx_appearances_week ON appearances (week_key, player_id);
+
+-- Команды недели (weekly_team_stats.json)
+CREATE TABLE IF NOT EXISTS weekly_teams (
+    week_key TEXT NOT NULL,
+    position TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    player_id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (week_key, position, rank)
+);
+CREATE INDEX IF NOT EXISTS idx_weekly_teams_player ON weekly_teams (player_id);
+
+-- Команды дня StatsService и send_daily_teams (source = stats / history)
+CREATE TABLE IF NOT EXISTS daily_teams (
+    source TEXT NOT NULL,
+    date TEXT NOT NULL,
+    slot TEXT NOT NULL,
+    player_id TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (source, date, slot)
+);
+CREATE INDEX IF NOT EXISTS idx_daily_teams_player ON daily_teams (source, player_id);
+
+CREATE TABLE IF NOT EXISTS team_players (
+    source TEXT NOT NULL,
+    player_id TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (source, player_id)
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class StatsDB:
+    """Доступ к базе статистики"""
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Args:
+            path: Путь к файлу базы (по умолчанию settings.STATS_DB_FILE)
+        """
+        self.path = Path(path or settings.STATS_DB_FILE)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Транзакция: фиксация при успехе, откат при ошибке"""
+        with self._lock:
+            try:
+                yield self.conn
+                self.conn.commit()
+            except BaseException:
+                self.conn.rollback()
+                raise
+
+    def commit(self) -> None:
+        with self._lock:
+            self.conn.commit()
+
+    # --- Служебные значения ---
+
+    def get_meta(self, key: str, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row["value"]) if row else default
+
+    def set_meta(self, key: str, value) -> None:
+        self.conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, json.dumps(value, ensure_ascii=False))
+        )
+
+    # --- Недельная статистика игроков (app_day / app_week) ---
+
+    def upsert_player(self, player_id: str, name: str) -> None:
+        self.conn.execute(
+            "INSERT INTO players (player_id, name) VALUES (?, ?) "
+            "ON CONFLICT(player_id) DO UPDATE SET name = excluded.name",
+            (str(player_id), name)
+        )
+
+    def has_daily_points(self, player_id: str, date_str: str) -> bool:
+        row = self.conn.execute(
+            "SELECT 1 FROM daily_points WHERE player_id = ? AND date = ?",
+            (str(player_id), date_str)
+        ).fetchone()
+        return row is not None
+
+    def add_daily_points(
+        self,
+        player_id: str,
+        date_str: str,
+        week_key: str,
+        position: str,
+        points: float,
+        team_of_the_day: bool
+    ) -> None:
+        self.conn.execute(
+            "INSERT OR IGNORE INTO daily_points "
+            "(player_id, date, week_key, position, points, team_of_the_day) VALUES (?, ?, ?, ?, ?, ?)",
+            (str(player_id), date_str, week_key, position, points, int(bool(team_of_the_day)))
+        )
+
+    def add_appearance(self, player_id: str, date_str: str, position: str, week_key: str) -> None:
+        self.conn.execute(
+            "INSERT OR IGNORE INTO appearances (player_id, date, position, week_key) VALUES (?, ?, ?, ?)",
+            (str(player_id), date_str, position, week_key)
+        )
+
+    def count_appearances(self, week_key: str, player_id: str) -> int:
+        row = self.conn.execute(
+            "SELECT COUNT(*) AS n FROM appearances WHERE week_key = ? AND player_id = ?",
+            (week_key, str(player_id))
+        ).fetchone()
+        return row["n"]
+
+    def get_week_players(self, week_key: str) -> Dict:
+        """
+        Записи игроков за неделю в формате player_stats.json
+
+        Args:
+            week_key: Ключ недели YYYY-MM-DD_YYYY-MM-DD
+
+        Returns:
+            Dict: {player_id: запись игрока}
+        """
+        players: Dict[str, Dict] = {}
+        rows = self.conn.execute(
+            "SELECT d.player_id, d.date, d.position, d.points, d.team_of_the_day, p.name "
+            "FROM daily_points d JOIN players p ON p.player_id = d.player_id "
+            "WHERE d.week_key = ? ORDER BY d.date, d.rowid",
+            (week_key,)
+        )
+        for row in rows:
+            stats = players.get(row["player_id"])
+            if stats is None:
+                stats = players[row["player_id"]] = {
+                    "name": row["name"],
+                    "team_of_the_day_count": 0,
+                    "grade": "common",
+                    "team_of_the_day_dates": [],
+                    "positions": [],
+                    "daily_stats": {},
+                    "total_points": 0,
+                    "position_appearances": {}
+                }
+            position = row["position"]
+            if position not in stats["positions"]:
+                stats["positions"].append(position)
+            stats["position_appearances"][position] = stats["position_appearances"].get(position, 0) + 1
+            stats["daily_stats"][row["date"]] = {
+                "points": row["points"],
+                "position": position,
+                "team_of_the_day": bool(row["team_of_the_day"])
+            }
+            stats["total_points"] += row["points"]
+
+        rows = self.conn.execute(
+            "SELECT player_id, date, position FROM appearances WHERE week_key = ? ORDER BY date, rowid",
+            (week_key,)
+        )
+        for row in rows:
+            stats = players.get(row["player_id"])
+            if stats is None:
+                continue
+            stats["team_of_the_day_dates"].append(f"{row['position']}:{row['date']}")
+
+        for stats in players.values():
+            stats["team_of_the_day_count"] = len(stats["team_of_the_day_dates"])
+            stats["grade"] = calculate_grade(stats["team_of_the_day_count"])
+        return players
+
+    def export_player_stats(self) -> Dict:
+        """
+        Вся недельная статистика в формате player_stats.json
+
+        Returns:
+            Dict: {"current_week": ..., "weeks": {week_key: {"players": ...}}}
+        """
+        week_keys = [
+            row["week_key"]
+            for row in self.conn.execute("SELECT DISTINCT week_key FROM daily_points ORDER BY week_key")
+        ]
+        return {
+            "current_week": self.get_meta("current_week", {}),
+            "weeks": {week_key: {"players": self.get_week_players(week_key)} for week_key in week_keys}
+        }
+
+    def import_player_stats(self, data: Dict) -> int:
+        """
+        Импорт player_stats.json
+
+        Args:
+            data: Содержимое файла
+
+        Returns:
+            int: Количество импортированных дневных записей
+        """
+        count = 0
+        with self.transaction():
+            if data.get("current_week"):
+                self.set_meta("current_week", data["current_week"])
+            for week_key, week in data.get("weeks", {}).items():
+                for player_id, stats in week.get("players", {}).items():
+                    self.upsert_player(player_id, stats.get("name", "Unknown"))
+                    for date_str, day in stats.get("daily_stats", {}).items():
+                        self.add_daily_points(
+                            player_id, date_str, week_key,
+                            day.get("position", ""), day.get("points", 0), day.get("team_of_the_day", False)
+                        )
+                        count += 1
+                    for entry in stats.get("team_of_the_day_dates", []):
+                        position, _, date_str = entry.partition(":")
+                        self.add_appearance(player_id, date_str, position, week_key)
+        return count
+
+    # --- Диапазонные запросы ---
+
+    def player_points(self, player_id: str, start_date: str, end_date: str) -> float:
+        """Сумма очков игрока за диапазон дат (включительно)"""
+        row = self.conn.execute(
+            "SELECT COALESCE(SUM(points), 0) AS total FROM daily_points "
+            "WHERE player_id = ? AND date BETWEEN ? AND ?",
+            (str(player_id), start_date, end_date)
+        ).fetchone()
+        return row["total"]
+
+    def leaderboard(self, start_date: str, end_date: str, limit: int = 10) -> List[Dict]:
+        """
+        Лучшие игроки по сумме очков за диапазон дат
+
+        Returns:
+            List[Dict]: [{"player_id", "name", "points", "appearances"}]
+        """
+        rows = self.conn.execute(
+            "SELECT d.player_id, p.name, SUM(d.points) AS points, "
+            "(SELECT COUNT(*) FROM appearances a WHERE a.player_id = d.player_id "
+            " AND a.date BETWEEN ? AND ?) AS appearances "
+            "FROM daily_points d JOIN players p ON p.player_id = d.player_id "
+            "WHERE d.date BETWEEN ? AND ? "
+            "GROUP BY d.player_id ORDER BY points DESC, d.player_id LIMIT ?",
+            (start_date, end_date, start_date, end_date, limit)
+        )
+        return [dict(row) for row in rows]
+
+    # --- Команды недели ---
+
+    def save_weekly_team(self, week_key: str, team: Dict[str, List[Dict]]) -> None:
+        """Сохранение команды недели (заменяет прежнюю)"""
+        self.conn.execute("DELETE FROM weekly_teams WHERE week_key = ?", (week_key,))
+        for position, players in team.items():
+            for rank, player in enumerate(players):
+                self.conn.execute(
+                    "INSERT INTO weekly_teams (week_key, position, rank, player_id, data) VALUES (?, ?, ?, ?, ?)",
+                    (week_key, position, rank, str(player.get("id")), json.dumps(player, ensure_ascii=False))
+                )
+
+    def get_weekly_team(self, week_key: str) -> Optional[Dict[str, List[Dict]]]:
+        """Команда недели или None"""
+        team: Dict[str, List[Dict]] = {}
+        rows = self.conn.execute(
+            "SELECT position, data FROM weekly_teams WHERE week_key = ? ORDER BY rowid",
+            (week_key,)
+        )
+        for row in rows:
+            team.setdefault(row["position"], []).append(json.loads(row["data"]))
+        return team or None
+
+    def load_weekly_stats(self) -> Dict:
+        """Команды недели в формате weekly_team_stats.json"""
+        stats = self.get_meta("weekly_stats", {})
+        stats["weeks"] = {}
+        for row in self.conn.execute("SELECT DISTINCT week_key FROM weekly_teams ORDER BY week_key"):
+            stats["weeks"][row["week_key"]] = self.get_weekly_team(row["week_key"])
+        return stats
+
+    def save_weekly_stats(self, stats: Dict) -> None:
+        """Сохранение weekly_team_stats.json (только изменившиеся недели перезаписываются)"""
+        with self.transaction():
+            self.set_meta("weekly_stats", {key: value for key, value in stats.items() if key != "weeks"})
+            for week_key, team in stats.get("weeks", {}).items():
+                if self.get_weekly_team(week_key) != team:
+                    self.save_weekly_team(week_key, team)
+
+    # --- Команды дня StatsService / send_daily_teams ---
+
+    def load_daily_teams(self, source: str, days_key: str = "days") -> Dict:
+        """
+        Команды дня и сводка по игрокам
+
+        Args:
+            source: Источник (stats - StatsService, history - send_daily_teams)
+            days_key: Ключ раздела команд в исходном JSON (days или teams)
+
+        Returns:
+            Dict: {days_key: {дата: команда}, "players": {...}}
+        """
+        days: Dict[str, Dict] = {}
+        for row in self.conn.execute(
+            "SELECT date, slot, data FROM daily_teams WHERE source = ? ORDER BY date, rowid",
+            (source,)
+        ):
+            days.setdefault(row["date"], {})[row["slot"]] = json.loads(row["data"])
+        players = {
+            row["player_id"]: json.loads(row["data"])
+            for row in self.conn.execute(
+                "SELECT player_id, data FROM team_players WHERE source = ? ORDER BY rowid", (source,)
+            )
+        }
+        return {days_key: days, "players": players}
+
+    def save_daily_teams(self, stats: Dict, source: str, days_key: str = "days") -> None:
+        """Сохранение команд дня и сводки по игрокам"""
+        with self.transaction():
+            for date_str, team in stats.get(days_key, {}).items():
+                for slot, player in team.items():
+                    info = player.get("info", player) if isinstance(player, dict) else {}
+                    self.conn.execute(
+                        "INSERT INTO daily_teams (source, date, slot, player_id, data) VALUES (?, ?, ?, ?, ?) "
+                        "ON CONFLICT(source, date, slot) DO UPDATE SET "
+                        "player_id = excluded.player_id, data = excluded.data",
+                        (source, date_str, slot, str(info.get("id")), json.dumps(player, ensure_ascii=False))
+                    )
+            for player_id, data in stats.get("players", {}).items():
+                self.conn.execute(
+                    "INSERT INTO team_players (source, player_id, data) VALUES (?, ?, ?) "
+                    "ON CONFLICT(source, player_id) DO UPDATE SET data = excluded.data",
+                    (source, str(player_id), json.dumps(data, ensure_ascii=False))
+                )
+
+
+class SqlitePlayerStatsStore:
+    """
+    Недельная статистика игроков в SQLite с интерфейсом PlayerStatsStore
+
+    Изменения копятся в транзакции и фиксируются в flush().
+    """
+
+    def __init__(self, db: Optional[StatsDB] = None):
+        self.db = db or get_stats_db()
+
+    def load(self) -> "SqlitePlayerStatsStore":
+        return self
+
+    def get_week_players(self, week_key: str) -> Dict:
+        return self.db.get_week_players(week_key)
+
+    def get_grade(self, week_key: str, player_id: str) -> str:
+        return calculate_grade(self.db.count_appearances(week_key, player_id))
+
+    def get_current_week(self) -> Dict:
+        return self.db.get_meta("current_week", {}) or {}
+
+    def begin_week(self, start_date: datetime, end_date: datetime) -> bool:
+        """Те же правила, что и PlayerStatsStore.begin_week (недели в базе создаются записями)"""
+        if self.get_current_week().get("start_date") == start_date.strftime("%Y-%m-%d"):
+            return False
+        self.set_current_week(start_date, end_date)
+        return True
+
+    def ensure_week(self, week_key: str) -> Dict:
+        return self.db.get_week_players(week_key)
+
+    def set_current_week(self, start_date: datetime, end_date: datetime) -> None:
+        self.db.set_meta("current_week", {
+            "start_date": start_date.strftime("%Y-%m-%d"),
+            "end_date": end_date.strftime("%Y-%m-%d")
+        })
+
+    def record_selection(
+        self,
+        player_id: str,
+        name: str,
+        date_str: str,
+        applied_total: float,
+        position: str,
+        team_of_the_day: bool = False
+    ) -> str:
+        """Те же правила, что и PlayerStatsStore.record_selection"""
+        date = datetime.strptime(date_str, "%Y-%m-%d").replace(tzinfo=ESPN_TIMEZONE)
+        week_key = get_week_key(date)
+        player_id = str(player_id)
+
+        with self.db._lock:
+            self.db.upsert_player(player_id, name)
+            if self.db.has_daily_points(player_id, date_str):
+                logger.info(f"Статистика {name} за {date_str} уже существует, пропускаем обновление")
+                return calculate_grade(self.db.count_appearances(week_key, player_id))
+
+            self.db.add_daily_points(player_id, date_str, week_key, position, applied_total, team_of_the_day)
+            if team_of_the_day:
+                self.db.add_appearance(player_id, date_str, position, week_key)
+
+            current_date = datetime.now(ESPN_TIMEZONE)
+            current_week_start = current_date - timedelta(days=(current_date.weekday() - 1) % 7)
+            self.set_current_week(current_week_start, current_week_start + timedelta(days=6))
+
+            return calculate_grade(self.db.count_appearances(week_key, player_id))
+
+    def flush(self) -> bool:
+        self.db.commit()
+        return True
+
+
+_db_lock = threading.Lock()
+_db: Optional[StatsDB] = None
+
+
+def get_stats_db() -> StatsDB:
+    """
+    Общее соединение с базой статистики процесса
+
+    Соединение открывается при первом обращении и закрывается при выходе,
+    чтобы загрузка и сохранение не открывали базу на каждый вызов.
+    """
+    global _db
+    with _db_lock:
+        if _db is None:
+            _db = StatsDB()
+        return _db
+
+
+def close_stats_db() -> None:
+    """Закрытие общего соединения"""
+    global _db
+    with _db_lock:
+        if _db is not None:
+            _db.close()
+            _db = None
+
+
+atexit.register(close_stats_db)
+
+
+def open_player_stats_store(json_path: str, backend: Optional[str] = None):
+    """
+    Хранилище недельной статистики для app_day согласно STATS_BACKEND
+
+    Args:
+        json_path: Путь к player_stats.json (для backend=json)
+        backend: json или sqlite (по умолчанию settings.STATS_BACKEND)
+
+    Returns:
+        PlayerStatsStore или SqlitePlayerStatsStore
+    """
+    backend = backend or settings.STATS_BACKEND
+    if backend == "sqlite":
+        return SqlitePlayerStatsStore()
+    return PlayerStatsStore(json_path).load()
@@ -2,14 +2,18 @@ from typing import Dict, Optional, List
 from datetime import datetime, timedelta
 import logging
 import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 from ..config import settings
 from ..config.settings import PLAYER_POSITIONS
 import json
 from .cache_service import CacheService
+from .game_state import is_period_final
+from .http_client import HostSession, get_http_client
+from .player_projection import read_players
+from .response_archive import get_archive
+from .schedule_index import has_games
+from .stats_db import get_stats_db
+from ..utils.player_record import PlayerDay
 import pytz
-from collections import defaultdict
 
 logger = logging.getLogger(__name__)
 
@@ -19,21 +23,9 @@ class StatsService:
         self.base_url = settings.ESPN_API['BASE_URL']
         self.cache = CacheService()
         
-    def _create_session(self) -> requests.Session:
-        """Создает сессию с настроенным механизмом повторных попыток"""
-        session = requests.Session()
-        
-        retry_strategy = Retry(
-            total=settings.MAX_RETRIES,
-            backoff_factor=settings.RETRY_DELAY,
-            status_forcelist=[429, 500, 502, 503, 504]
-        )
-        
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        session.mount("https://", adapter)
-        session.mount("http://", adapter)
-        
-        return session
+    def _create_session(self) -> HostSession:
+        """Возвращает общий пул соединений к API ESPN"""
+        return get_http_client().session_for(settings.ESPN_API['BASE_URL'])
     
     def _get_auth_headers(self, scoring_period_id: Optional[int] = None) -> Dict:
         """Формирует заголовки для авторизации"""
@@ -64,15 +56,16 @@ class StatsService:
             date: Дата для получения статистики
             
         Returns:
-            Dict со статистикой или None в случае ошибки
+            Dict со статистикой ({"date", "players": [PlayerDay]}) или None в случае ошибки
         """
         try:
             # Проверяем кэш
             cache_key = f"stats_{date.strftime('%Y-%m-%d')}"
-            cached_data = self.cache.get_cached_data(cache_key)
+            # Завершенные дни хранятся бессрочно, текущий день - короткое время
+            cached_data = self.cache.get_cached_data(cache_key, max_age=settings.CACHE_TTL_CURRENT)
             if cached_data:
                 logger.info(f"Использованы кэшированные данные за {date.date()}")
-                return cached_data
+                return self._from_cache(cached_data)
             
             # Получаем scoring_period_id
             scoring_period_id = self._get_scoring_period_id(date)
@@ -81,6 +74,10 @@ class StatsService:
                 return None
                 
             logger.info(f"Получен scoring_period_id {scoring_period_id} для даты {date.date()}")
+
+            if not has_games(scoring_period_id):
+                logger.info(f"Пропуск {date.date()}: по расписанию матчей нет")
+                return None
             
             # Делаем запрос к API
             headers = self._get_auth_headers(scoring_period_id)
@@ -93,16 +90,15 @@ class StatsService:
             logger.info(f"Заголовки запроса: {headers}")
             logger.info(f"Параметры запроса: {params}")
             
-            response = self.session.get(
-                self.base_url,
-                headers=headers,
-                params=params,
-                timeout=settings.REQUEST_TIMEOUT
+            data = get_archive().fetch(
+                settings.ESPN_API['league_id'],
+                settings.ESPN_API['season_id'],
+                scoring_period_id,
+                {"params": params, "filter": json.loads(headers["x-fantasy-filter"])},
+                lambda: self._request_json(headers, params)
             )
-            response.raise_for_status()
-            data = response.json()
             
-            logger.info(f"Получен ответ от API: {data}")
+            logger.info(f"Получен ответ от API: {len(data.get('players', [])) if isinstance(data, dict) else 0} игроков")
             
             # Проверяем данные
             if not self._validate_response(data):
@@ -114,8 +110,9 @@ class StatsService:
             
             # Сохраняем в кэш
             if processed_data and processed_data["players"]:
-                self.cache.cache_data(cache_key, processed_data)
-                logger.info(f"Данные за {date.date()} сохранены в кэш")
+                final = is_period_final(scoring_period_id)
+                self.cache.cache_data(cache_key, self._to_cache(processed_data), final=final)
+                logger.info(f"Данные за {date.date()} сохранены в кэш (день завершен: {final})")
             
             return processed_data
             
@@ -129,8 +126,39 @@ class StatsService:
             logger.error(f"Неожиданная ошибка: {e}")
             return None
     
+    def _request_json(self, headers: Dict, params: Dict) -> Dict:
+        """Выполняет запрос к API и возвращает JSON ответа"""
+        response = self.session.get(
+            self.base_url,
+            headers=headers,
+            params=params,
+            timeout=settings.REQUEST_TIMEOUT,
+            stream=True
+        )
+        response.raise_for_status()
+        return read_players(response)
+    
+    @staticmethod
+    def _to_cache(processed_data: Dict) -> Dict:
+        """Статистика дня в формате JSON для кэша"""
+        return {
+            "date": processed_data["date"],
+            "players": [
+                player.to_dict() if isinstance(player, PlayerDay) else player
+                for player in processed_data["players"]
+            ]
+        }
+
+    @staticmethod
+    def _from_cache(cached_data: Dict) -> Dict:
+        """Статистика дня из кэша: игроки прежнего формата преобразуются в PlayerDay"""
+        players = cached_data.get("players")
+        if not isinstance(players, list) or not all(isinstance(player, dict) and "info" in player for player in players):
+            return cached_data
+        return {**cached_data, "players": [PlayerDay.from_dict(player) for player in players]}
+
     def _process_daily_stats(self, data: Dict, date: datetime) -> Dict:
-        """Обрабатывает статистику за день"""
+        """Обрабатывает статистику за день: игроки с очками в виде записей PlayerDay"""
         processed_data = {
             "date": date.strftime("%Y-%m-%d"),
             "players": []
@@ -151,18 +179,12 @@ class StatsService:
                     logger.warning(f"Пропущен игрок: неизвестная позиция {position_id}")
                     continue
                     
-                # Базовая информация об игроке
-                player_info = {
-                    "id": str(player.get("id")),
-                    "name": player.get("fullName"),
-                    "primary_position": position_id,
-                    "team_id": str(player.get("proTeamId"))
-                }
-                
                 # Проверяем обязательные поля
-                if not all(player_info.values()):
-                    logger.warning(f"Пропущен игрок из-за отсутствия обязательных полей: {player_info}")
+                required = {field: player.get(field) for field in ("id", "fullName", "proTeamId")}
+                if not all(required.values()):
+                    logger.warning(f"Пропущен игрок из-за отсутствия обязательных полей: {required}")
                     continue
+                name = player["fullName"]
                 
                 # Получаем очки
                 total_points = 0
@@ -174,20 +196,15 @@ class StatsService:
                         break
                 
                 if not stats_found:
-                    logger.warning(f"Пропущен игрок {player_info['name']}: нет данных о статистике")
+                    logger.warning(f"Пропущен игрок {name}: нет данных о статистике")
                     continue
                 
                 # Добавляем игрока только если у него есть очки
                 if total_points > 0:
-                    processed_data["players"].append({
-                        "info": player_info,
-                        "stats": {
-                            "total_points": total_points
-                        }
-                    })
-                    logger.info(f"Добавлен игрок {player_info['name']} ({settings.PLAYER_POSITIONS[position_id]}) с {total_points} очками")
+                    processed_data["players"].append(PlayerDay.from_espn(player, total_points))
+                    logger.debug(f"Добавлен игрок {name} ({settings.PLAYER_POSITIONS[position_id]}) с {total_points} очками")
                 else:
-                    logger.debug(f"Пропущен игрок {player_info['name']}: нет очков")
+                    logger.debug(f"Пропущен игрок {name}: нет очков")
                 
             except Exception as e:
                 logger.error(f"Ошибка при обработке данных игрока: {str(e)}")
@@ -289,6 +306,9 @@ class StatsService:
             Dict со статистикой или None в случае ошибки
         """
         try:
+            if settings.STATS_BACKEND == 'sqlite':
+                return get_stats_db().load_daily_teams('stats')
+
             stats_file = settings.STATS_FILE
             if not stats_file.exists():
                 logger.error(f"Файл статистики не найден: {stats_file}")
@@ -317,6 +337,11 @@ class StatsService:
             bool: True если сохранение успешно, False в случае ошибки
         """
         try:
+            if settings.STATS_BACKEND == 'sqlite':
+                get_stats_db().save_daily_teams(stats, 'stats')
+                logger.info("Статистика успешно сохранена")
+                return True
+
             stats_file = settings.STATS_FILE
             
             # Создаем директорию, если её нет
@@ -350,34 +375,31 @@ class StatsService:
             if start_date.replace(tzinfo=None) < season_start:
                 start_date = season_start
                 
-            # Собираем статистику за каждый день недели
-            weekly_players = defaultdict(lambda: {
-                "info": None,
-                "stats": {
-                    "total_points": 0
-                }
-            })
+            # Собираем статистику за каждый день недели: {player_id: PlayerDay с суммой очков}
+            weekly_players: Dict[str, PlayerDay] = {}
             
             current_date = start_date
             while current_date <= end_date:
                 daily_stats = self.get_daily_stats(current_date)
                 if daily_stats and "players" in daily_stats:
                     for player in daily_stats["players"]:
-                        player_id = player["info"]["id"]
-                        if not weekly_players[player_id]["info"]:
-                            weekly_players[player_id]["info"] = player["info"]
-                        weekly_players[player_id]["stats"]["total_points"] += player["stats"]["total_points"]
+                        total = weekly_players.get(player.id)
+                        if total is None:
+                            weekly_players[player.id] = player.copy()
+                        else:
+                            total.points += player.points
                 current_date += timedelta(days=1)
+            
+            self.cache.flush()
+            cache_stats = self.cache.stats()
+            logger.info(
+                f"Кэш статистики: попаданий {cache_stats['hits']} "
+                f"(завершенные дни: {cache_stats['final_hits']}), промахов {cache_stats['misses']}, "
+                f"прочитано {cache_stats['bytes_read']} Б, записано {cache_stats['bytes_written']} Б"
+            )
                 
             # Преобразуем в список игроков
-            players = [
-                {
-                    "info": data["info"],
-                    "stats": data["stats"]
-                }
-                for player_id, data in weekly_players.items()
-                if data["info"] is not None and data["stats"]["total_points"] > 0
-            ]
+            players = [player for player in weekly_players.values() if player.points > 0]
             
             if not players:
                 logger.error(f"Нет данных за период с {start_date.date()} по {end_date.date()}")
@@ -461,7 +483,7 @@ class StatsService:
                 daily_stats = self.get_daily_stats(current_date)
                 if daily_stats and daily_stats["players"]:
                     date_str = current_date.strftime("%Y-%m-%d")
-                    stats["days"][date_str] = daily_stats
+                    stats["days"][date_str] = self._to_cache(daily_stats)
                     stats["total_days"] += 1
                     logger.info(f"Получена статистика за {date_str}, игроков: {len(daily_stats['players'])}")
                 else:
@@ -469,6 +491,7 @@ class StatsService:
                 
                 current_date += timedelta(days=1)
             
+            self.cache.flush()
             logger.info(f"Сбор статистики завершен. Обработано дней: {stats['total_days']}")
             return stats
             
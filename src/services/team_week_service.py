@@ -3,8 +3,8 @@ from datetime import datetime
 import logging
 from .stats_service import StatsService
 from .image_service import ImageService
-from ..config import settings
-from collections import defaultdict
+from ..utils.player_record import PlayerDay
+from ..utils.team_utils import select_top_by_position, team_slots
 
 logger = logging.getLogger(__name__)
 
@@ -31,68 +31,41 @@ class TeamWeekService:
         }
         
         # Считаем общие очки команды
-        team["total_points"] = sum(
-            player["stats"]["total_points"] 
-            for player in team["players"].values()
-        )
+        team["total_points"] = sum(player.points for player in team["players"].values())
         
         return team
         
-    def _group_players_by_position(self, players: List[Dict]) -> Dict[str, List[Dict]]:
-        """Группирует игроков по позициям"""
-        grouped_players = defaultdict(list)
-        
-        for player in players:
-            position_id = player["info"]["primary_position"]
-            if position_id in settings.PLAYER_POSITIONS:
-                position = settings.PLAYER_POSITIONS[position_id]
-                # Добавляем только игроков с положительными очками
-                if player["stats"]["total_points"] > 0:
-                    grouped_players[position].append(player)
-        
-        # Сортируем игроков по очкам в каждой позиции
-        for position in grouped_players:
-            grouped_players[position].sort(
-                key=lambda x: x["stats"]["total_points"],
-                reverse=True
-            )
-        
-        return dict(grouped_players)
+    def _group_players_by_position(self, players: List[PlayerDay]) -> Dict[str, List[PlayerDay]]:
+        """Лучшие игроки каждой позиции (только игроки с положительными очками)"""
+        top = select_top_by_position(
+            players,
+            position_of=lambda player: player.position,
+            points_of=lambda player: player.points,
+            min_points=0
+        )
+        return top
         
     def _select_best_players(self, players_by_position: Dict) -> Dict:
         """Выбирает лучших игроков для команды недели"""
-        selected = {}
-        
-        # Выбираем нужное количество игроков для каждой позиции
-        for position, count in settings.TEAM_OF_DAY_COMPOSITION.items():
-            players = players_by_position.get(position, [])
-            # Выбираем лучших игроков для каждой позиции
-            for i, player in enumerate(players[:count]):
-                pos_key = position if count == 1 else f"{position}{i+1}"
-                selected[pos_key] = player
-                logger.info(f"Выбран игрок {player['info']['name']} ({pos_key}) с {player['stats']['total_points']} очками")
-        
+        selected = team_slots(players_by_position)
+        for pos_key, player in selected.items():
+            logger.info(f"Выбран игрок {player.name} ({pos_key}) с {player.points} очками")
         return selected
         
-    def create_team_collage(self, team: Dict) -> Optional[str]:
-        """Создает коллаж команды"""
+    def create_team_collage(self, team: Dict) -> Optional[bytes]:
+        """Создает коллаж команды в памяти (PNG)"""
         # Получаем фото всех игроков
         player_photos = {}
         for pos, player_data in team["players"].items():
-            # Добавляем поле position на основе primary_position
-            player_data["info"]["position"] = settings.PLAYER_POSITIONS[player_data["info"]["primary_position"]]
-            photo = self.image_service.get_player_photo(
-                str(player_data["info"]["id"]),
-                player_data["info"]["name"]
-            )
+            photo = self.image_service.get_player_photo(player_data.id, player_data.name)
             if photo:
-                player_photos[str(player_data["info"]["id"])] = photo
+                player_photos[player_data.id] = photo
                 
         if len(player_photos) != len(team["players"]):
             logger.warning("Не удалось получить фото всех игроков")
             
         # Создаем коллаж
-        return self.image_service.create_team_collage(
+        return self.image_service.render_team_collage(
             player_photos,
             team["players"],
             team["date"]
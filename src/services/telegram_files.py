@@ -0,0 +1,141 @@
+"""
+Повторное использование file_id Telegram для уже загруженных изображений
+"""
+
+from pathlib import Path
+from typing import Dict, Optional
+import hashlib
+import json
+import logging
+
+from telegram import Bot, Message
+from telegram.error import BadRequest
+
+from ..config import settings
+from .player_stats_store import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+# Фрагменты текста BadRequest, означающие недействительный file_id
+FILE_ID_ERRORS = ("file identifier", "file_id", "file id")
+
+
+def content_hash(data: bytes) -> str:
+    """SHA-256 содержимого файла"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def is_file_id_error(error: BadRequest) -> bool:
+    """Отклонен ли сам file_id (а не подпись, разметка и т.п.)"""
+    message = str(error).lower()
+    return any(fragment in message for fragment in FILE_ID_ERRORS)
+
+
+class FileIdStore:
+    """
+    Сохраняемое соответствие "хэш содержимого -> file_id Telegram"
+
+    file_id действителен только для бота, который загрузил файл, поэтому
+    ключ включает ID бота (часть токена до ":"). Файл общий для app_day,
+    app_week и скриптов: перед записью он перечитывается, чтобы не потерять
+    записи других процессов.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or settings.TELEGRAM_FILE_IDS_FILE)
+        self._ids: Dict[str, str] = self._load()
+
+    def _load(self) -> Dict[str, str]:
+        try:
+            with self.path.open('r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Не удалось прочитать {self.path}: {e}")
+            return {}
+
+    @staticmethod
+    def _key(bot: Bot, digest: str) -> str:
+        return f"{bot.token.split(':', 1)[0]}:{digest}"
+
+    def get(self, bot: Bot, digest: str) -> Optional[str]:
+        """file_id загруженного ранее содержимого"""
+        return self._ids.get(self._key(bot, digest))
+
+    def _update(self, key: str, file_id: Optional[str]) -> None:
+        self._ids = {**self._load(), **self._ids}
+        if file_id is None:
+            self._ids.pop(key, None)
+        else:
+            self._ids[key] = file_id
+        try:
+            atomic_write_json(self.path, self._ids, indent=None)
+        except OSError as e:
+            logger.warning(f"Не удалось сохранить {self.path}: {e}")
+
+    def put(self, bot: Bot, digest: str, file_id: str) -> None:
+        """Запоминает file_id загруженного содержимого"""
+        self._update(self._key(bot, digest), file_id)
+
+    def forget(self, bot: Bot, digest: str) -> None:
+        """Удаляет недействительный file_id"""
+        self._update(self._key(bot, digest), None)
+
+
+_store: Optional[FileIdStore] = None
+
+
+def get_file_id_store() -> FileIdStore:
+    """Общее хранилище file_id процесса"""
+    global _store
+    if _store is None:
+        _store = FileIdStore()
+    return _store
+
+
+async def send_photo(
+    bot: Bot,
+    chat_id,
+    photo: bytes,
+    store: Optional[FileIdStore] = None,
+    **kwargs
+) -> Message:
+    """
+    Отправка фото: загрузка байтов только для нового содержимого
+
+    Если такое же содержимое уже загружалось этим ботом (в любой чат, в
+    предыдущей попытке или предыдущем запуске), отправляется только его
+    file_id. Недействительный file_id удаляется, и фото загружается заново;
+    прочие ошибки запроса (подпись, parse_mode) пробрасываются.
+
+    Args:
+        bot: Бот Telegram
+        chat_id: ID чата
+        photo: Изображение
+        store: Хранилище file_id (None - общее)
+        **kwargs: Остальные параметры Bot.send_photo (caption, parse_mode, ...)
+
+    Returns:
+        Message: Отправленное сообщение
+    """
+    store = store or get_file_id_store()
+    digest = content_hash(photo)
+
+    file_id = store.get(bot, digest)
+    if file_id is not None:
+        try:
+            return await bot.send_photo(chat_id=chat_id, photo=file_id, **kwargs)
+        except BadRequest as e:
+            if not is_file_id_error(e):
+                raise
+            logger.warning(f"file_id {file_id} не принят Telegram ({e}), загружаем фото заново")
+            store.forget(bot, digest)
+
+    message = await bot.send_photo(chat_id=chat_id, photo=photo, **kwargs)
+    if message is not None and message.photo:
+        # Самый большой вариант - исходное изображение
+        store.put(bot, digest, message.photo[-1].file_id)
+    return message
+
@@ -1,8 +1,11 @@
 import logging
-from typing import Optional
+from typing import List, Optional, Union
 from telegram import Bot
 from telegram.error import TelegramError
 from ..config import settings
+from .http_client import telegram_request
+from .rate_limiter import get_rate_limiter, run_limited
+from .telegram_files import send_photo
 import os
 import aiofiles
 
@@ -10,26 +13,56 @@ logger = logging.getLogger(__name__)
 
 class TelegramService:
     def __init__(self):
-        self.bot = Bot(token=settings.TELEGRAM_TOKEN)
+        self.bot = Bot(token=settings.TELEGRAM_TOKEN, request=telegram_request())
         self.chat_id = settings.TELEGRAM_CHAT_ID
+        self.limiter = get_rate_limiter('telegram')
         
-    async def send_team_of_day(self, message: str, photo_path: Optional[str] = None) -> bool:
-        """Отправляет сообщение с командой дня в Telegram"""
+    @property
+    def chat_ids(self) -> List[str]:
+        """Чаты рассылки: основной и settings.TELEGRAM_EXTRA_CHAT_IDS"""
+        return [self.chat_id] + [chat_id for chat_id in settings.TELEGRAM_EXTRA_CHAT_IDS if chat_id != self.chat_id]
+
+    async def _send_photo_to_chats(self, photo: bytes, caption: str) -> None:
+        """Отправка фото во все чаты рассылки
+        
+        Фото загружается один раз, дальше (в другие чаты, при повторных попытках
+        и повторных отправках того же коллажа) отправляется его file_id.
+        Повторные попытки - по каждому чату отдельно, чтобы не дублировать
+        сообщения в чатах, куда отправка уже прошла.
+        """
+        for chat_id in self.chat_ids:
+            async def send(chat_id=chat_id):
+                await send_photo(self.bot, chat_id, photo, caption=caption, parse_mode='Markdown')
+
+            # Частота отправки подстраивается под ответы Telegram (RetryAfter)
+            await run_limited(self.limiter, send)
+
+    async def send_team_of_day(self, message: str, photo_path: Optional[Union[str, bytes]] = None) -> bool:
+        """Отправляет сообщение с командой дня в Telegram
+        
+        Args:
+            message: Текст сообщения
+            photo_path: Коллаж в памяти (bytes) или путь к файлу
+        """
         try:
             if photo_path:
-                with open(photo_path, 'rb') as photo:
-                    await self.bot.send_photo(
-                        chat_id=self.chat_id,
-                        photo=photo,
-                        caption=message,
-                        parse_mode='Markdown'
-                    )
+                if isinstance(photo_path, bytes):
+                    photo = photo_path
+                else:
+                    with open(photo_path, 'rb') as f:
+                        photo = f.read()
+                await self._send_photo_to_chats(photo, message)
             else:
-                await self.bot.send_message(
-                    chat_id=self.chat_id,
-                    text=message,
-                    parse_mode='Markdown'
-                )
+                for chat_id in self.chat_ids:
+                    async def send(chat_id=chat_id):
+                        await self.bot.send_message(
+                            chat_id=chat_id,
+                            text=message,
+                            parse_mode='Markdown'
+                        )
+                    
+                    # Частота отправки подстраивается под ответы Telegram (RetryAfter)
+                    await run_limited(self.limiter, send)
                 
             logger.info("Сообщение успешно отправлено в Telegram")
             return True
@@ -56,29 +89,29 @@ class TelegramService:
             logger.error(f"Ошибка при отправке сообщения об ошибке в Telegram: {e}")
             return False 
 
-    async def send_team_of_week(self, message: str, photo_path: str) -> None:
+    async def send_team_of_week(self, message: str, photo_path: Union[str, bytes]) -> None:
         """Отправка команды недели в Telegram
         
         Args:
             message (str): Текст сообщения
-            photo_path (str): Путь к фото коллажа
+            photo_path (Union[str, bytes]): Коллаж в памяти (bytes) или путь к файлу
         """
         try:
             logger.info("Отправляем команду недели в Telegram")
             
-            # Проверяем существование файла
-            if not os.path.exists(photo_path):
-                logger.error(f"Файл коллажа не найден: {photo_path}")
-                return
-                
-            # Отправляем фото с подписью
-            async with aiofiles.open(photo_path, 'rb') as photo:
-                await self.bot.send_photo(
-                    chat_id=settings.TELEGRAM_CHAT_ID,
-                    photo=photo,
-                    caption=message,
-                    parse_mode='Markdown'
-                )
+            if isinstance(photo_path, bytes):
+                photo = photo_path
+            else:
+                # Проверяем существование файла
+                if not os.path.exists(photo_path):
+                    logger.error(f"Файл коллажа не найден: {photo_path}")
+                    return
+                    
+                async with aiofiles.open(photo_path, 'rb') as f:
+                    photo = await f.read()
+            
+            # Отправляем фото с подписью (повторно - по file_id)
+            await self._send_photo_to_chats(photo, message)
                 
             logger.info("Команда недели успешно отправлена")
             
@@ -0,0 +1,217 @@
+"""
+Кэш готовых к вставке миниатюр фотографий игроков
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+import json
+import logging
+import os
+import threading
+import time
+
+from PIL import Image
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+Size = Tuple[int, int]
+
+
+class ThumbnailEntry:
+    """Миниатюра вместе с метаданными для перепроверки"""
+
+    __slots__ = ('image', 'fetched_at', 'etag', 'last_modified')
+
+    def __init__(
+        self,
+        image: Image.Image,
+        fetched_at: float,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ):
+        self.image = image
+        self.fetched_at = fetched_at
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def is_fresh(self, ttl: int) -> bool:
+        """Проверяет, не истек ли срок жизни миниатюры"""
+        return time.time() - self.fetched_at <= ttl
+
+
+class ThumbnailCache:
+    """
+    Двухуровневый кэш миниатюр: LRU декодированных изображений в памяти
+    и RGB-миниатюры на диске, по ключу (player_id, размер)
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        ttl: int = settings.THUMBNAIL_TTL,
+        memory_size: int = settings.THUMBNAIL_MEMORY_SIZE
+    ):
+        """
+        Инициализация кэша
+
+        Args:
+            cache_dir: Директория для миниатюр на диске
+            ttl: Время в секундах, после которого миниатюру нужно перепроверить
+            memory_size: Количество миниатюр, хранимых в памяти
+        """
+        self.cache_dir = Path(cache_dir or settings.THUMBNAILS_CACHE_DIR)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.memory_size = memory_size
+        self._memory: "OrderedDict[Tuple[str, Size], ThumbnailEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _paths(self, player_id: str, size: Size) -> Tuple[Path, Path]:
+        """Пути к файлу миниатюры и файлу метаданных"""
+        name = f"{player_id}_{size[0]}x{size[1]}"
+        return self.cache_dir / f"{name}.png", self.cache_dir / f"{name}.json"
+
+    def _remember(self, key: Tuple[str, Size], entry: ThumbnailEntry) -> None:
+        """Добавляет запись в LRU в памяти, вытесняя самые старые"""
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def get_entry(self, player_id: str, size: Size) -> Optional[ThumbnailEntry]:
+        """
+        Получение миниатюры вместе с метаданными, независимо от ее свежести
+
+        Args:
+            player_id: ID игрока
+            size: Размер миниатюры
+
+        Returns:
+            ThumbnailEntry или None, если миниатюры нет ни в памяти, ни на диске
+        """
+        key = (str(player_id), tuple(size))
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                return entry
+
+        image_path, meta_path = self._paths(*key)
+        if not image_path.exists():
+            return None
+
+        try:
+            with Image.open(image_path) as img:
+                image = img.convert("RGB")
+            meta: Dict = {}
+            if meta_path.exists():
+                with meta_path.open('r', encoding='utf-8') as f:
+                    meta = json.load(f)
+        except Exception as e:
+            logger.warning(f"Ошибка чтения миниатюры {image_path}: {e}")
+            return None
+
+        entry = ThumbnailEntry(
+            image,
+            meta.get('fetched_at', image_path.stat().st_mtime),
+            meta.get('etag'),
+            meta.get('last_modified')
+        )
+        self._remember(key, entry)
+        return entry
+
+    def get(self, player_id: str, size: Size) -> Optional[Image.Image]:
+        """
+        Получение свежей миниатюры
+
+        Args:
+            player_id: ID игрока
+            size: Размер миниатюры
+
+        Returns:
+            Image.Image или None, если миниатюры нет или ее срок жизни истек
+        """
+        entry = self.get_entry(player_id, size)
+        if entry is None or not entry.is_fresh(self.ttl):
+            return None
+        return entry.image
+
+    def put(
+        self,
+        player_id: str,
+        size: Size,
+        image: Image.Image,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ) -> None:
+        """
+        Сохранение миниатюры в память и на диск
+
+        Args:
+            player_id: ID игрока
+            size: Размер миниатюры
+            image: Готовая RGB-миниатюра
+            etag: ETag ответа сервера
+            last_modified: Last-Modified ответа сервера
+        """
+        key = (str(player_id), tuple(size))
+        entry = ThumbnailEntry(image, time.time(), etag, last_modified)
+        self._remember(key, entry)
+
+        image_path, meta_path = self._paths(*key)
+        try:
+            self._write_atomic(image_path, lambda tmp: image.save(tmp, 'PNG'))
+            self._write_meta(meta_path, entry)
+        except Exception as e:
+            logger.error(f"Ошибка сохранения миниатюры {image_path}: {e}")
+
+    def touch(self, player_id: str, size: Size) -> None:
+        """
+        Продлевает срок жизни миниатюры после успешной перепроверки (304)
+
+        Args:
+            player_id: ID игрока
+            size: Размер миниатюры
+        """
+        entry = self.get_entry(player_id, size)
+        if entry is None:
+            return
+
+        entry.fetched_at = time.time()
+        _, meta_path = self._paths(str(player_id), tuple(size))
+        try:
+            self._write_meta(meta_path, entry)
+        except Exception as e:
+            logger.error(f"Ошибка обновления метаданных миниатюры {meta_path}: {e}")
+
+    def _write_meta(self, meta_path: Path, entry: ThumbnailEntry) -> None:
+        """Записывает метаданные миниатюры"""
+        meta = json.dumps({
+            'fetched_at': entry.fetched_at,
+            'etag': entry.etag,
+            'last_modified': entry.last_modified
+        })
+        self._write_atomic(meta_path, lambda tmp: tmp.write_text(meta, encoding='utf-8'))
+
+    @staticmethod
+    def _write_atomic(path: Path, write: Callable[[Path], None]) -> None:
+        """
+        Записывает файл через временный файл в той же директории и os.replace,
+        чтобы другие процессы не увидели недописанную миниатюру
+
+        Args:
+            path: Итоговый путь файла
+            write: Функция, записывающая содержимое по переданному пути
+        """
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            write(tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
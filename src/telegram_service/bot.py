@@ -3,6 +3,7 @@ import os
 from telegram import Bot
 from telegram.constants import ParseMode
 from dotenv import load_dotenv
+from src.services.http_client import telegram_request
 
 class TelegramService:
     def __init__(self):
@@ -21,7 +22,7 @@ class TelegramService:
         if not self.chat_id:
             raise ValueError("CHAT_ID не найден в переменных окружения")
             
-        self.bot = Bot(token=self.token)
+        self.bot = Bot(token=self.token, request=telegram_request())
 
     async def send_photo(self, photo_path, caption=None):
         """Отправка фото в Telegram
@@ -0,0 +1,173 @@
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Sequence, Set
+import logging
+
+from ..config import settings
+from .team_utils import top_k
+
+logger = logging.getLogger(__name__)
+
+# Слоты состава ESPN (eligibleSlots / lineupSlotId), соответствующие позициям команды
+POSITION_SLOT_IDS = {
+    'C': 0,
+    'LW': 1,
+    'RW': 2,
+    'D': 4,
+    'G': 5
+}
+
+
+def eligible_positions(player: Dict) -> Set[str]:
+    """
+    Позиции, на которых может играть игрок ESPN
+
+    Позиции из eligibleSlots и основная позиция (defaultPositionId).
+
+    Args:
+        player: Объект player из ответа ESPN
+
+    Returns:
+        Set[str]: Позиции (C, LW, RW, D, G)
+    """
+    slots = set(player.get('eligibleSlots') or ())
+    positions = {position for position, slot_id in POSITION_SLOT_IDS.items() if slot_id in slots}
+    default = settings.PLAYER_POSITIONS.get(player.get('defaultPositionId'))
+    if default:
+        positions.add(default)
+    return positions
+
+
+def _assign(weights: Sequence[Sequence[float]], allowed: Sequence[Sequence[bool]]) -> List[int]:
+    """
+    Назначение максимального веса (венгерский алгоритм, O(n^2 * m))
+
+    Args:
+        weights: Матрица весов n x m, n <= m (строки - места в составе)
+        allowed: Допустимые пары место - игрок
+
+    Returns:
+        List[int]: Столбец для каждой строки или -1, если место не заполнено
+    """
+    n, m = len(weights), len(weights[0]) if weights else 0
+    if n == 0 or m == 0:
+        return [-1] * n
+
+    # Недопустимые пары получают штраф больше любой возможной суммы весов,
+    # поэтому выбираются, только если место заполнить нечем
+    spread = max((abs(w) for row in weights for w in row), default=0.0)
+    penalty = (spread + 1.0) * (n + 1) * 2
+    cost = [
+        [-weights[i][j] if allowed[i][j] else penalty for j in range(m)]
+        for i in range(n)
+    ]
+
+    # Потенциалы и обратное назначение с 1-индексацией (классическая схема)
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    owner = [0] * (m + 1)
+    way = [0] * (m + 1)
+    for i in range(1, n + 1):
+        owner[0] = i
+        j0 = 0
+        minv = [float('inf')] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = owner[j0]
+            row = cost[i0 - 1]
+            delta = float('inf')
+            j1 = 0
+            for j in range(1, m + 1):
+                if used[j]:
+                    continue
+                current = row[j - 1] - u[i0] - v[j]
+                if current < minv[j]:
+                    minv[j] = current
+                    way[j] = j0
+                if minv[j] < delta:
+                    delta = minv[j]
+                    j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[owner[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if owner[j0] == 0:
+                break
+        while True:
+            j1 = way[j0]
+            owner[j0] = owner[j1]
+            j0 = j1
+            if j0 == 0:
+                break
+
+    result = [-1] * n
+    for j in range(1, m + 1):
+        i = owner[j]
+        if i and allowed[i - 1][j - 1]:
+            result[i - 1] = j - 1
+    return result
+
+
+def solve_lineup(
+    players: Iterable[Any],
+    points_of: Callable[[Any], float],
+    positions_of: Callable[[Any], Iterable[Hashable]],
+    composition: Dict[Hashable, int] = settings.TEAM_OF_DAY_COMPOSITION
+) -> Dict[Hashable, List[Any]]:
+    """
+    Состав с максимальной суммой очков с учетом всех позиций игроков
+
+    Игрок, допущенный на несколько позиций (например, C/LW), может занять
+    любую из них, но только одно место. Задача решается как назначение
+    максимального веса в двудольном графе места - игроки. Кандидаты
+    предварительно отсекаются: для каждой позиции достаточно лучших
+    игроков в количестве мест во всем составе, остальные не могут войти
+    в оптимальное решение, поэтому назначение решается на нескольких
+    десятках кандидатов независимо от размера пула.
+
+    Args:
+        players: Игроки
+        points_of: Очки игрока
+        positions_of: Позиции, на которых может играть игрок
+        composition: Количество игроков на позицию
+
+    Returns:
+        Dict: {позиция: [игроки по убыванию очков]} для всех позиций состава
+    """
+    players = list(players)
+    seats = [position for position, count in composition.items() for _ in range(count)]
+
+    points = [points_of(player) for player in players]
+    eligible = [set(positions_of(player)) for player in players]
+
+    by_position: Dict[Hashable, List[int]] = {position: [] for position in composition}
+    for index, positions in enumerate(eligible):
+        for position in positions:
+            group = by_position.get(position)
+            if group is not None:
+                group.append(index)
+    candidates: Set[int] = set()
+    for group in by_position.values():
+        candidates.update(top_k(group, len(seats), key=points.__getitem__))
+    candidates_order = sorted(candidates)
+
+    team: Dict[Hashable, List[Any]] = {position: [] for position in composition}
+    if candidates_order and seats:
+        candidate_points = [points[index] for index in candidates_order]
+        weights = [candidate_points for _ in seats]
+        allowed = [[seat in eligible[index] for index in candidates_order] for seat in seats]
+        if len(candidates_order) < len(seats):
+            # Строк не может быть больше столбцов: добавляем фиктивных игроков
+            padding = len(seats) - len(candidates_order)
+            weights = [row + [0.0] * padding for row in weights]
+            allowed = [row + [False] * padding for row in allowed]
+
+        for seat, column in zip(seats, _assign(weights, allowed)):
+            if column >= 0:
+                team[seat].append(players[candidates_order[column]])
+
+    for position in team:
+        team[position].sort(key=points_of, reverse=True)
+    return team
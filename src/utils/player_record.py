@@ -0,0 +1,150 @@
+from typing import Any, Dict, Optional
+
+from ..config import settings
+
+# Фото игрока ESPN в размере коллажа команды дня
+HEADSHOT_URL = "https://a.espncdn.com/combiner/i?img=/i/headshots/nhl/players/full/{player_id}.png&w=130&h=100"
+
+
+class PlayerDay:
+    """
+    Компактная запись очков игрока за игровой день (или период)
+
+    Хранит только скалярные поля в __slots__: без словаря атрибутов и
+    вложенных словарей info/stats на каждого игрока. URL фото, позиция и
+    словари прежнего формата строятся по запросу, поэтому для сотен
+    игроков дня, из которых в команду попадают шесть, они не создаются.
+
+    Для совместимости поддерживается доступ по ключам прежнего формата:
+    player["info"], player["stats"], player["appliedTotal"] и т.д.
+    """
+
+    __slots__ = ("id", "name", "position_id", "team_id", "points", "grade")
+
+    # Ключи прежних словарей игрока -> атрибуты записи
+    _KEYS = {
+        "id": "id",
+        "name": "name",
+        "grade": "grade",
+        "appliedTotal": "points",
+        "image_url": "image_url",
+        "info": "info",
+        "stats": "stats",
+    }
+
+    def __init__(
+        self,
+        id: str,
+        name: str,
+        position_id: int,
+        team_id: Optional[str] = None,
+        points: float = 0.0,
+        grade: str = "common"
+    ):
+        self.id = id
+        self.name = name
+        self.position_id = position_id
+        self.team_id = team_id
+        self.points = points
+        self.grade = grade
+
+    @classmethod
+    def from_espn(cls, player: Dict, points: float, grade: str = "common") -> "PlayerDay":
+        """
+        Запись из объекта player ответа ESPN
+
+        Args:
+            player: Объект player (id, fullName, defaultPositionId, proTeamId)
+            points: Очки игрока
+            grade: Грейд игрока
+
+        Returns:
+            PlayerDay: Запись игрока
+        """
+        team_id = player.get("proTeamId")
+        return cls(
+            str(player.get("id")),
+            player.get("fullName"),
+            player.get("defaultPositionId"),
+            str(team_id) if team_id is not None else None,
+            points,
+            grade
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "PlayerDay":
+        """
+        Запись из словаря прежнего формата {"info": {...}, "stats": {...}}
+
+        Args:
+            data: Словарь игрока (например, из кэша)
+
+        Returns:
+            PlayerDay: Запись игрока
+        """
+        info = data["info"]
+        return cls(
+            str(info["id"]),
+            info.get("name"),
+            info.get("primary_position"),
+            info.get("team_id"),
+            data.get("stats", {}).get("total_points", 0.0),
+            data.get("grade", "common")
+        )
+
+    def to_dict(self) -> Dict:
+        """Словарь прежнего формата для JSON (кэш, файлы статистики)"""
+        return {"info": self.info, "stats": self.stats}
+
+    def copy(self, **changes) -> "PlayerDay":
+        """Копия записи с измененными полями"""
+        values = {field: getattr(self, field) for field in self.__slots__}
+        values.update(changes)
+        return PlayerDay(**values)
+
+    @property
+    def position(self) -> Optional[str]:
+        """Позиция игрока (C, LW, RW, D, G)"""
+        return settings.PLAYER_POSITIONS.get(self.position_id)
+
+    @property
+    def image_url(self) -> str:
+        """URL фото игрока"""
+        return HEADSHOT_URL.format(player_id=self.id)
+
+    @property
+    def info(self) -> Dict:
+        """Информация об игроке в прежнем формате"""
+        return {
+            "id": self.id,
+            "name": self.name,
+            "primary_position": self.position_id,
+            "team_id": self.team_id,
+            "position": self.position
+        }
+
+    @property
+    def stats(self) -> Dict:
+        """Статистика игрока в прежнем формате"""
+        return {"total_points": self.points}
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, self._KEYS[key])
+        except KeyError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Доступ по ключу прежнего формата со значением по умолчанию"""
+        attribute = self._KEYS.get(key)
+        return getattr(self, attribute) if attribute else default
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PlayerDay):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"PlayerDay(id={self.id!r}, name={self.name!r}, position={self.position}, points={self.points})"
@@ -1,56 +1,120 @@
-from typing import Dict, List, Optional
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+from bisect import insort
+import heapq
 import logging
 
+from ..config import settings
+
 logger = logging.getLogger(__name__)
 
+
+def top_k(items: Iterable[Any], count: int, key: Callable[[Any], float]) -> List[Any]:
+    """
+    Лучшие count элементов по ключу за один проход (куча размера count)
+
+    Результат совпадает с sorted(items, key=key, reverse=True)[:count]:
+    при равенстве ключей выше элемент, встретившийся раньше.
+
+    Args:
+        items: Элементы
+        count: Количество элементов
+        key: Очки элемента
+
+    Returns:
+        List: Элементы по убыванию ключа
+    """
+    return heapq.nlargest(count, items, key=key) if count > 0 else []
+
+
+def select_top_by_position(
+    players: Iterable[Any],
+    position_of: Callable[[Any], Optional[Hashable]],
+    points_of: Callable[[Any], float],
+    composition: Dict[Hashable, int] = settings.TEAM_OF_DAY_COMPOSITION,
+    min_points: Optional[float] = None
+) -> Dict[Hashable, List[Any]]:
+    """
+    Лучшие игроки каждой позиции согласно составу команды
+
+    Один проход по игрокам: для каждой позиции хранятся только count
+    лучших, поэтому полная сортировка списков не нужна (O(n log count)).
+    При равенстве очков выше игрок, встретившийся раньше.
+
+    Args:
+        players: Игроки
+        position_of: Позиция игрока (игроки с позицией вне состава пропускаются)
+        points_of: Очки игрока
+        composition: Количество игроков на позицию
+        min_points: Если указано, берутся только игроки с очками строго больше
+
+    Returns:
+        Dict: {позиция: [игроки по убыванию очков]} для всех позиций состава
+    """
+    # Для каждой позиции - не более count записей (-очки, порядок, игрок) по возрастанию,
+    # то есть от лучшего к худшему; игрок хуже последнего отсекается одним сравнением
+    best: Dict[Hashable, List] = {position: [] for position in composition}
+    for order, player in enumerate(players):
+        position = position_of(player)
+        top = best.get(position)
+        if top is None:
+            continue
+        points = points_of(player)
+        if min_points is not None and not points > min_points:
+            continue
+        if len(top) >= composition[position]:
+            # При равенстве очков остается игрок, встретившийся раньше
+            if not top or not -points < top[-1][0]:
+                continue
+            top.pop()
+        insort(top, (-points, order, player))
+
+    return {position: [entry[2] for entry in top] for position, top in best.items()}
+
+
+def team_slots(
+    team: Dict[str, List[Any]],
+    composition: Dict[str, int] = settings.TEAM_OF_DAY_COMPOSITION
+) -> Dict[str, Any]:
+    """
+    Раскладка по слотам: позиция с одним игроком - "C", с несколькими - "D1", "D2"
+
+    Args:
+        team: Результат select_top_by_position
+        composition: Состав команды
+
+    Returns:
+        Dict[str, Any]: {слот: игрок}
+    """
+    slots = {}
+    for position, count in composition.items():
+        for number, player in enumerate(team.get(position, [])[:count], start=1):
+            slots[position if count == 1 else f"{position}{number}"] = player
+    return slots
+
+
 def get_best_players_by_position(players: List[Dict]) -> Optional[Dict]:
     """
     Выбирает лучших игроков по позициям
-    
+
     Args:
         players: Список игроков с их статистикой
-        
+
     Returns:
         Словарь с лучшими игроками по позициям или None в случае ошибки
     """
     try:
-        # Группируем игроков по позициям
-        players_by_position = {
-            1: [], # C
-            2: [], # LW
-            3: [], # RW
-            4: [], # D
-            5: []  # G
-        }
-        
-        for player in players:
-            position = player["info"]["primary_position"]
-            if position in players_by_position:
-                players_by_position[position].append(player)
-        
-        # Сортируем игроков по очкам в каждой позиции
-        for pos in players_by_position:
-            players_by_position[pos].sort(
-                key=lambda x: x["stats"]["total_points"],
-                reverse=True
-            )
-        
-        # Выбираем лучших игроков
-        best_team = {
-            "C": players_by_position[1][0] if players_by_position[1] else None,
-            "LW": players_by_position[2][0] if players_by_position[2] else None,
-            "RW": players_by_position[3][0] if players_by_position[3] else None,
-            "D1": players_by_position[4][0] if players_by_position[4] else None,
-            "D2": players_by_position[4][1] if len(players_by_position[4]) > 1 else None,
-            "G": players_by_position[5][0] if players_by_position[5] else None
-        }
-        
+        best_team = team_slots(select_top_by_position(
+            players,
+            position_of=lambda player: settings.PLAYER_POSITIONS.get(player["info"]["primary_position"]),
+            points_of=lambda player: player["stats"]["total_points"]
+        ))
+
         # Проверяем, что все позиции заполнены
-        if None in best_team.values():
+        if len(best_team) < sum(settings.TEAM_OF_DAY_COMPOSITION.values()):
             return None
-            
+
         return best_team
-        
+
     except Exception as e:
         logger.error(f"Ошибка при выборе лучших игроков: {str(e)}")
-        return None 
\ No newline at end of file
+        return None
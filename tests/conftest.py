@@ -0,0 +1,11 @@
+import pytest
+
+from src.services import response_archive
+
+
+@pytest.fixture(autouse=True)
+def isolated_archive(tmp_path, monkeypatch):
+    """Архив ответов ESPN во временной директории и выключен: тесты не пишут в data/archive"""
+    monkeypatch.setattr(response_archive.settings, "ARCHIVE_DIR", tmp_path / "archive")
+    monkeypatch.setattr(response_archive.settings, "ESPN_ARCHIVE_MODE", "off")
+    monkeypatch.setattr(response_archive, "_archive", None)
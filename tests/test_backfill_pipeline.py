@@ -0,0 +1,124 @@
+import asyncio
+import threading
+import time
+
+from src.services.backfill_pipeline import BackfillPipeline
+
+
+def test_process_in_order_despite_out_of_order_fetch():
+    """Тест: обработка строго по порядку, даже если загрузки завершаются вразнобой"""
+    delays = {1: 0.05, 2: 0.01, 3: 0.03, 4: 0.0}
+    processed = []
+
+    def fetch(item):
+        time.sleep(delays[item])
+        return item * 10
+
+    def process(item, data):
+        processed.append((item, data))
+        return None
+
+    report = asyncio.run(BackfillPipeline(fetch, process, fetch_concurrency=4).run([1, 2, 3, 4]))
+
+    assert processed == [(1, 10), (2, 20), (3, 30), (4, 40)]
+    assert report.stages["загрузка"].items == 4
+    assert report.stages["обработка"].items == 4
+    assert "публикация" not in report.stages
+
+
+def test_fetch_concurrency_is_bounded():
+    """Тест ограничения количества одновременных загрузок"""
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+
+    def fetch(item):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.02)
+        with lock:
+            state["active"] -= 1
+        return item
+
+    asyncio.run(BackfillPipeline(fetch, lambda item, data: None, fetch_concurrency=2).run(range(8)))
+
+    assert state["peak"] == 2
+
+
+def test_publish_overlaps_with_fetch():
+    """Тест: публикация идет параллельно с загрузкой следующих периодов"""
+    published = []
+
+    def fetch(item):
+        time.sleep(0.05)
+        return item
+
+    async def publish(job):
+        await asyncio.sleep(0.05)
+        published.append(job)
+
+    started = time.perf_counter()
+    report = asyncio.run(
+        BackfillPipeline(fetch, lambda item, data: data, publish, fetch_concurrency=1).run(range(6))
+    )
+    elapsed = time.perf_counter() - started
+
+    assert published == list(range(6))
+    assert report.stages["публикация"].items == 6
+    # Последовательно было бы 6 * (0.05 + 0.05) = 0.6 с
+    assert elapsed < 0.5
+
+
+def test_slow_publish_bounds_read_ahead():
+    """Тест: при медленной публикации загрузки не уходят далеко вперед"""
+    concurrency, queue_size = 2, 1
+    lock = threading.Lock()
+    state = {"fetched": 0, "published": 0, "peak": 0}
+
+    def fetch(item):
+        with lock:
+            state["fetched"] += 1
+            state["peak"] = max(state["peak"], state["fetched"] - state["published"])
+        return item
+
+    async def publish(job):
+        await asyncio.sleep(0.02)
+        state["published"] += 1
+
+    asyncio.run(BackfillPipeline(
+        fetch, lambda item, data: data, publish,
+        fetch_concurrency=concurrency, publish_queue_size=queue_size
+    ).run(range(20)))
+
+    assert state["published"] == 20
+    # Загружено, но не опубликовано: окно загрузок, очередь, публикуемое и обрабатываемое задания
+    assert state["peak"] <= concurrency + queue_size + 2
+
+
+def test_errors_do_not_stop_pipeline():
+    """Тест: ошибки загрузки, обработки и публикации не останавливают конвейер"""
+    seen = []
+    published = []
+
+    def fetch(item):
+        if item == 1:
+            raise RuntimeError("network")
+        return item
+
+    def process(item, data):
+        seen.append((item, data))
+        if item == 2:
+            raise ValueError("bad data")
+        return item if data is not None else None
+
+    async def publish(job):
+        if job == 3:
+            raise RuntimeError("telegram")
+        published.append(job)
+
+    report = asyncio.run(BackfillPipeline(fetch, process, publish).run([0, 1, 2, 3, 4]))
+
+    assert seen == [(0, 0), (1, None), (2, 2), (3, 3), (4, 4)]
+    assert published == [0, 4]
+    assert report.stages["публикация"].items == 3
+    assert "Конвейер завершен" in report.format()
@@ -71,4 +71,145 @@ def test_invalid_json(cache_service, cache_dir):
     bad_json_file = cache_dir / "bad_key.json"
     bad_json_file.write_text("{invalid json")
     
-    assert cache_service.get_cached_data("bad_key") is None 
\ No newline at end of file
+    assert cache_service.get_cached_data("bad_key") is None 
+
+def test_final_entries_never_expire(cache_service, monkeypatch):
+    """Тест: данные завершенного дня не устаревают"""
+    cache_service.cache_data("final_key", {"test": "final"}, final=True)
+    cache_service.cache_data("current_key", {"test": "current"})
+
+    future_time = time.time() + 365 * 24 * 3600
+    monkeypatch.setattr(time, 'time', lambda: future_time)
+
+    assert cache_service.get_cached_data("final_key", max_age=60) == {"test": "final"}
+    assert cache_service.get_cached_data("current_key", max_age=60) is None
+
+
+def test_legacy_entries_are_readable(cache_service, cache_dir):
+    """Тест чтения записей старого формата (без метаданных)"""
+    (cache_dir / "legacy_key.json").write_text(json.dumps({"players": []}))
+
+    assert cache_service.get_cached_data("legacy_key") == {"players": []}
+
+
+def test_cache_counters(cache_service):
+    """Тест счетчиков попаданий, промахов и байт"""
+    cache_service.get_cached_data("missing")
+    cache_service.cache_data("key", {"test": "data"}, final=True)
+    cache_service.get_cached_data("key")
+    cache_service.get_cached_data("key")
+
+    stats = cache_service.stats()
+    assert stats["hits"] == 2
+    assert stats["final_hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["writes"] == 1
+    # Запись сразу попадает в память, диск не читается
+    assert stats["memory_hits"] == 2
+    assert stats["bytes_read"] == 0
+    assert stats["hit_rate"] == pytest.approx(2 / 3)
+
+
+def test_memory_tier_avoids_disk_reads(cache_service, cache_dir):
+    """Тест: повторное чтение обслуживается из памяти"""
+    cache_service.cache_data("stats_1", {"test": "data"})
+    (cache_dir / "stats_1.json").unlink()
+
+    assert cache_service.get_cached_data("stats_1") == {"test": "data"}
+    assert cache_service.stats()["memory_hits"] == 1
+    assert cache_service.stats()["bytes_read"] == 0
+
+
+def test_disk_budget_evicts_least_recently_used(tmp_path):
+    """Тест вытеснения по LRU при превышении размера на диске"""
+    payload = {"value": "x" * 50}
+    service = CacheService(str(tmp_path / "lru"), memory_size=0, max_bytes=0)
+    service.cache_data("probe", payload)
+    entry_size = service.disk_bytes
+    service.clear_cache()
+    service.max_bytes = 3 * entry_size + entry_size // 2
+    for key in ("a", "b", "c"):
+        service.cache_data(key, payload)
+        time.sleep(0.01)
+    # Обращение к "a" делает её самой свежей
+    assert service.get_cached_data("a") == payload
+    service.cache_data("d", payload)
+
+    assert service.get_cached_data("b") is None
+    assert service.get_cached_data("a") == payload
+    assert service.disk_bytes <= service.max_bytes
+    assert service.stats()["evictions"] >= 1
+
+
+def test_disk_budget_evicts_least_frequently_used(tmp_path):
+    """Тест вытеснения по LFU"""
+    payload = {"value": "x" * 50}
+    service = CacheService(str(tmp_path / "lfu"), memory_size=0, max_bytes=0, policy="lfu")
+    service.cache_data("probe", payload)
+    entry_size = service.disk_bytes
+    service.clear_cache()
+    service.max_bytes = 3 * entry_size + entry_size // 2
+    for key in ("a", "b", "c"):
+        service.cache_data(key, payload)
+    for _ in range(3):
+        service.get_cached_data("a")
+        service.get_cached_data("c")
+    service.cache_data("d", payload)
+
+    assert service.get_cached_data("b") is None
+    assert service.get_cached_data("a") == payload
+    assert service.get_cached_data("c") == payload
+
+
+def test_index_persists_between_instances(cache_dir, cache_service):
+    """Тест: индекс сохраняется и используется новым экземпляром"""
+    cache_service.cache_data("stats_1", {"test": "data"})
+
+    restored = CacheService(str(cache_dir))
+    assert restored.disk_bytes == cache_service.disk_bytes > 0
+    assert restored.get_cached_data("stats_1") == {"test": "data"}
+
+
+def test_index_writes_are_batched(cache_dir, monkeypatch):
+    """Тест: индекс пишется пакетно, обращения сохраняются в flush()"""
+    from src.services import cache_service as module
+    monkeypatch.setattr(module, "INDEX_SAVE_EVERY", 3)
+    index_file = cache_dir / module.INDEX_FILE
+
+    with CacheService(str(cache_dir)) as service:
+        service.cache_data("stats_1", {"day": 1})
+        service.cache_data("stats_2", {"day": 2})
+        assert not index_file.exists()
+        service.cache_data("stats_3", {"day": 3})
+        assert set(json.loads(index_file.read_text())) == {"stats_1", "stats_2", "stats_3"}
+
+        service.memory_size = 0
+        service._memory.clear()
+        service.get_cached_data("stats_1")
+        assert json.loads(index_file.read_text())["stats_1"]["hits"] == 0
+
+    assert json.loads(index_file.read_text())["stats_1"]["hits"] == 1
+
+
+def test_entries_missing_from_index_are_recovered(cache_dir, cache_service):
+    """Тест: записи, не попавшие в индекс до аварийного завершения, учитываются"""
+    cache_service.cache_data("stats_1", {"day": 1})
+    cache_service.flush()
+    cache_service.cache_data("stats_2", {"day": 2})
+
+    restored = CacheService(str(cache_dir))
+    assert restored.disk_bytes == cache_service.disk_bytes
+    assert restored.get_cached_data("stats_2") == {"day": 2}
+
+
+def test_clear_cache_by_namespace(cache_service):
+    """Тест очистки по пространству имен"""
+    cache_service.cache_data("stats_2024-10-08", {"day": 1})
+    cache_service.cache_data("stats_2024-10-09", {"day": 2})
+    cache_service.cache_data("team_2024-10-08", {"team": 1})
+
+    cache_service.clear_cache(namespace="stats")
+
+    assert cache_service.get_cached_data("stats_2024-10-08") is None
+    assert cache_service.get_cached_data("stats_2024-10-09") is None
+    assert cache_service.get_cached_data("team_2024-10-08") == {"team": 1}
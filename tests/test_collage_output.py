@@ -0,0 +1,45 @@
+from io import BytesIO
+
+from PIL import Image
+
+from src.services import collage_output
+from src.services.collage_output import encode_image, persist_collage
+
+
+def test_encode_image_jpeg_and_png():
+    image = Image.new("RGBA", (40, 30), (255, 0, 0, 128))
+
+    jpeg = encode_image(image, "JPEG")
+    png = encode_image(image, "PNG")
+
+    assert isinstance(jpeg, bytes) and jpeg[:2] == b"\xff\xd8"
+    with Image.open(BytesIO(jpeg)) as decoded:
+        assert decoded.format == "JPEG"
+        assert decoded.size == (40, 30)
+    with Image.open(BytesIO(png)) as decoded:
+        assert decoded.format == "PNG"
+        assert decoded.mode == "RGBA"
+
+
+def test_persist_disabled_by_default(tmp_path, monkeypatch):
+    monkeypatch.setattr(collage_output.settings, "COLLAGE_ARCHIVE", False)
+
+    assert persist_collage(b"data", "team.jpg", tmp_path) is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_persist_when_enabled(tmp_path, monkeypatch):
+    monkeypatch.setattr(collage_output.settings, "COLLAGE_ARCHIVE", True)
+    monkeypatch.setattr(collage_output.settings, "COLLAGE_ARCHIVE_DIR", tmp_path / "collages")
+
+    path = persist_collage(b"data", "team.jpg")
+
+    assert path == tmp_path / "collages" / "team.jpg"
+    assert path.read_bytes() == b"data"
+    assert [p.name for p in path.parent.iterdir()] == ["team.jpg"]
+
+
+def test_persist_forced(tmp_path, monkeypatch):
+    monkeypatch.setattr(collage_output.settings, "COLLAGE_ARCHIVE", False)
+
+    assert persist_collage(b"x", "a.png", tmp_path, force=True).read_bytes() == b"x"
@@ -0,0 +1,111 @@
+from PIL import Image, ImageChops, ImageDraw
+
+from src.services.collage_template import (
+    grid_positions,
+    lineup_grid_template,
+    load_font,
+    team_grid_template,
+    vertical_template,
+)
+
+
+def test_load_font_cached_and_falls_back():
+    font = load_font("/missing/font.ttf", 20)
+
+    assert font is load_font("/missing/font.ttf", 20)
+    assert font.getlength("abc") > 0
+
+
+def legacy_vertical(rows, title):
+    """Прежний app_day.create_collage"""
+    font = load_font(None, 20)
+    width, line_height = 500, 100 + 10 + 30 + 20
+    image = Image.new("RGB", (width, len(rows) * line_height + 40), "white")
+    draw = ImageDraw.Draw(image)
+    draw.text(((width - draw.textlength(title, font=font)) // 2, 20), title, fill="black", font=font)
+    y = 60
+    for text, fill in rows:
+        draw.text(((width - draw.textlength(text, font=font)) // 2, y + 110), text, fill=fill, font=font)
+        y += line_height
+    return image
+
+
+def legacy_grid(captions, title):
+    """Прежний ImageService.render_team_collage"""
+    title_font, stats_font = load_font(None, 36), load_font(None, 24)
+    image = Image.new("RGB", (1200, 800), "white")
+    draw = ImageDraw.Draw(image)
+    bbox = draw.textbbox((0, 0), title, font=title_font)
+    draw.text(((1200 - (bbox[2] - bbox[0])) // 2, 20), title, font=title_font, fill="black")
+    for (x, y), text in captions:
+        bbox = draw.textbbox((0, 0), text, font=stats_font)
+        draw.text((x - (bbox[2] - bbox[0]) // 2, y + 110), text, font=stats_font, fill="black", align="center")
+    return image
+
+
+def test_vertical_text_matches_legacy_layout():
+    rows = [("C: Connor McDavid (12.30 ftps)", "gold"), ("G: Igor Shesterkin (9.50 ftps)", "blue")]
+    title = "Команда дня 2025-01-15"
+    template = vertical_template(len(rows))
+    image, draw = template.canvas()
+
+    template.draw_title(draw, title)
+    for row, (text, fill) in enumerate(rows):
+        template.draw_caption(draw, row, text, fill)
+
+    assert ImageChops.difference(image, legacy_vertical(rows, title)).getbbox() is None
+
+
+def test_grid_multiline_text_matches_legacy_layout():
+    names = ["Connor McDavid", "Cale Makar", "Quinn Hughes", "Artemi Panarin", "Leon Draisaitl", "Igor Shesterkin"]
+    title = "Команда недели 13.01 - 19.01"
+    template = team_grid_template(None)
+    image, draw = template.canvas()
+
+    template.draw_title(draw, title)
+    captions = []
+    for (slot, (x, _)), name in zip(template.captions.items(), names):
+        text = f"{name}\n{len(name) * 3.5} pts"
+        template.draw_caption(draw, slot, text)
+        captions.append(((x, template.slots[slot][1] + 100), text))
+
+    assert ImageChops.difference(image, legacy_grid(captions, title)).getbbox() is None
+
+
+def test_vertical_template_geometry():
+    template = vertical_template(6)
+
+    assert template is vertical_template(6)
+    assert template.size == (500, 6 * 160 + 40)
+    assert template.slots[0] == (185, 60)
+    assert template.slots[1] == (185, 220)
+    assert template.captions[0] == (250, 170)
+
+
+def test_vertical_render_with_placeholder():
+    template = vertical_template(2)
+    image, draw = template.canvas()
+    photo = Image.new("RGB", template.photo_size, "red")
+
+    template.draw_title(draw, "Команда дня 2025-01-15")
+    template.paste(image, 0, photo)
+    template.paste(image, 1, None)
+    template.draw_caption(draw, 1, "G: Igor Shesterkin (9.50 ftps)", "blue")
+
+    assert image.size == template.size and image.mode == "RGB"
+    assert image.getpixel(template.slots[0]) == (255, 0, 0)
+    assert image.getpixel(template.slots[1]) == template.placeholder.getpixel((0, 0))
+    # Фон макета не меняется при отрисовке
+    assert template.background.getbbox() == (0, 0) + template.size
+    assert template.background.getextrema() == ((255, 255),) * 3
+
+
+def test_grid_templates():
+    lineup = lineup_grid_template()
+    team = team_grid_template(None)
+
+    assert lineup.background.mode == "RGBA"
+    assert lineup.slots == grid_positions(*lineup.size)
+    assert team.size == (1200, 800)
+    assert team.slots["G"] == (400, 50)
+    assert team.captions["G"] == (500, 260)
@@ -0,0 +1,119 @@
+import time
+from io import BytesIO
+from unittest.mock import Mock
+
+import pytest
+import requests
+from PIL import Image
+
+from src.services.headshot_service import HeadshotService, get_headshot_url, prepare_headshot
+from src.services.thumbnail_cache import ThumbnailCache
+
+
+def _png_bytes(size=(260, 200), color=(255, 0, 0, 128)):
+    buffer = BytesIO()
+    Image.new('RGBA', size, color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def png_response():
+    response = Mock()
+    response.status_code = 200
+    response.content = _png_bytes()
+    response.headers = {'ETag': '"v1"'}
+    response.raise_for_status.return_value = None
+    return response
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ThumbnailCache(str(tmp_path / "thumbnails"))
+
+
+def test_headshot_url():
+    """Тест генерации URL фото"""
+    assert get_headshot_url("123").endswith("/players/full/123.png&w=130&h=100")
+
+
+def test_prepare_headshot():
+    """Тест подготовки миниатюры: белый фон, RGB, нужный размер"""
+    image = prepare_headshot(_png_bytes(color=(0, 0, 0, 0)), (130, 100))
+    assert image.mode == 'RGB'
+    assert image.size == (130, 100)
+    assert image.getpixel((0, 0)) == (255, 255, 255)
+
+
+def test_fetch_many_deduplicates(png_response, cache):
+    """Тест загрузки набора фото: повторы запрашиваются один раз"""
+    session = Mock()
+    session.get.return_value = png_response
+    service = HeadshotService(session=session, cache=cache)
+
+    images = service.fetch_many(["1", "2", "1"])
+
+    assert set(images) == {"1", "2"}
+    assert all(img.size == (130, 100) for img in images.values())
+    assert session.get.call_count == 2
+
+
+def test_fetch_many_handles_errors(png_response, cache):
+    """Тест обработки ошибок: неудачная загрузка дает None"""
+    def get(url, headers, timeout):
+        if "/bad.png" in url:
+            raise requests.RequestException("boom")
+        return png_response
+
+    session = Mock()
+    session.get.side_effect = get
+    images = HeadshotService(session=session, cache=cache).fetch_many(["good", "bad"])
+
+    assert images["good"] is not None
+    assert images["bad"] is None
+
+
+def test_fetch_many_is_concurrent(png_response, cache):
+    """Тест параллельности: время ограничено самой медленной загрузкой"""
+    def slow_get(url, headers, timeout):
+        time.sleep(0.2)
+        return png_response
+
+    session = Mock()
+    session.get.side_effect = slow_get
+    service = HeadshotService(max_workers=6, session=session, cache=cache)
+
+    started = time.perf_counter()
+    images = service.fetch_many([str(i) for i in range(6)])
+    elapsed = time.perf_counter() - started
+
+    assert len(images) == 6
+    assert elapsed < 0.6
+
+
+def test_fresh_thumbnail_skips_network(png_response, cache):
+    """Тест кэша: свежая миниатюра не требует запроса"""
+    session = Mock()
+    session.get.return_value = png_response
+    service = HeadshotService(session=session, cache=cache)
+
+    service.fetch_headshot("1")
+    service.fetch_headshot("1")
+
+    session.get.assert_called_once()
+
+
+def test_stale_thumbnail_revalidated_with_etag(png_response, cache, monkeypatch):
+    """Тест перепроверки: устаревшая миниатюра запрашивается с If-None-Match"""
+    session = Mock()
+    session.get.return_value = png_response
+    service = HeadshotService(session=session, cache=cache)
+    first = service.fetch_headshot("1")
+
+    cache.ttl = -1
+    not_modified = Mock(status_code=304)
+    session.get.return_value = not_modified
+
+    second = service.fetch_headshot("1")
+
+    assert second is first
+    assert session.get.call_args.kwargs['headers'] == {'If-None-Match': '"v1"'}
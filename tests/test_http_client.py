@@ -0,0 +1,85 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.services.http_client import HttpClient, http2_available, telegram_request
+
+
+def test_one_pool_per_host():
+    """Тест: один пул соединений на хост"""
+    client = HttpClient(host_limits={"a.espncdn.com": 8}, default_limit=2)
+
+    cdn = client.session_for("https://a.espncdn.com/i/headshots/1.png")
+    assert client.session_for("https://a.espncdn.com/combiner/i?img=2") is cdn
+    assert cdn.limit == 8
+
+    api = client.session_for("https://lm-api-reads.fantasy.espn.com/apis/v3")
+    assert api is not cdn
+    assert api.limit == 2
+
+
+def test_default_timeout_applied(mocker):
+    """Тест таймаута по умолчанию"""
+    client = HttpClient(timeout=7)
+    pool = client.session_for("https://example.com")
+    request = mocker.patch.object(pool.session, "request")
+
+    client.get("https://example.com/a")
+    client.get("https://example.com/b", timeout=3)
+
+    assert request.call_args_list[0].kwargs["timeout"] == 7
+    assert request.call_args_list[1].kwargs["timeout"] == 3
+
+
+def test_per_host_concurrency_limit(mocker):
+    """Тест ограничения одновременных запросов к хосту"""
+    client = HttpClient(host_limits={"example.com": 2})
+    pool = client.session_for("https://example.com")
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+
+    def fake_request(method, url, **kwargs):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.02)
+        with lock:
+            state["active"] -= 1
+
+    mocker.patch.object(pool.session, "request", side_effect=fake_request)
+
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        list(executor.map(lambda i: client.get(f"https://example.com/{i}"), range(12)))
+
+    assert state["peak"] == 2
+
+
+def test_retry_policy_shared():
+    """Тест: единая политика повторов во всех пулах"""
+    client = HttpClient(retries=5, backoff=0.1)
+    adapter = client.session_for("https://example.com").session.get_adapter("https://example.com/x")
+
+    assert adapter.max_retries.total == 5
+    assert 429 in adapter.max_retries.status_forcelist
+
+
+def test_telegram_request_http_version():
+    """Тест: HTTP/2 для Telegram только при установленном h2"""
+    request = telegram_request(pool_size=4)
+    expected = "2" if http2_available() else "1.1"
+    assert request.http_version == expected
+
+
+def test_rate_limiter_observes_responses(mocker):
+    """Тест: пул сообщает ограничителю об ответах 429"""
+    from src.services.http_client import HostSession
+    from src.services.rate_limiter import AdaptiveRateLimiter
+
+    limiter = AdaptiveRateLimiter("test", rate=100.0, min_rate=1.0, max_rate=100.0, burst=10)
+    pool = HostSession("https://example.com", 2, 5, HttpClient().retry, limiter)
+    response = mocker.Mock(status_code=429, headers={"Retry-After": "0"}, raw=None)
+    mocker.patch.object(pool.session, "request", return_value=response)
+
+    assert pool.get("https://example.com/a") is response
+    assert limiter.throttled == 1
+    assert limiter.rate == 50.0
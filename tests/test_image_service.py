@@ -3,6 +3,7 @@ import os
 from PIL import Image
 import requests
 from src.services.image_service import ImageService
+from src.services.http_client import HttpClient
 from src.config import settings
 from .fixtures.test_data import TEST_TEAM_OF_DAY
 
@@ -42,7 +43,7 @@ def test_get_player_photo_download(image_service, mocker):
     mock_response = mocker.Mock()
     mock_response.content = b'test'
     mock_response.status_code = 200
-    mocker.patch.object(requests, 'get', return_value=mock_response)
+    mocker.patch.object(HttpClient, 'get', return_value=mock_response)
     
     photo_path = image_service.get_player_photo(player_id, player_name)
     assert photo_path is not None
@@ -106,7 +107,7 @@ def test_error_handling(image_service, mocker):
     player_name = "Test Player"
     
     # Мокаем ошибку сети
-    mocker.patch.object(requests, 'get', side_effect=requests.RequestException)
+    mocker.patch.object(HttpClient, 'get', side_effect=requests.RequestException)
     
     photo_path = image_service.get_player_photo(player_id, player_name)
     assert photo_path is None 
\ No newline at end of file
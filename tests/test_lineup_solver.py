@@ -0,0 +1,97 @@
+import itertools
+import random
+
+from src.utils.lineup_solver import eligible_positions, solve_lineup
+
+COMPOSITION = {"C": 1, "LW": 1, "RW": 1, "D": 2, "G": 1}
+
+
+def points_of(player):
+    return player["points"]
+
+
+def positions_of(player):
+    return player["positions"]
+
+
+def team_total(team):
+    return sum(player["points"] for players in team.values() for player in players)
+
+
+def brute_force_total(players, composition):
+    """Полный перебор назначений мест, места могут оставаться пустыми (только для маленьких пулов)"""
+    seats = [position for position, count in composition.items() for _ in range(count)]
+    best = 0.0
+    for chosen in itertools.product([None] + list(range(len(players))), repeat=len(seats)):
+        used = [index for index in chosen if index is not None]
+        if len(used) != len(set(used)):
+            continue
+        if all(index is None or seat in players[index]["positions"] for seat, index in zip(seats, chosen)):
+            best = max(best, sum(players[index]["points"] for index in used))
+    return best
+
+
+def test_eligible_positions_from_slots():
+    """Тест позиций по eligibleSlots ESPN"""
+    assert eligible_positions({"defaultPositionId": 1, "eligibleSlots": [0, 1, 3, 6, 7, 8]}) == {"C", "LW"}
+    assert eligible_positions({"defaultPositionId": 4}) == {"D"}
+    assert eligible_positions({"defaultPositionId": 9, "eligibleSlots": [7]}) == set()
+
+
+def test_multi_position_player_moves_to_better_slot():
+    """Тест: игрок C/LW занимает LW, если это увеличивает сумму"""
+    players = [
+        {"name": "A", "points": 10.0, "positions": {"C", "LW"}},
+        {"name": "B", "points": 9.0, "positions": {"C"}},
+        {"name": "C", "points": 2.0, "positions": {"LW"}},
+    ]
+    team = solve_lineup(players, points_of, positions_of, {"C": 1, "LW": 1})
+    assert [p["name"] for p in team["C"]] == ["B"]
+    assert [p["name"] for p in team["LW"]] == ["A"]
+
+
+def test_player_used_once_and_unfillable_slots_empty():
+    """Тест: игрок занимает одно место; места без кандидатов остаются пустыми"""
+    players = [
+        {"name": "A", "points": 10.0, "positions": {"C", "LW", "RW"}},
+        {"name": "D1", "points": 3.0, "positions": {"D"}},
+    ]
+    team = solve_lineup(players, points_of, positions_of, COMPOSITION)
+    assert sum(len(p) for p in team.values()) == 2
+    assert [p["name"] for p in team["D"]] == ["D1"]
+    assert team["G"] == []
+
+
+def test_matches_brute_force():
+    """Тест: решение оптимально на случайных маленьких пулах"""
+    rng = random.Random(7)
+    composition = {"C": 1, "LW": 1, "RW": 1, "D": 2}
+    for _ in range(15):
+        players = []
+        for _ in range(7):
+            positions = set(rng.sample(["C", "LW", "RW", "D"], rng.randint(1, 2)))
+            players.append({"points": float(rng.randint(0, 20)), "positions": positions})
+        team = solve_lineup(players, points_of, positions_of, composition)
+        assert team_total(team) == brute_force_total(players, composition)
+        chosen = [id(p) for players_ in team.values() for p in players_]
+        assert len(chosen) == len(set(chosen))
+
+
+def test_large_pool_matches_pruned_brute_force():
+    """Тест: отсечение кандидатов не теряет оптимум на большом пуле"""
+    rng = random.Random(11)
+    players = [
+        {"points": round(rng.uniform(0, 20), 1), "positions": set(rng.sample(list(COMPOSITION), rng.randint(1, 2)))}
+        for _ in range(1000)
+    ]
+    team = solve_lineup(players, points_of, positions_of, COMPOSITION)
+    assert sum(len(p) for p in team.values()) == 6
+    # Оптимум не хуже жадного выбора по позициям
+    greedy = 0.0
+    used = set()
+    for position, count in COMPOSITION.items():
+        pool = sorted((p for p in players if position in p["positions"] and id(p) not in used),
+                      key=points_of, reverse=True)[:count]
+        used.update(id(p) for p in pool)
+        greedy += sum(p["points"] for p in pool)
+    assert team_total(team) >= greedy
@@ -0,0 +1,133 @@
+from src.services.period_batch import build_period_filter, fetch_periods, split_by_period
+
+
+def make_player(player_id, points_by_period):
+    return {
+        'player': {
+            'id': player_id,
+            'fullName': f'Player {player_id}',
+            'defaultPositionId': 1,
+            'stats': [
+                {'scoringPeriodId': period_id, 'appliedTotal': points}
+                for period_id, points in points_by_period.items()
+            ]
+        }
+    }
+
+
+def test_single_period_filter_matches_legacy_request():
+    """Тест: фильтр для одного дня совпадает с прежним запросом"""
+    filters = build_period_filter([42])
+
+    assert filters == {
+        "players": {
+            "filterSlotIds": {"value": [0, 6, 1, 2, 4, 5]},
+            "filterStatsForCurrentSeasonScoringPeriodId": {"value": [42]},
+            "sortAppliedStatTotalForScoringPeriodId": {"sortAsc": False, "sortPriority": 2, "value": 42},
+            "limit": 100
+        }
+    }
+
+
+def test_multi_period_filter_pages_by_offset():
+    """Тест фильтра для нескольких дней со смещением страницы"""
+    players_filter = build_period_filter([1, 2, 3], limit=50, offset=100)["players"]
+
+    assert players_filter["filterStatsForCurrentSeasonScoringPeriodId"] == {"value": [1, 2, 3]}
+    assert players_filter["limit"] == 50
+    assert players_filter["offset"] == 100
+    # Стабильный порядок страниц
+    assert players_filter["sortAppliedStatTotalForScoringPeriodId"]["value"] == 1
+
+
+def test_split_by_period_ranks_each_day():
+    """Тест раскладки ответа на рейтинги по дням"""
+    players = [
+        make_player(1, {10: 1.0, 11: 9.0}),
+        make_player(2, {10: 5.0}),
+        make_player(3, {10: 3.0, 11: 2.0}),
+    ]
+
+    periods = split_by_period(players, [10, 11], limit=2)
+
+    assert [p['player']['id'] for p in periods[10]['players']] == [2, 3]
+    assert [p['player']['id'] for p in periods[11]['players']] == [1, 3]
+    # В записи остается только статистика за свой день
+    assert periods[11]['players'][0]['player']['stats'] == [{'scoringPeriodId': 11, 'appliedTotal': 9.0}]
+    # Исходные записи не изменяются
+    assert len(players[0]['player']['stats']) == 2
+
+
+def test_split_by_period_prefers_actual_stats():
+    """Тест: фактическая и прогнозная статистика за день дают одну запись игрока"""
+    player = make_player(1, {})
+    player['player']['stats'] = [
+        {'scoringPeriodId': 10, 'statSourceId': 1, 'appliedTotal': 9.0},
+        {'scoringPeriodId': 10, 'statSourceId': 0, 'appliedTotal': 10.0},
+        {'scoringPeriodId': 11, 'statSourceId': 1, 'appliedTotal': 4.0},
+    ]
+
+    periods = split_by_period([player, make_player(2, {10: 9.5})], [10, 11])
+
+    assert [p['player']['id'] for p in periods[10]['players']] == [1, 2]
+    assert periods[10]['players'][0]['player']['stats'] == [
+        {'scoringPeriodId': 10, 'statSourceId': 0, 'appliedTotal': 10.0}
+    ]
+    assert [p['player']['stats'][0]['appliedTotal'] for p in periods[11]['players']] == [4.0]
+
+
+def test_fetch_periods_with_paging():
+    """Тест постраничной загрузки нескольких дней"""
+    pool = [make_player(i, {1: float(i), 2: float(-i)}) for i in range(5)]
+    requests_made = []
+
+    def request(filters):
+        players_filter = filters['players']
+        requests_made.append(players_filter)
+        offset = players_filter.get('offset', 0)
+        return {'players': pool[offset:offset + players_filter['limit']]}
+
+    periods, missing = fetch_periods(request, [2, 1], page_size=2, max_pages=5, limit=3)
+
+    assert len(requests_made) == 3
+    assert missing == []
+    assert [p['player']['id'] for p in periods[1]['players']] == [4, 3, 2]
+    assert [p['player']['id'] for p in periods[2]['players']] == [0, 1, 2]
+
+
+def test_fetch_periods_counts_shifted_player_once():
+    """Тест: игрок, попавший на две страницы, учитывается один раз"""
+    pages = [
+        [make_player(1, {1: 5.0}), make_player(2, {1: 4.0})],
+        [make_player(2, {1: 4.0})],
+    ]
+
+    def request(filters):
+        return {'players': pages[filters['players'].get('offset', 0) // 2]}
+
+    periods, missing = fetch_periods(request, [1, 2], page_size=2, max_pages=2)
+
+    assert [p['player']['id'] for p in periods[1]['players']] == [1, 2]
+    assert missing == [2]
+
+
+def test_fetch_periods_falls_back_when_truncated():
+    """Тест: обрезанный лимитом ответ отправляет все дни на загрузку по одному"""
+    def request(filters):
+        return {'players': [make_player(i, {1: 1.0}) for i in range(filters['players']['limit'])]}
+
+    periods, missing = fetch_periods(request, [1, 2], page_size=2, max_pages=2)
+
+    assert periods == {}
+    assert missing == [1, 2]
+
+
+def test_fetch_periods_reports_empty_and_failed_days():
+    """Тест: дни без игроков и неудачные запросы загружаются отдельно"""
+    periods, missing = fetch_periods(lambda filters: {'players': [make_player(1, {1: 2.0})]}, [1, 2])
+    assert list(periods) == [1]
+    assert missing == [2]
+
+    periods, missing = fetch_periods(lambda filters: None, [3, 4])
+    assert periods == {}
+    assert missing == [3, 4]
@@ -0,0 +1,110 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.services.period_trigger import PeriodTrigger
+from src.services.schedule_index import ScheduleIndex
+
+# Матчи: день 1 - до 20:00 UTC, день 2 - без матчей, день 3 - до 23:00 UTC
+DAY1 = datetime(2024, 10, 4, 17, 0, tzinfo=timezone.utc)
+DAY3 = datetime(2024, 10, 6, 20, 0, tzinfo=timezone.utc)
+
+
+def millis(moment):
+    return int(moment.timestamp() * 1000)
+
+
+@pytest.fixture
+def schedule(monkeypatch):
+    from src.services import schedule_index
+    monkeypatch.setattr(schedule_index.settings, "GAME_DURATION_MINUTES", 180)
+    games = {
+        "1": [{"id": 1, "homeProTeamId": 1, "awayProTeamId": 2, "date": millis(DAY1)}],
+        "3": [{"id": 3, "homeProTeamId": 1, "awayProTeamId": 2, "date": millis(DAY3)}],
+    }
+    return ScheduleIndex.from_schedule({"settings": {"proTeams": [{"id": 1, "proGamesByScoringPeriod": games}]}})
+
+
+@pytest.fixture
+def trigger(tmp_path, schedule):
+    return PeriodTrigger(tmp_path / "published.json", schedule=schedule, grace_minutes=30, lookback=2, season=2025)
+
+
+def test_final_by_game_state_or_estimate(trigger):
+    before_end = DAY1 + timedelta(hours=3)
+    after_grace = DAY1 + timedelta(hours=3, minutes=30)
+
+    assert not trigger.is_final(1, current_period=1, now=before_end)
+    assert trigger.is_final(1, current_period=1, now=after_grace)
+    assert trigger.is_final(1, current_period=2, now=before_end)
+
+
+def test_ready_periods_skip_no_game_and_published(trigger):
+    now = DAY3 + timedelta(hours=4)
+
+    assert trigger.ready_periods(current_period=3, now=now) == [1, 3]
+    trigger.mark_published(1)
+    assert trigger.ready_periods(current_period=3, now=now) == [3]
+
+
+def test_published_state_persists(trigger, tmp_path, schedule):
+    trigger.mark_published(3)
+
+    assert json.loads((tmp_path / "published.json").read_text()) == {"season": "2025", "published": [3]}
+    assert PeriodTrigger(tmp_path / "published.json", schedule=schedule, season="2025").published == {3}
+
+
+def test_published_state_is_per_season(trigger, tmp_path, schedule):
+    trigger.mark_published(1)
+
+    next_season = PeriodTrigger(tmp_path / "published.json", schedule=schedule, season=2026)
+    assert next_season.published == set()
+    assert next_season.ready_periods(current_period=3, now=DAY3 + timedelta(hours=4)) == [1, 3]
+
+    next_season.mark_published(1)
+    assert json.loads((tmp_path / "published.json").read_text()) == {"season": "2026", "published": [1]}
+
+
+def test_next_check_waits_for_estimated_end(trigger):
+    now = DAY3
+    trigger.mark_published(1)
+
+    assert trigger.next_check(current_period=3, now=now) == pytest.approx(3.5 * 3600)
+
+
+def test_run_processes_each_period_once(trigger):
+    moments = iter([
+        DAY3 + timedelta(hours=1),   # день 3 еще идет, день 1 уже завершен
+        DAY3 + timedelta(hours=1),
+        DAY3 + timedelta(hours=4),   # день 3 завершен по расчету
+        DAY3 + timedelta(hours=4),
+    ])
+    processed, sleeps = [], []
+
+    async def process(period):
+        processed.append(period)
+        return True
+
+    async def sleep(delay):
+        sleeps.append(delay)
+        if len(sleeps) == 2:
+            raise asyncio.CancelledError
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(trigger.run(process, clock=lambda: next(moments), sleep=sleep, refresh=lambda: 3))
+
+    assert processed == [1, 3]
+    assert sleeps[0] == pytest.approx(2.5 * 3600)
+    assert trigger.published == {1, 3}
+
+
+def test_run_once_retries_failed_period(trigger):
+    async def fail(period):
+        return False
+
+    result = asyncio.run(trigger.run(fail, once=True, clock=lambda: DAY3, refresh=lambda: 3))
+
+    assert result == []
+    assert trigger.published == set()
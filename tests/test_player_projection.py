@@ -0,0 +1,116 @@
+import io
+import json
+from unittest.mock import Mock
+
+import pytest
+
+from src.services import player_projection
+from src.services.player_projection import project_entry, project_players, read_players
+
+
+def espn_entry(player_id):
+    return {
+        "id": player_id,
+        "onTeamId": 3,
+        "draftAuctionValue": 0,
+        "ratings": {"0": {"positionalRanking": 5, "totalRating": 12.5}},
+        "player": {
+            "id": player_id,
+            "fullName": f"Игрок {player_id}",
+            "defaultPositionId": 4,
+            "proTeamId": 7,
+            "eligibleSlots": [4, 6, 7],
+            "ownership": {"percentOwned": 55.1},
+            "rankings": {"0": [{"rank": 1}]},
+            "stats": [
+                {
+                    "scoringPeriodId": 12,
+                    "seasonId": 2025,
+                    "statSourceId": 0,
+                    "statSplitTypeId": 5,
+                    "appliedTotal": 4.5,
+                    "stats": {"0": 1.0, "1": 2.0},
+                    "appliedStats": {"0": 2.0},
+                },
+                {"scoringPeriodId": 12, "stats": {"0": 1.0}},
+            ],
+        },
+    }
+
+
+class FakeRaw(io.BytesIO):
+    """Поток тела ответа в стиле urllib3 (stream=True)"""
+    decode_content = False
+
+
+def streamed_response(payload):
+    response = Mock(spec=["raw", "_content_consumed", "json", "close"])
+    response.raw = FakeRaw(json.dumps(payload).encode("utf-8"))
+    response._content_consumed = False
+    return response
+
+
+def test_project_entry_keeps_only_required_fields():
+    entry = project_entry(espn_entry(1))
+
+    assert entry == {
+        "id": 1,
+        "onTeamId": 3,
+        "player": {
+            "id": 1,
+            "fullName": "Игрок 1",
+            "defaultPositionId": 4,
+            "proTeamId": 7,
+            "eligibleSlots": [4, 6, 7],
+            "stats": [
+                {
+                    "scoringPeriodId": 12,
+                    "seasonId": 2025,
+                    "statSourceId": 0,
+                    "statSplitTypeId": 5,
+                    "appliedTotal": 4.5,
+                }
+            ],
+        },
+    }
+
+
+@pytest.mark.skipif(not player_projection.streaming_available(), reason="ijson не установлен")
+def test_streaming_matches_full_parse():
+    payload = {"players": [espn_entry(i) for i in range(5)], "positionAgainstOpponent": {}}
+    response = streamed_response(payload)
+
+    result = read_players(response)
+
+    assert result == project_players(payload)
+    assert response.raw.decode_content is True
+    response.json.assert_not_called()
+    response.close.assert_called_once()
+
+
+@pytest.mark.skipif(not player_projection.streaming_available(), reason="ijson не установлен")
+def test_streaming_invalid_json_raises_value_error():
+    response = streamed_response({})
+    response.raw = FakeRaw(b'{"players": [{"id": 1,')
+
+    with pytest.raises(ValueError):
+        read_players(response)
+    response.close.assert_called_once()
+
+
+def test_fallback_to_full_parse():
+    payload = {"players": [espn_entry(1)]}
+    response = Mock()
+    response.json.return_value = payload
+
+    assert read_players(response) == project_players(payload)
+    response.close.assert_called_once()
+
+
+def test_fallback_without_ijson(monkeypatch):
+    monkeypatch.setattr(player_projection, "ijson", None)
+    payload = {"players": [espn_entry(1)]}
+    response = streamed_response(payload)
+    response.json.return_value = payload
+
+    assert read_players(response) == project_players(payload)
@@ -0,0 +1,74 @@
+from datetime import datetime
+
+import pytest
+
+from src.services.stats_service import StatsService
+from src.utils.player_record import PlayerDay
+
+
+def espn_player(player_id=1, position_id=4, team_id=7):
+    return {"id": player_id, "fullName": f"Игрок {player_id}", "defaultPositionId": position_id, "proTeamId": team_id}
+
+
+def test_record_has_no_instance_dict():
+    player = PlayerDay.from_espn(espn_player(), 3.5)
+
+    assert not hasattr(player, "__dict__")
+    with pytest.raises(AttributeError):
+        player.extra = 1
+
+
+def test_from_espn_and_lazy_fields():
+    player = PlayerDay.from_espn(espn_player(42, 2, 10), 7.25, grade="rare")
+
+    assert (player.id, player.name, player.position_id, player.team_id) == ("42", "Игрок 42", 2, "10")
+    assert player.position == "LW"
+    assert player.points == 7.25
+    assert player.grade == "rare"
+    assert "/players/full/42.png" in player.image_url
+
+
+def test_legacy_key_access():
+    player = PlayerDay.from_espn(espn_player(5, 1), 4.0)
+
+    assert player["info"] == {"id": "5", "name": "Игрок 5", "primary_position": 1, "team_id": "7", "position": "C"}
+    assert player["stats"] == {"total_points": 4.0}
+    assert player["appliedTotal"] == 4.0
+    assert player.get("grade") == "common"
+    assert player.get("missing", "x") == "x"
+    with pytest.raises(KeyError):
+        player["missing"]
+
+
+def test_dict_round_trip():
+    player = PlayerDay.from_espn(espn_player(9, 5), 12.0)
+
+    assert PlayerDay.from_dict(player.to_dict()) == player
+    assert player.copy(points=1.0).points == 1.0
+    assert player.points == 12.0
+
+
+def test_process_daily_stats_returns_records():
+    data = {
+        "players": [
+            {"player": espn_player(1, 1), "stats": [{"appliedTotal": 5.5}]},
+            {"player": espn_player(2, 4), "stats": [{"appliedTotal": 0}]},
+            {"player": espn_player(3, 9), "stats": [{"appliedTotal": 3.0}]},
+            {"player": espn_player(4, 5), "stats": []},
+        ]
+    }
+    processed = StatsService._process_daily_stats(None, data, datetime(2024, 10, 10))
+
+    assert processed["date"] == "2024-10-10"
+    assert processed["players"] == [PlayerDay("1", "Игрок 1", 1, "7", 5.5)]
+
+
+def test_cache_round_trip_keeps_other_shapes():
+    processed = {"date": "2024-10-10", "players": [PlayerDay("1", "Игрок 1", 1, "7", 5.5)]}
+    cached = StatsService._to_cache(processed)
+
+    assert cached["players"] == [processed["players"][0].to_dict()]
+    assert StatsService._from_cache(cached) == processed
+
+    legacy = {"players": {"123": {"name": "Test"}}}
+    assert StatsService._from_cache(legacy) is legacy
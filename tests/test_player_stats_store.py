@@ -0,0 +1,97 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from src.services.player_stats_store import (
+    PlayerStatsStore, calculate_grade, changed_weeks, get_week_key, week_fingerprint
+)
+
+
+@pytest.fixture
+def stats_file(tmp_path):
+    return tmp_path / "player_stats.json"
+
+
+def test_week_key_starts_on_tuesday():
+    """Тест ключа недели: неделя со вторника по понедельник"""
+    assert get_week_key(datetime(2024, 10, 8)) == "2024-10-08_2024-10-14"
+    assert get_week_key(datetime(2024, 10, 14)) == "2024-10-08_2024-10-14"
+    assert get_week_key(datetime(2024, 10, 15)) == "2024-10-15_2024-10-21"
+
+
+def test_calculate_grade():
+    """Тест расчета грейда"""
+    assert [calculate_grade(n) for n in range(1, 7)] == [
+        "common", "uncommon", "rare", "epic", "legend", "legend"
+    ]
+
+
+def test_record_selection_in_memory(stats_file):
+    """Тест применения выборов в памяти без записи на диск"""
+    store = PlayerStatsStore(str(stats_file)).load()
+
+    store.record_selection("1", "Player", "2024-10-08", 5.0, "C", team_of_the_day=True)
+    grade = store.record_selection("1", "Player", "2024-10-09", 3.0, "C", team_of_the_day=True)
+
+    assert grade == "uncommon"
+    assert not stats_file.exists()
+
+    player = store.get_week_players("2024-10-08_2024-10-14")["1"]
+    assert player["total_points"] == 8.0
+    assert player["team_of_the_day_dates"] == ["C:2024-10-08", "C:2024-10-09"]
+    assert player["position_appearances"] == {"C": 2}
+
+
+def test_duplicate_date_is_ignored(stats_file):
+    """Тест повторной обработки даты"""
+    store = PlayerStatsStore(str(stats_file)).load()
+
+    store.record_selection("1", "Player", "2024-10-08", 5.0, "C", team_of_the_day=True)
+    store.record_selection("1", "Player", "2024-10-08", 5.0, "C", team_of_the_day=True)
+
+    player = store.get_week_players("2024-10-08_2024-10-14")["1"]
+    assert player["team_of_the_day_count"] == 1
+    assert player["total_points"] == 5.0
+
+
+def test_flush_writes_once_and_roundtrips(stats_file):
+    """Тест атомарной записи: один файл без временных остатков"""
+    store = PlayerStatsStore(str(stats_file)).load()
+    for day in range(8, 15):
+        store.record_selection("1", "Player", f"2024-10-{day:02d}", 1.0, "D", team_of_the_day=True)
+
+    assert store.flush() is True
+    assert store.flush() is False
+    assert [p.name for p in stats_file.parent.iterdir()] == ["player_stats.json"]
+
+    with open(stats_file) as f:
+        data = json.load(f)
+    assert data["weeks"]["2024-10-08_2024-10-14"]["players"]["1"]["grade"] == "legend"
+
+    reloaded = PlayerStatsStore(str(stats_file)).load()
+    assert reloaded.get_grade("2024-10-08_2024-10-14", "1") == "legend"
+    assert reloaded.get_grade("2024-10-08_2024-10-14", "2") == "common"
+
+
+def test_changed_weeks_by_fingerprint():
+    """Тест отбора новых и изменившихся недель по отпечаткам"""
+    weeks = {
+        "2024-10-08_2024-10-14": {"players": {"1": {"name": "A", "total_points": 5.0}}},
+        "2024-10-15_2024-10-21": {"players": {"2": {"name": "B", "total_points": 3.0}}},
+        "2024-10-22_2024-10-28": {"players": {}},
+    }
+    first = changed_weeks(weeks, {})
+    assert [week_key for week_key, _ in first] == ["2024-10-08_2024-10-14", "2024-10-15_2024-10-21"]
+
+    fingerprints = dict(first)
+    assert changed_weeks(weeks, fingerprints) == []
+
+    weeks["2024-10-15_2024-10-21"]["players"]["2"]["total_points"] = 4.0
+    assert [week_key for week_key, _ in changed_weeks(weeks, fingerprints)] == ["2024-10-15_2024-10-21"]
+
+
+def test_week_fingerprint_ignores_key_order():
+    """Тест: отпечаток не зависит от порядка ключей"""
+    assert week_fingerprint({"1": {"a": 1, "b": 2}}) == week_fingerprint({"1": {"b": 2, "a": 1}})
+    assert week_fingerprint({"1": {"a": 1}}) != week_fingerprint({"1": {"a": 2}})
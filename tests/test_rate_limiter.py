@@ -0,0 +1,162 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+import requests
+from telegram.error import BadRequest, Forbidden, NetworkError, RetryAfter, TimedOut
+
+from src.services.rate_limiter import AdaptiveRateLimiter, is_retryable, parse_retry_after, run_limited
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_limiter(clock, **kwargs):
+    params = dict(rate=2.0, min_rate=0.5, max_rate=4.0, burst=2, increase=1.0)
+    params.update(kwargs)
+    return AdaptiveRateLimiter("test", clock=clock, **params)
+
+
+def test_token_bucket_allows_burst_then_paces(clock):
+    """Тест: ведро выдает burst запросов сразу, затем по скорости"""
+    limiter = make_limiter(clock)
+
+    assert limiter.reserve() == 0
+    assert limiter.reserve() == 0
+    assert limiter.reserve() == pytest.approx(0.5)
+
+    clock.now = 10.0
+    assert limiter.reserve() == 0
+
+
+def test_success_increases_rate_up_to_max(clock):
+    """Тест аддитивного увеличения скорости"""
+    limiter = make_limiter(clock)
+    for _ in range(5):
+        limiter.on_success()
+    assert limiter.rate == 4.0
+
+
+def test_throttle_halves_rate_and_honours_retry_after(clock):
+    """Тест: 429 снижает скорость, Retry-After приостанавливает выдачу"""
+    limiter = make_limiter(clock)
+    limiter.observe(429, {"Retry-After": "3"})
+
+    assert limiter.rate == 1.0
+    assert limiter.throttled == 1
+    assert limiter.reserve() == pytest.approx(3.0)
+
+    limiter.on_throttle()
+    limiter.on_throttle()
+    assert limiter.rate == 0.5
+
+
+def test_throttle_delays_next_request_with_growing_backoff(clock):
+    """Тест: после ограничения следующий запрос ждет, пауза растет с каждым ограничением"""
+    limiter = make_limiter(clock, min_rate=0.1, burst=4)
+
+    limiter.on_throttle()
+    assert limiter.reserve() == pytest.approx(1.0)
+
+    clock.now = 1.0
+    limiter.on_throttle()
+    assert limiter.reserve() == pytest.approx(2.0)
+
+
+def test_observe_retried_statuses(clock):
+    """Тест: повторы транспорта на 429 тоже учитываются"""
+    limiter = make_limiter(clock)
+    limiter.observe(200, {}, retried_statuses=[429])
+    assert limiter.rate == 1.0
+
+    limiter.observe(200, {})
+    assert limiter.rate == 2.0
+
+
+def test_parse_retry_after():
+    """Тест разбора Retry-After"""
+    assert parse_retry_after("5") == 5.0
+    assert parse_retry_after(7) == 7.0
+    assert parse_retry_after(timedelta(seconds=2)) == 2.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+
+
+def test_run_limited_retries_after_retry_after():
+    """Тест: ошибка с retry_after снижает скорость и вызов повторяется"""
+    limiter = AdaptiveRateLimiter("telegram", rate=100.0, min_rate=1.0, max_rate=100.0, burst=5)
+    calls = []
+
+    class RetryAfter(Exception):
+        retry_after = 0.01
+
+    async def call():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RetryAfter()
+        return "ok"
+
+    assert asyncio.run(run_limited(limiter, call)) == "ok"
+    assert len(calls) == 2
+    assert limiter.throttled == 1
+
+
+def test_run_limited_raises_after_attempts():
+    """Тест: после исчерпания попыток ошибка пробрасывается"""
+    limiter = AdaptiveRateLimiter("telegram", rate=1000.0, min_rate=500.0, max_rate=1000.0, burst=5)
+
+    calls = []
+
+    async def call():
+        calls.append(1)
+        raise ConnectionError("down")
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(run_limited(limiter, call, attempts=2))
+    assert len(calls) == 2
+
+
+def test_run_limited_does_not_retry_request_errors():
+    """Тест: ошибка запроса пробрасывается сразу и не снижает скорость"""
+    limiter = AdaptiveRateLimiter("telegram", rate=100.0, min_rate=1.0, max_rate=100.0, burst=5)
+    calls = []
+
+    async def call():
+        calls.append(1)
+        raise BadRequest("Can't parse entities: can't find end of the entity")
+
+    with pytest.raises(BadRequest):
+        asyncio.run(run_limited(limiter, call))
+    assert len(calls) == 1
+    assert limiter.throttled == 0
+    assert limiter.rate == 100.0
+
+
+def test_is_retryable():
+    """Тест разделения временных ошибок и ошибок запроса"""
+    def http_error(status):
+        response = requests.Response()
+        response.status_code = status
+        return requests.HTTPError(response=response)
+
+    assert is_retryable(RetryAfter(3))
+    assert is_retryable(TimedOut())
+    assert is_retryable(NetworkError("connection reset"))
+    assert is_retryable(requests.ConnectionError())
+    assert is_retryable(http_error(503))
+    assert is_retryable(http_error(429))
+    assert not is_retryable(BadRequest("Wrong file identifier"))
+    assert not is_retryable(Forbidden("bot was blocked"))
+    assert not is_retryable(http_error(404))
+    assert not is_retryable(ValueError("bad data"))
@@ -0,0 +1,82 @@
+import asyncio
+import os
+
+from src.services.render_cache import RenderCache, render_key
+from src.services.render_service import RenderService
+
+
+def test_render_key_covers_displayed_fields():
+    players = [("1", "C: Player (10.00 ftps)", "gold"), ("2", "G: Goalie (5.00 ftps)", "common")]
+    key = render_key("vertical", "Команда дня 2025-01-15", players, font="a.ttf")
+
+    assert key == render_key("vertical", "Команда дня 2025-01-15", [list(p) for p in players], font="a.ttf")
+    assert key != render_key("lineup", "Команда дня 2025-01-15", players, font="a.ttf")
+    assert key != render_key("vertical", "Команда дня 2025-01-16", players, font="a.ttf")
+    assert key != render_key("vertical", "Команда дня 2025-01-15", players[::-1], font="a.ttf")
+    assert key != render_key("vertical", "Команда дня 2025-01-15", [players[0], ("2", "G: Goalie (5.00 ftps)", "rare")], font="a.ttf")
+    assert key != render_key("vertical", "Команда дня 2025-01-15", players, font="b.ttf")
+    assert key != render_key("vertical", "Команда дня 2025-01-15", players, font="a.ttf", format="PNG")
+
+
+def test_memory_only_cache_is_bounded(tmp_path):
+    cache = RenderCache(tmp_path, max_bytes=0, memory_bytes=10)
+
+    cache.put("a", b"12345")
+    cache.put("b", b"12345")
+    assert cache.get("a") == b"12345"
+    cache.put("c", b"12345")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"12345" and cache.get("c") == b"12345"
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_disk_cache_shared_between_instances(tmp_path):
+    RenderCache(tmp_path, max_bytes=1000, memory_bytes=0).put("key", b"collage")
+
+    other = RenderCache(tmp_path, max_bytes=1000, memory_bytes=0)
+
+    assert other.get("key") == b"collage"
+    assert other.stats()["hits"] == 1
+
+
+def test_disk_eviction_removes_least_recent(tmp_path):
+    cache = RenderCache(tmp_path, max_bytes=25, memory_bytes=0)
+    cache.put("old", b"x" * 10)
+    cache.put("used", b"x" * 10)
+    os.utime(tmp_path / "old.bin", (1, 1))
+    os.utime(tmp_path / "used.bin", (2, 2))
+    assert cache.get("used") is not None
+
+    cache.put("new", b"x" * 10)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["new.bin", "used.bin"]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_render_job_uses_cache(tmp_path):
+    cache = RenderCache(tmp_path, max_bytes=1000, memory_bytes=1000)
+    prepared = []
+
+    def prepare():
+        prepared.append(1)
+        return ("collage",), True
+
+    async def run():
+        renderer = RenderService(workers=0)
+        first = await renderer.render_job("k", prepare, str.encode, cache)
+        second = await renderer.render_job("k", prepare, str.encode, cache)
+        return first, second
+
+    assert asyncio.run(run()) == (b"collage", b"collage")
+    assert prepared == [1]
+
+
+def test_render_job_skips_incomplete(tmp_path):
+    cache = RenderCache(tmp_path, max_bytes=1000, memory_bytes=1000)
+
+    async def run():
+        return await RenderService(workers=0).render_job("k", lambda: (("partial",), False), str.encode, cache)
+
+    assert asyncio.run(run()) == b"partial"
+    assert cache.get("k") is None
@@ -0,0 +1,78 @@
+import asyncio
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+from PIL import Image
+
+from src.services import render_service
+from src.services.collage_template import lineup_grid_template, vertical_template
+from src.services.render_service import RenderService, pack_image, render_lineup, render_vertical, unpack_image
+
+
+def _rows():
+    photo = pack_image(Image.new("RGB", (130, 100), "red"))
+    return [(photo, "C: Player One (10.00 ftps)", "blue"), (None, "G: Player Two (5.00 ftps)", "black")]
+
+
+def test_pack_roundtrip():
+    image = Image.new("RGBA", (4, 3), (1, 2, 3, 4))
+
+    packed = pack_image(image)
+
+    assert pack_image(None) is None and unpack_image(None) is None
+    assert unpack_image(packed).tobytes() == image.tobytes()
+    assert unpack_image(packed).mode == "RGBA"
+
+
+def test_render_vertical():
+    data = render_vertical("Команда дня 2025-01-15", _rows(), "PNG")
+
+    with Image.open(BytesIO(data)) as image:
+        assert image.size == vertical_template(2).size
+        assert image.getpixel(vertical_template(2).slots[0]) == (255, 0, 0)
+        # Без фото - серая заглушка
+        assert image.getpixel(vertical_template(2).slots[1]) == (128, 128, 128)
+
+
+def test_render_lineup():
+    data = render_lineup({"C": pack_image(Image.new("RGB", (130, 100), "red"))})
+
+    with Image.open(BytesIO(data)) as image:
+        template = lineup_grid_template()
+        assert image.size == template.size and image.mode == "RGBA"
+        assert image.getpixel(template.slots["C"]) == (255, 0, 0, 255)
+        assert image.getpixel(template.slots["G"])[3] == 0
+
+
+def test_process_pool_matches_inline():
+    async def run():
+        with RenderService(workers=2) as renderer:
+            renders = [renderer.submit(render_vertical, "Title", _rows()) for _ in range(3)]
+            return await asyncio.gather(*renders)
+
+    inline = render_vertical("Title", _rows())
+
+    assert asyncio.run(run()) == [inline] * 3
+
+
+def test_without_workers_renders_in_thread():
+    renderer = RenderService(workers=0)
+
+    assert asyncio.run(renderer.render(render_lineup, {})) == render_lineup({})
+    assert renderer._pool is None
+
+
+def test_broken_pool_falls_back(monkeypatch):
+    renderer = RenderService(workers=1)
+
+    class BrokenPool:
+        def submit(self, *args, **kwargs):
+            raise BrokenProcessPool("worker died")
+
+        def shutdown(self, *args, **kwargs):
+            pass
+
+    monkeypatch.setattr(render_service, "ProcessPoolExecutor", lambda max_workers: BrokenPool())
+
+    assert asyncio.run(renderer.render(render_lineup, {})) == render_lineup({})
+    assert renderer.workers == 0
@@ -0,0 +1,119 @@
+import gzip
+import json
+
+import pytest
+
+from src.services import game_state
+from src.services.response_archive import ResponseArchive, filter_hash, period_label
+
+
+@pytest.fixture
+def game_state_file(tmp_path, monkeypatch):
+    path = tmp_path / "kona_game_state.json"
+    path.write_text(json.dumps({"currentScoringPeriod": {"id": 10}}))
+    monkeypatch.setattr(game_state.settings, "GAME_STATE_FILE", path)
+    return path
+
+
+@pytest.fixture
+def archive(tmp_path, game_state_file):
+    return ResponseArchive(tmp_path / "archive", mode="record")
+
+
+FILTERS = {"players": {"filterStatsForCurrentSeasonScoringPeriodId": {"value": [5]}, "limit": 100}}
+RESPONSE = {"players": [{"player": {"id": 1, "fullName": "Player"}}]}
+
+
+def test_filter_hash_ignores_key_order():
+    """Тест: хэш фильтра не зависит от порядка ключей"""
+    assert filter_hash({"a": 1, "b": [1, 2]}) == filter_hash({"b": [1, 2], "a": 1})
+    assert filter_hash({"a": 1}) != filter_hash({"a": 2})
+
+
+def test_period_label():
+    """Тест имени дня в ключе архива"""
+    assert period_label(5) == "5"
+    assert period_label([7]) == "7"
+    assert period_label([3, 1, 2]) == "1-3"
+
+
+def test_is_period_final(game_state_file):
+    """Тест: завершены только дни раньше currentScoringPeriod"""
+    assert game_state.get_current_scoring_period(game_state_file) == 10
+    assert game_state.is_period_final(9, game_state_file)
+    assert not game_state.is_period_final(10, game_state_file)
+
+
+def test_put_get_roundtrip_is_content_addressed(archive):
+    """Тест: одинаковые ответы хранятся одним сжатым блоком"""
+    digest = archive.put(1, 2025, 5, FILTERS, RESPONSE)
+    same = archive.put(1, 2025, 6, {"other": True}, RESPONSE)
+
+    assert digest == same
+    assert archive.get(1, 2025, 5, FILTERS) == RESPONSE
+    assert archive.get(1, 2025, 6, {"other": True}) == RESPONSE
+    assert archive.get(1, 2025, 7, FILTERS) is None
+
+    blobs = list((archive.root / "blobs").rglob("*.json.gz"))
+    assert len(blobs) == 1
+    assert json.loads(gzip.decompress(blobs[0].read_bytes())) == RESPONSE
+
+
+def test_record_stores_only_final_periods(archive):
+    """Тест: в режиме record сохраняются только завершенные дни"""
+    calls = []
+
+    def fetcher():
+        calls.append(1)
+        return RESPONSE
+
+    assert archive.fetch(1, 2025, 5, FILTERS, fetcher) == RESPONSE
+    assert archive.fetch(1, 2025, 10, FILTERS, fetcher) == RESPONSE
+    assert archive.fetch(1, 2025, 5, FILTERS, fetcher) == RESPONSE
+
+    assert len(calls) == 3
+    assert archive.get(1, 2025, 5, FILTERS) == RESPONSE
+    assert archive.get(1, 2025, 10, FILTERS) is None
+
+
+def test_replay_and_offline(archive):
+    """Тест режимов replay и offline"""
+    archive.put(1, 2025, 5, FILTERS, RESPONSE)
+
+    def fail():
+        raise AssertionError("запрос к сети не ожидался")
+
+    archive.mode = "replay"
+    assert archive.fetch(1, 2025, 5, FILTERS, fail) == RESPONSE
+    assert archive.fetch(1, 2025, [1, 2], FILTERS, lambda: RESPONSE) == RESPONSE
+    assert archive.get(1, 2025, [1, 2], FILTERS) == RESPONSE
+
+    archive.mode = "offline"
+    assert archive.fetch(1, 2025, 5, FILTERS, fail) == RESPONSE
+    assert archive.fetch(1, 2025, 3, FILTERS, fail) is None
+
+
+def test_corrupted_blob_is_ignored(archive):
+    """Тест: поврежденный блок не возвращается"""
+    digest = archive.put(1, 2025, 5, FILTERS, RESPONSE)
+    blob = archive.root / "blobs" / digest[:2] / f"{digest}.json.gz"
+    blob.write_bytes(gzip.compress(b'{"players": []}'))
+
+    assert archive.get(1, 2025, 5, FILTERS) is None
+
+
+def test_unknown_mode_rejected(tmp_path):
+    """Тест: неизвестный режим архива"""
+    with pytest.raises(ValueError):
+        ResponseArchive(tmp_path, mode="sometimes")
+
+
+def test_missing_league_id_not_archived(archive):
+    """Тест: без ID лиги ответ не записывается под общий ключ"""
+    assert archive.fetch(None, 2025, 5, FILTERS, lambda: RESPONSE, final=True) == RESPONSE
+    assert not (archive.root / "index").exists()
+    with pytest.raises(ValueError):
+        archive.put(None, 2025, 5, FILTERS, RESPONSE)
+
+    archive.mode = "offline"
+    assert archive.fetch(None, 2025, 5, FILTERS, lambda: RESPONSE) is None
@@ -0,0 +1,107 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from src.services import schedule_index
+from src.services.schedule_index import ScheduleIndex, filter_playing, get_schedule_index
+
+# 2024-10-04 17:00 UTC
+START = 1728061200000
+
+
+def game(game_id, home, away, period, date=START):
+    return {"id": game_id, "homeProTeamId": home, "awayProTeamId": away, "scoringPeriodId": period, "date": date}
+
+
+SCHEDULE = {
+    "settings": {
+        "proTeams": [
+            {"id": 1, "proGamesByScoringPeriod": {"1": [game(10, 1, 2, 1)], "3": [game(30, 124292, 1, 3)]}},
+            {"id": 2, "proGamesByScoringPeriod": {"1": [game(10, 1, 2, 1)], "3": [game(31, 2, 5, 3, START + 3600000)]}},
+            {"id": 5, "proGamesByScoringPeriod": {"3": [game(31, 2, 5, 3, START + 3600000)]}},
+            {"id": 124292, "proGamesByScoringPeriod": {"3": [game(30, 124292, 1, 3)]}},
+            {"id": 0, "proGamesByScoringPeriod": {}},
+        ]
+    }
+}
+
+
+@pytest.fixture
+def schedule_file(tmp_path, monkeypatch):
+    path = tmp_path / "TeamShedules.json"
+    path.write_text(json.dumps(SCHEDULE))
+    monkeypatch.setattr(schedule_index.settings, "TEAM_SCHEDULES_FILE", path)
+    monkeypatch.setattr(schedule_index.settings, "SCHEDULE_INDEX_FILE", tmp_path / "schedule_index.bin")
+    monkeypatch.setitem(schedule_index._cached, "key", None)
+    return path
+
+
+def test_index_from_schedule():
+    index = ScheduleIndex.from_schedule(SCHEDULE)
+
+    assert index.has_games(1) and index.has_games(3)
+    assert not index.has_games(2)
+    assert index.has_games(50)  # вне расписания день не пропускается
+    assert index.game_count(1) == 1
+    assert index.game_count(3) == 2
+    assert index.teams_playing(3) == {1, 2, 5, 124292}
+    assert index.team_played(1, 2) and not index.team_played(1, 5)
+    assert index.team_played(3, 124292)
+    assert index.teams_playing(50) is None
+
+
+def test_last_game_end(monkeypatch):
+    monkeypatch.setattr(schedule_index.settings, "GAME_DURATION_MINUTES", 180)
+    index = ScheduleIndex.from_schedule(SCHEDULE)
+
+    assert index.last_game_end(3) == datetime(2024, 10, 4, 21, 0, tzinfo=timezone.utc)
+    assert index.last_game_end(2) is None
+
+
+def test_bytes_round_trip_and_staleness():
+    index = ScheduleIndex.from_schedule(SCHEDULE)
+    payload = index.to_bytes(source_mtime=123.0, source_size=456)
+
+    loaded = ScheduleIndex.from_bytes(payload, 123.0, 456)
+    assert loaded.team_ids == index.team_ids
+    assert loaded.team_masks == index.team_masks
+    assert loaded.game_counts == index.game_counts
+    assert loaded.last_ends == index.last_ends
+
+    assert ScheduleIndex.from_bytes(payload, 124.0, 456) is None
+    assert ScheduleIndex.from_bytes(payload[:20]) is None
+    assert ScheduleIndex.from_bytes(b"junk" + payload[4:]) is None
+
+
+def test_get_schedule_index_uses_binary_cache(schedule_file, tmp_path, monkeypatch):
+    index = get_schedule_index()
+
+    assert index.teams_playing(1) == {1, 2}
+    assert (tmp_path / "schedule_index.bin").exists()
+
+    # Повторная загрузка берет бинарный индекс и не читает JSON
+    monkeypatch.setitem(schedule_index._cached, "key", None)
+    monkeypatch.setattr(schedule_index.json, "load", lambda f: pytest.fail("JSON не должен читаться"))
+    assert get_schedule_index().team_masks == index.team_masks
+
+
+def test_missing_schedule(tmp_path, monkeypatch):
+    monkeypatch.setattr(schedule_index.settings, "TEAM_SCHEDULES_FILE", tmp_path / "missing.json")
+    monkeypatch.setitem(schedule_index._cached, "key", None)
+
+    assert get_schedule_index() is None
+    assert schedule_index.has_games(2)
+    players = [{"player": {"proTeamId": 5}}]
+    assert filter_playing(players, 1) == players
+
+
+def test_filter_playing(schedule_file):
+    players = [
+        {"player": {"id": 1, "proTeamId": 1}},
+        {"player": {"id": 2, "proTeamId": 5}},
+        {"player": {"id": 3}},
+    ]
+
+    assert [entry["player"]["id"] for entry in filter_playing(players, 1)] == [1, 3]
+    assert not schedule_index.has_games(2)
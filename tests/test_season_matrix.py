@@ -0,0 +1,140 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.services.season_matrix import SeasonMatrix, espn_period_rows
+
+
+def espn_player(player_id, position_id, points, period_id):
+    return {
+        "player": {
+            "id": player_id,
+            "fullName": f"Игрок {player_id}",
+            "defaultPositionId": position_id,
+            "proTeamId": 1,
+            "stats": [
+                {"scoringPeriodId": 0, "appliedTotal": 999.0},
+                {"scoringPeriodId": period_id, "appliedTotal": points},
+            ]
+        }
+    }
+
+
+@pytest.fixture
+def matrix():
+    matrix = SeasonMatrix(periods=10, capacity=2)
+    matrix.set_period(1, [("1", 1, 5.0, None), ("2", 1, 3.0, None), ("3", 4, 2.0, None), ("4", 4, 4.0, None)])
+    matrix.set_period(2, [("2", 1, 6.0, None), ("3", 4, 3.0, None), ("5", 4, 1.0, None), ("6", 5, 7.5, None)])
+    return matrix
+
+
+def test_espn_period_rows_uses_period_stat():
+    """Тест разбора ответа ESPN: очки берутся из записи нужного игрового дня"""
+    rows = list(espn_period_rows([espn_player(7, 2, 4.5, 3), {"player": {"id": 8, "defaultPositionId": 9}}], 3))
+    assert rows == [("7", 2, 4.5, {"id": "7", "name": "Игрок 7", "primary_position": 2, "team_id": "1"})]
+
+
+def test_grows_rows_and_columns(matrix):
+    """Тест расширения матрицы под новых игроков и игровые дни"""
+    assert matrix.size == 6
+    matrix.set_period(15, [("1", 1, 2.0, None)])
+    assert matrix.periods == 15
+    assert matrix.has_period(1) and matrix.has_period(15) and not matrix.has_period(3)
+    assert matrix.range_totals(1, 15)[matrix.index["1"]] == pytest.approx(7.0)
+
+
+def test_set_period_overwrites(matrix):
+    """Тест перезаписи игрового дня"""
+    matrix.set_period(2, [("2", 1, 1.0, None)])
+    totals = matrix.range_totals(2, 2)
+    assert totals[matrix.index["2"]] == 1.0
+    assert totals[matrix.index["6"]] == 0.0
+
+
+def test_team_of_period(matrix):
+    """Тест команды дня и команды за диапазон"""
+    day = matrix.team_of_period(1, 1, {"C": 1, "D": 2, "G": 1})
+    assert day == {"C": [("1", 5.0)], "D": [("4", 4.0), ("3", 2.0)], "G": []}
+
+    week = matrix.team_of_period(1, 2, {"C": 1, "D": 2, "G": 1})
+    assert week == {"C": [("2", 9.0)], "D": [("3", 5.0), ("4", 4.0)], "G": [("6", 7.5)]}
+
+
+def test_ties_prefer_earlier_player():
+    """Тест: при равенстве очков выбирается игрок, добавленный раньше"""
+    matrix = SeasonMatrix(periods=3)
+    matrix.set_period(1, [(str(i), 4, 2.0, None) for i in range(10)])
+    team = matrix.team_of_period(1, 1, {"D": 2})
+    assert [player_id for player_id, _ in team["D"]] == ["0", "1"]
+
+
+def test_team_slots(matrix):
+    """Тест преобразования в слоты send_daily_teams"""
+    matrix.info["3"] = {"id": "3", "name": "Игрок 3"}
+    slots = matrix.team_slots(matrix.team_of_period(1, 2, {"C": 1, "D": 2}))
+    assert set(slots) == {"C", "D1", "D2"}
+    assert slots["D1"] == {"info": {"id": "3", "name": "Игрок 3"}, "stats": {"total_points": 5.0}}
+
+
+def test_save_and_load_memory_mapped(tmp_path, matrix):
+    """Тест сохранения в .npy и загрузки с отображением в память"""
+    matrix.save(tmp_path)
+    loaded = SeasonMatrix.load(tmp_path)
+    assert isinstance(loaded.points, np.memmap)
+    assert loaded.ids == matrix.ids
+    assert loaded.team_of_period(1, 2) == matrix.team_of_period(1, 2)
+
+    # Запись в загруженную только для чтения матрицу не меняет файлы
+    loaded.set_period(3, [("1", 1, 10.0, None), ("9", 3, 1.0, None)])
+    assert loaded.range_totals(1, 3)[loaded.index["1"]] == 15.0
+    assert SeasonMatrix.load(tmp_path).size == 6
+
+
+def test_empty_saved_matrix_grows_after_load(tmp_path):
+    """Тест: матрица без игроков (дни без матчей) после загрузки расширяется"""
+    empty = SeasonMatrix(periods=10)
+    empty.set_period(3, [])
+    empty.save(tmp_path)
+
+    loaded = SeasonMatrix.load(tmp_path)
+    assert loaded.points.shape[0] == 0
+    loaded.set_period(4, [("1", 1, 5.0, None)])
+
+    assert loaded.size == 1
+    assert loaded.range_totals(1, 4)[loaded.index["1"]] == 5.0
+
+
+def test_load_missing_directory(tmp_path):
+    """Тест загрузки отсутствующей матрицы"""
+    assert SeasonMatrix.load(tmp_path / "missing").size == 0
+
+
+def test_prefix_sums_match_direct_sums():
+    """Тест: суммы по накопленным суммам совпадают с прямым суммированием"""
+    rng = np.random.default_rng(1)
+    matrix = SeasonMatrix(periods=20, capacity=4)
+    # Дни записываются не по порядку, часть дней перезаписывается
+    for period_id in [5, 1, 3, 20, 5, 2, 12, 3]:
+        players = rng.choice(30, size=12, replace=False)
+        matrix.set_period(period_id, [
+            (str(player), int(player) % 5 + 1, float(rng.integers(0, 100)) / 4, None) for player in players
+        ])
+
+    for start, end in [(1, 20), (2, 5), (5, 5), (6, 11), (3, 12), (0, 30)]:
+        direct = matrix.points[:matrix.size, max(start, 1):end + 1].sum(axis=1, dtype=np.float64)
+        assert np.allclose(matrix.range_totals(start, end), direct)
+
+
+def test_new_periods_continue_cumulative(matrix):
+    """Тест: расширение по дням продолжает накопленные суммы"""
+    matrix.set_period(30, [("6", 5, 1.0, None)])
+    assert matrix.range_totals(1, 29)[matrix.index["6"]] == 7.5
+    assert matrix.range_totals(3, 30)[matrix.index["6"]] == 1.0
+
+
+def test_load_rebuilds_missing_cumulative(tmp_path, matrix):
+    """Тест: матрица без файла накопленных сумм загружается с их пересчетом"""
+    matrix.save(tmp_path)
+    (tmp_path / "cumulative.npy").unlink()
+    loaded = SeasonMatrix.load(tmp_path)
+    assert np.array_equal(loaded.range_totals(1, 2), matrix.range_totals(1, 2))
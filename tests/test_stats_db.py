@@ -0,0 +1,152 @@
+import importlib
+from datetime import datetime
+
+import pytest
+
+from src.services import stats_db
+from src.services.player_stats_store import PlayerStatsStore
+from src.services.stats_db import SqlitePlayerStatsStore, StatsDB, open_player_stats_store
+
+SELECTIONS = [
+    ("1", "Игрок 1", "2024-10-08", 12.5, "C", True),
+    ("2", "Игрок 2", "2024-10-08", 7.0, "D", True),
+    ("1", "Игрок 1", "2024-10-09", 3.5, "LW", True),
+    ("1", "Игрок 1", "2024-10-09", 99.0, "LW", True),  # повтор даты игнорируется
+    ("3", "Игрок 3", "2024-10-10", 4.0, "G", False),
+    ("2", "Игрок 2", "2024-10-15", 8.0, "D", True),
+]
+
+WEEK = "2024-10-08_2024-10-14"
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = StatsDB(tmp_path / "stats.sqlite3")
+    yield database
+    database.close()
+
+
+def apply(store):
+    grades = [store.record_selection(*selection) for selection in SELECTIONS]
+    store.flush()
+    return grades
+
+
+def test_sqlite_store_matches_json_store(tmp_path, db):
+    """Тест: SQLite-хранилище дает те же недельные записи, что и JSON"""
+    json_store = PlayerStatsStore(str(tmp_path / "player_stats.json")).load()
+    sqlite_store = SqlitePlayerStatsStore(db)
+
+    assert apply(json_store) == apply(sqlite_store)
+    for week_key in (WEEK, "2024-10-15_2024-10-21"):
+        assert sqlite_store.get_week_players(week_key) == json_store.get_week_players(week_key)
+    assert sqlite_store.get_grade(WEEK, "1") == json_store.get_grade(WEEK, "1") == "uncommon"
+
+
+def test_import_export_round_trip(tmp_path, db):
+    """Тест импорта player_stats.json и обратного экспорта"""
+    json_store = PlayerStatsStore(str(tmp_path / "player_stats.json")).load()
+    apply(json_store)
+    data = json_store.data
+
+    assert db.import_player_stats(data) == 5
+    exported = db.export_player_stats()
+    assert exported["weeks"] == data["weeks"]
+    assert exported["current_week"] == data["current_week"]
+
+    # Повторный импорт не дублирует записи
+    db.import_player_stats(data)
+    assert db.export_player_stats()["weeks"] == data["weeks"]
+
+
+def test_range_queries(db):
+    """Тест запросов по диапазону дат"""
+    apply(SqlitePlayerStatsStore(db))
+
+    assert db.player_points("1", "2024-10-08", "2024-10-14") == 16.0
+    assert db.player_points("2", "2024-10-01", "2024-10-31") == 15.0
+    assert db.player_points("2", "2024-10-09", "2024-10-14") == 0
+
+    leaders = db.leaderboard("2024-10-08", "2024-10-14", limit=2)
+    assert [row["player_id"] for row in leaders] == ["1", "2"]
+    assert leaders[0]["appearances"] == 2
+    assert leaders[0]["name"] == "Игрок 1"
+
+
+def test_weekly_stats_round_trip(db):
+    """Тест сохранения команд недели"""
+    stats = {
+        "weeks": {
+            WEEK: {
+                "C": [{"id": 1, "name": "Игрок 1", "total_points": 16.0}],
+                "D": [{"id": 2, "name": "Игрок 2", "total_points": 7.0},
+                      {"id": 4, "name": "Игрок 4", "total_points": 5.0}],
+            }
+        },
+        "last_update": "2024-10-15"
+    }
+    db.save_weekly_stats(stats)
+    assert db.load_weekly_stats() == stats
+
+    stats["weeks"][WEEK]["C"][0]["total_points"] = 17.0
+    db.save_weekly_stats(stats)
+    assert db.get_weekly_team(WEEK) == stats["weeks"][WEEK]
+    assert db.get_weekly_team("2024-10-15_2024-10-21") is None
+
+
+def test_daily_teams_round_trip(db):
+    """Тест сохранения команд дня по источникам"""
+    stats = {
+        "days": {"2024-10-08": {"C": {"info": {"id": 1, "name": "Игрок 1"}, "stats": {"total_points": 12.5}}}},
+        "players": {"1": {"name": "Игрок 1", "appearances": 1}}
+    }
+    db.save_daily_teams(stats, "stats")
+    assert db.load_daily_teams("stats") == stats
+    assert db.load_daily_teams("history", days_key="teams") == {"teams": {}, "players": {}}
+
+
+def test_open_player_stats_store(tmp_path):
+    """Тест выбора хранилища по STATS_BACKEND"""
+    store = open_player_stats_store(str(tmp_path / "player_stats.json"), backend="json")
+    assert isinstance(store, PlayerStatsStore)
+
+
+@pytest.fixture
+def app_day(monkeypatch):
+    monkeypatch.setenv("TELEGRAM_TOKEN", "123:test")
+    monkeypatch.setenv("CHAT_ID", "1")
+    return importlib.import_module("app_day")
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_update_week_period(tmp_path, monkeypatch, app_day, backend):
+    """Тест смены недели app_day на обоих хранилищах"""
+    tuesday, monday = datetime(2024, 10, 8), datetime(2024, 10, 14)
+    monkeypatch.setattr(app_day, "get_current_week_dates", lambda: (tuesday, monday))
+
+    def reopen():
+        if backend == "sqlite":
+            return SqlitePlayerStatsStore(StatsDB(tmp_path / "stats.sqlite3"))
+        return PlayerStatsStore(str(tmp_path / "player_stats.json")).load()
+
+    store = reopen()
+    assert app_day.update_week_period(store) == (tuesday, monday)
+    assert store.begin_week(tuesday, monday) is False
+
+    store = reopen()
+    assert store.get_current_week() == {"start_date": "2024-10-08", "end_date": "2024-10-14"}
+    assert store.get_week_players(WEEK) == {}
+
+
+def test_shared_stats_db(tmp_path, monkeypatch):
+    """Тест: загрузка и сохранение используют одно соединение"""
+    monkeypatch.setattr(stats_db.settings, "STATS_DB_FILE", tmp_path / "stats.sqlite3")
+    stats_db.close_stats_db()
+
+    db = stats_db.get_stats_db()
+    assert stats_db.get_stats_db() is db
+    assert SqlitePlayerStatsStore().db is db
+
+    stats_db.close_stats_db()
+    assert stats_db.get_stats_db() is not db
+    stats_db.close_stats_db()
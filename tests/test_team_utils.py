@@ -0,0 +1,65 @@
+import random
+
+from src.config import settings
+from src.utils.team_utils import get_best_players_by_position, select_top_by_position, team_slots, top_k
+
+
+def make_players(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        {
+            "info": {"id": str(i), "name": f"Игрок {i}", "primary_position": rng.randint(1, 6)},
+            # Мелкий шаг очков, чтобы было много равенств
+            "stats": {"total_points": rng.randint(-2, 20) / 2}
+        }
+        for i in range(count)
+    ]
+
+
+def position_of(player):
+    return settings.PLAYER_POSITIONS.get(player["info"]["primary_position"])
+
+
+def points_of(player):
+    return player["stats"]["total_points"]
+
+
+def test_top_k_matches_stable_sort():
+    """Тест: top_k совпадает с устойчивой сортировкой и срезом"""
+    players = make_players(300)
+    for count in (0, 1, 2, 5, 400):
+        assert top_k(players, count, points_of) == sorted(players, key=points_of, reverse=True)[:count]
+
+
+def test_select_top_by_position_matches_sort():
+    """Тест: выбор по позициям совпадает с группировкой и полной сортировкой"""
+    players = make_players(1000, seed=3)
+    composition = {"C": 1, "LW": 1, "RW": 1, "D": 3, "G": 2}
+    top = select_top_by_position(players, position_of, points_of, composition, min_points=0)
+
+    for position, count in composition.items():
+        group = [p for p in players if position_of(p) == position and points_of(p) > 0]
+        assert top[position] == sorted(group, key=points_of, reverse=True)[:count]
+
+
+def test_select_top_by_position_empty_positions():
+    """Тест: позиции без кандидатов присутствуют в результате пустыми"""
+    players = [{"info": {"primary_position": 1}, "stats": {"total_points": 0}}]
+    top = select_top_by_position(players, position_of, points_of, min_points=0)
+    assert top == {position: [] for position in settings.TEAM_OF_DAY_COMPOSITION}
+
+
+def test_team_slots():
+    """Тест раскладки по слотам"""
+    team = {"C": ["c"], "LW": ["lw"], "RW": [], "D": ["d1", "d2"], "G": ["g"]}
+    assert team_slots(team) == {"C": "c", "LW": "lw", "D1": "d1", "D2": "d2", "G": "g"}
+
+
+def test_get_best_players_by_position():
+    """Тест выбора команды из списка игроков"""
+    players = make_players(200, seed=5)
+    team = get_best_players_by_position(players)
+    assert set(team) == {"C", "LW", "RW", "D1", "D2", "G"}
+    defense = sorted([p for p in players if position_of(p) == "D"], key=points_of, reverse=True)
+    assert [team["D1"], team["D2"]] == defense[:2]
+    assert get_best_players_by_position(players[:2]) is None
@@ -0,0 +1,87 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from telegram.error import BadRequest
+
+from src.services.telegram_files import FileIdStore, content_hash, send_photo
+
+
+class FakeBot:
+    def __init__(self, token="123:secret", reject_file_ids=False):
+        self.token = token
+        self.reject_file_ids = reject_file_ids
+        self.sent = []
+
+    async def send_photo(self, chat_id, photo, **kwargs):
+        self.sent.append((chat_id, photo))
+        if kwargs.get("parse_mode") == "Markdown" and "_" in kwargs.get("caption", ""):
+            raise BadRequest("Can't parse entities: can't find end of the entity starting at byte offset 5")
+        if isinstance(photo, str) and self.reject_file_ids:
+            raise BadRequest("Wrong file identifier/http url specified")
+        return SimpleNamespace(photo=[
+            SimpleNamespace(file_id="small"),
+            SimpleNamespace(file_id=f"id-{len(self.sent)}"),
+        ])
+
+
+def test_upload_once_then_file_id(tmp_path):
+    store = FileIdStore(tmp_path / "ids.json")
+    bot = FakeBot()
+
+    async def run():
+        await send_photo(bot, "chat-1", b"collage", store, caption="x")
+        await send_photo(bot, "chat-2", b"collage", store, caption="x")
+        await send_photo(bot, "chat-1", b"other", store)
+
+    asyncio.run(run())
+
+    assert bot.sent == [("chat-1", b"collage"), ("chat-2", "id-1"), ("chat-1", b"other")]
+    assert store.get(bot, content_hash(b"collage")) == "id-1"
+
+
+def test_store_persists_per_bot(tmp_path):
+    path = tmp_path / "ids.json"
+    bot = FakeBot()
+    FileIdStore(path).put(bot, "digest", "file-id")
+
+    reloaded = FileIdStore(path)
+
+    assert reloaded.get(bot, "digest") == "file-id"
+    assert reloaded.get(FakeBot(token="456:other"), "digest") is None
+
+
+def test_store_keeps_entries_of_other_processes(tmp_path):
+    path = tmp_path / "ids.json"
+    bot = FakeBot()
+    first, second = FileIdStore(path), FileIdStore(path)
+
+    first.put(bot, "a", "id-a")
+    second.put(bot, "b", "id-b")
+
+    assert FileIdStore(path).get(bot, "a") == "id-a"
+    assert FileIdStore(path).get(bot, "b") == "id-b"
+
+
+def test_invalid_file_id_is_replaced(tmp_path):
+    store = FileIdStore(tmp_path / "ids.json")
+    bot = FakeBot(reject_file_ids=True)
+    store.put(bot, content_hash(b"collage"), "stale")
+
+    asyncio.run(send_photo(bot, "chat", b"collage", store))
+
+    assert bot.sent == [("chat", "stale"), ("chat", b"collage")]
+    assert FileIdStore(tmp_path / "ids.json").get(bot, content_hash(b"collage")) == "id-2"
+
+
+def test_caption_error_keeps_file_id(tmp_path):
+    """Тест: ошибка подписи не удаляет file_id и не вызывает повторную загрузку"""
+    store = FileIdStore(tmp_path / "ids.json")
+    bot = FakeBot()
+    store.put(bot, content_hash(b"collage"), "valid")
+
+    with pytest.raises(BadRequest):
+        asyncio.run(send_photo(bot, "chat", b"collage", store, caption="bad_markdown", parse_mode="Markdown"))
+
+    assert bot.sent == [("chat", "valid")]
+    assert FileIdStore(tmp_path / "ids.json").get(bot, content_hash(b"collage")) == "valid"
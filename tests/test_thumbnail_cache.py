@@ -0,0 +1,84 @@
+import time
+
+import pytest
+from PIL import Image
+
+from src.services.thumbnail_cache import ThumbnailCache
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return tmp_path / "thumbnails"
+
+
+@pytest.fixture
+def thumbnail():
+    return Image.new('RGB', (130, 100), 'red')
+
+
+def test_put_and_get(cache_dir, thumbnail):
+    """Тест сохранения и получения миниатюры"""
+    cache = ThumbnailCache(str(cache_dir))
+    cache.put("1", (130, 100), thumbnail, etag='"abc"')
+
+    assert cache.get("1", (130, 100)) is thumbnail
+    assert cache.get("1", (200, 200)) is None
+    assert (cache_dir / "1_130x100.png").exists()
+
+
+def test_disk_tier_survives_restart(cache_dir, thumbnail):
+    """Тест дискового уровня: новый экземпляр читает миниатюру и метаданные"""
+    ThumbnailCache(str(cache_dir)).put("1", (130, 100), thumbnail, etag='"abc"')
+
+    entry = ThumbnailCache(str(cache_dir)).get_entry("1", (130, 100))
+
+    assert entry is not None
+    assert entry.image.size == (130, 100)
+    assert entry.image.getpixel((0, 0)) == (255, 0, 0)
+    assert entry.etag == '"abc"'
+
+
+def test_expired_entry(cache_dir, thumbnail, monkeypatch):
+    """Тест устаревания: get не отдает миниатюру, get_entry отдает"""
+    cache = ThumbnailCache(str(cache_dir), ttl=60)
+    cache.put("1", (130, 100), thumbnail)
+
+    future_time = time.time() + 61
+    monkeypatch.setattr(time, 'time', lambda: future_time)
+
+    assert cache.get("1", (130, 100)) is None
+    assert cache.get_entry("1", (130, 100)) is not None
+
+    cache.touch("1", (130, 100))
+    assert cache.get("1", (130, 100)) is thumbnail
+
+
+def test_memory_lru_eviction(cache_dir):
+    """Тест вытеснения из памяти: старые записи остаются только на диске"""
+    cache = ThumbnailCache(str(cache_dir), memory_size=2)
+    for player_id in ("1", "2", "3"):
+        cache.put(player_id, (130, 100), Image.new('RGB', (130, 100)))
+
+    assert list(key[0] for key in cache._memory) == ["2", "3"]
+    assert cache.get("1", (130, 100)) is not None
+
+
+def test_put_writes_atomically(cache_dir, thumbnail, monkeypatch):
+    """Тест атомарной записи: при сбое старые файлы остаются целыми, временных файлов нет"""
+    cache = ThumbnailCache(str(cache_dir))
+    cache.put("1", (130, 100), thumbnail, etag='"old"')
+    old_png = (cache_dir / "1_130x100.png").read_bytes()
+    old_meta = (cache_dir / "1_130x100.json").read_text(encoding='utf-8')
+    assert not list(cache_dir.glob("*.tmp"))
+
+    def broken_save(self, fp, *args, **kwargs):
+        with open(fp, 'wb') as f:
+            f.write(b'\x89PNG')
+        raise OSError("disk full")
+
+    monkeypatch.setattr(Image.Image, 'save', broken_save)
+    cache.put("1", (130, 100), Image.new('RGB', (130, 100), 'blue'), etag='"new"')
+
+    assert (cache_dir / "1_130x100.png").read_bytes() == old_png
+    assert (cache_dir / "1_130x100.json").read_text(encoding='utf-8') == old_meta
+    assert not list(cache_dir.glob("*.tmp"))
@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 import json
 import pytz
@@ -300,4 +301,52 @@ def test_form_weekly_team_appearances_history(stats_service, sample_week_data, t
     assert len(player5["appearances"]) == 3
     assert player5["appearances"]["2024-10-07"]["points"] == 6
     assert player5["appearances"]["2024-10-08"]["points"] == 8
-    assert player5["appearances"]["2024-10-09"]["points"] == 7 
\ No newline at end of file
+    assert player5["appearances"]["2024-10-09"]["points"] == 7 
+
+@pytest.fixture
+def app_week(monkeypatch):
+    """app_week без Telegram и без записи в week_log.txt"""
+    import importlib
+    import logging
+    monkeypatch.setenv("TELEGRAM_TOKEN", "123:test")
+    monkeypatch.setenv("CHAT_ID", "1")
+    monkeypatch.setattr(logging, "FileHandler", lambda *args, **kwargs: logging.NullHandler())
+    return importlib.import_module("app_week")
+
+
+def test_process_all_weeks_skips_unchanged_team(app_week, monkeypatch):
+    """Тест: новые записи игроков без изменения команды не отправляются повторно"""
+    week = "2024-10-08_2024-10-14"
+    player = {
+        "name": "Player1", "grade": "common",
+        "team_of_the_day_dates": ["C:2024-10-08"],
+        "daily_stats": {"2024-10-08": {"points": 10, "position": "C", "team_of_the_day": True}}
+    }
+    bench = {"name": "Player2", "grade": "common", "team_of_the_day_dates": [],
+             "daily_stats": {"2024-10-09": {"points": 1, "position": "D", "team_of_the_day": False}}}
+    player_stats = {"weeks": {week: {"players": {"1": player}}}}
+    weekly_stats = {"weeks": {}}
+    sent = []
+
+    async def send_weekly_team(team, week_str, render=None):
+        sent.append(week_str)
+        return True
+
+    async def render_weekly_collage(team, week_str, renderer=None):
+        return b"collage"
+
+    monkeypatch.setattr(app_week, "load_player_stats", lambda: player_stats)
+    monkeypatch.setattr(app_week, "load_weekly_stats", lambda: weekly_stats)
+    monkeypatch.setattr(app_week, "save_weekly_stats", lambda stats: None)
+    monkeypatch.setattr(app_week, "send_weekly_team", send_weekly_team)
+    monkeypatch.setattr(app_week, "render_weekly_collage", render_weekly_collage)
+
+    asyncio.run(app_week.process_all_weeks())
+    first_fingerprint = weekly_stats["fingerprints"][week]
+
+    # Новая дневная запись меняет отпечаток недели, но не команду
+    player_stats["weeks"][week]["players"]["2"] = bench
+    asyncio.run(app_week.process_all_weeks())
+
+    assert sent == [week]
+    assert weekly_stats["fingerprints"][week] != first_fingerprint